@@ -84,6 +84,9 @@ class InstanceConfig(BaseModel):
     cache_shared_labels: Optional[bool]
     collect_counters_with_distributions: Optional[bool]
     collect_histogram_buckets: Optional[bool]
+    compile_sample_pipelines: Optional[bool]
+    concurrent_scrapers: Optional[int]
+    conditional_requests: Optional[bool]
     connect_timeout: Optional[float]
     datacenter_metrics: Optional[Sequence[str]]
     datacenters: Optional[Sequence[str]]
@@ -135,6 +138,7 @@ class InstanceConfig(BaseModel):
     tag_by_endpoint: Optional[bool]
     tags: Optional[Sequence[str]]
     telemetry: Optional[bool]
+    text_parser: Optional[str]
     timeout: Optional[float]
     tls_ca_cert: Optional[str]
     tls_cert: Optional[str]
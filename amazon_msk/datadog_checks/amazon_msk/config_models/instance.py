@@ -87,6 +87,9 @@ class InstanceConfig(BaseModel):
     cluster_arn: str
     collect_counters_with_distributions: Optional[bool]
     collect_histogram_buckets: Optional[bool]
+    compile_sample_pipelines: Optional[bool]
+    concurrent_scrapers: Optional[int]
+    conditional_requests: Optional[bool]
     connect_timeout: Optional[float]
     disable_generic_tags: Optional[bool]
     empty_default_hostname: Optional[bool]
@@ -136,6 +139,7 @@ class InstanceConfig(BaseModel):
     tag_by_endpoint: Optional[bool]
     tags: Optional[Sequence[str]]
     telemetry: Optional[bool]
+    text_parser: Optional[str]
     timeout: Optional[float]
     tls_ca_cert: Optional[str]
     tls_cert: Optional[str]
@@ -66,6 +66,18 @@ def instance_collect_histogram_buckets(field, value):
     return True
 
 
+def instance_compile_sample_pipelines(field, value):
+    return False
+
+
+def instance_concurrent_scrapers(field, value):
+    return 0
+
+
+def instance_conditional_requests(field, value):
+    return False
+
+
 def instance_connect_timeout(field, value):
     return get_default_field_value(field, value)
 
@@ -250,6 +262,10 @@ def instance_telemetry(field, value):
     return False
 
 
+def instance_text_parser(field, value):
+    return 'prometheus_client'
+
+
 def instance_timeout(field, value):
     return 10
 
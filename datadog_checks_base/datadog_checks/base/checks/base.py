@@ -11,6 +11,7 @@ import re
 import traceback
 import unicodedata
 from collections import deque
+from itertools import repeat
 from os.path import basename
 from typing import (  # noqa: F401
     TYPE_CHECKING,
@@ -28,7 +29,7 @@ from typing import (  # noqa: F401
 )
 
 import yaml
-from six import PY2, binary_type, iteritems, raise_from, text_type
+from six import PY2, binary_type, iteritems, raise_from, string_types, text_type
 
 from ..config import is_affirmative
 from ..constants import ServiceCheck
@@ -48,7 +49,7 @@ from ..utils.http import RequestsWrapper
 from ..utils.limiter import Limiter
 from ..utils.metadata import MetadataManager
 from ..utils.secrets import SecretsSanitizer
-from ..utils.tagging import GENERIC_TAGS
+from ..utils.tagging import GENERIC_TAGS, TagSet
 from ..utils.tls import TlsContextWrapper
 from ..utils.tracing import traced_class
 
@@ -87,6 +88,17 @@ if TYPE_CHECKING:
 
 # Metric types for which it's only useful to submit once per set of tags
 ONE_PER_CONTEXT_METRIC_TYPES = [aggregator.GAUGE, aggregator.RATE, aggregator.MONOTONIC_COUNT]
+# Metric types accepted by `AgentCheck.submit_metric_batch`
+BATCH_METRIC_TYPES = {
+    'gauge': aggregator.GAUGE,
+    'count': aggregator.COUNT,
+    'monotonic_count': aggregator.MONOTONIC_COUNT,
+    'rate': aggregator.RATE,
+    'histogram': aggregator.HISTOGRAM,
+    'historate': aggregator.HISTORATE,
+}
+# Maximum number of entries kept by the caches used by `AgentCheck.submit_metric_batch`
+BATCH_CACHE_SIZE = 10000
 TYPO_SIMILARITY_THRESHOLD = 0.95
 
 
@@ -289,6 +301,12 @@ class AgentCheck(object):
         # Setup metric limits
         self.metric_limiter = self._get_metric_limiter(self.name, instance=self.instance)
 
+        # Normalized metric names and tags reused across calls to `submit_metric_batch`
+        self._batch_metric_names = {}  # type: Dict[Tuple[str, str, bool], Optional[str]]
+        self._batch_tags = {}  # type: Dict[Tuple[str, ...], Sequence[str]]
+        # Tag sets with generic tags renamed, only used when `disable_generic_tags` is set
+        self._degeneralised_tag_sets = {}  # type: Dict[TagSet, TagSet]
+
         # Lazily load and validate config
         self._config_model_instance = None  # type: Any
         self._config_model_shared = None  # type: Any
@@ -588,7 +606,11 @@ class AgentCheck(object):
 
     def _context_uid(self, mtype, name, tags=None, hostname=None):
         # type: (int, str, Sequence[str], str) -> str
-        return '{}-{}-{}-{}'.format(mtype, name, tags if tags is None else hash(frozenset(tags)), hostname)
+        if tags is not None:
+            # Tag sets carry the hash of their tags
+            tags = hash(tags if isinstance(tags, TagSet) else frozenset(tags))
+
+        return '{}-{}-{}-{}'.format(mtype, name, tags, hostname)
 
     def submit_histogram_bucket(
         self, name, value, lower_bound, upper_bound, monotonic, hostname, tags, raw=False, flush_first_value=False
@@ -703,6 +725,95 @@ class AgentCheck(object):
 
         aggregator.submit_metric(self, self.check_id, mtype, name, value, tags, hostname, flush_first_value)
 
+    def submit_metric_batch(self, metric_type, names, values, tags, hostnames=None, raw=False, flush_first_value=False):
+        # type: (str, Union[str, Sequence[str]], Sequence[float], Sequence[Tuple[str, ...]], Any, bool, bool) -> None
+        """Submit many points of the same metric type at once.
+
+        The arguments are columns, the point at index `i` is made of `names[i]`, `values[i]`, `tags[i]`
+        and `hostnames[i]`. A single name or hostname may be given for every point instead.
+
+        Metric names and tags are normalized once and reused for every subsequent point and call, so
+        tags must be hashable, e.g. tuples of strings or `TagSet` instances. This is meant for checks that
+        submit many points for a bounded number of tag sets.
+
+        **Parameters:**
+
+        - **metric_type** (_str_) - one of `gauge`, `count`, `monotonic_count`, `rate`, `histogram` or `historate`
+        - **names** (_Union[str, List[str]]_) - the name of the metric, or the name of every point
+        - **values** (_List[float]_) - the value of every point
+        - **tags** (_List[Tuple[str, ...]]_) - the tags of every point
+        - **hostnames** (_Union[str, List[str]]_) - the hostname, or the hostname of every point.
+            Defaults to the current host.
+        - **raw** (_bool_) - whether to ignore any defined namespace prefix
+        - **flush_first_value** (_bool_) - whether to sample the first value of monotonic counts
+        """
+        mtype = BATCH_METRIC_TYPES.get(metric_type)
+        if mtype is None:
+            raise ValueError('Unknown metric type `{}`'.format(metric_type))
+
+        if isinstance(names, string_types):
+            names = repeat(names)
+        if hostnames is None or isinstance(hostnames, string_types):
+            hostnames = repeat(hostnames or '')
+        else:
+            hostnames = (hostname or '' for hostname in hostnames)
+
+        submit_metric = aggregator.submit_metric
+        check_id = self.check_id
+        metric_limiter = self.metric_limiter
+        one_per_context = mtype in ONE_PER_CONTEXT_METRIC_TYPES
+        batch_metric_names = self._batch_metric_names
+        batch_tags = self._batch_tags
+        namespace = self.__NAMESPACE__
+
+        for name, value, point_tags, hostname in zip(names, values, tags, hostnames):
+            if value is None:
+                continue
+
+            name_key = (namespace, name, raw)
+            try:
+                metric_name = batch_metric_names[name_key]
+            except KeyError:
+                if len(batch_metric_names) >= BATCH_CACHE_SIZE:
+                    batch_metric_names.clear()
+
+                metric_name = self._format_namespace(name, raw)
+                if not self.should_send_metric(metric_name):
+                    metric_name = None
+
+                batch_metric_names[name_key] = metric_name
+
+            if metric_name is None:
+                continue
+
+            try:
+                normalized_tags = batch_tags[point_tags]
+            except KeyError:
+                if len(batch_tags) >= BATCH_CACHE_SIZE:
+                    batch_tags.clear()
+
+                normalized_tags = batch_tags[point_tags] = self._normalize_tags_type(point_tags or (), None, name)
+
+            if metric_limiter:
+                if one_per_context:
+                    if metric_limiter.is_reached():
+                        continue
+                elif metric_limiter.is_reached(self._context_uid(mtype, metric_name, normalized_tags, hostname)):
+                    continue
+
+            try:
+                value = float(value)
+            except ValueError:
+                err_msg = 'Metric: {} has non float value: {}. Only float values can be submitted as metrics.'.format(
+                    repr(metric_name), repr(value)
+                )
+                if using_stub_aggregator:
+                    raise ValueError(err_msg)
+                self.warning(err_msg)
+                continue
+
+            submit_metric(self, check_id, mtype, metric_name, value, normalized_tags, hostname, flush_first_value)
+
     def gauge(self, name, value, tags=None, hostname=None, device_name=None, raw=False):
         # type: (str, float, Sequence[str], str, str, bool) -> None
         """Sample a gauge metric.
@@ -966,7 +1077,7 @@ class AgentCheck(object):
             for hostname, source_map in external_tags:
                 new_tags.append((to_native_string(hostname), source_map))
                 for src_name, tags in iteritems(source_map):
-                    source_map[src_name] = self._normalize_tags_type(tags)
+                    source_map[src_name] = list(self._normalize_tags_type(tags))
             datadog_agent.set_external_tags(new_tags)
         except IndexError:
             self.log.exception('Unexpected external tags format: %s', external_tags)
@@ -1205,13 +1316,28 @@ class AgentCheck(object):
         aggregator.submit_event(self, self.check_id, event)
 
     def _normalize_tags_type(self, tags, device_name=None, metric_name=None):
-        # type: (Sequence[Union[None, str, bytes]], str, str) -> List[str]
+        # type: (Sequence[Union[None, str, bytes]], str, str) -> Sequence[str]
         """
         Normalize tags contents and type:
         - append `device_name` as `device:` tag
         - normalize tags type
         - doesn't mutate the passed list, returns a new list
+        - `TagSet` instances are already normalized and returned as is, unless generic tags must be renamed
         """
+        if isinstance(tags, TagSet) and not device_name:
+            if not self.disable_generic_tags:
+                return tags
+
+            degeneralised_tag_set = self._degeneralised_tag_sets.get(tags)
+            if degeneralised_tag_set is None:
+                if len(self._degeneralised_tag_sets) >= BATCH_CACHE_SIZE:
+                    self._degeneralised_tag_sets.clear()
+
+                degeneralised_tag_set = TagSet(self.degeneralise_tag(tag) for tag in tags)
+                self._degeneralised_tag_sets[tags] = degeneralised_tag_set
+
+            return degeneralised_tag_set
+
         normalized_tags = []
 
         if device_name:
@@ -19,11 +19,16 @@
 #
 # The methods of a Pool object use all these concepts and expose
 # them to their caller in a very simple way.
+#
+# Datadog additions: the pool keeps statistics about its work queue and
+# workers that can be reported through the owning check, and can grow and
+# shrink its number of workers within bounds based on the backlog.
 
 # ruff: noqa
 
 import sys
 import threading
+import time
 import traceback
 
 from six.moves import queue, range
@@ -31,6 +36,10 @@ from six.moves import queue, range
 # Item pushed on the work queue to tell the worker threads to terminate
 SENTINEL = "QUIT"
 
+# Number of seconds an idle worker waits for work before exiting, when the
+# pool has more workers than its lower bound
+DEFAULT_IDLE_TIMEOUT = 5
+
 
 def is_sentinel(obj):
     """Predicate to determine whether an item from the queue is the
@@ -48,22 +57,46 @@ class PoolWorker(threading.Thread):
     """Thread that consumes WorkUnits from a queue to process them"""
 
     def __init__(self, workq, *args, **kwds):
-        """:param workq: Queue object to consume the work units from"""
+        """
+        :param workq: Queue object to consume the work units from
+        :param pool: Pool object the worker belongs to, which records
+        the statistics of the work units and decides whether an idle
+        worker should exit. Can be None.
+        """
+        self._pool = kwds.pop("pool", None)
         threading.Thread.__init__(self, *args, **kwds)
         self._workq = workq
         self.running = False
+        self.busy = False
 
     def run(self):
         """Process the work unit, or wait for sentinel to exit"""
+        pool = self._pool
+        idle_timeout = pool._idle_timeout if pool is not None and pool.adaptive else None
         while True:
             self.running = True
-            workunit = self._workq.get()
+            try:
+                workunit = self._workq.get(timeout=idle_timeout)
+            except queue.Empty:
+                if pool._retire(self):
+                    break
+                continue
+
             if is_sentinel(workunit):
                 # Got sentinel
                 break
 
             # Run the job / sequence
-            workunit.process()
+            self.busy = True
+            start = time.time()
+            try:
+                workunit.process()
+            finally:
+                self.busy = False
+                if pool is not None:
+                    pool._record(workunit, start, time.time())
+        if pool is not None:
+            pool._remove_worker(self)
         self.running = False
 
 
@@ -74,30 +107,128 @@ class Pool(object):
     few different ways
     """
 
-    def __init__(self, nworkers, name="Pool"):
+    def __init__(self, nworkers, name="Pool", min_workers=None, max_workers=None, idle_timeout=DEFAULT_IDLE_TIMEOUT):
         """
         :param nworkers: number of worker threads to start
         :type nworkers: integer
         :param name: prefix for the worker threads' name
         :type name: string
-        """
+        :param min_workers: lower bound of the number of workers in
+        adaptive mode, defaults to nworkers
+        :type min_workers: integer
+        :param max_workers: upper bound of the number of workers. When
+        greater than min_workers, the pool is adaptive: a worker is
+        started whenever the backlog outgrows the idle workers, and
+        workers idle for idle_timeout seconds exit until only
+        min_workers are left
+        :type max_workers: integer
+        :param idle_timeout: number of seconds an idle worker waits for
+        work before exiting in adaptive mode
+        :type idle_timeout: float
+        """
+        if min_workers is None:
+            min_workers = nworkers
+        if max_workers is None:
+            max_workers = max(nworkers, min_workers)
+        if not 0 < min_workers <= nworkers <= max_workers:
+            raise ValueError(
+                "The number of workers must satisfy 0 < min_workers <= nworkers <= max_workers, "
+                "got %s <= %s <= %s" % (min_workers, nworkers, max_workers)
+            )
+
+        self._name = name
+        self._min_workers = min_workers
+        self._max_workers = max_workers
+        self._idle_timeout = idle_timeout
+        self.adaptive = max_workers > min_workers
+
         self._workq = queue.Queue()
         self._closed = False
         self._workers = []
-        for idx in range(nworkers):
-            thr = PoolWorker(self._workq, name="Worker-%s-%d" % (name, idx))
+        self._worker_idx = 0
+        self._lock = threading.Lock()
+        self._reset_stats()
+        for _ in range(nworkers):
             try:
-                thr.start()
+                self._start_worker()
             except:
                 # If one thread has a problem, undo everything
                 self.terminate()
                 raise
-            else:
-                self._workers.append(thr)
 
     def get_nworkers(self):
         return len([w for w in self._workers if w.running])
 
+    def get_state(self):
+        """
+        Return the current state of the pool, the statistics keep being
+        gathered:
+
+        - queue_size: number of work units waiting for a worker
+        - workers: number of worker threads
+        - busy_workers: number of workers processing a work unit
+        - utilization: ratio of the time the workers spent processing
+          work units to the time they were alive, since the statistics
+          were last retrieved
+        """
+        with self._lock:
+            return self._get_state(time.time())
+
+    def get_stats(self):
+        """
+        Return the state of the pool (see get_state()) along with the
+        statistics gathered since the pool was started or since the
+        previous call, and start gathering new ones:
+
+        - completed: number of jobs processed
+        - wait_times: seconds each work unit waited in the queue
+        - run_times: seconds each work unit took to be processed
+
+        A work unit is either a single job or, for the map() family of
+        methods, a chunk of chunksize jobs.
+        """
+        with self._lock:
+            now = time.time()
+            stats = self._get_state(now)
+            stats["completed"] = self._completed
+            stats["wait_times"] = self._wait_times
+            stats["run_times"] = self._run_times
+            self._reset_stats(now)
+        return stats
+
+    def submit_gauges(self, check, prefix, tags=None):
+        """
+        Submit the current state of the pool (see get_state()) as gauges
+        of the given check: <prefix>.queue_size, <prefix>.workers,
+        <prefix>.busy_workers and <prefix>.utilization
+
+        The state is only meaningful while the pool is running, workers
+        exit once it is stopped.
+        """
+        state = self.get_state()
+        for name in ("queue_size", "workers", "busy_workers", "utilization"):
+            check.gauge("%s.%s" % (prefix, name), state[name], tags=tags, raw=True)
+
+    def submit_metrics(self, check, prefix, tags=None, gauges=True):
+        """
+        Submit the statistics of the pool (see get_stats()) as metrics
+        of the given check, named after prefix:
+
+        - <prefix>.queue_size, <prefix>.workers, <prefix>.busy_workers
+          and <prefix>.utilization gauges, unless gauges is False
+        - <prefix>.jobs.completed count
+        - <prefix>.jobs.wait_time and <prefix>.jobs.run_time histograms
+        """
+        stats = self.get_stats()
+        if gauges:
+            for name in ("queue_size", "workers", "busy_workers", "utilization"):
+                check.gauge("%s.%s" % (prefix, name), stats[name], tags=tags, raw=True)
+        check.count("%s.jobs.completed" % prefix, stats["completed"], tags=tags, raw=True)
+        for wait_time in stats["wait_times"]:
+            check.histogram("%s.jobs.wait_time" % prefix, wait_time, tags=tags, raw=True)
+        for run_time in stats["run_times"]:
+            check.histogram("%s.jobs.run_time" % prefix, run_time, tags=tags, raw=True)
+
     def apply(self, func, args=(), kwds=dict()):
         """Equivalent of the apply() builtin function. It blocks till
         the result is ready."""
@@ -152,7 +283,7 @@ class Pool(object):
         assert not self._closed  # No lock here. We assume it's atomic...
         apply_result = ApplyResult(callback=callback)
         job = Job(func, args, kwds, apply_result)
-        self._workq.put(job)
+        self._put(job)
         return apply_result
 
     def map_async(self, func, iterable, chunksize=None, callback=None):
@@ -227,7 +358,8 @@ class Pool(object):
     def join(self):
         """Wait for the worker processes to exit. One must call
         close() or terminate() before using join()."""
-        for thr in self._workers:
+        # Workers leave the list as they exit
+        for thr in list(self._workers):
             thr.join()
 
     def _create_sequences(self, func, iterable, chunksize, collector=None):
@@ -261,15 +393,98 @@ class Pool(object):
             sequences.append(JobSequence(seq))
 
         for seq in sequences:
-            self._workq.put(seq)
+            self._put(seq)
 
         return sequences
 
+    def _put(self, workunit):
+        """Push a work unit on the work queue, starting a new worker if
+        the pool is adaptive and the backlog exceeds the idle workers"""
+        workunit.queued_at = time.time()
+        self._workq.put(workunit)
+        if not self.adaptive or self._closed:
+            return
+
+        with self._lock:
+            if len(self._workers) >= self._max_workers:
+                return
+            idle_workers = sum(1 for w in self._workers if not w.busy)
+            if self._workq.qsize() > idle_workers:
+                self._start_worker(locked=True)
+
+    def _start_worker(self, locked=False):
+        thr = PoolWorker(self._workq, name="Worker-%s-%d" % (self._name, self._worker_idx), pool=self)
+        self._worker_idx += 1
+        thr.start()
+        if not locked:
+            self._lock.acquire()
+        try:
+            self._update_capacity(time.time())
+            self._workers.append(thr)
+        finally:
+            if not locked:
+                self._lock.release()
+
+    def _retire(self, worker):
+        """Called by an idle worker of an adaptive pool, tells whether
+        it should exit"""
+        with self._lock:
+            if len(self._workers) <= self._min_workers or worker not in self._workers:
+                return False
+            self._update_capacity(time.time())
+            self._workers.remove(worker)
+            return True
+
+    def _remove_worker(self, worker):
+        with self._lock:
+            if worker in self._workers:
+                self._update_capacity(time.time())
+                self._workers.remove(worker)
+
+    def _record(self, workunit, start, end):
+        """Called by a worker once it processed a work unit"""
+        if not workunit.size:
+            return
+        with self._lock:
+            self._completed += workunit.size
+            self._wait_times.append(start - getattr(workunit, "queued_at", start))
+            self._run_times.append(end - start)
+            self._busy_time += end - start
+
+    def _update_capacity(self, now):
+        """Account for the time the current workers were alive since
+        the last change of their number, must be called with the lock
+        held"""
+        self._capacity += len(self._workers) * (now - self._capacity_ts)
+        self._capacity_ts = now
+
+    def _get_state(self, now):
+        """Must be called with the lock held"""
+        self._update_capacity(now)
+        return {
+            "queue_size": self._workq.qsize(),
+            "workers": len(self._workers),
+            "busy_workers": sum(1 for w in self._workers if w.busy),
+            # Work units running across two calls are accounted for in the second one
+            "utilization": min(1.0, self._busy_time / self._capacity) if self._capacity > 0 else 0.0,
+        }
+
+    def _reset_stats(self, now=None):
+        self._completed = 0
+        self._wait_times = []
+        self._run_times = []
+        self._busy_time = 0.0
+        self._capacity = 0.0
+        self._capacity_ts = time.time() if now is None else now
+
 
 class WorkUnit(object):
     """ABC for a unit of work submitted to the worker threads. It's
     basically just an object equipped with a process() method"""
 
+    # Number of jobs processed by the work unit
+    size = 1
+
     def process(self):
         """Do the work. Shouldn't raise any exception"""
         raise NotImplementedError("Children must override Process")
@@ -311,6 +526,7 @@ class JobSequence(WorkUnit):
     def __init__(self, jobs):
         WorkUnit.__init__(self)
         self._jobs = jobs
+        self.size = len(jobs)
 
     def process(self):
         """
@@ -4,6 +4,7 @@
 # TODO: remove ignore when we stop invoking Mypy with --py2
 # type: ignore
 from collections import ChainMap
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 
 from requests.exceptions import RequestException
@@ -51,11 +52,26 @@ class OpenMetricsBaseCheckV2(AgentCheck):
         # All configured scrapers keyed by the endpoint
         self.scrapers = {}
 
+        # The maximum number of endpoints to download at the same time, scrapers run one after the other if unset
+        self.concurrent_scrapers = self.instance.get('concurrent_scrapers', 0) if self.instance else 0
+        if (
+            not isinstance(self.concurrent_scrapers, int)
+            or isinstance(self.concurrent_scrapers, bool)
+            or self.concurrent_scrapers < 0
+        ):
+            raise ConfigurationError('Setting `concurrent_scrapers` must be a non-negative integer')
+
+        # Created lazily as most checks only ever have a single scraper
+        self.scraper_executor = None
+
         self.check_initializations.append(self.configure_scrapers)
 
     def check(self, _):
         self.refresh_scrapers()
 
+        if self.concurrent_scrapers and len(self.scrapers) > 1:
+            self.prefetch_scrapers()
+
         for endpoint, scraper in self.scrapers.items():
             self.log.info('Scraping OpenMetrics endpoint: %s', endpoint)
 
@@ -66,6 +82,26 @@ class OpenMetricsBaseCheckV2(AgentCheck):
                     self.log.error("There was an error scraping endpoint %s: %s", endpoint, str(e))
                     raise_from(type(e)("There was an error scraping endpoint {}: {}".format(endpoint, e)), None)
 
+    def prefetch_scrapers(self):
+        """
+        Download the payloads of every endpoint concurrently.
+
+        Only the HTTP requests are executed by the worker threads, each scraper then parses
+        its payload and submits data on the check's thread when it runs.
+        """
+
+        if self.scraper_executor is None:
+            self.scraper_executor = ThreadPoolExecutor(
+                max_workers=self.concurrent_scrapers, thread_name_prefix=f'{self.name}-scraper'
+            )
+
+        for scraper in self.scrapers.values():
+            scraper.prefetch(self.scraper_executor)
+
+    def cancel(self):
+        if self.scraper_executor is not None:
+            self.scraper_executor.shutdown(wait=False)
+
     def configure_scrapers(self):
         """
         Creates a scraper configuration for each instance.
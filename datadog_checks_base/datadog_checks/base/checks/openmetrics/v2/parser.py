@@ -0,0 +1,183 @@
+# (C) Datadog, Inc. 2023-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+"""
+A Prometheus text format parser that produces the same metric families as
+`prometheus_client.parser.text_fd_to_metric_families`, but only parses the samples of
+the families that are actually consumed.
+
+Sample lines are grouped into families using only their metric name, the labels and values
+are parsed the first time the `samples` attribute of a family is accessed. Families that are
+dropped by `exclude_metrics` or are not defined in `metrics` therefore never pay for label parsing.
+"""
+import re
+
+from prometheus_client.metrics_core import METRIC_TYPES
+from prometheus_client.samples import Sample
+
+ESCAPE_SEQUENCES = {'\\\\': '\\', '\\n': '\n', '\\"': '"'}
+HELP_ESCAPING_PATTERN = re.compile(r'\\[\\n]')
+LABEL_ESCAPING_PATTERN = re.compile(r'\\[\\n"]')
+LABEL_PATTERN = re.compile(r'([^\s=,]+)\s*=\s*"([^"\\]*(?:\\.[^"\\]*)*)"')
+SAMPLE_NAME_PATTERN = re.compile(r'[^{\s]+')
+
+ALLOWED_SAMPLE_SUFFIXES = {
+    'counter': ('',),
+    'gauge': ('',),
+    'summary': ('_count', '_sum', ''),
+    'histogram': ('_count', '_sum', '_bucket'),
+}
+
+
+def replace_escape_sequence(match):
+    return ESCAPE_SEQUENCES[match.group(0)]
+
+
+def parse_labels(labels_string):
+    if '\\' not in labels_string:
+        return dict(LABEL_PATTERN.findall(labels_string))
+
+    labels = {}
+    for label_name, label_value in LABEL_PATTERN.findall(labels_string):
+        labels[label_name] = LABEL_ESCAPING_PATTERN.sub(replace_escape_sequence, label_value)
+
+    return labels
+
+
+def parse_sample(line, name_suffix=''):
+    label_start = line.find('{')
+    label_end = line.rfind('}')
+    if label_start != -1 and label_end > label_start:
+        name = line[:label_start].rstrip()
+        labels = parse_labels(line[label_start + 1 : label_end])
+        values = line[label_end + 1 :].split()
+    else:
+        name, *values = line.split()
+        labels = {}
+
+    # If we have multiple values only consider the first
+    value = float(values[0])
+    timestamp = float(values[-1]) / 1000 if len(values) > 1 else None
+
+    return Sample(name + name_suffix, labels, value, timestamp)
+
+
+class MetricFamily:
+    """
+    A metric family whose samples are parsed on first access.
+
+    This mirrors the interface of `prometheus_client.metrics_core.Metric` used by the scraper and transformers.
+    """
+
+    __slots__ = ('name', 'documentation', 'type', 'unit', '_lines', '_samples', '_sample_name_suffix')
+
+    def __init__(self, name, documentation, metric_type, lines):
+        # Munge counters into the OpenMetrics representation like the `prometheus_client` parser
+        sample_name_suffix = ''
+        if metric_type == 'counter':
+            if name.endswith('_total'):
+                name = name[:-6]
+            else:
+                sample_name_suffix = '_total'
+        elif metric_type == 'untyped':
+            metric_type = 'unknown'
+        elif metric_type not in METRIC_TYPES:
+            raise ValueError(f'Invalid metric type: {metric_type}')
+
+        self.name = name
+        self.documentation = documentation
+        self.type = metric_type
+        self.unit = ''
+        self._lines = lines
+        self._samples = None
+        self._sample_name_suffix = sample_name_suffix
+
+    @property
+    def samples(self):
+        if self._samples is None:
+            suffix = self._sample_name_suffix
+            self._samples = [parse_sample(line, suffix) for line in self._lines]
+            self._lines = None
+
+        return self._samples
+
+    @samples.setter
+    def samples(self, samples):
+        self._samples = samples
+        self._lines = None
+
+    @property
+    def sample_count(self):
+        """
+        The number of samples, counted without parsing them.
+        """
+        return len(self._lines) if self._samples is None else len(self._samples)
+
+    def __repr__(self):
+        return f'MetricFamily({self.name}, {self.documentation}, {self.type}, {self.unit}, {self.samples})'
+
+
+def text_fd_to_metric_families(fd):
+    """
+    Parse Prometheus text format from an iterable of lines, yielding lazily parsed `MetricFamily` objects.
+    """
+    name = ''
+    documentation = ''
+    metric_type = 'untyped'
+    lines = []
+    allowed_names = ()
+
+    for line in fd:
+        line = line.strip()
+
+        if not line:
+            continue
+        elif line[0] == '#':
+            parts = line.split(None, 3)
+            if len(parts) < 2:
+                continue
+            elif parts[1] == 'HELP':
+                if parts[2] != name:
+                    if name:
+                        yield MetricFamily(name, documentation, metric_type, lines)
+
+                    name = parts[2]
+                    metric_type = 'untyped'
+                    lines = []
+                    allowed_names = (name,)
+
+                if len(parts) == 4:
+                    documentation = HELP_ESCAPING_PATTERN.sub(replace_escape_sequence, parts[3])
+                else:
+                    documentation = ''
+            elif parts[1] == 'TYPE':
+                if parts[2] != name:
+                    if name:
+                        yield MetricFamily(name, documentation, metric_type, lines)
+
+                    name = parts[2]
+                    documentation = ''
+                    lines = []
+
+                metric_type = parts[3]
+                allowed_names = tuple(name + suffix for suffix in ALLOWED_SAMPLE_SUFFIXES.get(metric_type, ('',)))
+        else:
+            # Only the metric name is required to group samples, the rest of the line is parsed lazily
+            sample_name = SAMPLE_NAME_PATTERN.match(line).group()
+            if sample_name in allowed_names:
+                lines.append(line)
+            else:
+                if name:
+                    yield MetricFamily(name, documentation, metric_type, lines)
+
+                # New metric, yield immediately as untyped singleton
+                name = ''
+                documentation = ''
+                metric_type = 'untyped'
+                lines = []
+                allowed_names = ()
+
+                yield MetricFamily(sample_name, '', 'untyped', [line])
+
+    if name:
+        yield MetricFamily(name, documentation, metric_type, lines)
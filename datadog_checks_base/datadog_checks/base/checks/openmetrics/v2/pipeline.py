@@ -0,0 +1,128 @@
+# (C) Datadog, Inc. 2023-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+from math import isinf, isnan
+
+from .labels import get_label_normalizer
+
+# Sentinel cached for label sets that are excluded by `exclude_metrics_by_labels`
+SKIP_SAMPLE = object()
+
+
+class LabelRules:
+    """
+    The label configuration of a scraper, resolved once per label name rather than once per sample.
+    """
+
+    def __init__(self, scraper):
+        self.exclude_metrics_by_labels = scraper.exclude_metrics_by_labels
+        self.exclude_labels = scraper.exclude_labels
+        self.include_labels = scraper.include_labels
+        self.rename_labels = scraper.rename_labels
+
+        # Label name -> (sample excluder or None, tag prefix or None if the label is not a tag)
+        self.plans = {}
+
+    def get(self, label_name):
+        plan = self.plans.get(label_name)
+        if plan is None:
+            plan = self.plans[label_name] = self.compile(label_name)
+
+        return plan
+
+    def compile(self, label_name):
+        sample_excluder = self.exclude_metrics_by_labels.get(label_name)
+
+        if label_name in self.exclude_labels:
+            tag_prefix = None
+        elif self.include_labels and label_name not in self.include_labels:
+            tag_prefix = None
+        else:
+            tag_prefix = f'{self.rename_labels.get(label_name, label_name)}:'
+
+        return sample_excluder, tag_prefix
+
+
+class SamplePipeline:
+    """
+    Turns the samples of a single metric family into `(sample, tags, hostname)` tuples.
+
+    Tags and hostnames are cached by label set. The cache is generational: entries survive as long as the
+    label set is seen at least once per scrape, so unchanged series cost a dictionary lookup while series
+    that disappear are evicted after the next scrape.
+    """
+
+    def __init__(self, scraper, metric_type):
+        self.scraper = scraper
+        self.label_rules = scraper.label_rules
+        self.label_normalizer = get_label_normalizer(metric_type)
+        self.static_tags = scraper.tags
+        self.hostname_label = scraper.hostname_label
+        self.hostname_formatter = scraper.hostname_formatter
+
+        self.cache = {}
+        self.previous_cache = {}
+
+    def __call__(self, metric):
+        log = self.scraper.log
+        populate = self.scraper.label_aggregator.populate
+        label_normalizer = self.label_normalizer
+        submit_processed = self.scraper.submit_telemetry_number_of_processed_metric_samples
+        cache = self.cache
+        previous_cache = self.previous_cache
+
+        for sample in metric.samples:
+            value = sample.value
+            if isnan(value) or isinf(value):
+                log.debug('Ignoring sample for metric `%s` as it has an invalid value: %s', metric.name, value)
+                continue
+
+            labels = sample.labels
+            populate(labels)
+            label_normalizer(labels)
+
+            label_set = tuple(labels.items())
+            entry = cache.get(label_set)
+            if entry is None:
+                entry = previous_cache.pop(label_set, None)
+                if entry is None:
+                    entry = self.compile_entry(labels)
+
+                cache[label_set] = entry
+
+            if entry is SKIP_SAMPLE:
+                continue
+
+            tags, hostname = entry
+
+            submit_processed()
+            # Transformers are free to modify the tags they receive
+            yield sample, list(tags), hostname
+
+    def compile_entry(self, labels):
+        tags = []
+        get_plan = self.label_rules.get
+
+        for label_name, label_value in labels.items():
+            sample_excluder, tag_prefix = get_plan(label_name)
+            if sample_excluder is not None and sample_excluder(label_value):
+                return SKIP_SAMPLE
+            elif tag_prefix is not None:
+                tags.append(f'{tag_prefix}{label_value}')
+
+        tags.extend(self.static_tags)
+
+        hostname = ''
+        if self.hostname_label and self.hostname_label in labels:
+            hostname = labels[self.hostname_label]
+            if self.hostname_formatter is not None:
+                hostname = self.hostname_formatter(hostname)
+
+        return tuple(tags), hostname
+
+    def rotate(self):
+        """
+        Start a new cache generation, dropping label sets that were not seen since the previous call.
+        """
+        self.previous_cache = self.cache
+        self.cache = {}
@@ -2,11 +2,13 @@
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
 import fnmatch
+import hashlib
 import inspect
 import re
 from copy import copy, deepcopy
 from itertools import chain
 from math import isinf, isnan
+from time import perf_counter
 from typing import List  # noqa: F401
 
 from prometheus_client.openmetrics.parser import text_fd_to_metric_families as parse_openmetrics
@@ -20,6 +22,9 @@ from ....utils.functions import no_op, return_true
 from ....utils.http import RequestsWrapper
 from .first_scrape_handler import first_scrape_handler
 from .labels import LabelAggregator, get_label_normalizer
+from .parser import MetricFamily as LazyMetricFamily
+from .parser import text_fd_to_metric_families as parse_prometheus_lazily
+from .pipeline import LabelRules, SamplePipeline
 from .transform import MetricTransformer
 
 try:
@@ -28,6 +33,13 @@ except ImportError:
     from datadog_checks.base.stubs import datadog_agent
 
 
+# Parsers for the Prometheus text format, the OpenMetrics format is always handled by `prometheus_client`
+TEXT_PARSERS = {
+    'prometheus_client': parse_prometheus,
+    'lazy': parse_prometheus_lazily,
+}
+
+
 class OpenMetricsScraper:
     """
     OpenMetricsScraper is a class that can be used to override the default scraping behavior for OpenMetricsBaseCheckV2.
@@ -237,23 +249,111 @@ class OpenMetricsScraper:
 
         self.use_process_start_time = is_affirmative(config.get('use_process_start_time'))
 
+        text_parser = config.get('text_parser', 'prometheus_client')
+        if text_parser not in TEXT_PARSERS:
+            raise ConfigurationError(f'Setting `text_parser` must be one of: {", ".join(TEXT_PARSERS)}')
+
+        self.parse_prometheus = TEXT_PARSERS[text_parser]
+
         # Used for monotonic counts
         self.flush_first_value = False
 
+        # The pending download started by `prefetch`, consumed by the next scrape
+        self.prefetched_response = None
+
+        # Skip parsing payloads that did not change since the last scrape and replay the last transformations instead
+        self.conditional_requests = is_affirmative(config.get('conditional_requests', False))
+        if self.conditional_requests:
+            self.http.options['headers'].setdefault('Accept-Encoding', 'gzip, deflate')
+
+        # Validators and transformations of the last successful scrape
+        self.payload_validators = {}
+        self.cached_transformations = None
+        self.cached_transformations_tags = None
+
+        # Validators of the payload currently being scraped
+        self.pending_payload_validators = {}
+        self.payload_unchanged = False
+
+        # Compile label rules into a pipeline per metric family and cache the tags of every label set
+        self.compile_sample_pipelines = is_affirmative(config.get('compile_sample_pipelines', False))
+        self.label_rules = LabelRules(self)
+        self.sample_pipelines = {}
+        self.sample_pipeline_tags = self.tags
+
     def scrape(self):
         """
         Execute a scrape, and for each metric collected, transform the metric.
         """
         runtime_data = {'flush_first_value': self.flush_first_value, 'static_tags': self.static_tags}
 
+        if self.compile_sample_pipelines:
+            self.rotate_sample_pipelines()
+            generate_sample_data = self.generate_compiled_sample_data
+        else:
+            generate_sample_data = self.generate_sample_data
+
+        if self.conditional_requests:
+            self.scrape_conditionally(runtime_data, generate_sample_data)
+        else:
+            for metric in self.consume_metrics(runtime_data):
+                transformer = self.metric_transformer.get(metric)
+                if transformer is None:
+                    continue
+
+                transformer(metric, generate_sample_data(metric), runtime_data)
+
+        self.flush_first_value = True
+
+    def scrape_conditionally(self, runtime_data, generate_sample_data):
+        """
+        Execute a scrape that records the data passed to every transformer. If the endpoint reports
+        that the payload did not change, or the payload is identical to the last one, the recorded
+        data is sent to the transformers again without parsing anything.
+        """
+
+        self.payload_unchanged = False
+        transformations = []
+
         for metric in self.consume_metrics(runtime_data):
             transformer = self.metric_transformer.get(metric)
             if transformer is None:
                 continue
 
-            transformer(metric, self.generate_sample_data(metric), runtime_data)
+            sample_data = [(sample, tuple(tags), hostname) for sample, tags, hostname in generate_sample_data(metric)]
+            transformations.append((metric, transformer, sample_data))
+            transformer(metric, replay_sample_data(sample_data), runtime_data)
 
-        self.flush_first_value = True
+        if self.payload_unchanged:
+            for metric, transformer, sample_data in self.cached_transformations:
+                transformer(metric, replay_sample_data(sample_data), runtime_data)
+        else:
+            self.payload_validators = self.pending_payload_validators
+            self.cached_transformations = transformations
+            self.cached_transformations_tags = self.tags
+
+    def can_replay_transformations(self):
+        # Cached tags embed the dynamic tags so they must not have changed
+        return self.cached_transformations is not None and self.cached_transformations_tags == self.tags
+
+    def is_payload_unchanged(self, response):
+        """
+        Whether the response contains the same payload as the last successful scrape.
+        """
+
+        if response.status_code == 304:
+            self.pending_payload_validators = {}
+            return self.can_replay_transformations()
+
+        self.pending_payload_validators = {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'hash': hashlib.sha256(response.content).digest(),
+        }
+
+        return self.can_replay_transformations() and self.pending_payload_validators[
+            'hash'
+        ] == self.payload_validators.get('hash')
 
     def consume_metrics(self, runtime_data):
         """
@@ -313,7 +413,7 @@ class OpenMetricsScraper:
         return (
             parse_openmetrics
             if self._use_latest_spec or media_type == 'application/openmetrics-text'
-            else parse_prometheus
+            else self.parse_prometheus
         )
 
     def generate_sample_data(self, metric):
@@ -362,6 +462,32 @@ class OpenMetricsScraper:
             self.submit_telemetry_number_of_processed_metric_samples()
             yield sample, tags, hostname
 
+    def generate_compiled_sample_data(self, metric):
+        """
+        Yield the same data as `generate_sample_data` using the compiled pipeline of the metric family.
+        """
+
+        key = (metric.name, metric.type)
+        sample_pipeline = self.sample_pipelines.get(key)
+        if sample_pipeline is None:
+            sample_pipeline = self.sample_pipelines[key] = SamplePipeline(self, metric.type)
+
+        return sample_pipeline(metric)
+
+    def rotate_sample_pipelines(self):
+        """
+        Start a new tag cache generation for every compiled pipeline.
+        """
+
+        # Cached tags embed the dynamic tags so recompile everything if they changed
+        if self.sample_pipeline_tags != self.tags:
+            self.sample_pipeline_tags = self.tags
+            self.sample_pipelines.clear()
+            return
+
+        for sample_pipeline in self.sample_pipelines.values():
+            sample_pipeline.rotate()
+
     def stream_connection_lines(self):
         """
         Yield the connection line.
@@ -369,6 +495,10 @@ class OpenMetricsScraper:
 
         try:
             with self.get_connection() as connection:
+                if self.conditional_requests and self.is_payload_unchanged(connection):
+                    self.payload_unchanged = True
+                    return
+
                 # Media type will be used to select parser dynamically
                 self._content_type = connection.headers.get('Content-Type', '')
                 for line in connection.iter_lines(decode_unicode=True):
@@ -396,7 +526,12 @@ class OpenMetricsScraper:
         """
 
         try:
-            response = self.send_request()
+            if self.prefetched_response is not None:
+                prefetched_response, self.prefetched_response = self.prefetched_response, None
+                response, fetch_time = prefetched_response.result()
+                self.submit_telemetry_endpoint_fetch_time(fetch_time)
+            else:
+                response = self.send_request()
         except Exception as e:
             self.submit_health_check(ServiceCheck.CRITICAL, message=str(e))
             raise
@@ -424,8 +559,42 @@ class OpenMetricsScraper:
         """
 
         kwargs['stream'] = True
+        if self.conditional_requests and self.can_replay_transformations():
+            extra_headers = kwargs.setdefault('extra_headers', {})
+            if self.payload_validators.get('etag'):
+                extra_headers['If-None-Match'] = self.payload_validators['etag']
+            if self.payload_validators.get('last_modified'):
+                extra_headers['If-Modified-Since'] = self.payload_validators['last_modified']
+
         return self.http.get(self.endpoint, **kwargs)
 
+    def prefetch(self, executor):
+        """
+        Start downloading the payload on the given executor so that the next scrape does not wait on the network.
+        """
+
+        if self.prefetched_response is not None:
+            # The previous scrape failed before getting to this endpoint
+            self.prefetched_response.add_done_callback(close_prefetched_response)
+
+        self.prefetched_response = executor.submit(self.download)
+
+    def download(self):
+        """
+        Send the request and read the entire response body. Return the response and the time it took in seconds.
+        """
+
+        start_time = perf_counter()
+        response = self.send_request()
+        try:
+            # Accessing the content consumes the stream, lines will then be iterated from memory
+            response.content  # noqa: B018
+        except Exception:
+            response.close()
+            raise
+
+        return response, perf_counter() - start_time
+
     def set_dynamic_tags(self, *tags):
         """
         Set dynamic tags.
@@ -442,10 +611,10 @@ class OpenMetricsScraper:
             self.service_check(self.SERVICE_CHECK_HEALTH, status, tags=self.static_tags, **kwargs)
 
     def submit_telemetry_number_of_total_metric_samples(self, metric):
-        self.count('telemetry.metrics.input.count', len(metric.samples), tags=self.tags)
+        self.count('telemetry.metrics.input.count', get_sample_count(metric), tags=self.tags)
 
     def submit_telemetry_number_of_ignored_metric_samples(self, metric):
-        self.count('telemetry.metrics.ignored.count', len(metric.samples), tags=self.tags)
+        self.count('telemetry.metrics.ignored.count', get_sample_count(metric), tags=self.tags)
 
     def submit_telemetry_number_of_processed_metric_samples(self):
         self.count('telemetry.metrics.processed.count', 1, tags=self.tags)
@@ -462,6 +631,9 @@ class OpenMetricsScraper:
 
         self.gauge('telemetry.payload.size', content_length, tags=self.tags)
 
+    def submit_telemetry_endpoint_fetch_time(self, fetch_time):
+        self.gauge('telemetry.payload.fetch_time', fetch_time, tags=self.tags)
+
     def __getattr__(self, name):
         # Forward all unknown attribute lookups to the check instance for access to submission methods, hostname, etc.
         attribute = getattr(self.check, name)
@@ -469,6 +641,26 @@ class OpenMetricsScraper:
         return attribute
 
 
+def replay_sample_data(sample_data):
+    # Transformers are free to modify the tags they receive
+    for sample, tags, hostname in sample_data:
+        yield sample, list(tags), hostname
+
+
+def get_sample_count(metric):
+    # Families of the lazy parser are counted without parsing their samples, which ignored families never need
+    if isinstance(metric, LazyMetricFamily):
+        return metric.sample_count
+
+    return len(metric.samples)
+
+
+def close_prefetched_response(future):
+    if future.exception() is None:
+        response, _ = future.result()
+        response.close()
+
+
 class OpenMetricsCompatibilityScraper(OpenMetricsScraper):
     """
     This class is designed for existing checks that are transitioning to the new OpenMetrics implementation.
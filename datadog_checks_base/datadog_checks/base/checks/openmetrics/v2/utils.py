@@ -70,10 +70,12 @@ def decumulate_histogram_buckets(sample_data):
 
             # Prevent 0.0
             lower_bound = str(matching_bucket_tuple[0] or 0)
-            sample.labels['lower_bound'] = lower_bound
             tags.append(f'lower_bound:{lower_bound}')
 
-            yield Sample(sample.name, sample.labels, matching_bucket_tuple[2]), tags, hostname
+            # Leave the original labels untouched as samples may be transformed again when payloads are unchanged
+            labels = {**sample.labels, 'lower_bound': lower_bound}
+
+            yield Sample(sample.name, labels, matching_bucket_tuple[2]), tags, hostname
 
 
 def compute_bucket_hash(labels):
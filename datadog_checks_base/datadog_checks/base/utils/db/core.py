@@ -1,15 +1,21 @@
 # (C) Datadog, Inc. 2019-present
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
+import functools
 import logging
-from itertools import chain
-from typing import Any, Callable, Dict, List, Tuple  # noqa: F401
+from concurrent.futures.thread import ThreadPoolExecutor
+from itertools import chain, islice
+from typing import Any, Callable, Dict, Iterator, List, Tuple  # noqa: F401
 
-from datadog_checks.base import AgentCheck  # noqa: F401
+from six.moves.queue import Queue
+
+from datadog_checks.base import AgentCheck
 from datadog_checks.base.utils.db.types import QueriesExecutor, QueriesSubmitter, Transformer  # noqa: F401
 
+from ...checks.base import BATCH_METRIC_TYPES
 from ...config import is_affirmative
 from ..containers import iter_unique
+from ..time import get_precise_time
 from .query import Query
 from .transform import COLUMN_TRANSFORMERS, EXTRA_TRANSFORMERS
 from .utils import SUBMISSION_METHODS, create_submission_transformer
@@ -31,6 +37,8 @@ class QueryExecutor(object):
         error_handler=None,  # type: Callable[[str], str]
         hostname=None,  # type: str
         logger=None,
+        batch_size=None,  # type: int
+        parallel_executors=None,  # type: List[QueriesExecutor]
     ):  # type: (...) -> QueryExecutor
         self.executor = executor  # type: QueriesExecutor
         self.submitter = submitter  # type: QueriesSubmitter
@@ -46,14 +54,34 @@ class QueryExecutor(object):
         self.hostname = hostname  # type: str
         self.logger = logger or logging.getLogger(__name__)
 
+        if batch_size is not None and (not isinstance(batch_size, int) or batch_size < 1):
+            raise ValueError('QueryExecutor `batch_size` must be a positive integer')
+        self.batch_size = batch_size  # type: int
+
+        # Executors using their own connections, queries are distributed among them and the main executor
+        self.parallel_executors = list(parallel_executors or [])  # type: List[QueriesExecutor]
+
+        # Queries with a `collection_interval` -> time of their last execution
+        self.query_last_execution = {}  # type: Dict[Query, float]
+        # Queries with a `cache_ttl` -> time and results of their last execution
+        self.query_results_cache = {}  # type: Dict[Query, Tuple[float, List]]
+
     def compile_queries(self):
         """This method compiles every `Query` object."""
         column_transformers = COLUMN_TRANSFORMERS.copy()  # type: Dict[str, Transformer]
 
+        # Batches of values are submitted with a single call when the submitter is a check. The method of
+        # `AgentCheck` is looked up explicitly so that a check defining its own method with that name is not called
+        batch_submitter = self.submitter if self.batch_size and isinstance(self.submitter, AgentCheck) else None
+
         for submission_method, transformer_name in SUBMISSION_METHODS.items():
             method = getattr(self.submitter, submission_method)
+            batch_method = None
+            if batch_submitter is not None and submission_method in BATCH_METRIC_TYPES:
+                batch_method = functools.partial(AgentCheck.submit_metric_batch, batch_submitter, submission_method)
+
             # Save each method in the initializer -> callable format
-            column_transformers[transformer_name] = create_submission_transformer(method)
+            column_transformers[transformer_name] = create_submission_transformer(method, batch_method)
 
         for query in self.queries:
             query.compile(column_transformers, EXTRA_TRANSFORMERS.copy())
@@ -65,56 +93,221 @@ class QueryExecutor(object):
         if extra_tags:
             global_tags.extend(list(extra_tags))
 
+        for query, results in self._execute_queries():
+            if self.batch_size:
+                self._process_batches(query, results, global_tags)
+            else:
+                self._process_rows(query, results, global_tags)
+
+    def _execute_queries(self):
+        # type: () -> Iterator[Tuple[Query, Iterator]]
+        now = get_precise_time()
+
+        # Queries to process in order, along with their cached results if they are not due
+        scheduled_queries = []  # type: List[Tuple[Query, Any]]
         for query in self.queries:
-            query_name = query.name
-            query_columns = query.column_transformers
-            extra_transformers = query.extra_transformers
-            query_tags = query.base_tags
+            if query.collection_interval is None:
+                scheduled_queries.append((query, None))
+                continue
+
+            last_execution = self.query_last_execution.get(query)
+            if last_execution is None or now - last_execution >= query.collection_interval:
+                scheduled_queries.append((query, None))
+                continue
+
+            cached_results = self.query_results_cache.get(query)
+            if cached_results is not None and now - cached_results[0] < query.cache_ttl:
+                self.logger.debug('Query %s is not due, submitting its cached results', query.name)
+                scheduled_queries.append((query, cached_results[1]))
+            else:
+                self.logger.debug('Query %s is not due, skipping', query.name)
+
+        due_queries = [query for query, cached_results in scheduled_queries if cached_results is None]
+        if self.parallel_executors:
+            executed_queries = self._execute_queries_concurrently(due_queries)
+        else:
+            executed_queries = self._execute_queries_sequentially(due_queries)
+
+        for query, results in scheduled_queries:
+            if results is None:
+                _, results = next(executed_queries)
+                if results is None:
+                    # Failed queries are retried on the next run
+                    continue
+
+                if query.collection_interval is not None:
+                    self.query_last_execution[query] = now
+                if query.cache_ttl is not None:
+                    results = list(results)
+                    self.query_results_cache[query] = (now, results)
 
+            yield query, iter(results)
+
+    def _execute_queries_sequentially(self, queries):
+        # type: (List[Query]) -> Iterator[Tuple[Query, Any]]
+        execute_query = self.execute_query_batches if self.batch_size else self.execute_query
+        for query in queries:
             try:
-                rows = self.execute_query(query.query)
+                results = execute_query(query.query)
             except Exception as e:
-                if self.error_handler:
-                    self.logger.error('Error querying %s: %s', query_name, self.error_handler(str(e)))
-                else:
-                    self.logger.error('Error querying %s: %s', query_name, e)
+                self._log_query_error(query, e)
+                results = None
+
+            yield query, results
+
+    def _execute_queries_concurrently(self, queries):
+        # type: (List[Query]) -> Iterator[Tuple[Query, Any]]
+        # Every executor owns a connection, so a worker borrows one for the duration of a query
+        executors = Queue()
+        for executor in [self.executor] + self.parallel_executors:
+            executors.put(executor)
+
+        execute_query = self.execute_query_batches if self.batch_size else self.execute_query
+
+        def fetch(query):
+            executor = executors.get()
+            try:
+                # Results are fully fetched by the worker, processing happens on the calling thread
+                return list(execute_query(query.query, executor))
+            finally:
+                executors.put(executor)
+
+        with ThreadPoolExecutor(max_workers=executors.qsize()) as pool:
+            futures = [(query, pool.submit(fetch, query)) for query in queries]
+            for query, future in futures:
+                try:
+                    results = future.result()
+                except Exception as e:
+                    self._log_query_error(query, e)
+                    results = None
+
+                yield query, results
+
+    def _log_query_error(self, query, error):
+        # type: (Query, Exception) -> None
+        if self.error_handler:
+            self.logger.error('Error querying %s: %s', query.name, self.error_handler(str(error)))
+        else:
+            self.logger.error('Error querying %s: %s', query.name, error)
+
+    def _process_rows(self, query, rows, global_tags):
+        # type: (Query, Iterator, List[str]) -> None
+        query_columns = query.column_transformers
+        extra_transformers = query.extra_transformers
+        query_tags = query.base_tags
 
+        for row in rows:
+            if not self._is_row_valid(query, row):
                 continue
 
-            for row in rows:
-                if not self._is_row_valid(query, row):
+            # It holds the query results
+            sources = {}  # type: Dict[str, str]
+            # It holds the transformers defined in query_columns along with the column value
+            submission_queue = []  # type: List[Tuple[Transformer, Any]]
+            tags = global_tags + query_tags
+
+            for (column_name, type_transformer), column_value in zip(query_columns, row):
+                # Columns can be ignored via configuration
+                if not column_name:
                     continue
 
-                # It holds the query results
-                sources = {}  # type: Dict[str, str]
-                # It holds the transformers defined in query_columns along with the column value
-                submission_queue = []  # type: List[Tuple[Transformer, Any]]
-                tags = global_tags + query_tags
+                sources[column_name] = column_value
+                column_type, transformer = type_transformer
 
-                for (column_name, type_transformer), column_value in zip(query_columns, row):
-                    # Columns can be ignored via configuration
-                    if not column_name:
-                        continue
+                # The transformer can be None for `source` types. Those such columns do not submit
+                # anything but are collected into the row values for other columns to reference.
+                if transformer is None:
+                    continue
+                elif column_type == 'tag':
+                    tags.append(transformer(None, column_value))  # get_tag transformer
+                elif column_type == 'tag_not_null':
+                    if column_value is not None:
+                        tags.append(transformer(None, column_value))  # get_tag transformer
+                elif column_type == 'tag_list':
+                    tags.extend(transformer(None, column_value))  # get_tag_list transformer
+                else:
+                    submission_queue.append((transformer, column_value))
 
-                    sources[column_name] = column_value
-                    column_type, transformer = type_transformer
+            for transformer, value in submission_queue:
+                transformer(sources, value, tags=tags, hostname=self.hostname)
 
-                    # The transformer can be None for `source` types. Those such columns do not submit
-                    # anything but are collected into the row values for other columns to reference.
-                    if transformer is None:
-                        continue
-                    elif column_type == 'tag':
-                        tags.append(transformer(None, column_value))  # get_tag transformer
-                    elif column_type == 'tag_not_null':
-                        if column_value is not None:
-                            tags.append(transformer(None, column_value))  # get_tag transformer
-                    elif column_type == 'tag_list':
-                        tags.extend(transformer(None, column_value))  # get_tag_list transformer
-                    else:
-                        submission_queue.append((transformer, column_value))
+            for name, transformer in extra_transformers:
+                try:
+                    result = transformer(sources, tags=tags, hostname=self.hostname)
+                except Exception as e:
+                    self.logger.error('Error transforming %s: %s', name, e)
+                    continue
+                else:
+                    if result is not None:
+                        sources[name] = result
 
-                for transformer, value in submission_queue:
-                    transformer(sources, value, tags=tags, hostname=self.hostname)
+    def _process_batches(self, query, batches, global_tags):
+        # type: (Query, Iterator[List], List[str]) -> None
+        """
+        Process results a batch of rows at a time. Tags are computed once per distinct combination of tag column
+        values and columns whose transformer supports it are submitted with a single call per batch. Remaining
+        columns and extras are then processed row by row, in the same way as `_process_rows`.
+        """
+        base_tags = tuple(global_tags + query.base_tags)
+
+        source_columns = []  # type: List[Tuple[str, int]]
+        tag_columns = []  # type: List[Tuple[int, str, Transformer]]
+        batch_columns = []  # type: List[Tuple[int, Transformer]]
+        row_columns = []  # type: List[Tuple[int, Transformer]]
+        for index, (column_name, type_transformer) in enumerate(query.column_transformers):
+            # Columns can be ignored via configuration
+            if not column_name:
+                continue
+
+            source_columns.append((column_name, index))
+            column_type, transformer = type_transformer
+            if transformer is None:
+                continue
+            elif column_type in ('tag', 'tag_not_null', 'tag_list'):
+                tag_columns.append((index, column_type, transformer))
+            elif getattr(transformer, 'batch', None) is not None:
+                batch_columns.append((index, transformer.batch))
+            else:
+                row_columns.append((index, transformer))
+
+        tag_indices = [index for index, _, _ in tag_columns]
+        extra_transformers = query.extra_transformers
+        # Tags by tag column values, a column has a consistent type within a result set
+        row_tags_cache = {}  # type: Dict[Tuple, Tuple[str, ...]]
+
+        for rows in batches:
+            rows = [row for row in rows if self._is_row_valid(query, row)]
+            if not rows:
+                continue
+
+            if tag_columns:
+                tags_column = []
+                for row in rows:
+                    tag_values = tuple([row[index] for index in tag_indices])
+                    try:
+                        tags = row_tags_cache[tag_values]
+                    except KeyError:
+                        tags = row_tags_cache[tag_values] = self._get_row_tags(base_tags, tag_columns, row)
+                    except TypeError:
+                        # Unhashable values, e.g. lists used by `tag_list` columns
+                        tags = self._get_row_tags(base_tags, tag_columns, row)
+
+                    tags_column.append(tags)
+            else:
+                tags_column = [base_tags] * len(rows)
+
+            for index, batch_transformer in batch_columns:
+                batch_transformer([row[index] for row in rows], tags_column, hostname=self.hostname)
+
+            if not (row_columns or extra_transformers):
+                continue
+
+            for row, tags in zip(rows, tags_column):
+                sources = {column_name: row[index] for column_name, index in source_columns}
+                tags = list(tags)
+
+                for index, transformer in row_columns:
+                    transformer(sources, row[index], tags=tags, hostname=self.hostname)
 
                 for name, transformer in extra_transformers:
                     try:
@@ -126,6 +319,22 @@ class QueryExecutor(object):
                         if result is not None:
                             sources[name] = result
 
+    @staticmethod
+    def _get_row_tags(base_tags, tag_columns, row):
+        # type: (Tuple[str, ...], List[Tuple[int, str, Transformer]], List) -> Tuple[str, ...]
+        tags = list(base_tags)
+        for index, column_type, transformer in tag_columns:
+            column_value = row[index]
+            if column_type == 'tag':
+                tags.append(transformer(None, column_value))  # get_tag transformer
+            elif column_type == 'tag_not_null':
+                if column_value is not None:
+                    tags.append(transformer(None, column_value))  # get_tag transformer
+            else:
+                tags.extend(transformer(None, column_value))  # get_tag_list transformer
+
+        return tuple(tags)
+
     def _is_row_valid(self, query, row):
         # type: (Query, List) -> bool
         if not row:
@@ -144,12 +353,12 @@ class QueryExecutor(object):
             return False
         return True
 
-    def execute_query(self, query):
+    def execute_query(self, query, executor=None):
         """
         Called by `execute`, this triggers query execution to check for errors immediately in a way that is compatible
         with any library. If there are no errors, this is guaranteed to return an iterator over the result set.
         """
-        rows = self.executor(query)
+        rows = (executor or self.executor)(query)
         if rows is None:
             return iter([])
         else:
@@ -163,6 +372,46 @@ class QueryExecutor(object):
 
         return chain((first_row,), rows)
 
+    def execute_query_batches(self, query, executor=None):
+        """
+        Like `execute_query`, but returns an iterator over lists of at most `batch_size` rows. Results that
+        provide a `fetchmany` method, such as DB-API cursors, are fetched with it.
+        """
+        results = (executor or self.executor)(query)
+        if results is None:
+            return iter([])
+
+        if hasattr(results, 'fetchmany'):
+            batches = self._fetch_batches(results, self.batch_size)
+        else:
+            batches = self._slice_batches(iter(results), self.batch_size)
+
+        # Ensure we trigger query execution
+        try:
+            first_batch = next(batches)
+        except StopIteration:
+            return iter([])
+
+        return chain((first_batch,), batches)
+
+    @staticmethod
+    def _fetch_batches(cursor, batch_size):
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+
+            yield rows
+
+    @staticmethod
+    def _slice_batches(rows, batch_size):
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                return
+
+            yield batch
+
 
 class QueryManager(QueryExecutor):
     """
@@ -198,6 +447,8 @@ class QueryManager(QueryExecutor):
         tags=None,  # type: List[str]
         error_handler=None,  # type: Callable[[str], str]
         hostname=None,  # type: str
+        batch_size=None,  # type: int
+        parallel_executors=None,  # type: List[QueriesExecutor]
     ):  # type: (...) -> QueryManager
         """
         - **check** (_AgentCheck_) - an instance of a Check
@@ -207,6 +458,11 @@ class QueryManager(QueryExecutor):
         - **tags** (_List[str]_) - a list of tags to associate with every submission
         - **error_handler** (_callable_) - a callable accepting a `str` error as its sole argument and returning
           a sanitized string, useful for scrubbing potentially sensitive information libraries emit
+        - **batch_size** (_int_) - process results in batches of this many rows rather than one row at a time,
+          tags are then computed once per distinct set of tag values and metric columns are submitted with a
+          single call per batch
+        - **parallel_executors** (_List[callable]_) - additional executors, each using its own connection, used
+          along with `executor` to run queries concurrently. Results are still processed in query order.
         """
         super(QueryManager, self).__init__(
             executor=executor,
@@ -216,6 +472,8 @@ class QueryManager(QueryExecutor):
             error_handler=error_handler,
             hostname=hostname,
             logger=check.log,
+            batch_size=batch_size,
+            parallel_executors=parallel_executors,
         )
         self.check = check  # type: AgentCheck
 
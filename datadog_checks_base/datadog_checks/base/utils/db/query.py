@@ -19,6 +19,12 @@ class Query(object):
     It is now part of all our database integrations and
     [other](https://cloud.google.com/solutions/sap/docs/sap-hana-monitoring-agent-planning-guide#defining_custom_queries)
     products have since adopted this format.
+
+    Queries may also define how often they run with the optional `collection_interval` field, in seconds.
+    Queries that are not due are skipped, unless the optional `cache_ttl` field is set: the last result set
+    is then kept for that many seconds and submitted again as is when the query is skipped. This is best
+    suited to gauges, e.g. expensive catalog queries such as table sizes. The `cache_ttl` field requires
+    `collection_interval` to be set.
     """
 
     def __init__(self, query_data):
@@ -34,6 +40,10 @@ class Query(object):
         self.extra_transformers = None  # type: List[Tuple[str, Transformer]]
         # Contains the tags defined in query_data, more tags can be added later from the query result
         self.base_tags = None  # type: List[str]
+        # The minimum number of seconds between executions, None to run on every check run
+        self.collection_interval = None  # type: float
+        # The number of seconds the last result set can be submitted again when the query is skipped
+        self.cache_ttl = None  # type: float
 
     def compile(
         self,
@@ -72,6 +82,16 @@ class Query(object):
         if tags is not None and not isinstance(tags, list):
             raise ValueError('field `tags` for {} must be a list'.format(query_name))
 
+        collection_interval = self.query_data.get('collection_interval')
+        if collection_interval is not None and not _is_positive_number(collection_interval):
+            raise ValueError('field `collection_interval` for {} must be a positive number'.format(query_name))
+
+        cache_ttl = self.query_data.get('cache_ttl')
+        if cache_ttl is not None and not _is_positive_number(cache_ttl):
+            raise ValueError('field `cache_ttl` for {} must be a positive number'.format(query_name))
+        elif cache_ttl is not None and collection_interval is None:
+            raise ValueError('field `cache_ttl` for {} requires `collection_interval` to be set'.format(query_name))
+
         # Keep track of all defined names
         sources = {}
 
@@ -201,4 +221,11 @@ class Query(object):
         self.column_transformers = tuple(column_data)
         self.extra_transformers = tuple(extra_data)
         self.base_tags = tags
+        self.collection_interval = collection_interval
+        self.cache_ttl = cache_ttl
         del self.query_data
+
+
+def _is_positive_number(value):
+    # type: (Any) -> bool
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and value > 0
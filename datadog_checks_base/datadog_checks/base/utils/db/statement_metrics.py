@@ -22,7 +22,11 @@ class StatementMetrics:
     """
 
     def __init__(self):
-        self._previous_statements = {}
+        # The metric values of the previous run are stored column by column in a flat list: the values
+        # of a row start at `slot * len(columns)` where `slot` is the position of the row's key.
+        self._previous_columns = ()
+        self._previous_slots = {}
+        self._previous_values = []
 
     def compute_derivative_rows(self, rows, metrics, key):
         """
@@ -36,6 +40,10 @@ class StatementMetrics:
         metric tags. There is also custom logic around stats resets to discard all rows when a
         negative value is found, rather than just the single metric of that row/column.
 
+        Rows sharing the same key are merged into a single row with the sum of their metrics, see
+        `_merge_duplicate_rows`. All rows are expected to have the same columns, as is the case for
+        the results of a query. Only the metric values are kept between runs.
+
         This function resets the statement cache so it should only be called once per check run.
 
         - **rows** (_List[dict]_) - rows from current check run
@@ -43,91 +51,119 @@ class StatementMetrics:
         - **key** (_callable_) - function for an ID which uniquely identifies a row across runs
         """
         result = []
-        new_cache = {}
         metrics = set(metrics)
+        columns = ()
 
-        rows = _merge_duplicate_rows(rows, metrics, key)
         if len(rows) > 0:
             dropped_metrics = metrics - set(rows[0].keys())
             if dropped_metrics:
                 logger.warning(
                     'Some statement metrics are not available from the table: %s', ','.join(m for m in dropped_metrics)
                 )
-
-        for row in rows:
-            row_key = key(row)
-            if row_key in new_cache:
-                logger.error(
-                    'Unexpected collision in cached query metrics. Dropping existing row, row_key=%s new=%s dropped=%s',
-                    row_key,
-                    row,
-                    new_cache[row_key],
-                )
-
-            # Set the row on the new cache to be checked the next run. This should happen for every row, regardless of
-            # whether a metric is submitted for the row during this run or not.
-            new_cache[row_key] = row
-
-            prev = self._previous_statements.get(row_key)
-            if prev is None:
+            columns = tuple(k for k in rows[0] if k in metrics)
+
+        merged_rows, slots, values = _merge_duplicate_rows(rows, columns, key)
+        width = len(columns)
+
+        # Set the metric values of every row to be checked the next run, regardless of whether or not
+        # a metric is submitted for the row during this run.
+        previous_slots = self._previous_slots
+        previous_values = self._previous_values
+        previous_width = len(self._previous_columns)
+        positions = _column_positions(columns, self._previous_columns)
+        self._previous_columns = columns
+        self._previous_slots = slots
+        self._previous_values = values
+
+        if positions is None:
+            return result
+
+        for row_key, slot in slots.items():
+            previous_slot = previous_slots.get(row_key)
+            if previous_slot is None:
                 continue
 
-            metric_columns = metrics & set(row.keys())
-
             # Take the diff of all metric values between the current row and the previous run's row.
+            offset = slot * width
+            previous_offset = previous_slot * previous_width
+            if positions is True:
+                diffs = [
+                    value - previous_value
+                    for value, previous_value in zip(
+                        values[offset : offset + width], previous_values[previous_offset : previous_offset + width]
+                    )
+                ]
+            else:
+                diffs = [
+                    values[offset + i] - previous_values[previous_offset + position]
+                    for i, position in enumerate(positions)
+                ]
+
             # There are a couple of edge cases to be aware of:
             #
             # 1. Table truncation or stats reset: Because the table values are always increasing, a negative value
             #    suggests truncation or a stats reset. In this case, the row difference is discarded and the row should.
             #    be tracked from this run forward.
+            #    A "break" might be expected here instead of "continue," but there are cases where a subset of rows
+            #    are removed. To avoid situations where all results are discarded every check run, we err on the side
+            #    of potentially including truncated rows that exceed previous run counts.
             #
             # 2. No changes since the previous run: There is no need to store metrics of 0, since that is implied by
             #    the absence of metrics. On any given check run, most rows will have no difference so this optimization
             #    avoids having to send a lot of unnecessary metrics.
+            if not any(diffs) or any(diff < 0 for diff in diffs):
+                continue
 
-            diffed_row = {k: row[k] - prev[k] if k in metric_columns else row[k] for k in row.keys()}
+            diffed_row = dict(merged_rows[slot])
+            diffed_row.update(zip(columns, diffs))
+            result.append(diffed_row)
 
-            # Check for negative values, but only in the columns used for metrics
-            if any(diffed_row[k] < 0 for k in metric_columns):
-                # A "break" might be expected here instead of "continue," but there are cases where a subset of rows
-                # are removed. To avoid situations where all results are discarded every check run, we err on the side
-                # of potentially including truncated rows that exceed previous run counts.
-                continue
+        return result
 
-            # No changes to the query; no metric needed
-            if all(diffed_row[k] == 0 for k in metric_columns):
-                continue
 
-            result.append(diffed_row)
+def _column_positions(columns, previous_columns):
+    """
+    Return the position of each column in the previous run's columns, `True` if they are the same
+    or `None` if some column was not collected by the previous run.
+    """
+    if columns == previous_columns:
+        return True
 
-        self._previous_statements = new_cache
+    positions = {column: position for position, column in enumerate(previous_columns)}
+    if any(column not in positions for column in columns):
+        return None
 
-        return result
+    return [positions[column] for column in columns]
 
 
-def _merge_duplicate_rows(rows, metrics, key):
+def _merge_duplicate_rows(rows, columns, key):
     """
     Given a list of query rows, merge all duplicate rows as determined by the key function into a single row
     with the sum of the stats of all duplicates. This is motivated by database integrations such as postgres
     that can report many instances of a query that are considered the same after the agent normalization.
 
+    Returns the first row of each key, the position of each key and the flat list of the merged metric values.
+
     - **rows** (_List[dict]_) - rows from current check run
-    - **metrics** (_List[str]_) - the metrics to compute for each row
+    - **columns** (_Tuple[str]_) - the metric columns of the rows
     - **key** (_callable_) - function for an ID which uniquely identifies a query row across runs
     """
+    merged_rows = []
+    slots = {}
+    values = []
+    width = len(columns)
 
-    queries_by_key = {}
     for row in rows:
-        merged_row = dict(row)
-
-        query_key = key(merged_row)
+        row_key = key(row)
+        slot = slots.get(row_key)
 
-        if query_key in queries_by_key:
-            merged_state = queries_by_key[query_key]
-            queries_by_key[query_key] = {
-                k: merged_row[k] + merged_state[k] if k in metrics else merged_state[k] for k in merged_state.keys()
-            }
+        if slot is None:
+            slots[row_key] = len(merged_rows)
+            merged_rows.append(row)
+            values.extend([row[column] for column in columns])
         else:
-            queries_by_key[query_key] = merged_row
+            offset = slot * width
+            for i, column in enumerate(columns):
+                values[offset + i] = row[column] + values[offset + i]
 
-    return list(queries_by_key.values())
+    return merged_rows, slots, values
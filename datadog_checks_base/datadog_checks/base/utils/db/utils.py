@@ -1,19 +1,22 @@
 # (C) Datadog, Inc. 2019-present
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
+import contextlib
 import datetime
 import decimal
 import functools
 import logging
 import os
 import socket
+import sys
 import threading
 import time
+from collections import Counter
 from concurrent.futures.thread import ThreadPoolExecutor
 from itertools import chain
 from typing import Any, Callable, Dict, List, Tuple  # noqa: F401
 
-from cachetools import TTLCache
+from cachetools import LRUCache, TTLCache
 
 from datadog_checks.base import is_affirmative
 from datadog_checks.base.log import get_check_logger
@@ -22,6 +25,7 @@ from datadog_checks.base.utils.serialization import json
 from datadog_checks.base.utils.tracing import INTEGRATION_TRACING_SERVICE_NAME, tracing_enabled
 
 from ..common import to_native_string
+from .sql import compute_sql_signature
 
 try:
     import datadog_agent
@@ -44,6 +48,19 @@ SUBMISSION_METHODS = {
     'service_check': '__service_check',
 }
 
+# Upper bound of the estimated memory used by the shared cache of obfuscated statements
+OBFUSCATION_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+# Environment variable bounding the number of DBM async job runs in progress at the same time across all check
+# instances, unbounded when unset or 0. It is only read once, when this module is imported.
+DBM_ASYNC_JOB_MAX_CONCURRENCY_ENV = 'DBM_ASYNC_JOB_MAX_CONCURRENCY'
+
+# Interval in seconds at which a run waiting for a job slot checks whether its job was cancelled
+JOB_SLOT_WAIT_INTERVAL = 1
+
+# CPU time of the current thread, only available on Python 3.7+
+_thread_time = getattr(time, 'thread_time', None)
+
 
 def _traced_dbm_async_job_method(f):
     integration_tracing, _ = tracing_enabled()
@@ -69,8 +86,8 @@ def _traced_dbm_async_job_method(f):
     return f
 
 
-def create_submission_transformer(submit_method):
-    # type: (Any) -> Callable[[Any, Any, Any], Callable[[Any, List, Dict], Callable[[Any, Any, Any], Transformer]]]
+def create_submission_transformer(submit_method, batch_submit_method=None):
+    # type: (Any, Any) -> Callable[[Any, Any, Any], Callable[[Any, List, Dict], Callable[[Any, Any, Any], Transformer]]]
     # During the compilation phase every transformer will have access to all the others and may be
     # passed the first arguments (e.g. name) that will be forwarded the actual AgentCheck methods.
     def get_transformer(_transformers, *creation_args, **modifiers):
@@ -84,6 +101,16 @@ def create_submission_transformer(submit_method):
             # submit_method(*creation_args, *call_args, **kwargs)
             submit_method(*chain(creation_args, call_args), **kwargs)
 
+        # Batch submission only supports the modifiers of `AgentCheck.submit_metric_batch`
+        if batch_submit_method is not None and set(modifiers) <= {'raw'}:
+            raw = modifiers.get('raw', False)
+
+            def batch_transformer(values, tags, hostname=None):
+                # type: (List[Any], List[Tuple[str, ...]], str) -> None
+                batch_submit_method(*chain(creation_args, (values, tags)), hostnames=hostname, raw=raw)
+
+            transformer.batch = batch_transformer
+
         return transformer
 
     return get_transformer
@@ -212,12 +239,196 @@ def obfuscate_sql_with_metadata(query, options=None):
     return statement_with_metadata
 
 
+def _estimate_statement_size(query, statement):
+    size = sys.getsizeof(query) + sys.getsizeof(statement) + sys.getsizeof(statement['query'])
+    for value in statement['metadata'].values():
+        size += sys.getsizeof(value)
+        if isinstance(value, list):
+            size += sum(sys.getsizeof(item) for item in value)
+    return size
+
+
+class ObfuscationCache(LRUCache):
+    """
+    LRU cache of obfuscated statements keyed by the raw query text and the obfuscation options,
+    shared by the DBM jobs of all check instances.
+
+    The size of the cache is the estimated memory used by its entries in bytes, the least recently
+    used statements are evicted once it exceeds `maxsize`. Cached statements are shared and must not be modified.
+    """
+
+    def __init__(self, maxsize=OBFUSCATION_CACHE_MAX_BYTES):
+        super(ObfuscationCache, self).__init__(maxsize, getsizeof=lambda entry: entry[1])
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def popitem(self):
+        item = super(ObfuscationCache, self).popitem()
+        self.evictions += 1
+        return item
+
+    def clear(self):
+        # The hit, miss and eviction counters are running totals and are not reset
+        with self._lock:
+            super(ObfuscationCache, self).clear()
+
+    def obfuscate(self, query, options=None, stats=None):
+        """
+        Return the result of `obfuscate_sql_with_metadata` along with the `query_signature` of the obfuscated query,
+        only calling the obfuscator for queries that are not cached yet. Obfuscation errors are raised and not cached.
+
+        The hits, misses and evictions caused by this call are also counted in the `stats` Counter, if given.
+        """
+        key = (query, options)
+        with self._lock:
+            entry = self.get(key)
+            if entry is not None:
+                self.hits += 1
+                if stats is not None:
+                    stats['hits'] += 1
+                return entry[0]
+            self.misses += 1
+            if stats is not None:
+                stats['misses'] += 1
+
+        statement = obfuscate_sql_with_metadata(query, options)
+        statement['query_signature'] = compute_sql_signature(statement['query'])
+
+        with self._lock:
+            evictions = self.evictions
+            try:
+                self[key] = (statement, _estimate_statement_size(query, statement))
+            except ValueError:
+                # The statement alone does not fit in the cache
+                pass
+            if stats is not None:
+                stats['evictions'] += self.evictions - evictions
+
+        return statement
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self),
+                'bytes': self.currsize,
+            }
+
+
+obfuscation_cache = ObfuscationCache()
+
+
+class JobSlots(object):
+    """
+    Bound the number of DBM async job runs in progress at the same time across all check instances.
+
+    Runs are grouped by a key identifying their database. When all slots are taken, a freed slot is given to the
+    waiting run whose database has the fewest runs in progress, the run waiting the longest first. A slow database
+    can then only keep the slots of its own runs, while the runs of other databases get the next free slots.
+
+    The slots of `DBMAsyncJob.job_slots` are unbounded unless the `DBM_ASYNC_JOB_MAX_CONCURRENCY` environment variable
+    of the Agent is set to a positive integer. It is read once, when the module is imported.
+    """
+
+    def __init__(self, limit=0):
+        self._lock = threading.Lock()
+        self._limit = limit
+        self._running = {}
+        self._total = 0
+        self._waiters = []
+
+    @property
+    def limit(self):
+        return self._limit
+
+    def set_limit(self, limit):
+        """
+        :param limit: maximum number of runs in progress, unbounded when 0
+        """
+        with self._lock:
+            self._limit = max(limit, 0)
+            self._grant()
+
+    @contextlib.contextmanager
+    def acquire(self, key, cancel_event=None):
+        """
+        Hold a slot for the duration of the context, yields the number of seconds spent waiting for it.
+
+        If `cancel_event` is set while waiting, the run gives up on the slot and `None` is yielded instead.
+        """
+        start = time.time()
+        waiter = None
+        with self._lock:
+            if self._waiters or not self._has_room():
+                waiter = (key, threading.Event())
+                self._waiters.append(waiter)
+            else:
+                self._take(key)
+
+        if waiter is not None:
+            # The slot is taken on our behalf by the run releasing it
+            while not waiter[1].wait(JOB_SLOT_WAIT_INTERVAL):
+                if cancel_event is None or not cancel_event.is_set():
+                    continue
+                with self._lock:
+                    # The slot may have been granted in the meantime
+                    if not waiter[1].is_set():
+                        self._waiters.remove(waiter)
+                        break
+
+            if not waiter[1].is_set():
+                yield None
+                return
+
+        try:
+            yield time.time() - start
+        finally:
+            with self._lock:
+                self._running[key] -= 1
+                if not self._running[key]:
+                    del self._running[key]
+                self._total -= 1
+                self._grant()
+
+    def _has_room(self):
+        return not self._limit or self._total < self._limit
+
+    def _take(self, key):
+        self._running[key] = self._running.get(key, 0) + 1
+        self._total += 1
+
+    def _grant(self):
+        # Must be called with the lock held
+        while self._waiters and self._has_room():
+            waiter = min(self._waiters, key=lambda w: self._running.get(w[0], 0))
+            self._waiters.remove(waiter)
+            self._take(waiter[0])
+            waiter[1].set()
+
+
+def _get_max_concurrency():
+    value = os.environ.get(DBM_ASYNC_JOB_MAX_CONCURRENCY_ENV, '0')
+    try:
+        return max(int(value), 0)
+    except ValueError:
+        logger.warning("Ignoring invalid %s value: %r", DBM_ASYNC_JOB_MAX_CONCURRENCY_ENV, value)
+        return 0
+
+
 class DBMAsyncJob(object):
     # Set an arbitrary high limit so that dbm async jobs (which aren't CPU bound) don't
     # get artificially limited by the default max_workers count. Note that since threads are
-    # created lazily, it's safe to set a high maximum
+    # created lazily, it's safe to set a high maximum. Every job loop holds its thread for as long
+    # as it's running, so the concurrency of the runs is bounded with `job_slots` instead
     executor = ThreadPoolExecutor(100000)
 
+    # Shared by the jobs of all check instances
+    job_slots = JobSlots(_get_max_concurrency())
+
     """
     Runs Async Jobs
     """
@@ -254,6 +465,10 @@ class DBMAsyncJob(object):
         self._enabled = enabled
         self._expected_db_exceptions = expected_db_exceptions
         self._job_name = job_name
+        self._obfuscation_cache_stats = Counter()
+        # Accounted for during each run of the job
+        self._run_rows = 0
+        self._run_payload_bytes = 0
 
     def cancel(self):
         self._cancel_event.set()
@@ -334,12 +549,80 @@ class DBMAsyncJob(object):
             self._rate_limiter = ConstantRateLimiter(rate_limit)
 
     def _run_job_rate_limited(self):
-        self._run_job_traced()
+        with DBMAsyncJob.job_slots.acquire((self._dbms, self._db_hostname), self._cancel_event) as wait_time:
+            if wait_time is None:
+                # The job was cancelled while waiting for a slot
+                return
+            self._run_job_accounted(wait_time)
         self._rate_limiter.sleep()
 
+    def _run_job_accounted(self, wait_time):
+        self._run_rows = 0
+        self._run_payload_bytes = 0
+        start_time = time.time()
+        start_cpu_time = _thread_time() if _thread_time is not None else None
+        try:
+            self._run_job_traced()
+        finally:
+            self._submit_run_stats(
+                wait_time,
+                time.time() - start_time,
+                _thread_time() - start_cpu_time if start_cpu_time is not None else None,
+            )
+
+    def _submit_run_stats(self, wait_time, run_time, cpu_time):
+        metrics = [
+            ('wait_time', wait_time * 1000),
+            ('run_time', run_time * 1000),
+            ('rows', self._run_rows),
+            ('payload_bytes', self._run_payload_bytes),
+        ]
+        if cpu_time is not None:
+            metrics.append(('cpu_time', cpu_time * 1000))
+        for name, value in metrics:
+            self._check.histogram("dd.{}.async_job.{}".format(self._dbms, name), value, tags=self._job_tags, raw=True)
+
+    def _record_rows(self, count):
+        """
+        Account for rows read from the database during the current run of the job.
+        """
+        self._run_rows += count
+
+    def _submit_dbm_event(self, submit, payload):
+        """
+        Submit a serialized DBM event with one of the `database_monitoring_*` methods of the check,
+        accounting for its size in the current run of the job.
+        """
+        self._run_payload_bytes += len(payload)
+        submit(payload)
+
     @_traced_dbm_async_job_method
     def _run_job_traced(self):
         return self.run_job()
 
     def run_job(self):
         raise NotImplementedError()
+
+    def _obfuscate(self, query, options=None):
+        """
+        Obfuscate a statement through the shared `obfuscation_cache`, counting the cache hits, misses and evictions
+        of this job.
+        """
+        return obfuscation_cache.obfuscate(query, options, stats=self._obfuscation_cache_stats)
+
+    def _submit_obfuscation_cache_stats(self, tags, hostname=None):
+        """
+        Submit the obfuscation cache hits, misses and evictions of this job with its tags. The size of the cache is
+        shared by all the check instances so it is submitted without their tags.
+        """
+        for name in ('hits', 'misses', 'evictions'):
+            self._check.monotonic_count(
+                "dd.{}.obfuscation_cache.{}".format(self._dbms, name),
+                self._obfuscation_cache_stats[name],
+                tags=tags,
+                hostname=hostname,
+                raw=True,
+            )
+        stats = obfuscation_cache.get_stats()
+        for name in ('entries', 'bytes'):
+            self._check.gauge("dd.{}.obfuscation_cache.{}".format(self._dbms, name), stats[name], raw=True)
@@ -1,6 +1,11 @@
 # (C) Datadog, Inc. 2018-present
 # All rights reserved
 # Licensed under Simplified BSD License (see LICENSE)
+import logging
+import threading
+from collections import OrderedDict
+
+from .common import to_native_string
 
 try:
     import tagger
@@ -21,3 +26,71 @@ GENERIC_TAGS = {
     'service',
     'version',
 }
+
+# Maximum number of tag sets kept interned, the least recently used ones are evicted first
+TAG_SET_CACHE_SIZE = 10000
+
+LOGGER = logging.getLogger(__name__)
+
+
+class TagSet(tuple):
+    """
+    An immutable set of tags that the submission methods of `AgentCheck` accept in place of a list of tags.
+
+    Tags are converted to native strings, deduplicated and sorted once, and the hash is computed once. Instances
+    are interned: building a `TagSet` from recently used tags returns the existing instance, so integrations can
+    build the tags of an entity once and reuse them for every point they submit.
+    """
+
+    _cache = OrderedDict()  # type: OrderedDict
+    _cache_lock = threading.Lock()
+
+    def __new__(cls, tags=()):
+        if isinstance(tags, TagSet):
+            return tags
+
+        key = tags if type(tags) is tuple else tuple(tags)
+        with cls._cache_lock:
+            # Reinserting moves the entry to the end, which keeps the cache ordered from least to most recently used
+            tag_set = cls._cache.pop(key, None)
+            if tag_set is not None:
+                cls._cache[key] = tag_set
+                return tag_set
+
+        normalized_tags = set()
+        for tag in key:
+            if tag is None:
+                continue
+
+            try:
+                normalized_tags.add(to_native_string(tag))
+            except UnicodeError:
+                LOGGER.warning('Encoding error with tag `%r`, ignoring tag', tag)
+
+        tag_set = super(TagSet, cls).__new__(cls, sorted(normalized_tags))
+        tag_set._hash = hash(frozenset(tag_set))
+
+        with cls._cache_lock:
+            cls._cache[key] = tag_set
+            if len(cls._cache) > TAG_SET_CACHE_SIZE:
+                cls._cache.popitem(last=False)
+
+        return tag_set
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        return self is other or (isinstance(other, TagSet) and tuple.__eq__(self, other))
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        return 'TagSet({})'.format(tuple.__repr__(self))
+
+    def union(self, tags):
+        """
+        Return a `TagSet` made of these tags and the given ones.
+        """
+        return TagSet(self + tuple(tags))
@@ -6,6 +6,7 @@ import os
 import pytest
 
 from datadog_checks.base import OpenMetricsBaseCheckV2
+from datadog_checks.base.checks.openmetrics.v2.scraper import TEXT_PARSERS
 from datadog_checks.dev import get_here
 from datadog_checks.dev.testing import requires_py3
 
@@ -27,9 +28,12 @@ def fixture_amazon_msk_jmx_metrics():
     return os.path.join(FIXTURE_PATH, 'amazon_msk_jmx_metrics.txt')
 
 
-def test_ksm_new(benchmark, dd_run_check, mock_http_response, fixture_ksm):
+@pytest.mark.parametrize('text_parser', ['prometheus_client', 'lazy'])
+def test_ksm_new(benchmark, dd_run_check, mock_http_response, fixture_ksm, text_parser):
     mock_http_response(file_path=fixture_ksm)
-    c = OpenMetricsBaseCheckV2('test', {}, [{'openmetrics_endpoint': 'foo', 'namespace': 'bar', 'metrics': ['.+']}])
+    c = OpenMetricsBaseCheckV2(
+        'test', {}, [{'openmetrics_endpoint': 'foo', 'namespace': 'bar', 'metrics': ['.+'], 'text_parser': text_parser}]
+    )
 
     # Run once to get initialization steps out of the way.
     dd_run_check(c)
@@ -37,7 +41,10 @@ def test_ksm_new(benchmark, dd_run_check, mock_http_response, fixture_ksm):
     benchmark(c.check, None)
 
 
-def test_amazon_msk_jmx_metrics_new(benchmark, dd_run_check, mock_http_response, fixture_amazon_msk_jmx_metrics):
+@pytest.mark.parametrize('text_parser', ['prometheus_client', 'lazy'])
+def test_amazon_msk_jmx_metrics_new(
+    benchmark, dd_run_check, mock_http_response, fixture_amazon_msk_jmx_metrics, text_parser
+):
     mock_http_response(file_path=fixture_amazon_msk_jmx_metrics)
 
     metrics = []
@@ -48,7 +55,11 @@ def test_amazon_msk_jmx_metrics_new(benchmark, dd_run_check, mock_http_response,
 
         metrics.append(config)
 
-    c = OpenMetricsBaseCheckV2('test', {}, [{'openmetrics_endpoint': 'foo', 'namespace': 'bar', 'metrics': metrics}])
+    c = OpenMetricsBaseCheckV2(
+        'test',
+        {},
+        [{'openmetrics_endpoint': 'foo', 'namespace': 'bar', 'metrics': metrics, 'text_parser': text_parser}],
+    )
 
     # Run once to get initialization steps out of the way.
     dd_run_check(c)
@@ -82,3 +93,33 @@ def test_label_joins_new(benchmark, dd_run_check, mock_http_response, fixture_ks
     dd_run_check(c)
 
     benchmark(c.check, None)
+
+
+def test_ksm_compiled_sample_pipelines(benchmark, dd_run_check, mock_http_response, fixture_ksm):
+    mock_http_response(file_path=fixture_ksm)
+    c = OpenMetricsBaseCheckV2(
+        'test',
+        {},
+        [{'openmetrics_endpoint': 'foo', 'namespace': 'bar', 'metrics': ['.+'], 'compile_sample_pipelines': True}],
+    )
+
+    # Run once to get initialization steps out of the way.
+    dd_run_check(c)
+
+    benchmark(c.check, None)
+
+
+@pytest.mark.parametrize('consume_samples', [True, False], ids=['all_samples', 'no_samples'])
+@pytest.mark.parametrize('text_parser', ['prometheus_client', 'lazy'])
+def test_parse_amazon_msk_jmx_metrics(benchmark, fixture_amazon_msk_jmx_metrics, text_parser, consume_samples):
+    with open(fixture_amazon_msk_jmx_metrics) as f:
+        lines = f.read().splitlines()
+
+    parse_metric_families = TEXT_PARSERS[text_parser]
+
+    def parse():
+        for metric in parse_metric_families(iter(lines)):
+            if consume_samples:
+                metric.samples  # noqa: B018
+
+    benchmark(parse)
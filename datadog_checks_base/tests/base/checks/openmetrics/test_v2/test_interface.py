@@ -1,8 +1,12 @@
 # (C) Datadog, Inc. 2020-present
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
+import pytest
+from requests.exceptions import RequestException
+
 from datadog_checks.base import OpenMetricsBaseCheckV2
 from datadog_checks.base.constants import ServiceCheck
+from datadog_checks.dev.http import MockResponse
 from datadog_checks.dev.testing import requires_py3
 
 from .utils import get_check
@@ -128,3 +132,69 @@ def test_custom_transformer(aggregator, dd_run_check, mock_http_response):
     dd_run_check(check)
 
     aggregator.assert_metric('test.server.watchdog_mega_miss', metric_type=aggregator.GAUGE, count=2)
+
+
+def test_concurrent_scrapers(aggregator, dd_run_check, mocker):
+    class Check(OpenMetricsBaseCheckV2):
+        __NAMESPACE__ = 'test'
+
+        def __init__(self, name, init_config, instances):
+            super().__init__(name, init_config, instances)
+            self.scraper_configs = [
+                {'openmetrics_endpoint': f'test{i}', 'metrics': ['.+'], 'telemetry': True} for i in range(3)
+            ]
+
+    def get(url, **kwargs):
+        return MockResponse(f'# TYPE go_goroutines gauge\ngo_goroutines {url[-1]}')
+
+    mocker.patch('requests.get', side_effect=get)
+    check = Check('test', {}, [{'concurrent_scrapers': 2}])
+    dd_run_check(check)
+
+    for i in range(3):
+        aggregator.assert_metric('test.go_goroutines', i, metric_type=aggregator.GAUGE, tags=[f'endpoint:test{i}'])
+        aggregator.assert_metric('test.telemetry.payload.fetch_time', tags=[f'endpoint:test{i}'])
+        aggregator.assert_service_check('test.openmetrics.health', ServiceCheck.OK, tags=[f'endpoint:test{i}'])
+
+    assert check.scraper_executor._max_workers == 2
+
+
+def test_concurrent_scrapers_error(aggregator, dd_run_check, mocker):
+    class Check(OpenMetricsBaseCheckV2):
+        __NAMESPACE__ = 'test'
+
+        def __init__(self, name, init_config, instances):
+            super().__init__(name, init_config, instances)
+            self.scraper_configs = [{'openmetrics_endpoint': f'test{i}', 'metrics': ['.+']} for i in range(2)]
+
+    def get(url, **kwargs):
+        if url == 'test0':
+            raise RequestException('timed out')
+
+        return MockResponse('# TYPE go_goroutines gauge\ngo_goroutines 1')
+
+    mocker.patch('requests.get', side_effect=get)
+    check = Check('test', {}, [{'concurrent_scrapers': 2}])
+
+    with pytest.raises(Exception, match='There was an error scraping endpoint test0: timed out'):
+        dd_run_check(check, extract_message=True)
+
+    aggregator.assert_service_check('test.openmetrics.health', ServiceCheck.CRITICAL, tags=['endpoint:test0'])
+    assert check.scrapers['test1'].prefetched_response is not None
+
+    # The stale download of the second endpoint is discarded
+    aggregator.reset()
+    mocker.patch('requests.get', return_value=MockResponse('# TYPE go_goroutines gauge\ngo_goroutines 2'))
+    dd_run_check(check)
+
+    aggregator.assert_metric('test.go_goroutines', 2, tags=['endpoint:test0'])
+    aggregator.assert_metric('test.go_goroutines', 2, tags=['endpoint:test1'])
+    aggregator.assert_all_metrics_covered()
+
+
+@pytest.mark.parametrize('concurrent_scrapers', [-1, True, '2'])
+def test_concurrent_scrapers_invalid(dd_run_check, concurrent_scrapers):
+    with pytest.raises(Exception, match='Setting `concurrent_scrapers` must be a non-negative integer'):
+        OpenMetricsBaseCheckV2(
+            'test', {}, [{'openmetrics_endpoint': 'test', 'concurrent_scrapers': concurrent_scrapers}]
+        )
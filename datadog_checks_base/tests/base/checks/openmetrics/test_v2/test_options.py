@@ -745,3 +745,318 @@ class TestIgnoreTags:
         )
 
         aggregator.assert_all_metrics_covered()
+
+
+class TestCompileSamplePipelines:
+    def test_label_rules(self, aggregator, dd_run_check, mock_http_response):
+        mock_http_response(
+            """
+            # HELP go_memstats_alloc_bytes Number of bytes allocated and still in use.
+            # TYPE go_memstats_alloc_bytes gauge
+            go_memstats_alloc_bytes{foo="bar",bar="baz",zip="zap",node="n1"} 6.396288e+06
+            go_memstats_alloc_bytes{foo="bar",bar="baz",zip="zoo",node="n2"} 6.396288e+06
+            go_memstats_alloc_bytes{foo="bar",bar="bat",zip="zap",node="n3"} 7
+            """
+        )
+        check = get_check(
+            {
+                'metrics': ['.+'],
+                'compile_sample_pipelines': True,
+                'exclude_labels': ['zip'],
+                'rename_labels': {'foo': 'oof'},
+                'exclude_metrics_by_labels': {'bar': ['bat']},
+                'hostname_label': 'node',
+                'hostname_format': 'region_<HOSTNAME>',
+            }
+        )
+        dd_run_check(check)
+        dd_run_check(check)
+
+        for node in ('n1', 'n2'):
+            aggregator.assert_metric(
+                'test.go_memstats_alloc_bytes',
+                6396288,
+                metric_type=aggregator.GAUGE,
+                tags=['endpoint:test', 'oof:bar', 'bar:baz', f'node:{node}'],
+                hostname=f'region_{node}',
+                count=2,
+            )
+
+        aggregator.assert_all_metrics_covered()
+
+    def test_cache_eviction(self, aggregator, dd_run_check, mock_http_response):
+        mock_http_response(
+            """
+            # HELP go_memstats_alloc_bytes Number of bytes allocated and still in use.
+            # TYPE go_memstats_alloc_bytes gauge
+            go_memstats_alloc_bytes{foo="bar"} 6.396288e+06
+            """
+        )
+        check = get_check({'metrics': ['.+'], 'compile_sample_pipelines': True})
+        dd_run_check(check)
+
+        scraper = check.scrapers['test']
+        sample_pipeline = scraper.sample_pipelines['go_memstats_alloc_bytes', 'gauge']
+        assert list(sample_pipeline.cache) == [(('foo', 'bar'),)]
+
+        mock_http_response(
+            """
+            # HELP go_memstats_alloc_bytes Number of bytes allocated and still in use.
+            # TYPE go_memstats_alloc_bytes gauge
+            go_memstats_alloc_bytes{foo="baz"} 6.396288e+06
+            """
+        )
+        dd_run_check(check)
+        assert list(sample_pipeline.cache) == [(('foo', 'baz'),)]
+        assert list(sample_pipeline.previous_cache) == [(('foo', 'bar'),)]
+
+        dd_run_check(check)
+        assert list(sample_pipeline.cache) == [(('foo', 'baz'),)]
+        assert list(sample_pipeline.previous_cache) == []
+
+        aggregator.assert_metric('test.go_memstats_alloc_bytes', tags=['endpoint:test', 'foo:bar'], count=1)
+        aggregator.assert_metric('test.go_memstats_alloc_bytes', tags=['endpoint:test', 'foo:baz'], count=2)
+
+    def test_dynamic_tags(self, aggregator, dd_run_check, mock_http_response):
+        mock_http_response(
+            """
+            # HELP go_memstats_alloc_bytes Number of bytes allocated and still in use.
+            # TYPE go_memstats_alloc_bytes gauge
+            go_memstats_alloc_bytes{foo="bar"} 6.396288e+06
+            """
+        )
+        check = get_check({'metrics': ['.+'], 'compile_sample_pipelines': True})
+        dd_run_check(check)
+
+        check.set_dynamic_tags('baz:qux')
+        dd_run_check(check)
+
+        aggregator.assert_metric('test.go_memstats_alloc_bytes', tags=['endpoint:test', 'foo:bar'], count=1)
+        aggregator.assert_metric('test.go_memstats_alloc_bytes', tags=['endpoint:test', 'foo:bar', 'baz:qux'], count=1)
+
+    def test_histogram_buckets(self, aggregator, dd_run_check, mock_http_response):
+        mock_http_response(
+            """
+            # HELP rest_client_request_latency_seconds Request latency in seconds.
+            # TYPE rest_client_request_latency_seconds histogram
+            rest_client_request_latency_seconds_bucket{verb="GET",le="0.004"} 702
+            rest_client_request_latency_seconds_bucket{verb="GET",le="+Inf"} 706
+            rest_client_request_latency_seconds_sum{verb="GET"} 2.0
+            rest_client_request_latency_seconds_count{verb="GET"} 706
+            """
+        )
+        check = get_check(
+            {'metrics': ['.+'], 'compile_sample_pipelines': True, 'non_cumulative_histogram_buckets': True}
+        )
+        dd_run_check(check)
+        dd_run_check(check)
+
+        aggregator.assert_metric(
+            'test.rest_client_request_latency_seconds.bucket',
+            tags=['endpoint:test', 'verb:GET', 'upper_bound:0.004', 'lower_bound:0'],
+        )
+        aggregator.assert_metric('test.rest_client_request_latency_seconds.count', tags=['endpoint:test', 'verb:GET'])
+        aggregator.assert_metric('test.rest_client_request_latency_seconds.sum', tags=['endpoint:test', 'verb:GET'])
+        aggregator.assert_all_metrics_covered()
+
+
+class TestTextParser:
+    def test_lazy(self, aggregator, dd_run_check, mock_http_response):
+        mock_http_response(
+            """
+            # HELP go_memstats_alloc_bytes Number of bytes allocated and still in use.
+            # TYPE go_memstats_alloc_bytes gauge
+            go_memstats_alloc_bytes{foo="bar"} 6.396288e+06
+            # HELP go_memstats_frees_total Total number of frees.
+            # TYPE go_memstats_frees_total counter
+            go_memstats_frees_total{foo="bar"} 1.28219257e+08
+            # HELP go_memstats_gc_sys_bytes Number of bytes used for garbage collection system metadata.
+            # TYPE go_memstats_gc_sys_bytes gauge
+            go_memstats_gc_sys_bytes{foo="bar"} invalid
+            """
+        )
+        check = get_check(
+            {
+                'metrics': ['go_memstats_alloc_bytes', 'go_memstats_frees', 'go_memstats_gc_sys_bytes'],
+                'exclude_metrics': ['go_memstats_gc_sys_bytes'],
+                'text_parser': 'lazy',
+            }
+        )
+        dd_run_check(check)
+
+        aggregator.assert_metric(
+            'test.go_memstats_alloc_bytes', 6396288, metric_type=aggregator.GAUGE, tags=['endpoint:test', 'foo:bar']
+        )
+        aggregator.assert_metric(
+            'test.go_memstats_frees.count',
+            128219257,
+            metric_type=aggregator.MONOTONIC_COUNT,
+            tags=['endpoint:test', 'foo:bar'],
+        )
+        aggregator.assert_all_metrics_covered()
+
+    def test_lazy_telemetry(self, aggregator, dd_run_check, mock_http_response):
+        mock_http_response(
+            """
+            # HELP go_memstats_alloc_bytes Number of bytes allocated and still in use.
+            # TYPE go_memstats_alloc_bytes gauge
+            go_memstats_alloc_bytes{foo="bar"} 6.396288e+06
+            # HELP go_memstats_gc_sys_bytes Number of bytes used for garbage collection system metadata.
+            # TYPE go_memstats_gc_sys_bytes gauge
+            go_memstats_gc_sys_bytes{foo="bar"} invalid
+            go_memstats_gc_sys_bytes{foo="baz"} invalid
+            """
+        )
+        check = get_check(
+            {
+                'metrics': ['.+'],
+                'exclude_metrics': ['go_memstats_gc_sys_bytes'],
+                'text_parser': 'lazy',
+                'telemetry': True,
+            }
+        )
+        dd_run_check(check)
+
+        # The samples of ignored families are counted without being parsed
+        aggregator.assert_metric('test.telemetry.metrics.input.count', 3, tags=['endpoint:test'])
+        aggregator.assert_metric('test.telemetry.metrics.ignored.count', 2, tags=['endpoint:test'])
+
+    def test_unknown(self, dd_run_check):
+        check = get_check({'metrics': ['.+'], 'text_parser': 'foo'})
+
+        with pytest.raises(Exception, match='Setting `text_parser` must be one of: prometheus_client, lazy'):
+            dd_run_check(check, extract_message=True)
+
+
+class TestConditionalRequests:
+    def test_unchanged_payload(self, aggregator, dd_run_check, mock_http_response, mocker):
+        mock_http_response(
+            """
+            # HELP go_memstats_alloc_bytes Number of bytes allocated and still in use.
+            # TYPE go_memstats_alloc_bytes gauge
+            go_memstats_alloc_bytes{foo="bar"} 6.396288e+06
+            # HELP go_memstats_frees_total Total number of frees.
+            # TYPE go_memstats_frees_total counter
+            go_memstats_frees_total{foo="bar"} 1.28219257e+08
+            """
+        )
+        check = get_check({'metrics': ['.+'], 'conditional_requests': True})
+        dd_run_check(check)
+
+        scraper = check.scrapers['test']
+        generate_sample_data = mocker.spy(scraper, 'generate_sample_data')
+        dd_run_check(check)
+
+        assert scraper.payload_unchanged
+        generate_sample_data.assert_not_called()
+        aggregator.assert_metric(
+            'test.go_memstats_alloc_bytes',
+            6396288,
+            metric_type=aggregator.GAUGE,
+            tags=['endpoint:test', 'foo:bar'],
+            count=2,
+        )
+        aggregator.assert_metric(
+            'test.go_memstats_frees.count',
+            128219257,
+            metric_type=aggregator.MONOTONIC_COUNT,
+            tags=['endpoint:test', 'foo:bar'],
+            count=2,
+        )
+        aggregator.assert_all_metrics_covered()
+
+    def test_changed_payload(self, aggregator, dd_run_check, mock_http_response):
+        payload = """
+            # HELP go_memstats_alloc_bytes Number of bytes allocated and still in use.
+            # TYPE go_memstats_alloc_bytes gauge
+            go_memstats_alloc_bytes{{foo="bar"}} {}
+            """
+        check = get_check({'metrics': ['.+'], 'conditional_requests': True})
+
+        mock_http_response(payload.format(1))
+        dd_run_check(check)
+        mock_http_response(payload.format(2))
+        dd_run_check(check)
+
+        assert not check.scrapers['test'].payload_unchanged
+        aggregator.assert_metric('test.go_memstats_alloc_bytes', 1, tags=['endpoint:test', 'foo:bar'], count=1)
+        aggregator.assert_metric('test.go_memstats_alloc_bytes', 2, tags=['endpoint:test', 'foo:bar'], count=1)
+        aggregator.assert_all_metrics_covered()
+
+    def test_not_modified(self, aggregator, dd_run_check, mock_http_response):
+        mock_http_response(
+            """
+            # HELP go_memstats_alloc_bytes Number of bytes allocated and still in use.
+            # TYPE go_memstats_alloc_bytes gauge
+            go_memstats_alloc_bytes{foo="bar"} 6.396288e+06
+            """,
+            headers={'ETag': '"foo"', 'Last-Modified': 'Wed, 21 Oct 2015 07:28:00 GMT'},
+        )
+        check = get_check({'metrics': ['.+'], 'conditional_requests': True})
+        dd_run_check(check)
+
+        request = mock_http_response(status_code=304)
+        dd_run_check(check)
+
+        headers = request.call_args.kwargs['headers']
+        assert headers['If-None-Match'] == '"foo"'
+        assert headers['If-Modified-Since'] == 'Wed, 21 Oct 2015 07:28:00 GMT'
+        assert 'gzip' in headers['Accept-Encoding']
+        assert check.scrapers['test'].payload_unchanged
+
+        aggregator.assert_metric(
+            'test.go_memstats_alloc_bytes',
+            6396288,
+            metric_type=aggregator.GAUGE,
+            tags=['endpoint:test', 'foo:bar'],
+            count=2,
+        )
+        aggregator.assert_service_check('test.openmetrics.health', ServiceCheck.OK, count=2)
+
+    def test_histogram_buckets(self, aggregator, dd_run_check, mock_http_response):
+        mock_http_response(
+            """
+            # HELP rest_client_request_latency_seconds Request latency in seconds.
+            # TYPE rest_client_request_latency_seconds histogram
+            rest_client_request_latency_seconds_bucket{verb="GET",le="0.004"} 702
+            rest_client_request_latency_seconds_bucket{verb="GET",le="0.008"} 705
+            rest_client_request_latency_seconds_bucket{verb="GET",le="+Inf"} 706
+            rest_client_request_latency_seconds_sum{verb="GET"} 2.0
+            rest_client_request_latency_seconds_count{verb="GET"} 706
+            """
+        )
+        check = get_check({'metrics': ['.+'], 'conditional_requests': True, 'non_cumulative_histogram_buckets': True})
+        dd_run_check(check)
+        dd_run_check(check)
+
+        assert check.scrapers['test'].payload_unchanged
+        aggregator.assert_metric(
+            'test.rest_client_request_latency_seconds.bucket',
+            702,
+            tags=['endpoint:test', 'verb:GET', 'upper_bound:0.004', 'lower_bound:0'],
+            count=2,
+        )
+        aggregator.assert_metric(
+            'test.rest_client_request_latency_seconds.bucket',
+            3,
+            tags=['endpoint:test', 'verb:GET', 'upper_bound:0.008', 'lower_bound:0.004'],
+            count=2,
+        )
+
+    def test_dynamic_tags(self, aggregator, dd_run_check, mock_http_response):
+        mock_http_response(
+            """
+            # HELP go_memstats_alloc_bytes Number of bytes allocated and still in use.
+            # TYPE go_memstats_alloc_bytes gauge
+            go_memstats_alloc_bytes{foo="bar"} 6.396288e+06
+            """
+        )
+        check = get_check({'metrics': ['.+'], 'conditional_requests': True})
+        dd_run_check(check)
+
+        check.set_dynamic_tags('baz:qux')
+        dd_run_check(check)
+
+        assert not check.scrapers['test'].payload_unchanged
+        aggregator.assert_metric('test.go_memstats_alloc_bytes', tags=['endpoint:test', 'foo:bar'], count=1)
+        aggregator.assert_metric('test.go_memstats_alloc_bytes', tags=['endpoint:test', 'foo:bar', 'baz:qux'], count=1)
@@ -0,0 +1,101 @@
+# (C) Datadog, Inc. 2023-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+import os
+from textwrap import dedent
+
+import pytest
+from prometheus_client.parser import text_fd_to_metric_families as parse_prometheus
+
+from datadog_checks.base.checks.openmetrics.v2.parser import text_fd_to_metric_families as parse_prometheus_lazily
+from datadog_checks.dev import get_here
+from datadog_checks.dev.testing import requires_py3
+
+pytestmark = [requires_py3]
+
+HERE = get_here()
+FIXTURE_PATH = os.path.abspath(os.path.join(os.path.dirname(HERE), '..', '..', '..', 'fixtures', 'prometheus'))
+
+
+def assert_same_families(lines):
+    expected = [(m.name, m.documentation, m.type, m.samples) for m in parse_prometheus(iter(lines))]
+    actual = [(m.name, m.documentation, m.type, m.samples) for m in parse_prometheus_lazily(iter(lines))]
+
+    assert actual == expected
+
+
+@pytest.mark.parametrize('fixture', ['ksm.txt', 'metrics.txt', 'amazon_msk_jmx_metrics.txt'])
+def test_fixtures(fixture):
+    with open(os.path.join(FIXTURE_PATH, fixture)) as f:
+        assert_same_families(f.read().splitlines())
+
+
+@pytest.mark.parametrize(
+    'payload',
+    [
+        pytest.param(
+            """
+            # HELP foo_total Some counter.
+            # TYPE foo_total counter
+            foo_total{bar="baz"} 1
+            """,
+            id='counter with suffix',
+        ),
+        pytest.param(
+            """
+            # TYPE foo counter
+            foo{bar="baz"} 1 1500000000000
+            """,
+            id='counter without suffix and timestamp',
+        ),
+        pytest.param(
+            """
+            # TYPE foo histogram
+            foo_bucket{le="0.5"} 1
+            foo_bucket{le="+Inf"} 2
+            foo_sum 3
+            foo_count 2
+            """,
+            id='histogram',
+        ),
+        pytest.param(
+            """
+            # TYPE foo gauge
+            foo{bar="a \\"quoted\\" \\\\ value\\n",baz="x,y=z"} 1.5e3
+            foo { bar = "b" , } -Inf
+            foo\t+Inf
+            """,
+            id='escaping and spacing',
+        ),
+        pytest.param(
+            """
+            # HELP foo Some gauge\\nwith a newline.
+            # TYPE foo gauge
+            foo 1
+            bar{baz="qux"} 2
+            foo 3
+            #
+            # Some comment
+            """,
+            id='untyped singleton',
+        ),
+    ],
+)
+def test_payloads(payload):
+    assert_same_families(dedent(payload).splitlines())
+
+
+def test_samples_parsed_lazily():
+    lines = ['# TYPE foo gauge', 'foo{bar="baz"} invalid']
+    metric = next(parse_prometheus_lazily(iter(lines)))
+    assert metric.name == 'foo'
+    assert metric.type == 'gauge'
+
+    assert metric.sample_count == 1
+    with pytest.raises(ValueError):
+        metric.samples  # noqa: B018
+
+
+def test_invalid_type():
+    with pytest.raises(ValueError, match='Invalid metric type: foo'):
+        list(parse_prometheus_lazily(iter(['# TYPE bar foo', 'bar 1'])))
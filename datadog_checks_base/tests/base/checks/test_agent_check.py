@@ -14,6 +14,7 @@ from six import PY3
 from datadog_checks.base import AgentCheck, to_native_string
 from datadog_checks.base import __version__ as base_package_version
 from datadog_checks.base.checks.base import datadog_agent
+from datadog_checks.base.utils.tagging import TagSet
 from datadog_checks.dev.testing import requires_py3
 
 
@@ -456,6 +457,120 @@ class TestMetrics:
         aggregator.assert_metric(metric_name, count=0)
 
 
+class TestSubmitMetricBatch:
+    def test_single_name(self, aggregator):
+        check = AgentCheck()
+
+        check.submit_metric_batch('gauge', 'metric', [1, 2], [('foo:bar',), ('foo:baz',)])
+
+        aggregator.assert_metric('metric', 1, metric_type=aggregator.GAUGE, tags=['foo:bar'], count=1)
+        aggregator.assert_metric('metric', 2, metric_type=aggregator.GAUGE, tags=['foo:baz'], count=1)
+        aggregator.assert_all_metrics_covered()
+
+    def test_names(self, aggregator):
+        check = AgentCheck()
+
+        check.submit_metric_batch('count', ['metric1', 'metric2'], [1, 2], [(), ('foo:bar',)])
+
+        aggregator.assert_metric('metric1', 1, metric_type=aggregator.COUNT, tags=[], count=1)
+        aggregator.assert_metric('metric2', 2, metric_type=aggregator.COUNT, tags=['foo:bar'], count=1)
+        aggregator.assert_all_metrics_covered()
+
+    @pytest.mark.parametrize('metric_type', ['gauge', 'count', 'monotonic_count', 'rate', 'histogram', 'historate'])
+    def test_metric_types(self, aggregator, metric_type):
+        check = AgentCheck()
+
+        check.submit_metric_batch(metric_type, 'metric', [1], [()])
+
+        aggregator.assert_metric('metric', 1, metric_type=getattr(aggregator, metric_type.upper()), count=1)
+
+    def test_unknown_metric_type(self, aggregator):
+        check = AgentCheck()
+
+        with pytest.raises(ValueError, match='Unknown metric type `foo`'):
+            check.submit_metric_batch('foo', 'metric', [1], [()])
+
+    def test_namespace(self, aggregator):
+        check = AgentCheck()
+        check.__NAMESPACE__ = 'test'
+
+        check.submit_metric_batch('gauge', 'metric', [1], [()])
+        check.submit_metric_batch('gauge', 'metric', [2], [()], raw=True)
+
+        aggregator.assert_metric('test.metric', 1, count=1)
+        aggregator.assert_metric('metric', 2, count=1)
+
+    def test_hostnames(self, aggregator):
+        check = AgentCheck()
+
+        check.submit_metric_batch('gauge', 'metric', [1, 2], [(), ()], hostnames=['host1', 'host2'])
+        check.submit_metric_batch('gauge', 'metric', [3], [()], hostnames='host3')
+
+        aggregator.assert_metric('metric', 1, hostname='host1', count=1)
+        aggregator.assert_metric('metric', 2, hostname='host2', count=1)
+        aggregator.assert_metric('metric', 3, hostname='host3', count=1)
+
+    def test_hostnames_none(self, aggregator, mocker):
+        check = AgentCheck()
+        submit_metric = mocker.spy(aggregator, 'submit_metric')
+
+        check.submit_metric_batch('gauge', 'metric', [1, 2], [(), ()], hostnames=[None, 'host2'])
+
+        # Missing hostnames default to the current host, as with the other submission methods
+        assert [call.args[6] for call in submit_metric.call_args_list] == ['', 'host2']
+
+    def test_tags_normalized_once(self, aggregator, mocker):
+        check = AgentCheck()
+        normalize_tags = mocker.spy(check, '_normalize_tags_type')
+
+        for _ in range(3):
+            check.submit_metric_batch('gauge', 'metric', [1, 2], [('foo:bar',), ('foo:bar',)])
+
+        assert normalize_tags.call_count == 1
+        aggregator.assert_metric('metric', tags=['foo:bar'], count=6)
+
+    def test_tags_normalization(self, aggregator):
+        check = AgentCheck()
+
+        check.submit_metric_batch('gauge', 'metric', [1], [(b'foo:bar', None)])
+
+        aggregator.assert_metric('metric', tags=['foo:bar'], count=1)
+
+    def test_none_value(self, aggregator):
+        check = AgentCheck()
+
+        check.submit_metric_batch('gauge', 'metric', [None, 1], [(), ()])
+
+        aggregator.assert_metric('metric', 1, count=1)
+
+    def test_non_float_value(self, aggregator):
+        check = AgentCheck()
+
+        with pytest.raises(ValueError):
+            check.submit_metric_batch('gauge', 'metric', ['85k'], [()])
+
+        aggregator.assert_metric('metric', count=0)
+
+    def test_metrics_filters(self, aggregator):
+        instance = {'metric_patterns': {'exclude': ['^excluded']}}
+        check = AgentCheck('myintegration', {}, [instance])
+
+        check.submit_metric_batch('gauge', ['included', 'excluded'], [1, 2], [(), ()])
+
+        aggregator.assert_metric('included', 1, count=1)
+        aggregator.assert_metric('excluded', count=0)
+
+    def test_metric_limit(self, aggregator):
+        check = LimitedCheck()
+
+        check.submit_metric_batch('gauge', 'metric', [0] * 20, [()] * 20)
+        check.submit_metric_batch('count', 'count', list(range(20)), [('foo:{}'.format(i),) for i in range(20)])
+
+        assert len(check.get_warnings()) == 1
+        assert len(aggregator.metrics('metric')) == 10
+        assert len(aggregator.metrics('count')) == 0
+
+
 class TestEvents:
     def test_valid_event(self, aggregator):
         check = AgentCheck()
@@ -646,6 +761,49 @@ class TestTags:
         tags = check._normalize_tags_type(tags=["foo:bar", "cluster:my_cluster", "version", "bar"])
         assert set(tags) == expected_tags
 
+    @pytest.mark.parametrize(
+        "disable_generic_tags, expected_tags",
+        [
+            pytest.param(False, {"foo:bar", "cluster:my_cluster", "version", "bar"}),
+            pytest.param(True, {"foo:bar", "myintegration_cluster:my_cluster", "myintegration_version", "bar"}),
+        ],
+    )
+    def test_generic_tags_tag_set(self, disable_generic_tags, expected_tags):
+        instance = {'disable_generic_tags': disable_generic_tags}
+        check = AgentCheck('myintegration', {}, [instance])
+        tag_set = TagSet(["foo:bar", "cluster:my_cluster", "version", "bar"])
+
+        tags = check._normalize_tags_type(tags=tag_set)
+
+        assert isinstance(tags, TagSet)
+        assert set(tags) == expected_tags
+        assert check._normalize_tags_type(tags=tag_set) is tags
+
+    def test_tag_set_not_normalized(self):
+        check = AgentCheck()
+        tag_set = TagSet(['foo:bar'])
+
+        assert check._normalize_tags_type(tag_set) is tag_set
+        assert set(check._normalize_tags_type(tag_set, device_name='dev')) == {'foo:bar', 'device:dev'}
+
+    def test_tag_set_submission(self, aggregator):
+        check = AgentCheck()
+        tag_set = TagSet(['foo:bar', b'baz:qux'])
+
+        check.gauge('metric', 1, tags=tag_set)
+        check.submit_metric_batch('count', 'count', [1], [tag_set])
+        check.service_check('service_check', AgentCheck.OK, tags=tag_set)
+
+        aggregator.assert_metric('metric', 1, tags=['foo:bar', 'baz:qux'], count=1)
+        aggregator.assert_metric('count', 1, tags=['foo:bar', 'baz:qux'], count=1)
+        aggregator.assert_service_check('service_check', AgentCheck.OK, tags=['foo:bar', 'baz:qux'], count=1)
+
+    def test_tag_set_external_tags(self):
+        check = AgentCheck()
+        with mock.patch.object(datadog_agent, 'set_external_tags') as set_external_tags:
+            check.set_external_tags([('hostname', {'src_name': TagSet(['key1:val1'])})])
+            set_external_tags.assert_called_with([('hostname', {'src_name': ['key1:val1']})])
+
     @pytest.mark.parametrize(
         "exclude_metrics_filters, include_metrics_filters, expected_metrics",
         [
@@ -796,6 +954,9 @@ class TestLimits:
         assert uid != check._context_uid(aggregator.GAUGE, "test.metric", ["two"], None)
         assert uid != check._context_uid(aggregator.GAUGE, "test.metric", ["one", "two"], "host")
 
+        # Test tag sets share the contexts of the equivalent lists
+        assert uid == check._context_uid(aggregator.GAUGE, "test.metric", TagSet(["two", "one"]), None)
+
     def test_metric_limit_gauges(self, aggregator):
         check = LimitedCheck()
         assert check.get_warnings() == []
@@ -0,0 +1,55 @@
+# (C) Datadog, Inc. 2023-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+import pytest
+
+from datadog_checks.base import AgentCheck
+from datadog_checks.base.utils.tagging import TagSet
+from datadog_checks.dev.testing import requires_py3
+
+pytestmark = [requires_py3]
+
+NAMES = ['metric{}'.format(i % 50) for i in range(5000)]
+VALUES = [float(i) for i in range(5000)]
+TAGS = [('shard:{}'.format(i % 100), 'role:bench') for i in range(5000)]
+
+
+@pytest.fixture
+def check():
+    c = AgentCheck('bench', {}, [{}])
+    c.__NAMESPACE__ = 'bench'
+    return c
+
+
+def test_gauge_loop(benchmark, aggregator, check):
+    def submit():
+        aggregator.reset()
+        for name, value, tags in zip(NAMES, VALUES, TAGS):
+            check.gauge(name, value, tags=list(tags))
+
+    benchmark(submit)
+
+    assert len(aggregator.metrics('bench.metric0')) == 100
+
+
+def test_submit_metric_batch(benchmark, aggregator, check):
+    def submit():
+        aggregator.reset()
+        check.submit_metric_batch('gauge', NAMES, VALUES, TAGS)
+
+    benchmark(submit)
+
+    assert len(aggregator.metrics('bench.metric0')) == 100
+
+
+def test_gauge_loop_tag_set(benchmark, aggregator, check):
+    tag_sets = [TagSet(tags) for tags in TAGS]
+
+    def submit():
+        aggregator.reset()
+        for name, value, tags in zip(NAMES, VALUES, tag_sets):
+            check.gauge(name, value, tags=tags)
+
+    benchmark(submit)
+
+    assert len(aggregator.metrics('bench.metric0')) == 100
@@ -0,0 +1,170 @@
+# (C) Datadog, Inc. 2023-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+import threading
+import time
+
+import pytest
+
+from datadog_checks.base import AgentCheck
+from datadog_checks.base.checks.libs.thread_pool import Pool
+
+pytestmark = pytest.mark.unit
+
+
+def wait_for(predicate, timeout=5):
+    deadline = time.time() + timeout
+    while not predicate():
+        if time.time() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+@pytest.fixture
+def pools():
+    created = []
+
+    def make_pool(*args, **kwargs):
+        pool = Pool(*args, **kwargs)
+        created.append(pool)
+        return pool
+
+    yield make_pool
+
+    for pool in created:
+        pool.terminate()
+        pool.join()
+
+
+def test_map(pools):
+    pool = pools(4)
+
+    assert pool.map(lambda x: x * 2, range(100)) == [x * 2 for x in range(100)]
+
+
+@pytest.mark.parametrize(
+    'nworkers, min_workers, max_workers',
+    [
+        pytest.param(0, None, None, id='no workers'),
+        pytest.param(2, 3, None, id='fewer workers than the minimum'),
+        pytest.param(4, None, 2, id='more workers than the maximum'),
+    ],
+)
+def test_invalid_bounds(nworkers, min_workers, max_workers):
+    with pytest.raises(ValueError, match='The number of workers must satisfy'):
+        Pool(nworkers, min_workers=min_workers, max_workers=max_workers)
+
+
+def test_stats(pools):
+    pool = pools(2)
+    release = threading.Event()
+
+    results = [pool.apply_async(release.wait) for _ in range(5)]
+    assert wait_for(lambda: pool.get_stats()['busy_workers'] == 2)
+    stats = pool.get_stats()
+    assert stats['queue_size'] == 3
+    assert stats['workers'] == 2
+    assert stats['completed'] == 0
+
+    time.sleep(0.1)
+    release.set()
+    for result in results:
+        result.get(5)
+
+    stats = pool.get_stats()
+    assert stats['queue_size'] == 0
+    assert stats['busy_workers'] == 0
+    assert stats['completed'] == 5
+    assert len(stats['wait_times']) == len(stats['run_times']) == 5
+    # The queued jobs waited for the first two ones to complete
+    assert sorted(stats['wait_times'])[-1] >= 0.1
+    assert 0 < stats['utilization'] <= 1
+
+    # Statistics are reset once retrieved
+    assert pool.get_stats()['completed'] == 0
+
+
+def test_submit_metrics(aggregator, pools):
+    check = AgentCheck('test', {}, [{}])
+    pool = pools(2)
+    pool.map(time.sleep, [0.01] * 4)
+
+    pool.submit_metrics(check, 'pool', tags=['foo:bar'])
+
+    for name in ('pool.queue_size', 'pool.workers', 'pool.busy_workers', 'pool.utilization'):
+        aggregator.assert_metric(name, metric_type=aggregator.GAUGE, count=1, tags=['foo:bar'])
+    aggregator.assert_metric('pool.workers', value=2)
+    aggregator.assert_metric('pool.jobs.completed', value=4, metric_type=aggregator.COUNT, tags=['foo:bar'])
+    aggregator.assert_metric('pool.jobs.wait_time', metric_type=aggregator.HISTOGRAM, count=4, tags=['foo:bar'])
+    aggregator.assert_metric('pool.jobs.run_time', metric_type=aggregator.HISTOGRAM, count=4, tags=['foo:bar'])
+    aggregator.assert_all_metrics_covered()
+
+
+def test_submit_gauges(aggregator, pools):
+    check = AgentCheck('test', {}, [{}])
+    pool = pools(2)
+    release = threading.Event()
+    results = [pool.apply_async(release.wait) for _ in range(5)]
+    assert wait_for(lambda: pool.get_state()['busy_workers'] == 2)
+
+    pool.submit_gauges(check, 'pool', tags=['foo:bar'])
+    release.set()
+    for result in results:
+        result.get(5)
+    pool.submit_metrics(check, 'pool', tags=['foo:bar'], gauges=False)
+
+    aggregator.assert_metric('pool.queue_size', value=3, metric_type=aggregator.GAUGE, count=1, tags=['foo:bar'])
+    aggregator.assert_metric('pool.workers', value=2, metric_type=aggregator.GAUGE, count=1, tags=['foo:bar'])
+    aggregator.assert_metric('pool.busy_workers', value=2, metric_type=aggregator.GAUGE, count=1, tags=['foo:bar'])
+    aggregator.assert_metric('pool.utilization', metric_type=aggregator.GAUGE, count=1, tags=['foo:bar'])
+    # Retrieving the state doesn't reset the statistics
+    aggregator.assert_metric('pool.jobs.completed', value=5, metric_type=aggregator.COUNT, tags=['foo:bar'])
+    aggregator.assert_metric('pool.jobs.wait_time', metric_type=aggregator.HISTOGRAM, count=5, tags=['foo:bar'])
+    aggregator.assert_metric('pool.jobs.run_time', metric_type=aggregator.HISTOGRAM, count=5, tags=['foo:bar'])
+    aggregator.assert_all_metrics_covered()
+
+
+def test_adaptive_pool(pools):
+    pool = pools(1, max_workers=4, idle_timeout=0.1)
+    release = threading.Event()
+    assert pool.adaptive
+
+    # Workers are added while the backlog exceeds the idle workers, up to the upper bound
+    results = [pool.apply_async(release.wait) for _ in range(8)]
+    assert wait_for(lambda: pool.get_stats()['busy_workers'] == 4)
+    assert len(pool._workers) == 4
+
+    release.set()
+    for result in results:
+        result.get(5)
+
+    # Idle workers exit down to the lower bound
+    assert wait_for(lambda: len(pool._workers) == 1)
+    assert pool.get_nworkers() == 1
+    assert pool.apply(lambda: 42) == 42
+
+
+def test_fixed_pool_does_not_grow(pools):
+    pool = pools(2)
+    release = threading.Event()
+    assert not pool.adaptive
+
+    results = [pool.apply_async(release.wait) for _ in range(6)]
+    assert wait_for(lambda: pool.get_stats()['busy_workers'] == 2)
+    assert len(pool._workers) == 2
+
+    release.set()
+    for result in results:
+        result.get(5)
+
+
+def test_terminate_adaptive_pool():
+    pool = Pool(2, min_workers=1, max_workers=4, idle_timeout=0.1)
+    pool.map(time.sleep, [0.05] * 8)
+
+    pool.terminate()
+    pool.join()
+
+    assert pool.get_nworkers() == 0
+    assert pool._workers == []
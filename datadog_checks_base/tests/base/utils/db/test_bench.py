@@ -0,0 +1,69 @@
+# (C) Datadog, Inc. 2023-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+import pytest
+
+from datadog_checks.base.utils.db.statement_metrics import StatementMetrics
+from datadog_checks.dev.testing import requires_py3
+
+from .common import create_query_manager, mock_executor
+
+pytestmark = [requires_py3]
+
+QUERY = {
+    'name': 'per table statistics',
+    'query': 'foo',
+    'columns': [
+        {'name': 'schema', 'type': 'tag'},
+        {'name': 'table', 'type': 'tag'},
+        {'name': 'table.seq_scans', 'type': 'rate'},
+        {'name': 'table.idx_scans', 'type': 'rate'},
+        {'name': 'table.live_rows', 'type': 'gauge'},
+        {'name': 'table.dead_rows', 'type': 'gauge'},
+    ],
+    'tags': ['query:tables'],
+}
+ROWS = [['schema{}'.format(i % 10), 'table{}'.format(i), i, i, i, i] for i in range(20000)]
+
+
+@pytest.mark.parametrize('batch_size', [None, 1000], ids=['rows', 'batches'])
+def test_query_manager(benchmark, aggregator, batch_size):
+    query_manager = create_query_manager(QUERY, executor=mock_executor(ROWS), batch_size=batch_size)
+    query_manager.compile_queries()
+
+    def execute():
+        aggregator.reset()
+        query_manager.execute()
+
+    benchmark(execute)
+
+    assert len(aggregator.metrics('table.live_rows')) == len(ROWS)
+
+
+@pytest.mark.parametrize('row_count', [10000, 50000, 100000])
+def test_compute_derivative_rows(benchmark, row_count):
+    metrics = ['metric{}'.format(i) for i in range(20)]
+
+    def generate_rows(run):
+        rows = []
+        for i in range(row_count):
+            # A tenth of the queries are executed between runs
+            calls = run if i % 10 == 0 else 0
+            row = {'queryid': i, 'query': 'SELECT {}'.format(i), 'datname': 'db', 'rolname': 'user'}
+            row.update((metric, i + calls) for metric in metrics)
+            rows.append(row)
+        return rows
+
+    def key(row):
+        return (row['queryid'], row['datname'], row['rolname'])
+
+    runs = [generate_rows(run) for run in range(2)]
+    statement_metrics = StatementMetrics()
+    statement_metrics.compute_derivative_rows(runs[0], metrics, key)
+
+    def compute():
+        # Alternate between both runs, going back to the first one is handled as a stats reset
+        runs.reverse()
+        return statement_metrics.compute_derivative_rows(runs[0], metrics, key)
+
+    benchmark(compute)
@@ -3,6 +3,7 @@
 # Licensed under a 3-clause BSD style license (see LICENSE)
 
 import copy
+import random
 
 import pytest
 
@@ -16,6 +17,36 @@ def add_to_dict(a, b):
     return a
 
 
+def compute_derivative_rows_by_row(previous_rows, rows, metrics, key):
+    """
+    The row by row implementation of `StatementMetrics.compute_derivative_rows`, keeping the whole previous rows.
+    """
+    merged_rows = {}
+    for row in rows:
+        row_key = key(row)
+        if row_key in merged_rows:
+            merged = merged_rows[row_key]
+            merged_rows[row_key] = {k: row[k] + merged[k] if k in metrics else merged[k] for k in merged}
+        else:
+            merged_rows[row_key] = dict(row)
+
+    result = []
+    for row_key, row in merged_rows.items():
+        prev = previous_rows.get(row_key)
+        if prev is None:
+            continue
+
+        metric_columns = set(metrics) & set(row)
+        diffed_row = {k: row[k] - prev[k] if k in metric_columns else row[k] for k in row}
+        if any(diffed_row[k] < 0 for k in metric_columns) or all(diffed_row[k] == 0 for k in metric_columns):
+            continue
+        result.append(diffed_row)
+
+    previous_rows.clear()
+    previous_rows.update(merged_rows)
+    return result
+
+
 class TestStatementMetrics:
     @pytest.mark.parametrize(
         'fn_args',
@@ -181,3 +212,63 @@ class TestStatementMetrics:
         ]
 
         assert expected_merged_metrics == metrics
+
+    def test_compute_derivative_rows_same_as_by_row(self):
+        rng = random.Random(42)
+        metrics = ['count', 'time', 'rows']
+
+        def key(row):
+            return (row['query_signature'], row['db'])
+
+        def generate_rows(counters):
+            rows = []
+            for (signature, db, variant), values in sorted(counters.items()):
+                row = {'query_signature': signature, 'db': db, 'query': 'SELECT {}'.format(variant), 'errors': 1}
+                row.update(values)
+                rows.append(row)
+            rng.shuffle(rows)
+            return rows
+
+        counters = {
+            ('sig{}'.format(i % 40), 'db{}'.format(i % 3), i): {'count': 0, 'time': 0.0, 'rows': 0} for i in range(200)
+        }
+        sm = StatementMetrics()
+        previous_rows = {}
+        for _ in range(10):
+            for query_key, values in list(counters.items()):
+                change = rng.random()
+                if change < 0.05:
+                    # Stats reset
+                    counters[query_key] = {'count': 0, 'time': 0.0, 'rows': 0}
+                elif change < 0.1:
+                    # Evicted query
+                    del counters[query_key]
+                elif change < 0.5:
+                    values['count'] += rng.randint(0, 5)
+                    values['time'] += rng.random()
+                    values['rows'] += rng.randint(0, 1000)
+
+            rows = generate_rows(counters)
+            expected = compute_derivative_rows_by_row(previous_rows, copy.deepcopy(rows), metrics, key)
+            assert sm.compute_derivative_rows(rows, metrics, key) == expected
+
+    def test_compute_derivative_rows_columns_change(self):
+        sm = StatementMetrics()
+
+        def key(row):
+            return row['query']
+
+        rows1 = [{'query': 'COMMIT', 'count': 1, 'time': 10}]
+        rows2 = [{'query': 'COMMIT', 'time': 15, 'count': 2}]
+        rows3 = [{'query': 'COMMIT', 'time': 15, 'count': 3, 'rows': 1}]
+        rows4 = [{'query': 'COMMIT', 'time': 15, 'count': 4, 'rows': 2}]
+
+        assert sm.compute_derivative_rows(rows1, ['count', 'time', 'rows'], key) == []
+        assert sm.compute_derivative_rows(rows2, ['count', 'time', 'rows'], key) == [
+            {'query': 'COMMIT', 'time': 5, 'count': 1}
+        ]
+        # The new column was not tracked yet
+        assert sm.compute_derivative_rows(rows3, ['count', 'time', 'rows'], key) == []
+        assert sm.compute_derivative_rows(rows4, ['count', 'time', 'rows'], key) == [
+            {'query': 'COMMIT', 'time': 0, 'count': 1, 'rows': 1}
+        ]
@@ -871,6 +871,26 @@ class TestTransformerCompilation:
         ):
             query_manager.compile_queries()
 
+    @pytest.mark.parametrize('field', ['collection_interval', 'cache_ttl'])
+    @pytest.mark.parametrize('value', [0, -1, '60', True])
+    def test_schedule_field_not_positive_number(self, field, value):
+        query_manager = create_query_manager(
+            {'name': 'test query', 'query': 'foo', 'columns': [{'name': 'test.foo', 'type': 'gauge'}], field: value}
+        )
+
+        with pytest.raises(ValueError, match='^field `{}` for test query must be a positive number$'.format(field)):
+            query_manager.compile_queries()
+
+    def test_cache_ttl_without_collection_interval(self):
+        query_manager = create_query_manager(
+            {'name': 'test query', 'query': 'foo', 'columns': [{'name': 'test.foo', 'type': 'gauge'}], 'cache_ttl': 60}
+        )
+
+        with pytest.raises(
+            ValueError, match='^field `cache_ttl` for test query requires `collection_interval` to be set$'
+        ):
+            query_manager.compile_queries()
+
 
 class TestSubmission:
     @pytest.mark.parametrize(
@@ -1210,3 +1230,288 @@ class TestSubmission:
             )
 
         aggregator.assert_all_metrics_covered()
+
+
+def get_submissions(aggregator):
+    metrics = sorted(
+        (m.name, m.type, m.value, sorted(m.tags), m.hostname)
+        for name in aggregator.metric_names
+        for m in aggregator.metrics(name)
+    )
+    service_checks = sorted(
+        (sc.name, sc.status, sorted(sc.tags), sc.message)
+        for name in list(aggregator._service_checks)
+        for sc in aggregator.service_checks(name)
+    )
+    return metrics, service_checks
+
+
+class Cursor(object):
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.fetches = 0
+
+    def fetchmany(self, size):
+        self.fetches += 1
+        rows, self.rows = self.rows[:size], self.rows[size:]
+        return rows
+
+
+class TestBatchExecution:
+    QUERY = {
+        'name': 'test query',
+        'query': 'foo',
+        'columns': [
+            {'name': 'test.gauge', 'type': 'gauge'},
+            {'name': 'test.count', 'type': 'count', 'raw': True},
+            {'name': 'test.monotonic', 'type': 'monotonic_gauge'},
+            {'name': 'tag', 'type': 'tag'},
+            {'name': 'nullable', 'type': 'tag_not_null'},
+            {'name': 'tag_list', 'type': 'tag_list'},
+            {'name': 'status', 'type': 'service_check', 'status_map': {'up': 'OK', 'down': 'CRITICAL'}},
+            {},
+            {'name': 'source', 'type': 'source'},
+        ],
+        'tags': ['test:bar'],
+        'extras': [{'name': 'test.extra', 'expression': 'source * 2', 'submit_type': 'gauge'}],
+    }
+    ROWS = [
+        [1, 2, 3, 'a', None, 'x,y', 'up', 'ignored', 4],
+        [5, 6, 7, 'b', 'c', ['z'], 'down', 'ignored', 8],
+        [9, 10, 11, 'a', None, 'x,y', 'up', 'ignored', 12],
+        [],
+        [13, 14, 15, 'a', 'c', ('x',), 'down', 'ignored', 16],
+    ]
+
+    @pytest.mark.parametrize('batch_size', [1, 2, 100])
+    def test_same_submissions(self, aggregator, batch_size):
+        query_manager = create_query_manager(self.QUERY, executor=mock_executor(self.ROWS), tags=['test:foo'])
+        query_manager.compile_queries()
+        query_manager.execute(extra_tags=['test:baz'])
+        expected = get_submissions(aggregator)
+        aggregator.reset()
+
+        query_manager = create_query_manager(
+            self.QUERY, executor=mock_executor(self.ROWS), tags=['test:foo'], batch_size=batch_size
+        )
+        query_manager.compile_queries()
+        query_manager.execute(extra_tags=['test:baz'])
+
+        assert get_submissions(aggregator) == expected
+        assert len(expected[0]) == 20
+
+    def test_batch_submission(self, aggregator, mocker):
+        check = AgentCheck('test', {}, [{}])
+        gauge = mocker.spy(check, 'gauge')
+        submit_metric_batch = mocker.spy(AgentCheck, 'submit_metric_batch')
+        query_manager = create_query_manager(
+            {
+                'name': 'test query',
+                'query': 'foo',
+                'columns': [{'name': 'test.foo', 'type': 'gauge'}, {'name': 'tag', 'type': 'tag'}],
+                'tags': ['test:bar'],
+            },
+            executor=mock_executor([[i, 'tag{}'.format(i % 2)] for i in range(10)]),
+            check=check,
+            batch_size=4,
+        )
+        query_manager.compile_queries()
+        query_manager.execute()
+
+        assert gauge.call_count == 0
+        assert submit_metric_batch.call_count == 3
+        aggregator.assert_metric('test.foo', tags=['test:bar', 'tag:tag0'], count=5)
+        aggregator.assert_metric('test.foo', tags=['test:bar', 'tag:tag1'], count=5)
+        aggregator.assert_all_metrics_covered()
+
+    def test_batch_submission_method_overridden(self, aggregator, mocker):
+        class Check(AgentCheck):
+            def submit_metric_batch(self, metrics):
+                raise Exception('unrelated method')
+
+        check = Check('test', {}, [{}])
+        query_manager = create_query_manager(
+            {'name': 'test query', 'query': 'foo', 'columns': [{'name': 'test.foo', 'type': 'gauge'}]},
+            executor=mock_executor([[i] for i in range(10)]),
+            check=check,
+            batch_size=4,
+        )
+        query_manager.compile_queries()
+        query_manager.execute()
+
+        # The implementation of `AgentCheck` is used
+        aggregator.assert_metric('test.foo', count=10)
+
+    def test_fetchmany(self, aggregator):
+        cursor = Cursor([[i] for i in range(5)])
+        query_manager = create_query_manager(
+            {'name': 'test query', 'query': 'foo', 'columns': [{'name': 'test.foo', 'type': 'gauge'}]},
+            executor=lambda _: cursor,
+            batch_size=2,
+        )
+        query_manager.compile_queries()
+        query_manager.execute()
+
+        assert cursor.fetches == 4
+        aggregator.assert_metric('test.foo', count=5)
+        aggregator.assert_all_metrics_covered()
+
+    def test_query_execution_error(self, caplog, aggregator):
+        def executor(_):
+            raise ValueError('no result set')
+
+        query_manager = create_query_manager(
+            {'name': 'test query', 'query': 'foo', 'columns': [{'name': 'test.foo', 'type': 'gauge'}]},
+            executor=executor,
+            batch_size=2,
+        )
+        query_manager.compile_queries()
+        query_manager.execute()
+
+        expected_message = 'Error querying test query: no result set'
+        matches = [level for _, level, message in caplog.record_tuples if message == expected_message]
+
+        assert matches == [logging.ERROR]
+        aggregator.assert_all_metrics_covered()
+
+    @pytest.mark.parametrize('batch_size', [0, -1, '10'])
+    def test_invalid_batch_size(self, batch_size):
+        with pytest.raises(ValueError, match='^QueryExecutor `batch_size` must be a positive integer$'):
+            create_query_manager({}, batch_size=batch_size)
+
+
+class TestParallelExecution:
+    @pytest.mark.parametrize('batch_size', [None, 2])
+    def test_queries(self, aggregator, batch_size):
+        used_executors = set()
+
+        def create_executor(executor_id):
+            def executor(query):
+                used_executors.add(executor_id)
+                if query == 'error':
+                    raise ValueError('no result set')
+
+                return [[int(query), executor_id]]
+
+            return executor
+
+        queries = [
+            {
+                'name': 'query {}'.format(i),
+                'query': str(i) if i != 3 else 'error',
+                'columns': [{'name': 'test.foo', 'type': 'gauge'}, {'name': 'executor', 'type': 'source'}],
+            }
+            for i in range(10)
+        ]
+        query_manager = create_query_manager(
+            *queries,
+            executor=create_executor(0),
+            parallel_executors=[create_executor(1), create_executor(2)],
+            batch_size=batch_size,
+        )
+        query_manager.compile_queries()
+        query_manager.execute()
+
+        assert used_executors <= {0, 1, 2}
+        # Results are processed in query order
+        assert [m.value for m in aggregator.metrics('test.foo')] == [0, 1, 2, 4, 5, 6, 7, 8, 9]
+
+
+class TestScheduling:
+    @staticmethod
+    def create_query_manager(mocker, **query):
+        results = iter(range(100))
+        executor = mocker.MagicMock(side_effect=lambda _: [[next(results)]])
+        query_manager = create_query_manager(
+            dict({'name': 'test query', 'query': 'foo', 'columns': [{'name': 'test.foo', 'type': 'gauge'}]}, **query),
+            {'name': 'cheap query', 'query': 'bar', 'columns': [{'name': 'test.bar', 'type': 'gauge'}]},
+            executor=executor,
+        )
+        query_manager.compile_queries()
+
+        return query_manager, executor
+
+    @staticmethod
+    def execute_at(mocker, query_manager, now):
+        mocker.patch('datadog_checks.base.utils.db.core.get_precise_time', return_value=now)
+        query_manager.execute()
+
+    def test_collection_interval(self, aggregator, mocker):
+        query_manager, executor = self.create_query_manager(mocker, collection_interval=60)
+
+        for now in (0, 15, 30, 45, 60, 75):
+            self.execute_at(mocker, query_manager, now)
+
+        assert [call.args[0] for call in executor.call_args_list].count('foo') == 2
+        assert [call.args[0] for call in executor.call_args_list].count('bar') == 6
+        assert len(aggregator.metrics('test.foo')) == 2
+        assert len(aggregator.metrics('test.bar')) == 6
+
+    def test_cache_ttl(self, aggregator, mocker):
+        query_manager, executor = self.create_query_manager(mocker, collection_interval=60, cache_ttl=30)
+
+        for now in (0, 15, 30, 45, 60):
+            self.execute_at(mocker, query_manager, now)
+
+        assert [call.args[0] for call in executor.call_args_list].count('foo') == 2
+        # Cached results are submitted again until they expire
+        assert [m.value for m in aggregator.metrics('test.foo')] == [0, 0, 5]
+
+    def test_query_error_not_cached(self, aggregator, mocker):
+        query_manager = create_query_manager(
+            {
+                'name': 'test query',
+                'query': 'foo',
+                'columns': [{'name': 'test.foo', 'type': 'gauge'}],
+                'collection_interval': 60,
+                'cache_ttl': 60,
+            },
+            executor=mocker.MagicMock(side_effect=[Exception('error'), [[1]], [[2]]]),
+        )
+        query_manager.compile_queries()
+
+        # A failed query is retried on the next run rather than after its collection interval
+        for now in (0, 15, 30, 75):
+            self.execute_at(mocker, query_manager, now)
+
+        assert [m.value for m in aggregator.metrics('test.foo')] == [1, 1, 2]
+
+    def test_batches(self, aggregator, mocker):
+        query_manager = create_query_manager(
+            {
+                'name': 'test query',
+                'query': 'foo',
+                'columns': [{'name': 'test.foo', 'type': 'gauge'}],
+                'collection_interval': 60,
+                'cache_ttl': 60,
+            },
+            executor=mock_executor([[1], [2], [3]]),
+            batch_size=2,
+        )
+        query_manager.compile_queries()
+
+        for now in (0, 15):
+            self.execute_at(mocker, query_manager, now)
+
+        assert [m.value for m in aggregator.metrics('test.foo')] == [1, 2, 3, 1, 2, 3]
+
+    def test_parallel_executors(self, aggregator, mocker):
+        query_manager = create_query_manager(
+            {
+                'name': 'test query',
+                'query': 'foo',
+                'columns': [{'name': 'test.foo', 'type': 'gauge'}],
+                'collection_interval': 60,
+                'cache_ttl': 60,
+            },
+            {'name': 'cheap query', 'query': 'bar', 'columns': [{'name': 'test.bar', 'type': 'gauge'}]},
+            executor=mock_executor([[1]]),
+            parallel_executors=[mock_executor([[1]])],
+        )
+        query_manager.compile_queries()
+
+        for now in (0, 15):
+            self.execute_at(mocker, query_manager, now)
+
+        assert len(aggregator.metrics('test.foo')) == 2
+        assert len(aggregator.metrics('test.bar')) == 2
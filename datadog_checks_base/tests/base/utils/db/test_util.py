@@ -2,7 +2,9 @@
 # (C) Datadog, Inc. 2020-present
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
+import threading
 import time
+from collections import Counter
 from concurrent.futures.thread import ThreadPoolExecutor
 
 import mock
@@ -13,10 +15,14 @@ from datadog_checks.base.stubs.datadog_agent import datadog_agent
 from datadog_checks.base.utils.db.utils import (
     ConstantRateLimiter,
     DBMAsyncJob,
+    JobSlots,
+    ObfuscationCache,
     RateLimitingTTLCache,
     obfuscate_sql_with_metadata,
+    obfuscation_cache,
     resolve_db_host,
 )
+from datadog_checks.base.utils.db.sql import compute_sql_signature
 from datadog_checks.base.utils.serialization import json
 
 
@@ -164,6 +170,81 @@ def test_obfuscate_sql_with_metadata(obfuscator_return_value, expected_value):
     assert statement['metadata'] == {}
 
 
+class TestObfuscationCache:
+    def test_hits(self):
+        cache = ObfuscationCache()
+        with mock.patch.object(datadog_agent, 'obfuscate_sql', passthrough=True) as mock_agent:
+            mock_agent.side_effect = lambda query, options=None: 'SELECT ?'
+            statement = cache.obfuscate('SELECT 1', '{}')
+            assert statement == {
+                'query': 'SELECT ?',
+                'metadata': {},
+                'query_signature': compute_sql_signature('SELECT ?'),
+            }
+            assert cache.obfuscate('SELECT 1', '{}') is statement
+            assert mock_agent.call_count == 1
+
+            # Obfuscation options are part of the key
+            assert cache.obfuscate('SELECT 1', '{"replace_digits": true}') == statement
+            assert mock_agent.call_count == 2
+
+        assert cache.get_stats() == {'hits': 1, 'misses': 2, 'evictions': 0, 'entries': 2, 'bytes': cache.currsize}
+
+    def test_evictions(self):
+        cache = ObfuscationCache()
+        cache.obfuscate('SELECT 1')
+        size = cache.currsize
+
+        cache = ObfuscationCache(maxsize=size * 2)
+        for query in ('SELECT 1', 'SELECT 2', 'SELECT 1', 'SELECT 3'):
+            cache.obfuscate(query)
+
+        assert ('SELECT 1', None) in cache
+        assert ('SELECT 2', None) not in cache
+        assert ('SELECT 3', None) in cache
+        assert cache.get_stats() == {'hits': 1, 'misses': 3, 'evictions': 1, 'entries': 2, 'bytes': size * 2}
+
+    def test_statement_too_large(self):
+        cache = ObfuscationCache(maxsize=1)
+        assert cache.obfuscate('SELECT 1')['query'] == 'SELECT 1'
+        assert len(cache) == 0
+
+    def test_errors_not_cached(self):
+        cache = ObfuscationCache()
+        with mock.patch.object(datadog_agent, 'obfuscate_sql', passthrough=True) as mock_agent:
+            mock_agent.side_effect = Exception('failed to obfuscate')
+            with pytest.raises(Exception, match='failed to obfuscate'):
+                cache.obfuscate('SELECT 1')
+
+        assert len(cache) == 0
+        assert cache.obfuscate('SELECT 1')['query'] == 'SELECT 1'
+
+    def test_clear(self):
+        cache = ObfuscationCache()
+        cache.obfuscate('SELECT 1')
+        cache.obfuscate('SELECT 1')
+        cache.clear()
+
+        # The counters are not reset
+        assert cache.get_stats() == {'hits': 1, 'misses': 1, 'evictions': 0, 'entries': 0, 'bytes': 0}
+
+    def test_stats(self):
+        cache = ObfuscationCache()
+        cache.obfuscate('SELECT 1')
+        size = cache.currsize
+
+        cache = ObfuscationCache(maxsize=size * 2)
+        stats = Counter()
+        other_stats = Counter()
+        for query in ('SELECT 1', 'SELECT 2', 'SELECT 1'):
+            cache.obfuscate(query, stats=stats)
+        cache.obfuscate('SELECT 1', stats=other_stats)
+        cache.obfuscate('SELECT 3', stats=other_stats)
+
+        assert stats == {'hits': 1, 'misses': 2, 'evictions': 0}
+        assert other_stats == {'hits': 1, 'misses': 1, 'evictions': 1}
+
+
 class TestJob(DBMAsyncJob):
     def __init__(self, check, run_sync=False, enabled=True, rate_limit=10, min_collection_interval=15):
         super(TestJob, self).__init__(
@@ -254,3 +335,148 @@ def test_dbm_async_job_inactive_stop(aggregator):
     job.run_job_loop([])
     job._job_loop_future.result()
     aggregator.assert_metric("dd.test-dbms.async_job.inactive_stop", tags=['job:test-job'])
+
+
+def test_dbm_async_job_obfuscation_cache_stats(aggregator):
+    obfuscation_cache.clear()
+    # Statements obfuscated by other jobs are not counted
+    obfuscation_cache.obfuscate('SELECT 2')
+
+    job = TestJob(AgentCheck())
+    job._obfuscate('SELECT 1')
+    job._obfuscate('SELECT 1')
+    job._submit_obfuscation_cache_stats(['job:test'])
+    stats = obfuscation_cache.get_stats()
+    obfuscation_cache.clear()
+
+    # The size of the shared cache is submitted without the tags of the job
+    aggregator.assert_metric("dd.test-dbms.obfuscation_cache.entries", value=2, tags=[])
+    aggregator.assert_metric("dd.test-dbms.obfuscation_cache.bytes", value=stats['bytes'], tags=[])
+    for name, value in (('hits', 1), ('misses', 1), ('evictions', 0)):
+        aggregator.assert_metric(
+            "dd.test-dbms.obfuscation_cache.{}".format(name),
+            value=value,
+            tags=['job:test'],
+            metric_type=aggregator.MONOTONIC_COUNT,
+        )
+
+
+class RowsJob(TestJob):
+    def run_job(self):
+        self._record_rows(3)
+        self._submit_dbm_event(lambda payload: None, '{"rows": [1, 2, 3]}')
+        self._record_rows(2)
+
+
+def test_dbm_async_job_run_stats(aggregator):
+    job = RowsJob(AgentCheck(), run_sync=True)
+    job.run_job_loop(["hello:there"])
+
+    expected_tags = ["hello:there", "job:test-job"]
+    aggregator.assert_metric("dd.test-dbms.async_job.rows", value=5, count=1, tags=expected_tags)
+    aggregator.assert_metric("dd.test-dbms.async_job.payload_bytes", value=19, count=1, tags=expected_tags)
+    for name in ("run_time", "wait_time", "cpu_time"):
+        aggregator.assert_metric("dd.test-dbms.async_job.{}".format(name), count=1, tags=expected_tags)
+
+    # Each run is accounted for separately
+    job.run_job_loop(["hello:there"])
+    assert [m.value for m in aggregator.metrics("dd.test-dbms.async_job.rows")] == [5, 5]
+
+
+def test_job_slots_unbounded():
+    slots = JobSlots()
+    with slots.acquire("a"), slots.acquire("a"), slots.acquire("b") as wait_time:
+        assert wait_time < 1
+
+    assert slots._running == {}
+    assert slots._total == 0
+
+
+def test_job_slots_fair_scheduling():
+    slots = JobSlots(2)
+    acquired = []
+    release = threading.Event()
+
+    def run(key):
+        with slots.acquire(key):
+            acquired.append(key)
+            release.wait(5)
+
+    def wait_until(predicate):
+        deadline = time.time() + 5
+        while not predicate() and time.time() < deadline:
+            time.sleep(0.01)
+        assert predicate()
+
+    # The slow database takes all the slots
+    first = slots.acquire("slow")
+    second = slots.acquire("slow")
+    first.__enter__()
+    second.__enter__()
+
+    threads = [threading.Thread(target=run, args=("slow",)), threading.Thread(target=run, args=("fast",))]
+    try:
+        threads[0].start()
+        wait_until(lambda: len(slots._waiters) == 1)
+        threads[1].start()
+        wait_until(lambda: len(slots._waiters) == 2)
+
+        # The freed slot goes to the database with the fewest runs in progress, even though it waited less
+        first.__exit__(None, None, None)
+        wait_until(lambda: acquired)
+        assert acquired == ["fast"]
+
+        second.__exit__(None, None, None)
+        wait_until(lambda: len(acquired) == 2)
+        assert acquired == ["fast", "slow"]
+    finally:
+        release.set()
+        for thread in threads:
+            thread.join()
+
+    assert slots._total == 0
+
+
+def test_job_slots_set_limit():
+    slots = JobSlots(1)
+    acquired = threading.Event()
+
+    def run():
+        with slots.acquire("b"):
+            acquired.set()
+
+    with slots.acquire("a"):
+        thread = threading.Thread(target=run)
+        thread.start()
+        assert not acquired.wait(0.1)
+
+        # Lifting the limit grants the waiting runs
+        slots.set_limit(0)
+        assert acquired.wait(5)
+
+    thread.join()
+
+
+def test_job_slots_cancel():
+    slots = JobSlots(1)
+    cancel_event = threading.Event()
+    wait_times = []
+
+    def run():
+        with slots.acquire("b", cancel_event) as wait_time:
+            wait_times.append(wait_time)
+
+    with mock.patch('datadog_checks.base.utils.db.utils.JOB_SLOT_WAIT_INTERVAL', 0.01):
+        with slots.acquire("a"):
+            thread = threading.Thread(target=run)
+            thread.start()
+            cancel_event.set()
+            thread.join(5)
+
+            # The cancelled run gives up on the slot without waiting for it to be released
+            assert not thread.is_alive()
+            assert wait_times == [None]
+            assert slots._waiters == []
+
+    assert slots._running == {}
+    assert slots._total == 0
@@ -0,0 +1,66 @@
+# (C) Datadog, Inc. 2023-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+import pickle
+from collections import OrderedDict
+
+import mock
+
+from datadog_checks.base.utils.tagging import TagSet
+
+
+class TestTagSet:
+    def test_normalization(self):
+        tag_set = TagSet(['foo:bar', b'baz:qux', None, 'foo:bar'])
+
+        assert tuple(tag_set) == ('baz:qux', 'foo:bar')
+
+    def test_interned(self):
+        assert TagSet(['foo:bar', 'baz:qux']) is TagSet(['foo:bar', 'baz:qux'])
+        assert TagSet(('foo:bar', 'baz:qux')) is TagSet(('foo:bar', 'baz:qux'))
+
+    def test_tag_set_argument(self):
+        tag_set = TagSet(['foo:bar'])
+
+        assert TagSet(tag_set) is tag_set
+
+    def test_hash(self):
+        tag_set = TagSet(['foo:bar', 'baz:qux'])
+
+        assert hash(tag_set) == hash(frozenset(['baz:qux', 'foo:bar']))
+        assert hash(tag_set) == hash(TagSet(['baz:qux', 'foo:bar']))
+
+    def test_equality(self):
+        tag_set = TagSet(['foo:bar', 'baz:qux'])
+
+        assert tag_set == TagSet(['baz:qux', 'foo:bar'])
+        assert tag_set != TagSet(['foo:bar'])
+        assert tag_set != ('baz:qux', 'foo:bar')
+
+    def test_union(self):
+        tag_set = TagSet(['foo:bar']).union(['baz:qux'])
+
+        assert isinstance(tag_set, TagSet)
+        assert tag_set == TagSet(['foo:bar', 'baz:qux'])
+
+    def test_pickle(self):
+        tag_set = TagSet(['foo:bar'])
+        unpickled = pickle.loads(pickle.dumps(tag_set))
+
+        assert unpickled == tag_set
+        assert hash(unpickled) == hash(tag_set)
+
+    def test_eviction(self):
+        with mock.patch('datadog_checks.base.utils.tagging.TAG_SET_CACHE_SIZE', 2), mock.patch.object(
+            TagSet, '_cache', OrderedDict()
+        ):
+            tag_set = TagSet(['tag:0'])
+            TagSet(['tag:1'])
+            # Mark the first tag set as recently used
+            assert TagSet(['tag:0']) is tag_set
+            TagSet(['tag:2'])
+            TagSet(['tag:3'])
+
+            assert ('tag:0',) not in TagSet._cache
+            assert TagSet(['tag:0']) is not tag_set
+            assert TagSet(['tag:0']) == tag_set
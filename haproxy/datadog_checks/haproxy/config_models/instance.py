@@ -115,6 +115,9 @@ class InstanceConfig(BaseModel):
     collect_histogram_buckets: Optional[bool]
     collect_status_metrics: Optional[bool]
     collect_status_metrics_by_host: Optional[bool]
+    compile_sample_pipelines: Optional[bool]
+    concurrent_scrapers: Optional[int]
+    conditional_requests: Optional[bool]
     connect_timeout: Optional[float]
     count_status_by_service: Optional[bool]
     disable_generic_tags: Optional[bool]
@@ -183,6 +186,7 @@ class InstanceConfig(BaseModel):
     tags: Optional[Sequence[str]]
     tags_regex: Optional[str]
     telemetry: Optional[bool]
+    text_parser: Optional[str]
     timeout: Optional[float]
     tls_ca_cert: Optional[str]
     tls_cert: Optional[str]
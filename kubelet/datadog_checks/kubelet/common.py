@@ -1,7 +1,6 @@
 # (C) Datadog, Inc. 2018-present
 # All rights reserved
 # Licensed under Simplified BSD License (see LICENSE)
-
 from datadog_checks.base.utils.tagging import tagger
 
 try:
@@ -102,6 +101,52 @@ def get_container_label(labels, l_name):
         return labels[l_name]
 
 
+class PodEntry(object):
+    """
+    What PodListUtils indexes about a pod. Entries don't reference the pod dict so that they
+    can be kept between check runs, they are reused as long as the fingerprint of the pod is the same.
+    """
+
+    def __init__(self, pod, fingerprint=None):
+        metadata = pod.get("metadata", {})
+        status = pod.get("status", {})
+        self.uid = metadata.get("uid")
+        self.namespace = metadata.get("namespace")
+        self.name = metadata.get("name")
+        self.fingerprint = fingerprint if fingerprint is not None else self.get_fingerprint(pod)
+
+        # FIXME we are forced to do that because the Kubelet PodList isn't updated
+        # for static pods, see https://github.com/kubernetes/kubernetes/pull/59948
+        self.is_static_pending = is_static_pending_pod(pod)
+        self.is_host_networked = pod.get("spec", {}).get("hostNetwork", False)
+
+        # Only the fields used by the container filter are kept
+        self.containers = {}
+        self.container_id_by_name_tuple = {}
+        for ctr in status.get('containerStatuses', []):
+            cid = ctr.get('containerID')
+            if not cid:
+                continue
+            self.containers[cid] = {key: ctr[key] for key in ('name', 'image') if key in ctr}
+            self.container_id_by_name_tuple[(self.namespace, self.name, ctr.get('name'))] = cid
+
+    @staticmethod
+    def get_fingerprint(pod):
+        """
+        The status fields the entry is computed from, the metadata and spec fields it uses can't change
+        during the lifetime of a pod.
+        """
+        status = pod.get("status", {})
+        container_statuses = status.get('containerStatuses')
+        if container_statuses is None:
+            return status.get("phase"), None
+
+        return (
+            status.get("phase"),
+            tuple((ctr.get('containerID'), ctr.get('name'), ctr.get('image')) for ctr in container_statuses),
+        )
+
+
 class PodListUtils(object):
     """
     Queries the podlist and the agent6's filtering logic to determine whether to
@@ -110,42 +155,92 @@ class PodListUtils(object):
     cost (filter called once per prometheus metric), hence the PodListUtils object MUST
     be re-created at every check run.
 
+    The podlist is indexed by pod uid, container id and names so that looking up the pod
+    or container of a metric doesn't scan the podlist. Passing the `pod_entries` of the
+    previous check run reuses the entries of the pods that didn't change.
+
     Containers that are part of a static pod are not filtered, as we cannot currently
     reliably determine their image name to pass to the filtering logic.
     """
 
-    def __init__(self, podlist):
+    def __init__(self, podlist, previous_entries=None):
         self.containers = {}
         self.pods = {}
+        self.pod_entries = {}
         self.static_pod_uids = set()
+        self.host_networked_pod_uids = set()
         self.cache = {}
         self.cache_namespace_exclusion = {}
+        self.tags_cache = {}
         self.pod_uid_by_name_tuple = {}
         self.container_id_by_name_tuple = {}
         self.container_id_to_namespace = {}
 
-        pods = podlist.get('items', [])
+        if previous_entries is None:
+            previous_entries = {}
 
-        for pod in pods:
-            metadata = pod.get("metadata", {})
-            uid = metadata.get("uid")
-            namespace = metadata.get("namespace")
-            pod_name = metadata.get("name")
-            self.pod_uid_by_name_tuple[(namespace, pod_name)] = uid
-            self.pods[uid] = pod
+        for pod in podlist.get('items', []):
+            uid = pod.get("metadata", {}).get("uid")
+            fingerprint = PodEntry.get_fingerprint(pod)
+            entry = previous_entries.get(uid)
+            if entry is None or entry.fingerprint != fingerprint:
+                entry = PodEntry(pod, fingerprint)
 
-            # FIXME we are forced to do that because the Kubelet PodList isn't updated
-            # for static pods, see https://github.com/kubernetes/kubernetes/pull/59948
-            if is_static_pending_pod(pod):
+            self.pod_entries[uid] = entry
+            self.pod_uid_by_name_tuple[(entry.namespace, entry.name)] = uid
+            self.pods[uid] = pod
+            if entry.is_static_pending:
                 self.static_pod_uids.add(uid)
+            if entry.is_host_networked:
+                self.host_networked_pod_uids.add(uid)
+
+            self.containers.update(entry.containers)
+            self.container_id_by_name_tuple.update(entry.container_id_by_name_tuple)
+            for cid in entry.containers:
+                self.container_id_to_namespace[cid] = entry.namespace
+
+    def get_pod(self, uid):
+        """
+        Get a pod from its uid
+
+        :param uid: pod uid
+        :return: pod dict object or None
+        """
+        return self.pods.get(uid)
+
+    def is_static_pending(self, uid):
+        """
+        Whether the pod with the given uid is a static pending pod, see `is_static_pending_pod`
+
+        :param uid: pod uid
+        :return: bool
+        """
+        return uid in self.static_pod_uids
+
+    def is_host_networked(self, uid):
+        """
+        Whether the pod with the given uid is on the host network,
+        False if the pod isn't in the podlist
 
-            for ctr in pod.get('status', {}).get('containerStatuses', []):
-                cid = ctr.get('containerID')
-                if not cid:
-                    continue
-                self.containers[cid] = ctr
-                self.container_id_by_name_tuple[(namespace, pod_name, ctr.get('name'))] = cid
-                self.container_id_to_namespace[cid] = namespace
+        :param uid: pod uid
+        :return: bool
+        """
+        return uid in self.host_networked_pod_uids
+
+    def get_tags(self, entity_id, cardinality):
+        """
+        Queries the tagger for the given entity. Results are cached between calls to
+        avoid the python-go switching cost, as it's called once per metric and container.
+
+        :param entity_id: tagger entity id, e.g. container_id://<cid>
+        :param cardinality: tagger cardinality
+        :return: a new list of tags, empty if the entity is unknown
+        """
+        key = (entity_id, cardinality)
+        if key not in self.tags_cache:
+            self.tags_cache[key] = tagger.tag(entity_id, cardinality) or []
+
+        return list(self.tags_cache[key])
 
     def get_uid_by_name_tuple(self, name_tuple):
         """
@@ -214,6 +309,9 @@ class PodListUtils(object):
         if not namespace:
             return False
 
+        if namespace in self.cache_namespace_exclusion:
+            return self.cache_namespace_exclusion[namespace]
+
         # Sent empty container name and image because we are interested in
         # applying only the namespace exclusion rules.
         excluded = c_is_excluded('', '', namespace)
@@ -232,6 +232,9 @@ class KubeletCheck(
 
         self.first_run = True
 
+        # The pod entries indexed during the previous check run, by pod uid
+        self._previous_pod_entries = None
+
     def _create_kubelet_prometheus_instance(self, instance):
         """
         Create a copy of the instance and set default values.
@@ -361,7 +364,7 @@ class KubeletCheck(
             self.log.debug('cAdvisor not found, running in prometheus mode: %s', e)
 
         self.pod_list = self.retrieve_pod_list()
-        self.pod_list_utils = PodListUtils(self.pod_list)
+        self.pod_list_utils = PodListUtils(self.pod_list, previous_entries=self._previous_pod_entries)
 
         self.pod_tags_by_pvc = self._create_pod_tags_by_pvc(self.pod_list)
 
@@ -392,7 +395,8 @@ class KubeletCheck(
 
         self.first_run = False
 
-        # Free up memory
+        # Free up memory, only keeping the pod entries to reuse the ones of unchanged pods
+        self._previous_pod_entries = self.pod_list_utils.pod_entries
         self.pod_list = None
         self.pod_list_utils = None
 
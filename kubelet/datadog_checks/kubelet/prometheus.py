@@ -12,7 +12,7 @@ from datadog_checks.base.checks.kubelet_base.base import urljoin
 from datadog_checks.base.checks.openmetrics import OpenMetricsBaseCheck
 from datadog_checks.base.utils.tagging import tagger
 
-from .common import get_container_label, get_pod_by_uid, is_static_pending_pod, replace_container_rt_prefix
+from .common import get_container_label, replace_container_rt_prefix
 
 METRIC_TYPES = ['counter', 'gauge', 'summary']
 
@@ -162,11 +162,11 @@ class CadvisorPrometheusScraperMixin(object):
         :return str or None
         """
         if CadvisorPrometheusScraperMixin._is_container_metric(labels):
-            pod = self._get_pod_by_metric_label(labels)
-            if pod is not None and is_static_pending_pod(pod):
+            pod_uid = self._get_pod_uid(labels)
+            if self.pod_list_utils.is_static_pending(pod_uid):
                 # If the pod is static, ContainerStatus is unavailable.
                 # Return the pod UID so that we can collect metrics from it later on.
-                return self._get_pod_uid(labels)
+                return pod_uid
             return self.pod_list_utils.get_cid_by_labels(labels)
 
     def _get_pod_uid(self, labels):
@@ -199,10 +199,7 @@ class CadvisorPrometheusScraperMixin(object):
         :param pod_uid: str
         :return: bool
         """
-        for pod in self.pod_list['items']:
-            if pod.get('metadata', {}).get('uid', '') == pod_uid:
-                return pod.get('spec', {}).get('hostNetwork', False)
-        return False
+        return self.pod_list_utils.is_host_networked(pod_uid)
 
     def _get_pod_by_metric_label(self, labels):
         """
@@ -210,7 +207,7 @@ class CadvisorPrometheusScraperMixin(object):
         :return:
         """
         pod_uid = self._get_pod_uid(labels)
-        return get_pod_by_uid(pod_uid, self.pod_list)
+        return self.pod_list_utils.get_pod(pod_uid)
 
     @staticmethod
     def _get_kube_container_name(labels):
@@ -300,15 +297,14 @@ class CadvisorPrometheusScraperMixin(object):
 
             # FIXME we are forced to do that because the Kubelet PodList isn't updated
             # for static pods, see https://github.com/kubernetes/kubernetes/pull/59948
-            pod = self._get_pod_by_metric_label(sample[self.SAMPLE_LABELS])
-            if pod is not None and is_static_pending_pod(pod):
-                pod_tags = tagger.tag('kubernetes_pod_uid://%s' % pod["metadata"]["uid"], tagger.HIGH)
+            if self.pod_list_utils.is_static_pending(pod_uid):
+                pod_tags = self.pod_list_utils.get_tags('kubernetes_pod_uid://%s' % pod_uid, tagger.HIGH)
                 if not pod_tags:
                     continue
                 pod_tags += self._get_kube_container_name(sample[self.SAMPLE_LABELS])
                 tags = list(set(pod_tags))
             else:
-                tags = tagger.tag(replace_container_rt_prefix(c_id), tagger.HIGH)
+                tags = self.pod_list_utils.get_tags(replace_container_rt_prefix(c_id), tagger.HIGH)
 
             if not tags:
                 continue
@@ -340,14 +336,14 @@ class CadvisorPrometheusScraperMixin(object):
 
         samples = self._sum_values_by_context(metric, self._get_pod_uid_if_pod_metric)
         for pod_uid, sample in iteritems(samples):
-            pod = get_pod_by_uid(pod_uid, self.pod_list)
+            pod = self.pod_list_utils.get_pod(pod_uid)
             namespace = pod.get('metadata', {}).get('namespace', None)
             if self.pod_list_utils.is_namespace_excluded(namespace):
                 continue
 
             if '.network.' in metric_name and self._is_pod_host_networked(pod_uid):
                 continue
-            tags = tagger.tag('kubernetes_pod_uid://%s' % pod_uid, tagger.HIGH)
+            tags = self.pod_list_utils.get_tags('kubernetes_pod_uid://%s' % pod_uid, tagger.HIGH)
             if not tags:
                 continue
             tags += scraper_config['custom_tags']
@@ -379,16 +375,15 @@ class CadvisorPrometheusScraperMixin(object):
             if self.pod_list_utils.is_excluded(c_id, pod_uid):
                 continue
 
-            tags = tagger.tag(replace_container_rt_prefix(c_id), tagger.HIGH)
+            tags = self.pod_list_utils.get_tags(replace_container_rt_prefix(c_id), tagger.HIGH)
             if not tags:
                 continue
             tags += scraper_config['custom_tags']
 
             # FIXME we are forced to do that because the Kubelet PodList isn't updated
             # for static pods, see https://github.com/kubernetes/kubernetes/pull/59948
-            pod = self._get_pod_by_metric_label(sample[self.SAMPLE_LABELS])
-            if pod is not None and is_static_pending_pod(pod):
-                pod_tags = tagger.tag('kubernetes_pod_uid://%s' % pod["metadata"]["uid"], tagger.HIGH)
+            if self.pod_list_utils.is_static_pending(pod_uid):
+                pod_tags = self.pod_list_utils.get_tags('kubernetes_pod_uid://%s' % pod_uid, tagger.HIGH)
                 if not pod_tags:
                     continue
                 tags += pod_tags
@@ -423,7 +418,7 @@ class CadvisorPrometheusScraperMixin(object):
             if self.pod_list_utils.is_excluded(c_id, pod_uid):
                 continue
 
-            tags = tagger.tag(replace_container_rt_prefix(c_id), tagger.HIGH)
+            tags = self.pod_list_utils.get_tags(replace_container_rt_prefix(c_id), tagger.HIGH)
             if not tags:
                 continue
             tags += scraper_config['custom_tags']
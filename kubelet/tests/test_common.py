@@ -130,6 +130,74 @@ def test_pod_by_uid():
     assert pod is None
 
 
+def test_pod_list_utils_index():
+    pod_list_utils = PodListUtils(json.loads(mock_from_file('pods.json')))
+
+    pod = pod_list_utils.get_pod("260c2b1d43b094af6d6b4ccba082c2db")
+    assert pod["metadata"]["name"] == "kube-proxy-gke-haissam-default-pool-be5066f1-wnvn"
+    assert pod_list_utils.is_static_pending("260c2b1d43b094af6d6b4ccba082c2db") is True
+    assert pod_list_utils.is_static_pending("2edfd4d9-10ce-11e8-bd5a-42010af00137") is False
+    assert pod_list_utils.get_pod("unknown") is None
+    assert pod_list_utils.is_static_pending("unknown") is False
+
+    pod_list_utils = PodListUtils(json.loads(mock_from_file('podlist_containerd.json')))
+    assert pod_list_utils.is_host_networked("8abf1ed0-94c4-11e8-96a3-42010a840157") is True
+    assert pod_list_utils.is_host_networked("unknown") is False
+
+
+def test_pod_list_utils_reuses_unchanged_pods():
+    podlist = json.loads(mock_from_file('pods.json'))
+    previous = PodListUtils(podlist)
+
+    podlist = json.loads(mock_from_file('pods.json'))
+    fluentd = get_pod_by_uid("2edfd4d9-10ce-11e8-bd5a-42010af00137", podlist)
+    fluentd["metadata"]["resourceVersion"] = "424242"
+    fluentd["status"]["containerStatuses"][0]["containerID"] = "docker://restarted"
+    # The kubelet doesn't always update the resource version along with the status
+    agent = get_pod_by_uid("2fdfd4d9-10ce-11e8-bd5a-42010af00137", podlist)
+    agent["status"]["phase"] = "Failed"
+    # Changes that don't affect the entry
+    kube_proxy = get_pod_by_uid("260c2b1d43b094af6d6b4ccba082c2db", podlist)
+    kube_proxy["metadata"]["resourceVersion"] = "424243"
+    kube_proxy["status"]["startTime"] = "2018-02-14T16:10:31Z"
+    pod_list_utils = PodListUtils(podlist, previous_entries=previous.pod_entries)
+
+    assert set(pod_list_utils.pod_entries) == set(previous.pod_entries)
+    for uid, entry in pod_list_utils.pod_entries.items():
+        if uid in (fluentd["metadata"]["uid"], agent["metadata"]["uid"]):
+            assert entry is not previous.pod_entries[uid]
+        else:
+            assert entry is previous.pod_entries[uid]
+        # Entries are kept between check runs, they must not reference the pod list
+        for ctr in entry.containers.values():
+            assert set(ctr) <= {'name', 'image'}
+
+    assert pod_list_utils.is_static_pending("260c2b1d43b094af6d6b4ccba082c2db") is True
+    assert len(pod_list_utils.containers) == len(previous.containers)
+    assert "docker://restarted" in pod_list_utils.containers
+    assert "docker://restarted" not in previous.containers
+    name_tuple = (
+        fluentd["metadata"]["namespace"],
+        fluentd["metadata"]["name"],
+        fluentd["status"]["containerStatuses"][0]["name"],
+    )
+    assert pod_list_utils.get_cid_by_name_tuple(name_tuple) == "docker://restarted"
+
+
+def test_pod_list_utils_get_tags(monkeypatch):
+    tag = mock.Mock(return_value=['kube_namespace:default'])
+    monkeypatch.setattr('datadog_checks.kubelet.common.tagger.tag', tag)
+    pod_list_utils = PodListUtils(json.loads(mock_from_file('pods.json')))
+
+    for _ in range(3):
+        tags = pod_list_utils.get_tags('container_id://foo', 'high')
+        assert tags == ['kube_namespace:default']
+        # Callers add their own tags to the returned list
+        tags.append('custom:tag')
+
+    tag.assert_called_once_with('container_id://foo', 'high')
+
+
 def test_url_join():
     res = urljoin("https://10.100.0.1:443/api/fargate-XX.us-east-2.compute.internal/proxy", "/pods")
     assert res == 'https://10.100.0.1:443/api/fargate-XX.us-east-2.compute.internal/proxy/pods'
@@ -36,6 +36,9 @@ ALLOWED_WAITING_REASONS = [
 ]
 ALLOWED_TERMINATED_REASONS = ['oomkilled', 'containercannotrun', 'error']
 
+# Time after which the counts of jobs no longer reported by kube-state-metrics are forgotten
+JOB_COUNTS_TTL = 3600
+
 kube_labels_mapper = {
     'namespace': 'kube_namespace',
     'job': 'kube_job',
@@ -164,6 +167,9 @@ class KubernetesState(OpenMetricsBaseCheck):
         self.job_succeeded_count = defaultdict(int)
         self.job_failed_count = defaultdict(int)
 
+        # Last time the tags of the job and cron job counts above were reported, to forget the deleted ones
+        self.job_tags_last_seen = {}
+
         # Regex to extract cronjob from job names
         self._job_name_re = re.compile(JOB_NAME_PATTERN)
 
@@ -188,6 +194,25 @@ class KubernetesState(OpenMetricsBaseCheck):
         for job_tags, job_count in iteritems(self.job_failed_count):
             self.monotonic_count(scraper_config['namespace'] + '.job.failed', job_count, list(job_tags))
 
+        self._expire_job_counts()
+
+    def _expire_job_counts(self):
+        """
+        Forget the counts of jobs and cron jobs that haven't been reported for `JOB_COUNTS_TTL` seconds,
+        so that they don't keep growing with the history of the cluster.
+        """
+        expiration = time.time() - JOB_COUNTS_TTL
+        for job_tags, last_seen in list(iteritems(self.job_tags_last_seen)):
+            if last_seen < expiration:
+                del self.job_tags_last_seen[job_tags]
+                for job_counts in (
+                    self.failed_cron_job_counts,
+                    self.succeeded_cron_job_counts,
+                    self.job_failed_count,
+                    self.job_succeeded_count,
+                ):
+                    job_counts.pop(job_tags, None)
+
     def _filter_metric(self, metric, scraper_config):
         if scraper_config['telemetry']:
             # name is like "kube_pod_execution_duration"
@@ -619,20 +644,21 @@ class KubernetesState(OpenMetricsBaseCheck):
     def kube_pod_status_phase(self, metric, scraper_config):
         """Phase a pod is in."""
         metric_name = scraper_config['namespace'] + '.pod.status_phase'
-        status_phase_counter = Counter()
+        label_names = ('namespace', 'phase')
 
-        for sample in metric.samples:
-            # Counts aggregated cluster-wide to avoid no-data issues on pod churn,
-            # pod granularity available in the service checks
-            tags = (
-                self._label_to_tags('namespace', sample[self.SAMPLE_LABELS], scraper_config)
-                + self._label_to_tags('phase', sample[self.SAMPLE_LABELS], scraper_config)
+        # Counts aggregated cluster-wide to avoid no-data issues on pod churn,
+        # pod granularity available in the service checks
+        totals = self._aggregate_samples(metric, label_names)
+        self._submit_aggregates(
+            metric_name,
+            totals,
+            label_names,
+            lambda labels: (
+                self._label_to_tags('namespace', labels, scraper_config)
+                + self._label_to_tags('phase', labels, scraper_config)
                 + scraper_config['custom_tags']
-            )
-            status_phase_counter[tuple(sorted(tags))] += sample[self.SAMPLE_VALUE]
-
-        for tags, count in iteritems(status_phase_counter):
-            self.gauge(metric_name, count, tags=list(tags))
+            ),
+        )
 
     def _submit_metric_kube_pod_container_status_reason(
         self, metric, metric_suffix, allowed_status_reasons, scraper_config
@@ -721,6 +747,7 @@ class KubernetesState(OpenMetricsBaseCheck):
             self.service_check(service_check_name, self.CRITICAL, tags=tags + scraper_config['custom_tags'])
 
     def kube_job_status_failed(self, metric, scraper_config):
+        now = time.time()
         for sample in metric.samples:
             job_ts = None
             tags = [] + scraper_config['custom_tags']
@@ -730,14 +757,15 @@ class KubernetesState(OpenMetricsBaseCheck):
                     job_ts = self._extract_job_timestamp(label_value)
                 else:
                     tags += self._build_tags(label_name, label_value, scraper_config)
+            job_tags = frozenset(tags)
+            self.job_tags_last_seen[job_tags] = now
             if job_ts is not None:  # if there is a timestamp, this is a Cron Job
-                self.failed_cron_job_counts[frozenset(tags)].update_current_ts_and_add_count(
-                    job_ts, sample[self.SAMPLE_VALUE]
-                )
+                self.failed_cron_job_counts[job_tags].update_current_ts_and_add_count(job_ts, sample[self.SAMPLE_VALUE])
             else:
-                self.job_failed_count[frozenset(tags)] += sample[self.SAMPLE_VALUE]
+                self.job_failed_count[job_tags] += sample[self.SAMPLE_VALUE]
 
     def kube_job_status_succeeded(self, metric, scraper_config):
+        now = time.time()
         for sample in metric.samples:
             job_ts = None
             tags = [] + scraper_config['custom_tags']
@@ -747,18 +775,21 @@ class KubernetesState(OpenMetricsBaseCheck):
                     job_ts = self._extract_job_timestamp(label_value)
                 else:
                     tags += self._build_tags(label_name, label_value, scraper_config)
+            job_tags = frozenset(tags)
+            self.job_tags_last_seen[job_tags] = now
             if job_ts is not None:  # if there is a timestamp, this is a Cron Job
-                self.succeeded_cron_job_counts[frozenset(tags)].update_current_ts_and_add_count(
+                self.succeeded_cron_job_counts[job_tags].update_current_ts_and_add_count(
                     job_ts, sample[self.SAMPLE_VALUE]
                 )
             else:
-                self.job_succeeded_count[frozenset(tags)] += sample[self.SAMPLE_VALUE]
+                self.job_succeeded_count[job_tags] += sample[self.SAMPLE_VALUE]
 
     def kube_node_status_condition(self, metric, scraper_config):
         """The ready status of a cluster node. v1.0+"""
         base_check_name = scraper_config['namespace'] + '.node'
         metric_name = scraper_config['namespace'] + '.nodes.by_condition'
-        by_condition_counter = Counter()
+        label_names = ('condition', 'status')
+        by_condition_totals = defaultdict(int)
 
         for sample in metric.samples:
             node_tags = self._label_to_tags("node", sample[self.SAMPLE_LABELS], scraper_config)
@@ -772,15 +803,19 @@ class KubernetesState(OpenMetricsBaseCheck):
 
             # Counts aggregated cluster-wide to avoid no-data issues on node churn,
             # node granularity available in the service checks
-            tags = (
-                self._label_to_tags("condition", sample[self.SAMPLE_LABELS], scraper_config)
-                + self._label_to_tags("status", sample[self.SAMPLE_LABELS], scraper_config)
-                + scraper_config['custom_tags']
-            )
-            by_condition_counter[tuple(sorted(tags))] += sample[self.SAMPLE_VALUE]
+            labels = sample[self.SAMPLE_LABELS]
+            by_condition_totals[tuple([labels.get(name) for name in label_names])] += sample[self.SAMPLE_VALUE]
 
-        for tags, count in iteritems(by_condition_counter):
-            self.gauge(metric_name, count, tags=list(tags))
+        self._submit_aggregates(
+            metric_name,
+            by_condition_totals,
+            label_names,
+            lambda labels: (
+                self._label_to_tags("condition", labels, scraper_config)
+                + self._label_to_tags("status", labels, scraper_config)
+                + scraper_config['custom_tags']
+            ),
+        )
 
     def kube_node_status_ready(self, metric, scraper_config):
         """The ready status of a cluster node (legacy)"""
@@ -913,35 +948,66 @@ class KubernetesState(OpenMetricsBaseCheck):
         """Sum values by allowed tags and submit counts as gauges."""
         config = self.object_count_params[metric.name]
         metric_name = "{}.{}".format(scraper_config['namespace'], config['metric_name'])
-        object_counter = Counter()
 
-        for sample in metric.samples:
-            tags = self._tags_for_count(sample, config, scraper_config)
-            object_counter[tuple(sorted(tags))] += sample[self.SAMPLE_VALUE]
-
-        for tags, count in iteritems(object_counter):
-            self.gauge(metric_name, count, tags=list(tags))
+        totals = self._aggregate_samples(metric, config['allowed_labels'])
+        self._submit_aggregates(
+            metric_name,
+            totals,
+            config['allowed_labels'],
+            lambda labels: self._tags_for_count(labels, config, scraper_config),
+        )
 
     def count_objects_by_tags(self, metric, scraper_config):
         """Count objects by allowed tags and submit counts as gauges."""
         config = self.object_count_params[metric.name]
         metric_name = "{}.{}".format(scraper_config['namespace'], config['metric_name'])
-        object_counter = Counter()
+
+        totals = self._aggregate_samples(metric, config['allowed_labels'], count_objects=True)
+        self._submit_aggregates(
+            metric_name,
+            totals,
+            config['allowed_labels'],
+            lambda labels: self._tags_for_count(labels, config, scraper_config),
+        )
+
+    def _aggregate_samples(self, metric, label_names, count_objects=False):
+        """
+        Fold the samples of a metric into totals keyed by the values of `label_names`, summing their values
+        or counting them if `count_objects` is set.
+
+        Only the raw label values are looked up for every sample, tags are built by `_submit_aggregates`
+        once for every distinct combination of values, so the cost of a sample doesn't depend on the tags.
+        """
+        totals = defaultdict(int)
+        labels_index = self.SAMPLE_LABELS
+        value_index = self.SAMPLE_VALUE
 
         for sample in metric.samples:
-            tags = self._tags_for_count(sample, config, scraper_config)
-            object_counter[tuple(sorted(tags))] += 1
+            labels = sample[labels_index]
+            totals[tuple([labels.get(name) for name in label_names])] += 1 if count_objects else sample[value_index]
+
+        return totals
+
+    def _submit_aggregates(self, metric_name, totals, label_names, tags_for_labels):
+        """
+        Submit as gauges the totals of `_aggregate_samples`, adding up the ones whose label values result in the
+        same tags. `tags_for_labels` builds the tags of a total from a dict of its label values.
+        """
+        gauges = Counter()
+        for label_values, total in iteritems(totals):
+            tags = tags_for_labels(dict(zip(label_names, label_values)))
+            gauges[tuple(sorted(tags))] += total
 
-        for tags, count in iteritems(object_counter):
-            self.gauge(metric_name, count, tags=list(tags))
+        for tags, total in iteritems(gauges):
+            self.gauge(metric_name, total, tags=list(tags))
 
-    def _tags_for_count(self, sample, count_config, scraper_config):
+    def _tags_for_count(self, labels, count_config, scraper_config):
         """
         Extracts tags for object count elements.
         """
         tags = []
         for l in count_config['allowed_labels']:
-            value = sample[self.SAMPLE_LABELS].get(l, None)
+            value = labels.get(l, None)
             if not value:
                 tag = self._format_tag(l, "unknown", scraper_config)
                 tags.append(tag)
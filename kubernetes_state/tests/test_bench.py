@@ -0,0 +1,72 @@
+# (C) Datadog, Inc. 2023-present
+# All rights reserved
+# Licensed under Simplified BSD License (see LICENSE)
+import mock
+import pytest
+
+from datadog_checks.kubernetes_state import KubernetesState
+
+from .test_kubernetes_state import CHECK_NAME, NAMESPACE, MockResponse
+
+NAMESPACES = 50
+PODS = 20000
+PHASES = ('Pending', 'Running', 'Succeeded', 'Failed', 'Unknown')
+
+
+def large_payload(pods=PODS):
+    """
+    A kube-state-metrics payload of a large cluster, limited to the metrics aggregated by the check.
+    """
+    lines = ['# TYPE kube_pod_status_phase gauge']
+    for i in range(pods):
+        for phase in PHASES:
+            lines.append(
+                'kube_pod_status_phase{{namespace="ns-{}",pod="pod-{}",phase="{}"}} {}'.format(
+                    i % NAMESPACES, i, phase, int(phase == 'Running')
+                )
+            )
+
+    lines.append('# TYPE kube_replicaset_owner gauge')
+    for i in range(pods // 10):
+        lines.append(
+            'kube_replicaset_owner{{namespace="ns-{}",replicaset="deploy-{}-5d9c7b",owner_kind="Deployment",'
+            'owner_name="deploy-{}",owner_is_controller="true"}} 1'.format(i % NAMESPACES, i, i)
+        )
+
+    lines.append('# TYPE kube_service_spec_type gauge')
+    for i in range(pods // 10):
+        lines.append(
+            'kube_service_spec_type{{namespace="ns-{}",service="svc-{}",type="ClusterIP"}} 1'.format(i % NAMESPACES, i)
+        )
+
+    lines.append('# TYPE kube_namespace_status_phase gauge')
+    for i in range(NAMESPACES):
+        for phase in ('Active', 'Terminating'):
+            lines.append(
+                'kube_namespace_status_phase{{namespace="ns-{}",phase="{}"}} {}'.format(
+                    i, phase, int(phase == 'Active')
+                )
+            )
+
+    return '\n'.join(lines).encode('utf-8')
+
+
+@pytest.fixture(scope='module')
+def payload():
+    return large_payload()
+
+
+def test_aggregate_large_payload(benchmark, aggregator, instance, payload):
+    check = KubernetesState(CHECK_NAME, {}, [instance])
+    check.poll = mock.MagicMock(return_value=MockResponse(payload, 'text/plain'))
+    # The first run only collects the labels to join
+    check.check(instance)
+
+    benchmark(check.check, instance)
+
+    aggregator.assert_metric(
+        NAMESPACE + '.pod.status_phase',
+        value=PODS // NAMESPACES,
+        tags=['kube_namespace:ns-0', 'namespace:ns-0', 'phase:running', 'pod_phase:running', 'optional:tag1'],
+    )
+    aggregator.assert_metric(NAMESPACE + '.namespace.count', value=NAMESPACES, tags=['phase:active', 'optional:tag1'])
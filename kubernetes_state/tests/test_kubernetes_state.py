@@ -2,6 +2,7 @@
 # All rights reserved
 # Licensed under Simplified BSD License (see LICENSE)
 import os
+import time
 
 import mock
 import pytest
@@ -980,3 +981,73 @@ def test_telemetry(aggregator, instance):
         tags=['resource_name:hpa', 'resource_namespace:ns1', 'optional:tag1'],
         value=8.0,
     )
+
+
+def test_count_objects_by_tags_merges_label_values(aggregator, instance):
+    payload = b'\n'.join(
+        [
+            b'# TYPE kube_service_spec_type gauge',
+            b'kube_service_spec_type{namespace="default",service="a",type="ClusterIP"} 1',
+            b'kube_service_spec_type{namespace="default",service="b",type="clusterip"} 1',
+            b'kube_service_spec_type{namespace="Default",service="c",type="ClusterIP"} 1',
+            b'kube_service_spec_type{service="d",type="NodePort"} 1',
+            b'kube_service_spec_type{namespace="",service="e",type="NodePort"} 1',
+            b'# TYPE kube_namespace_status_phase gauge',
+            b'kube_namespace_status_phase{namespace="default",phase="Active"} 1',
+            b'kube_namespace_status_phase{namespace="kube-system",phase="Active"} 1',
+            b'kube_namespace_status_phase{namespace="old",phase="Terminating"} 0',
+        ]
+    )
+    check = KubernetesState(CHECK_NAME, {}, [instance])
+    check.poll = mock.MagicMock(return_value=MockResponse(payload, 'text/plain'))
+    # The first run only collects the labels to join
+    for _ in range(2):
+        check.check(instance)
+
+    # Label values resulting in the same tags are counted together
+    aggregator.assert_metric(
+        NAMESPACE + '.service.count',
+        tags=['kube_namespace:default', 'namespace:default', 'type:clusterip', 'optional:tag1'],
+        value=3,
+        count=1,
+    )
+    aggregator.assert_metric(
+        NAMESPACE + '.service.count',
+        tags=['namespace:unknown', 'type:nodeport', 'optional:tag1'],
+        value=2,
+        count=1,
+    )
+    aggregator.assert_metric(NAMESPACE + '.namespace.count', tags=['phase:active', 'optional:tag1'], value=2, count=1)
+    aggregator.assert_metric(
+        NAMESPACE + '.namespace.count', tags=['phase:terminating', 'optional:tag1'], value=0, count=1
+    )
+
+
+def test_job_counts_expire(aggregator, instance):
+    check = KubernetesState(CHECK_NAME, {}, [instance])
+    payload = mock_from_file("prometheus.txt")
+    check.poll = mock.MagicMock(return_value=MockResponse(payload, 'text/plain'))
+    for _ in range(2):
+        check.check(instance)
+
+    job_tags = frozenset(
+        ['namespace:default', 'kube_namespace:default', 'job_name:test', 'kube_job:test', 'optional:tag1']
+    )
+    assert job_tags in check.job_succeeded_count
+    assert check.succeeded_cron_job_counts
+
+    # The jobs are deleted, their counts are still submitted until they expire
+    payload = b'\n'.join(line for line in payload.split(b'\n') if b'kube_job_status_' not in line)
+    check.poll = mock.MagicMock(return_value=MockResponse(payload, 'text/plain'))
+    check.check(instance)
+    assert job_tags in check.job_succeeded_count
+
+    now = time.time()
+    with mock.patch('time.time', return_value=now + 3600 + 1):
+        check.check(instance)
+
+    assert check.job_succeeded_count == {}
+    assert check.job_failed_count == {}
+    assert check.succeeded_cron_job_counts == {}
+    assert check.failed_cron_job_counts == {}
+    assert check.job_tags_last_seen == {}
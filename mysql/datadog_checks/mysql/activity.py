@@ -165,7 +165,7 @@ class MySQLActivity(DBMAsyncJob):
             rows = self._normalize_rows(rows)
             event = self._create_activity_event(rows, tags)
             payload = json.dumps(event, default=self._json_event_encoding)
-            self._check.database_monitoring_query_activity(payload)
+            self._submit_dbm_event(self._check.database_monitoring_query_activity, payload)
             self._check.histogram(
                 "dd.mysql.activity.collect_activity.payload_size",
                 len(payload),
@@ -177,7 +177,9 @@ class MySQLActivity(DBMAsyncJob):
         # type: (pymysql.cursor) -> List[Dict[str]]
         self._log.debug("Running activity query [%s]", ACTIVITY_QUERY)
         cursor.execute(ACTIVITY_QUERY)
-        return cursor.fetchall()
+        rows = cursor.fetchall()
+        self._record_rows(len(rows))
+        return rows
 
     def _normalize_rows(self, rows):
         # type: (List[Dict[str]]) -> List[Dict[str]]
@@ -12,21 +12,473 @@ from datadog_checks.base import is_affirmative
 from datadog_checks.base.log import get_check_logger
 
 from .collection_utils import collect_scalar
-from .const import OPTIONAL_INNODB_VARS
+from .const import INNODB_VARS, OPTIONAL_INNODB_VARS
 
 if PY3:
     long = int
 
-
-def _are_values_numeric(array):
-    return all(v.isdigit() for v in array)
+# The InnoDB status is made of sections, each one starting with a header like:
+# --------
+# FILE I/O
+# --------
+# Patterns start with a line break rather than `^`, the regex engine then only tries to match them after one.
+SECTION_HEADER_PATTERN = re.compile(r'\n-{3,}[ \t]*\n([A-Z][A-Z0-9 /]*?)[ \t]*\n-{3,}[ \t]*$', re.MULTILINE)
+
+
+def _line_pattern(pattern):
+    # Sections start with the line break ending their header, so that the first line matches too
+    return re.compile(r'\n[ \t]*' + pattern)
+
+
+# SEMAPHORES
+# Mutex spin waits 79626940, rounds 157459864, OS waits 698719
+MUTEX_SPIN_WAITS_PATTERN = _line_pattern(r'Mutex spin waits (\d+), rounds (\d+), OS waits (\d+)')
+# RW-shared spins 3859028, OS waits 2100750; RW-excl spins 4641946, OS waits 1530310
+RW_SPINS_PATTERN = _line_pattern(r'RW-shared spins (\d+), OS waits (\d+); RW-excl spins (\d+), OS waits (\d+)')
+# Post 5.5.17 SHOW ENGINE INNODB STATUS syntax
+# RW-shared spins 604733, rounds 8107431, OS waits 241268
+RW_SHARED_SPINS_PATTERN = _line_pattern(r'RW-shared spins (\d+), rounds (\d+), OS waits (\d+)')
+# RW-excl spins 604733, rounds 8107431, OS waits 241268
+RW_EXCL_SPINS_PATTERN = _line_pattern(r'RW-excl spins (\d+), rounds (\d+), OS waits (\d+)')
+# --Thread 907205 has waited at handler/ha_innodb.cc line 7156 for 1.00 seconds the semaphore:
+SEMAPHORE_WAIT_PATTERN = _line_pattern(r'--Thread .* for ([0-9.]+) seconds the semaphore:')
+
+# TRANSACTIONS
+# History list length 132
+HISTORY_LIST_LENGTH_PATTERN = _line_pattern(r'History list length (\d+)')
+# ---TRANSACTION 0, not started, process no 13510, OS thread id 1170446656
+TRANSACTION_PATTERN = _line_pattern(r'---TRANSACTION (.*)')
+# 23 lock struct(s), heap size 3024, undo log entries 27
+# LOCK WAIT 12 lock struct(s), heap size 3024, undo log entries 5
+# ROLLING BACK 127539 lock struct(s), heap size 15201832, 4411492 row lock(s), undo log entries 1042488
+LOCK_STRUCTS_PATTERN = _line_pattern(r'(LOCK WAIT |ROLLING BACK )?(\d+) lock struct\(s\)')
+# mysql tables in use 2, locked 2
+TABLES_IN_USE_PATTERN = _line_pattern(r'mysql tables in use (\d+), locked (\d+)')
+
+# FILE I/O
+# 8782182 OS file reads, 15635445 OS file writes, 947800 OS fsyncs
+OS_FILE_PATTERN = _line_pattern(r'(\d+) OS file reads, (\d+) OS file writes, (\d+) OS fsyncs')
+# The pending operations are reported as a total, per I/O thread, or both:
+# Pending normal aio reads: 0, aio writes: 0,
+# Pending normal aio reads: [0, 0, 0, 0] , aio writes: [0, 0, 0, 0] ,
+# Pending normal aio reads: 0 [0, 0, 0, 0] , aio writes: 0 [0, 0] ,
+PENDING_NORMAL_AIO_PATTERN = _line_pattern(
+    r'Pending normal aio reads: *(\d+)? *(?:\[([\d, ]*)\])? *, *aio writes: *(\d+)? *(?:\[([\d, ]*)\])?'
+)
+# ibuf aio reads: 0, log i/o's: 0, sync i/o's: 0
+# ibuf aio reads:, log i/o's:, sync i/o's:
+PENDING_IBUF_AIO_PATTERN = _line_pattern(r"ibuf aio reads: *(\d*), log i/o's: *(\d*), sync i/o's: *(\d*)")
+# Pending flushes (fsync) log: 0; buffer pool: 0
+PENDING_FLUSHES_PATTERN = _line_pattern(r'Pending flushes \(fsync\) log: (\d+); buffer pool: (\d+)')
+# Pending flushes (fsync): 0
+PENDING_BUFFER_POOL_FLUSHES_PATTERN = _line_pattern(r'Pending flushes \(fsync\): (\d+)')
+
+# INSERT BUFFER AND ADAPTIVE HASH INDEX
+# Older InnoDB code seemed to be ready for an ibuf per tablespace.  It
+# had two lines in the output.  Newer has just one line, see below.
+# Ibuf for space 0: size 1, free list len 887, seg size 889, is not empty
+IBUF_FOR_SPACE_PATTERN = _line_pattern(r'Ibuf for space 0: size (\d+), free list len (\d+), seg size (\d+)')
+# Ibuf: size 1, free list len 4634, seg size 4636, 1874 merges
+IBUF_PATTERN = _line_pattern(r'Ibuf: size (\d+), free list len (\d+), seg size (\d+),(?: (\d+) merges)?')
+# Output of show engine innodb status has changed in 5.5
+# merged operations:
+#  insert 593983, delete mark 387006, delete 73092
+IBUF_MERGED_OPERATIONS_PATTERN = _line_pattern(
+    r'merged operations:[ \t]*\n[ \t]*insert (\d+), delete mark (\d+), delete (\d+)'
+)
+# 19817685 inserts, 19817684 merged recs, 3552620 merges
+IBUF_MERGED_RECS_PATTERN = _line_pattern(r'(\d+) inserts, (\d+) merged recs, (\d+) merges')
+# In some versions of InnoDB, the used cells is omitted.
+# Hash table size 4425293, used cells 4229064, ....
+# Hash table size 57374437, node heap has 72964 buffer(s) <-- no used cells
+HASH_TABLE_PATTERN = _line_pattern(r'Hash table size (\d+)(?:, used cells (\d+))?')
+
+# LOG
+# This number is NOT printed in hex in InnoDB plugin.
+# Log sequence number 272588624
+LOG_SEQUENCE_NUMBER_PATTERN = _line_pattern(r'Log sequence number +(\d+)')
+# Log flushed up to   272588624
+LOG_FLUSHED_PATTERN = _line_pattern(r'Log flushed up to +(\d+)')
+# Last checkpoint at  272588624
+LAST_CHECKPOINT_PATTERN = _line_pattern(r'Last checkpoint at +(\d+)')
+# 0 pending log writes, 0 pending chkp writes
+PENDING_LOG_WRITES_PATTERN = _line_pattern(r'(\d+) pending log writes, (\d+) pending chkp writes')
+# 3430041 log i/o's done, 17.44 log i/o's/second
+LOG_IOS_PATTERN = _line_pattern(r"(\d+) log i/o's done, ")
+
+# BUFFER POOL AND MEMORY
+# Total memory allocated 29642194944; in additional pool allocated 0
+TOTAL_MEMORY_PATTERN = _line_pattern(r'Total memory allocated (\d+); in additional pool allocated (\d+)')
+# Internal hash tables (constant factor + variable factor)
+#     Adaptive hash index 1538240664     (186998824 + 1351241840)
+#     Page hash           11688584
+MEMORY_PATTERNS = (
+    ('Innodb_mem_adaptive_hash', _line_pattern(r'Adaptive hash index (\d+)')),
+    ('Innodb_mem_page_hash', _line_pattern(r'Page hash +(\d+)')),
+    ('Innodb_mem_dictionary', _line_pattern(r'Dictionary cache +(\d+)')),
+    ('Innodb_mem_file_system', _line_pattern(r'File system +(\d+)')),
+    ('Innodb_mem_lock_system', _line_pattern(r'Lock system +(\d+)')),
+    ('Innodb_mem_recovery_system', _line_pattern(r'Recovery system +(\d+)')),
+    ('Innodb_mem_thread_hash', _line_pattern(r'Threads +(\d+)')),
+)
+# Buffer pool size        1769471
+# Free buffers            0
+# Database pages          1696503
+# Modified db pages       160602
+BUFFER_POOL_PATTERNS = (
+    # The " " after size is necessary to avoid matching the wrong line:
+    # Buffer pool size, bytes 28991012864
+    ('Innodb_buffer_pool_pages_total', _line_pattern(r'Buffer pool size +(\d+)')),
+    ('Innodb_buffer_pool_pages_free', _line_pattern(r'Free buffers +(\d+)')),
+    ('Innodb_buffer_pool_pages_data', _line_pattern(r'Database pages +(\d+)')),
+    ('Innodb_buffer_pool_pages_dirty', _line_pattern(r'Modified db pages +(\d+)')),
+)
+# Pages read 15240822, created 1770238, written 21705836
+PAGES_PATTERN = _line_pattern(r'Pages read (\d+), created (\d+), written (\d+)')
+
+# ROW OPERATIONS
+# Number of rows inserted 50678311, updated 66425915, deleted 20605903, read 454561562
+ROWS_PATTERN = _line_pattern(r'Number of rows inserted (\d+), updated (\d+), deleted (\d+), read (\d+)')
+# 0 queries inside InnoDB, 0 queries in queue
+QUERIES_PATTERN = _line_pattern(r'(\d+) queries inside InnoDB, (\d+) queries in queue')
+# 1 read views open inside InnoDB
+READ_VIEWS_PATTERN = _line_pattern(r'(\d+) read views open inside InnoDB')
+
+
+def _set_values(results, names, match):
+    if match is not None:
+        for name, value in zip(names, match.groups()):
+            results[name] = long(value or 0)
+
+
+def _pending_aio(total, per_thread):
+    if total is not None:
+        return long(total)
+    if per_thread:
+        return sum(long(value) for value in per_thread.split(','))
+    return None
+
+
+def _parse_semaphores(section, results, metric_names):
+    _set_values(
+        results,
+        ('Innodb_mutex_spin_waits', 'Innodb_mutex_spin_rounds', 'Innodb_mutex_os_waits'),
+        MUTEX_SPIN_WAITS_PATTERN.search(section),
+    )
+    _set_values(
+        results,
+        ('Innodb_s_lock_spin_waits', 'Innodb_s_lock_os_waits', 'Innodb_x_lock_spin_waits', 'Innodb_x_lock_os_waits'),
+        RW_SPINS_PATTERN.search(section),
+    )
+    _set_values(
+        results,
+        ('Innodb_s_lock_spin_waits', 'Innodb_s_lock_spin_rounds', 'Innodb_s_lock_os_waits'),
+        RW_SHARED_SPINS_PATTERN.search(section),
+    )
+    _set_values(
+        results,
+        ('Innodb_x_lock_spin_waits', 'Innodb_x_lock_spin_rounds', 'Innodb_x_lock_os_waits'),
+        RW_EXCL_SPINS_PATTERN.search(section),
+    )
+    for wait_time in SEMAPHORE_WAIT_PATTERN.findall(section):
+        results['Innodb_semaphore_waits'] += 1
+        results['Innodb_semaphore_wait_time'] += long(float(wait_time)) * 1000
+
+
+def _parse_transactions(section, results, metric_names):
+    _set_values(results, ('Innodb_history_list_length',), HISTORY_LIST_LENGTH_PATTERN.search(section))
+
+    # The list of transactions is by far the largest part of the status on busy servers,
+    # only go through it when its metrics are collected.
+    if metric_names is not None and metric_names.isdisjoint(TRANSACTION_LIST_METRICS):
+        return
+
+    for transaction in TRANSACTION_PATTERN.findall(section):
+        results['Innodb_current_transactions'] += 1
+        if 'ACTIVE' in transaction:
+            results['Innodb_active_transactions'] += 1
+    for state, lock_structs in LOCK_STRUCTS_PATTERN.findall(section):
+        results['Innodb_lock_structs'] += long(lock_structs)
+        if state == 'LOCK WAIT ':
+            results['Innodb_locked_transactions'] += 1
+    for tables_in_use, locked_tables in TABLES_IN_USE_PATTERN.findall(section):
+        results['Innodb_tables_in_use'] += long(tables_in_use)
+        results['Innodb_locked_tables'] += long(locked_tables)
+
+
+def _parse_file_io(section, results, metric_names):
+    _set_values(
+        results,
+        ('Innodb_os_file_reads', 'Innodb_os_file_writes', 'Innodb_os_file_fsyncs'),
+        OS_FILE_PATTERN.search(section),
+    )
+
+    match = PENDING_NORMAL_AIO_PATTERN.search(section)
+    if match is not None:
+        reads, reads_per_thread, writes, writes_per_thread = match.groups()
+        pending_reads = _pending_aio(reads, reads_per_thread)
+        pending_writes = _pending_aio(writes, writes_per_thread)
+        if pending_reads is not None and pending_writes is not None:
+            results['Innodb_pending_normal_aio_reads'] = pending_reads
+            results['Innodb_pending_normal_aio_writes'] = pending_writes
+
+    _set_values(
+        results,
+        ('Innodb_pending_ibuf_aio_reads', 'Innodb_pending_aio_log_ios', 'Innodb_pending_aio_sync_ios'),
+        PENDING_IBUF_AIO_PATTERN.search(section),
+    )
+    _set_values(
+        results,
+        ('Innodb_pending_log_flushes', 'Innodb_pending_buffer_pool_flushes'),
+        PENDING_FLUSHES_PATTERN.search(section),
+    )
+    _set_values(results, ('Innodb_pending_buffer_pool_flushes',), PENDING_BUFFER_POOL_FLUSHES_PATTERN.search(section))
+
+
+def _parse_insert_buffer(section, results, metric_names):
+    _set_values(
+        results,
+        ('Innodb_ibuf_size', 'Innodb_ibuf_free_list', 'Innodb_ibuf_segment_size'),
+        IBUF_FOR_SPACE_PATTERN.search(section),
+    )
+
+    match = IBUF_PATTERN.search(section)
+    if match is not None:
+        size, free_list, segment_size, merges = match.groups()
+        results['Innodb_ibuf_size'] = long(size)
+        results['Innodb_ibuf_free_list'] = long(free_list)
+        results['Innodb_ibuf_segment_size'] = long(segment_size)
+        if merges is not None:
+            results['Innodb_ibuf_merges'] = long(merges)
+
+    match = IBUF_MERGED_OPERATIONS_PATTERN.search(section)
+    if match is not None:
+        _set_values(
+            results,
+            ('Innodb_ibuf_merged_inserts', 'Innodb_ibuf_merged_delete_marks', 'Innodb_ibuf_merged_deletes'),
+            match,
+        )
+        results['Innodb_ibuf_merged'] = (
+            results['Innodb_ibuf_merged_inserts']
+            + results['Innodb_ibuf_merged_delete_marks']
+            + results['Innodb_ibuf_merged_deletes']
+        )
+
+    _set_values(
+        results,
+        ('Innodb_ibuf_merged_inserts', 'Innodb_ibuf_merged', 'Innodb_ibuf_merges'),
+        IBUF_MERGED_RECS_PATTERN.search(section),
+    )
+
+    # The adaptive hash index can be partitioned, the last partition is reported
+    hash_tables = HASH_TABLE_PATTERN.findall(section)
+    if hash_tables:
+        cells_total, cells_used = hash_tables[-1]
+        results['Innodb_hash_index_cells_total'] = long(cells_total)
+        results['Innodb_hash_index_cells_used'] = long(cells_used or 0)
+
+
+def _parse_log(section, results, metric_names):
+    _set_values(results, ('Innodb_log_writes',), LOG_IOS_PATTERN.search(section))
+    _set_values(
+        results,
+        ('Innodb_pending_log_writes', 'Innodb_pending_checkpoint_writes'),
+        PENDING_LOG_WRITES_PATTERN.search(section),
+    )
+    _set_values(results, ('Innodb_lsn_current',), LOG_SEQUENCE_NUMBER_PATTERN.search(section))
+    _set_values(results, ('Innodb_lsn_flushed',), LOG_FLUSHED_PATTERN.search(section))
+    _set_values(results, ('Innodb_lsn_last_checkpoint',), LAST_CHECKPOINT_PATTERN.search(section))
+
+    # We need to calculate this metric separately
+    results['Innodb_checkpoint_age'] = results['Innodb_lsn_current'] - results['Innodb_lsn_last_checkpoint']
+
+
+def _parse_buffer_pool(section, results, metric_names):
+    # Only the aggregated buffer pool metrics are reported, the INDIVIDUAL BUFFER POOL INFO section is ignored
+    _set_values(results, ('Innodb_mem_total', 'Innodb_mem_additional_pool'), TOTAL_MEMORY_PATTERN.search(section))
+    for metric, pattern in MEMORY_PATTERNS:
+        _set_values(results, (metric,), pattern.search(section))
+    for metric, pattern in BUFFER_POOL_PATTERNS:
+        _set_values(results, (metric,), pattern.search(section))
+    _set_values(
+        results,
+        ('Innodb_pages_read', 'Innodb_pages_created', 'Innodb_pages_written'),
+        PAGES_PATTERN.search(section),
+    )
+
+
+def _parse_row_operations(section, results, metric_names):
+    _set_values(
+        results,
+        ('Innodb_rows_inserted', 'Innodb_rows_updated', 'Innodb_rows_deleted', 'Innodb_rows_read'),
+        ROWS_PATTERN.search(section),
+    )
+    _set_values(results, ('Innodb_queries_inside', 'Innodb_queries_queued'), QUERIES_PATTERN.search(section))
+    _set_values(results, ('Innodb_read_views',), READ_VIEWS_PATTERN.search(section))
+
+
+TRANSACTION_LIST_METRICS = frozenset(
+    [
+        'Innodb_current_transactions',
+        'Innodb_active_transactions',
+        'Innodb_lock_structs',
+        'Innodb_locked_transactions',
+        'Innodb_tables_in_use',
+        'Innodb_locked_tables',
+    ]
+)
+
+# The sections of the InnoDB status that are parsed, with the metrics found in each of them
+INNODB_STATUS_SECTIONS = {
+    'SEMAPHORES': (
+        _parse_semaphores,
+        frozenset(
+            [
+                'Innodb_mutex_spin_waits',
+                'Innodb_mutex_spin_rounds',
+                'Innodb_mutex_os_waits',
+                'Innodb_s_lock_spin_waits',
+                'Innodb_s_lock_spin_rounds',
+                'Innodb_s_lock_os_waits',
+                'Innodb_x_lock_spin_waits',
+                'Innodb_x_lock_spin_rounds',
+                'Innodb_x_lock_os_waits',
+                'Innodb_semaphore_waits',
+                'Innodb_semaphore_wait_time',
+            ]
+        ),
+    ),
+    'TRANSACTIONS': (_parse_transactions, TRANSACTION_LIST_METRICS | {'Innodb_history_list_length'}),
+    'FILE I/O': (
+        _parse_file_io,
+        frozenset(
+            [
+                'Innodb_os_file_reads',
+                'Innodb_os_file_writes',
+                'Innodb_os_file_fsyncs',
+                'Innodb_pending_normal_aio_reads',
+                'Innodb_pending_normal_aio_writes',
+                'Innodb_pending_ibuf_aio_reads',
+                'Innodb_pending_aio_log_ios',
+                'Innodb_pending_aio_sync_ios',
+                'Innodb_pending_log_flushes',
+                'Innodb_pending_buffer_pool_flushes',
+            ]
+        ),
+    ),
+    'INSERT BUFFER AND ADAPTIVE HASH INDEX': (
+        _parse_insert_buffer,
+        frozenset(
+            [
+                'Innodb_ibuf_size',
+                'Innodb_ibuf_free_list',
+                'Innodb_ibuf_segment_size',
+                'Innodb_ibuf_merges',
+                'Innodb_ibuf_merged_inserts',
+                'Innodb_ibuf_merged_delete_marks',
+                'Innodb_ibuf_merged_deletes',
+                'Innodb_ibuf_merged',
+                'Innodb_hash_index_cells_total',
+                'Innodb_hash_index_cells_used',
+            ]
+        ),
+    ),
+    'LOG': (
+        _parse_log,
+        frozenset(
+            [
+                'Innodb_log_writes',
+                'Innodb_pending_log_writes',
+                'Innodb_pending_checkpoint_writes',
+                'Innodb_lsn_current',
+                'Innodb_lsn_flushed',
+                'Innodb_lsn_last_checkpoint',
+                'Innodb_checkpoint_age',
+            ]
+        ),
+    ),
+    'BUFFER POOL AND MEMORY': (
+        _parse_buffer_pool,
+        frozenset(
+            [
+                'Innodb_mem_total',
+                'Innodb_mem_additional_pool',
+                'Innodb_mem_adaptive_hash',
+                'Innodb_mem_page_hash',
+                'Innodb_mem_dictionary',
+                'Innodb_mem_file_system',
+                'Innodb_mem_lock_system',
+                'Innodb_mem_recovery_system',
+                'Innodb_mem_thread_hash',
+                'Innodb_buffer_pool_pages_total',
+                'Innodb_buffer_pool_pages_free',
+                'Innodb_buffer_pool_pages_data',
+                'Innodb_buffer_pool_pages_dirty',
+                'Innodb_pages_read',
+                'Innodb_pages_created',
+                'Innodb_pages_written',
+            ]
+        ),
+    ),
+    'ROW OPERATIONS': (
+        _parse_row_operations,
+        frozenset(
+            [
+                'Innodb_rows_inserted',
+                'Innodb_rows_updated',
+                'Innodb_rows_deleted',
+                'Innodb_rows_read',
+                'Innodb_queries_inside',
+                'Innodb_queries_queued',
+                'Innodb_read_views',
+            ]
+        ),
+    ),
+}
+
+# The metrics needed from the InnoDB status when the extra InnoDB metrics are not collected:
+# the ones reported by default and the buffer pool pages used by `process_innodb_stats`.
+DEFAULT_INNODB_STATUS_METRICS = frozenset(INNODB_VARS) | {
+    'Innodb_buffer_pool_pages_data',
+    'Innodb_buffer_pool_pages_dirty',
+    'Innodb_buffer_pool_pages_total',
+    'Innodb_buffer_pool_pages_free',
+}
+
+
+def parse_innodb_status(innodb_status_text, metric_names=None):
+    """Extract the metrics from the output of `SHOW ENGINE INNODB STATUS`.
+
+    Only the sections containing some of `metric_names` are parsed, all of them when it's None. This is heavily
+    inspired by the Percona monitoring plugins work.
+    """
+    results = defaultdict(int)
+
+    headers = list(SECTION_HEADER_PATTERN.finditer(innodb_status_text))
+    for i, header in enumerate(headers):
+        section = INNODB_STATUS_SECTIONS.get(header.group(1))
+        if section is None:
+            continue
+        parse_section, section_metric_names = section
+        if metric_names is not None and metric_names.isdisjoint(section_metric_names):
+            continue
+
+        end = headers[i + 1].start() if i + 1 < len(headers) else len(innodb_status_text)
+        parse_section(innodb_status_text[header.end() : end], results, metric_names)
+
+    # Finally we change back the metrics values to string to make the values
+    # consistent with how they are reported by SHOW GLOBAL STATUS
+    for metric, value in list(iteritems(results)):
+        results[metric] = str(value)
+
+    return results
 
 
 class InnoDBMetrics(object):
     def __init__(self):
         self.log = get_check_logger()
 
-    def get_stats_from_innodb_status(self, db):
+    def get_stats_from_innodb_status(self, db, extra_metrics=True):
         # There are a number of important InnoDB metrics that are reported in
         # InnoDB status but are not otherwise present as part of the STATUS
         # variables in MySQL. Majority of these metrics are reported though
@@ -61,305 +513,9 @@ class InnoDBMetrics(object):
         innodb_status = cursor.fetchone()
         innodb_status_text = innodb_status[2]
 
-        results = defaultdict(int)
-
-        # Here we now parse InnoDB STATUS one line at a time
-        # This is heavily inspired by the Percona monitoring plugins work
-        txn_seen = False
-        prev_line = ''
-        # Only return aggregated buffer pool metrics
-        buffer_id = -1
-        for line in innodb_status_text.splitlines():
-            line = line.strip()
-            row = re.split(" +", line)
-            row = [item.strip(',') for item in row]
-            row = [item.strip(';') for item in row]
-            row = [item.strip('[') for item in row]
-            row = [item.strip(']') for item in row]
-
-            if line.startswith('---BUFFER POOL'):
-                buffer_id = long(row[2])
-
-            # SEMAPHORES
-            if line.find('Mutex spin waits') == 0:
-                # Mutex spin waits 79626940, rounds 157459864, OS waits 698719
-                # Mutex spin waits 0, rounds 247280272495, OS waits 316513438
-                results['Innodb_mutex_spin_waits'] = long(row[3])
-                results['Innodb_mutex_spin_rounds'] = long(row[5])
-                results['Innodb_mutex_os_waits'] = long(row[8])
-            elif line.find('RW-shared spins') == 0 and line.find(';') > 0:
-                # RW-shared spins 3859028, OS waits 2100750; RW-excl spins
-                # 4641946, OS waits 1530310
-                results['Innodb_s_lock_spin_waits'] = long(row[2])
-                results['Innodb_x_lock_spin_waits'] = long(row[8])
-                results['Innodb_s_lock_os_waits'] = long(row[5])
-                results['Innodb_x_lock_os_waits'] = long(row[11])
-            elif line.find('RW-shared spins') == 0 and line.find('; RW-excl spins') == -1:
-                # Post 5.5.17 SHOW ENGINE INNODB STATUS syntax
-                # RW-shared spins 604733, rounds 8107431, OS waits 241268
-                results['Innodb_s_lock_spin_waits'] = long(row[2])
-                results['Innodb_s_lock_spin_rounds'] = long(row[4])
-                results['Innodb_s_lock_os_waits'] = long(row[7])
-            elif line.find('RW-excl spins') == 0:
-                # Post 5.5.17 SHOW ENGINE INNODB STATUS syntax
-                # RW-excl spins 604733, rounds 8107431, OS waits 241268
-                results['Innodb_x_lock_spin_waits'] = long(row[2])
-                results['Innodb_x_lock_spin_rounds'] = long(row[4])
-                results['Innodb_x_lock_os_waits'] = long(row[7])
-            elif line.find('seconds the semaphore:') > 0:
-                # --Thread 907205 has waited at handler/ha_innodb.cc line 7156 for 1.00 seconds the semaphore:
-                results['Innodb_semaphore_waits'] += 1
-                results['Innodb_semaphore_wait_time'] += long(float(row[9])) * 1000
-
-            # TRANSACTIONS
-            elif line.find('Trx id counter') == 0:
-                # The beginning of the TRANSACTIONS section: start counting
-                # transactions
-                # Trx id counter 0 1170664159
-                # Trx id counter 861B144C
-                txn_seen = True
-            elif line.find('History list length') == 0:
-                # History list length 132
-                results['Innodb_history_list_length'] = long(row[3])
-            elif txn_seen and line.find('---TRANSACTION') == 0:
-                # ---TRANSACTION 0, not started, process no 13510, OS thread id 1170446656
-                results['Innodb_current_transactions'] += 1
-                if line.find('ACTIVE') > 0:
-                    results['Innodb_active_transactions'] += 1
-            elif line.find('read views open inside InnoDB') > 0:
-                # 1 read views open inside InnoDB
-                results['Innodb_read_views'] = long(row[0])
-            elif line.find('mysql tables in use') == 0:
-                # mysql tables in use 2, locked 2
-                results['Innodb_tables_in_use'] += long(row[4])
-                results['Innodb_locked_tables'] += long(row[6])
-            elif txn_seen and line.find('lock struct(s)') > 0:
-                # 23 lock struct(s), heap size 3024, undo log entries 27
-                # LOCK WAIT 12 lock struct(s), heap size 3024, undo log entries 5
-                # LOCK WAIT 2 lock struct(s), heap size 368
-                if line.find('LOCK WAIT') == 0:
-                    results['Innodb_lock_structs'] += long(row[2])
-                    results['Innodb_locked_transactions'] += 1
-                elif line.find('ROLLING BACK') == 0:
-                    # ROLLING BACK 127539 lock struct(s), heap size 15201832,
-                    # 4411492 row lock(s), undo log entries 1042488
-                    results['Innodb_lock_structs'] += long(row[2])
-                else:
-                    results['Innodb_lock_structs'] += long(row[0])
-
-            # FILE I/O
-            elif line.find(' OS file reads, ') > 0:
-                # 8782182 OS file reads, 15635445 OS file writes, 947800 OS
-                # fsyncs
-                results['Innodb_os_file_reads'] = long(row[0])
-                results['Innodb_os_file_writes'] = long(row[4])
-                results['Innodb_os_file_fsyncs'] = long(row[8])
-            elif line.find('Pending normal aio reads:') == 0:
-                try:
-                    if len(row) == 8:
-                        # (len(row) == 8)  Pending normal aio reads: 0, aio writes: 0,
-                        results['Innodb_pending_normal_aio_reads'] = long(row[4])
-                        results['Innodb_pending_normal_aio_writes'] = long(row[7])
-                    elif len(row) == 14:
-                        # (len(row) == 14) Pending normal aio reads: 0 [0, 0] , aio writes: 0 [0, 0] ,
-                        results['Innodb_pending_normal_aio_reads'] = long(row[4])
-                        results['Innodb_pending_normal_aio_writes'] = long(row[10])
-                    elif len(row) == 16:
-                        # (len(row) == 16) Pending normal aio reads: [0, 0, 0, 0] , aio writes: [0, 0, 0, 0] ,
-                        if _are_values_numeric(row[4:8]) and _are_values_numeric(row[11:15]):
-                            results['Innodb_pending_normal_aio_reads'] = (
-                                long(row[4]) + long(row[5]) + long(row[6]) + long(row[7])
-                            )
-                            results['Innodb_pending_normal_aio_writes'] = (
-                                long(row[11]) + long(row[12]) + long(row[13]) + long(row[14])
-                            )
-
-                        # (len(row) == 16) Pending normal aio reads: 0 [0, 0, 0, 0] , aio writes: 0 [0, 0] ,
-                        elif _are_values_numeric(row[4:9]) and _are_values_numeric(row[12:15]):
-                            results['Innodb_pending_normal_aio_reads'] = long(row[4])
-                            results['Innodb_pending_normal_aio_writes'] = long(row[12])
-                        else:
-                            self.log.warning("Can't parse result line %s", line)
-                    elif len(row) == 18:
-                        # (len(row) == 18) Pending normal aio reads: 0 [0, 0, 0, 0] , aio writes: 0 [0, 0, 0, 0] ,
-                        results['Innodb_pending_normal_aio_reads'] = long(row[4])
-                        results['Innodb_pending_normal_aio_writes'] = long(row[12])
-                    elif len(row) == 22:
-                        # (len(row) == 22)
-                        # Pending normal aio reads: 0 [0, 0, 0, 0, 0, 0, 0, 0] , aio writes: 0 [0, 0, 0, 0] ,
-                        results['Innodb_pending_normal_aio_reads'] = long(row[4])
-                        results['Innodb_pending_normal_aio_writes'] = long(row[16])
-                except ValueError as e:
-                    self.log.warning("Can't parse result line %s: %s", line, e)
-            elif line.find('ibuf aio reads') == 0:
-                #  ibuf aio reads: 0, log i/o's: 0, sync i/o's: 0
-                #  or ibuf aio reads:, log i/o's:, sync i/o's:
-                if len(row) == 10:
-                    results['Innodb_pending_ibuf_aio_reads'] = long(row[3])
-                    results['Innodb_pending_aio_log_ios'] = long(row[6])
-                    results['Innodb_pending_aio_sync_ios'] = long(row[9])
-                elif len(row) == 7:
-                    results['Innodb_pending_ibuf_aio_reads'] = 0
-                    results['Innodb_pending_aio_log_ios'] = 0
-                    results['Innodb_pending_aio_sync_ios'] = 0
-            elif line.find('Pending flushes (fsync)') == 0:
-                if len(row) == 4:
-                    # Pending flushes (fsync): 0
-                    results['Innodb_pending_buffer_pool_flushes'] = long(row[3])
-                else:
-                    # Pending flushes (fsync) log: 0; buffer pool: 0
-                    results['Innodb_pending_log_flushes'] = long(row[4])
-                    results['Innodb_pending_buffer_pool_flushes'] = long(row[7])
-
-            # INSERT BUFFER AND ADAPTIVE HASH INDEX
-            elif line.find('Ibuf for space 0: size ') == 0:
-                # Older InnoDB code seemed to be ready for an ibuf per tablespace.  It
-                # had two lines in the output.  Newer has just one line, see below.
-                # Ibuf for space 0: size 1, free list len 887, seg size 889, is not empty
-                # Ibuf for space 0: size 1, free list len 887, seg size 889,
-                results['Innodb_ibuf_size'] = long(row[5])
-                results['Innodb_ibuf_free_list'] = long(row[9])
-                results['Innodb_ibuf_segment_size'] = long(row[12])
-            elif line.find('Ibuf: size ') == 0:
-                # Ibuf: size 1, free list len 4634, seg size 4636,
-                results['Innodb_ibuf_size'] = long(row[2])
-                results['Innodb_ibuf_free_list'] = long(row[6])
-                results['Innodb_ibuf_segment_size'] = long(row[9])
-
-                if line.find('merges') > -1:
-                    results['Innodb_ibuf_merges'] = long(row[10])
-            elif line.find(', delete mark ') > 0 and prev_line.find('merged operations:') == 0:
-                # Output of show engine innodb status has changed in 5.5
-                # merged operations:
-                # insert 593983, delete mark 387006, delete 73092
-                results['Innodb_ibuf_merged_inserts'] = long(row[1])
-                results['Innodb_ibuf_merged_delete_marks'] = long(row[4])
-                results['Innodb_ibuf_merged_deletes'] = long(row[6])
-                results['Innodb_ibuf_merged'] = (
-                    results['Innodb_ibuf_merged_inserts']
-                    + results['Innodb_ibuf_merged_delete_marks']
-                    + results['Innodb_ibuf_merged_deletes']
-                )
-            elif line.find(' merged recs, ') > 0:
-                # 19817685 inserts, 19817684 merged recs, 3552620 merges
-                results['Innodb_ibuf_merged_inserts'] = long(row[0])
-                results['Innodb_ibuf_merged'] = long(row[2])
-                results['Innodb_ibuf_merges'] = long(row[5])
-            elif line.find('Hash table size ') == 0:
-                # In some versions of InnoDB, the used cells is omitted.
-                # Hash table size 4425293, used cells 4229064, ....
-                # Hash table size 57374437, node heap has 72964 buffer(s) <--
-                # no used cells
-                results['Innodb_hash_index_cells_total'] = long(row[3])
-                results['Innodb_hash_index_cells_used'] = long(row[6]) if line.find('used cells') > 0 else 0
-
-            # LOG
-            elif line.find(" log i/o's done, ") > 0:
-                # 3430041 log i/o's done, 17.44 log i/o's/second
-                # 520835887 log i/o's done, 17.28 log i/o's/second, 518724686
-                # syncs, 2980893 checkpoints
-                results['Innodb_log_writes'] = long(row[0])
-            elif line.find(" pending log writes, ") > 0:
-                # 0 pending log writes, 0 pending chkp writes
-                results['Innodb_pending_log_writes'] = long(row[0])
-                results['Innodb_pending_checkpoint_writes'] = long(row[4])
-            elif line.find("Log sequence number") == 0:
-                # This number is NOT printed in hex in InnoDB plugin.
-                # Log sequence number 272588624
-                results['Innodb_lsn_current'] = long(row[3])
-            elif line.find("Log flushed up to") == 0:
-                # This number is NOT printed in hex in InnoDB plugin.
-                # Log flushed up to   272588624
-                results['Innodb_lsn_flushed'] = long(row[4])
-            elif line.find("Last checkpoint at") == 0:
-                # Last checkpoint at  272588624
-                results['Innodb_lsn_last_checkpoint'] = long(row[3])
-
-            # BUFFER POOL AND MEMORY
-            elif line.find("Total memory allocated") == 0 and line.find("in additional pool allocated") > 0:
-                # Total memory allocated 29642194944; in additional pool allocated 0
-                # Total memory allocated by read views 96
-                results['Innodb_mem_total'] = long(row[3])
-                results['Innodb_mem_additional_pool'] = long(row[8])
-            elif line.find('Adaptive hash index ') == 0:
-                #   Adaptive hash index 1538240664     (186998824 + 1351241840)
-                results['Innodb_mem_adaptive_hash'] = long(row[3])
-            elif line.find('Page hash           ') == 0:
-                #   Page hash           11688584
-                results['Innodb_mem_page_hash'] = long(row[2])
-            elif line.find('Dictionary cache    ') == 0:
-                #   Dictionary cache    145525560      (140250984 + 5274576)
-                results['Innodb_mem_dictionary'] = long(row[2])
-            elif line.find('File system         ') == 0:
-                #   File system         313848         (82672 + 231176)
-                results['Innodb_mem_file_system'] = long(row[2])
-            elif line.find('Lock system         ') == 0:
-                #   Lock system         29232616       (29219368 + 13248)
-                results['Innodb_mem_lock_system'] = long(row[2])
-            elif line.find('Recovery system     ') == 0:
-                #   Recovery system     0      (0 + 0)
-                results['Innodb_mem_recovery_system'] = long(row[2])
-            elif line.find('Threads             ') == 0:
-                #   Threads             409336         (406936 + 2400)
-                results['Innodb_mem_thread_hash'] = long(row[1])
-            elif line.find("Buffer pool size ") == 0:
-                # The " " after size is necessary to avoid matching the wrong line:
-                # Buffer pool size        1769471
-                # Buffer pool size, bytes 28991012864
-                if buffer_id == -1:
-                    results['Innodb_buffer_pool_pages_total'] = long(row[3])
-            elif line.find("Free buffers") == 0:
-                # Free buffers            0
-                if buffer_id == -1:
-                    results['Innodb_buffer_pool_pages_free'] = long(row[2])
-            elif line.find("Database pages") == 0:
-                # Database pages          1696503
-                if buffer_id == -1:
-                    results['Innodb_buffer_pool_pages_data'] = long(row[2])
-
-            elif line.find("Modified db pages") == 0:
-                # Modified db pages       160602
-                if buffer_id == -1:
-                    results['Innodb_buffer_pool_pages_dirty'] = long(row[3])
-            elif line.find("Pages read ahead") == 0:
-                # Must do this BEFORE the next test, otherwise it'll get fooled by this
-                # line from the new plugin:
-                # Pages read ahead 0.00/s, evicted without access 0.06/s
-                pass
-            elif line.find("Pages read") == 0:
-                # Pages read 15240822, created 1770238, written 21705836
-                if buffer_id == -1:
-                    results['Innodb_pages_read'] = long(row[2])
-                    results['Innodb_pages_created'] = long(row[4])
-                    results['Innodb_pages_written'] = long(row[6])
-
-            # ROW OPERATIONS
-            elif line.find('Number of rows inserted') == 0:
-                # Number of rows inserted 50678311, updated 66425915, deleted
-                # 20605903, read 454561562
-                results['Innodb_rows_inserted'] = long(row[4])
-                results['Innodb_rows_updated'] = long(row[6])
-                results['Innodb_rows_deleted'] = long(row[8])
-                results['Innodb_rows_read'] = long(row[10])
-            elif line.find(" queries inside InnoDB, ") > 0:
-                # 0 queries inside InnoDB, 0 queries in queue
-                results['Innodb_queries_inside'] = long(row[0])
-                results['Innodb_queries_queued'] = long(row[4])
-
-            prev_line = line
-
-        # We need to calculate this metric separately
-        try:
-            results['Innodb_checkpoint_age'] = results['Innodb_lsn_current'] - results['Innodb_lsn_last_checkpoint']
-        except KeyError as e:
-            self.log.error("Not all InnoDB LSN metrics available, unable to compute: %s", e)
-
-        # Finally we change back the metrics values to string to make the values
-        # consistent with how they are reported by SHOW GLOBAL STATUS
-        for metric, value in list(iteritems(results)):
-            results[metric] = str(value)
-
-        return results
+        return parse_innodb_status(
+            innodb_status_text, metric_names=None if extra_metrics else DEFAULT_INNODB_STATUS_METRICS
+        )
 
     def process_innodb_stats(self, results, options, metrics):
         innodb_keys = [
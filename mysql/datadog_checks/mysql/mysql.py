@@ -413,7 +413,11 @@ class MySql(AgentCheck):
         if not is_affirmative(
             self._config.options.get('disable_innodb_metrics', False)
         ) and self._is_innodb_engine_enabled(db):
-            results.update(self.innodb_stats.get_stats_from_innodb_status(db))
+            results.update(
+                self.innodb_stats.get_stats_from_innodb_status(
+                    db, extra_metrics=is_affirmative(self._config.options.get('extra_innodb_metrics', False))
+                )
+            )
             self.innodb_stats.process_innodb_stats(results, self._config.options, metrics)
 
         # Binary log statistics
@@ -329,6 +329,7 @@ class MySQLStatementSamples(DBMAsyncJob):
             )
             self._cursor_run(cursor, EVENTS_STATEMENTS_CURRENT_QUERY)
             rows = cursor.fetchall()
+            self._record_rows(len(rows))
             tags = (
                 self._tags
                 + ["events_statements_table:{}".format(EVENTS_STATEMENTS_TABLE)]
@@ -571,7 +572,9 @@ class MySQLStatementSamples(DBMAsyncJob):
             self._tags + ["events_statements_table:{}".format(events_statements_table)] + self._check._get_debug_tags()
         )
         for e in events:
-            self._check.database_monitoring_query_sample(json.dumps(e, default=default_json_event_encoding))
+            self._submit_dbm_event(
+                self._check.database_monitoring_query_sample, json.dumps(e, default=default_json_event_encoding)
+            )
             submitted_count += 1
         self._check.histogram(
             "dd.mysql.collect_statement_samples.time",
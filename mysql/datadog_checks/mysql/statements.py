@@ -13,9 +13,8 @@ from cachetools import TTLCache
 from datadog_checks.base import is_affirmative
 from datadog_checks.base.log import get_check_logger
 from datadog_checks.base.utils.common import to_native_string
-from datadog_checks.base.utils.db.sql import compute_sql_signature
 from datadog_checks.base.utils.db.statement_metrics import StatementMetrics
-from datadog_checks.base.utils.db.utils import DBMAsyncJob, default_json_event_encoding, obfuscate_sql_with_metadata
+from datadog_checks.base.utils.db.utils import DBMAsyncJob, default_json_event_encoding
 from datadog_checks.base.utils.serialization import json
 from datadog_checks.base.utils.tracking import tracked_method
 
@@ -137,7 +136,9 @@ class MySQLStatementMetrics(DBMAsyncJob):
         # by the agent
         tags = [t for t in self._tags if not t.startswith('dd.internal')]
         for event in self._rows_to_fqt_events(rows, tags):
-            self._check.database_monitoring_query_sample(json.dumps(event, default=default_json_event_encoding))
+            self._submit_dbm_event(
+                self._check.database_monitoring_query_sample, json.dumps(event, default=default_json_event_encoding)
+            )
         payload = {
             'host': self._check.resolved_hostname,
             'timestamp': time.time() * 1000,
@@ -150,13 +151,18 @@ class MySQLStatementMetrics(DBMAsyncJob):
             'cloud_metadata': self._config.cloud_metadata,
             'mysql_rows': rows,
         }
-        self._check.database_monitoring_query_metrics(json.dumps(payload, default=default_json_event_encoding))
+        self._submit_dbm_event(
+            self._check.database_monitoring_query_metrics, json.dumps(payload, default=default_json_event_encoding)
+        )
         self._check.count(
             "dd.mysql.collect_per_statement_metrics.rows",
             len(rows),
             tags=tags + self._check._get_debug_tags(),
             hostname=self._check.resolved_hostname,
         )
+        self._submit_obfuscation_cache_stats(
+            tags + self._check._get_debug_tags(), hostname=self._check.resolved_hostname
+        )
 
     def _collect_per_statement_metrics(self):
         # type: () -> List[PyMysqlRow]
@@ -198,6 +204,7 @@ class MySQLStatementMetrics(DBMAsyncJob):
             cursor.execute(sql_statement_summary)
 
             rows = cursor.fetchall() or []  # type: ignore
+            self._record_rows(len(rows))
 
         return rows
 
@@ -206,14 +213,14 @@ class MySQLStatementMetrics(DBMAsyncJob):
         for row in rows:
             normalized_row = dict(copy.copy(row))
             try:
-                statement = obfuscate_sql_with_metadata(row['digest_text'], self._obfuscate_options)
+                statement = self._obfuscate(row['digest_text'], self._obfuscate_options)
                 obfuscated_statement = statement['query'] if row['digest_text'] is not None else None
             except Exception as e:
                 self.log.warning("Failed to obfuscate query=[%s] | err=[%s]", row['digest_text'], e)
                 continue
 
             normalized_row['digest_text'] = obfuscated_statement
-            normalized_row['query_signature'] = compute_sql_signature(obfuscated_statement)
+            normalized_row['query_signature'] = statement['query_signature']
             metadata = statement['metadata']
             normalized_row['dd_tables'] = metadata.get('tables', None)
             normalized_row['dd_commands'] = metadata.get('commands', None)
@@ -9,6 +9,7 @@ import mock
 import pymysql
 import pytest
 
+from datadog_checks.base.utils.db.utils import obfuscation_cache
 from datadog_checks.dev import TempDir, WaitFor, docker_run
 from datadog_checks.dev.conditions import CheckDockerLogs
 
@@ -22,6 +23,12 @@ MYSQL_VERSION = os.getenv('MYSQL_VERSION')
 COMPOSE_FILE = os.getenv('COMPOSE_FILE')
 
 
+@pytest.fixture(autouse=True)
+def clear_obfuscation_cache():
+    # Obfuscated statements are shared across check instances, tests mocking the obfuscator must not reuse them
+    obfuscation_cache.clear()
+
+
 @pytest.fixture(scope='session')
 def config_e2e(instance_basic):
     instance = copy.deepcopy(instance_basic)
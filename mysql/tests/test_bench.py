@@ -0,0 +1,27 @@
+# (C) Datadog, Inc. 2023-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+import os
+
+import pytest
+
+from datadog_checks.mysql.innodb_metrics import DEFAULT_INNODB_STATUS_METRICS, parse_innodb_status
+
+pytestmark = pytest.mark.unit
+
+INNODB_STATUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "innodb_status")
+
+
+@pytest.fixture(scope='module')
+def busy_innodb_status():
+    # A busy server, with thousands of transactions listed in the status
+    with open(os.path.join(INNODB_STATUS_DIR, 'mysql-5.7.txt')) as f:
+        innodb_status_text = f.read()
+    start = innodb_status_text.index('---TRANSACTION ')
+    end = innodb_status_text.index('--------\nFILE I/O')
+    return innodb_status_text[:start] + innodb_status_text[start:end] * 2000 + innodb_status_text[end:]
+
+
+@pytest.mark.parametrize('metric_names', [None, DEFAULT_INNODB_STATUS_METRICS], ids=['extra', 'default'])
+def test_parse_innodb_status(benchmark, busy_innodb_status, metric_names):
+    benchmark(parse_innodb_status, busy_innodb_status, metric_names)
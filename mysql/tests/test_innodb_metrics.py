@@ -1,11 +1,17 @@
 # (C) Datadog, Inc. 2020-present
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
+import json
 import logging
+import os
 
 import pytest
 
-from datadog_checks.mysql.innodb_metrics import InnoDBMetrics
+from datadog_checks.mysql.innodb_metrics import DEFAULT_INNODB_STATUS_METRICS, InnoDBMetrics, parse_innodb_status
+
+INNODB_STATUS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "innodb_status")
+# `SHOW ENGINE INNODB STATUS` outputs captured from several versions, along with their expected metrics
+INNODB_STATUS_CORPUS = ['mysql-5.1', 'mysql-5.6', 'mysql-5.7', 'mysql-8.0', 'mariadb-10.5']
 
 
 @pytest.mark.unit
@@ -25,3 +31,58 @@ def test_innodb_status_unicode_error(caplog):
     idb = InnoDBMetrics()
     assert idb.get_stats_from_innodb_status(MockDatabase()) == {}
     assert 'Unicode error while getting INNODB status' in caplog.text
+
+
+def _read_innodb_status(name):
+    with open(os.path.join(INNODB_STATUS_DIR, name + '.txt')) as f:
+        return f.read()
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('name', INNODB_STATUS_CORPUS)
+def test_parse_innodb_status(name):
+    with open(os.path.join(INNODB_STATUS_DIR, name + '.json')) as f:
+        expected = json.load(f)
+
+    assert parse_innodb_status(_read_innodb_status(name)) == expected
+
+
+@pytest.mark.unit
+@pytest.mark.parametrize('name', INNODB_STATUS_CORPUS)
+def test_parse_innodb_status_default_metrics(name):
+    innodb_status_text = _read_innodb_status(name)
+    all_results = parse_innodb_status(innodb_status_text)
+    results = parse_innodb_status(innodb_status_text, metric_names=DEFAULT_INNODB_STATUS_METRICS)
+
+    # Only the sections with default metrics are parsed, the transactions are not even listed
+    assert 'Innodb_current_transactions' not in results
+    assert 'Innodb_history_list_length' not in results
+    assert 'Innodb_rows_read' not in results
+    assert results['Innodb_buffer_pool_pages_total'] == all_results['Innodb_buffer_pool_pages_total']
+    for metric, value in results.items():
+        assert all_results[metric] == value
+
+
+@pytest.mark.unit
+def test_parse_innodb_status_sections():
+    innodb_status_text = _read_innodb_status('mysql-5.7')
+
+    # The individual buffer pools are ignored, only the aggregated values are reported
+    results = parse_innodb_status(innodb_status_text, metric_names={'Innodb_buffer_pool_pages_total'})
+    assert results['Innodb_buffer_pool_pages_total'] == '131056'
+    assert 'Innodb_s_lock_spin_waits' not in results
+
+    # Only the transactions header is parsed when the list metrics are not needed
+    results = parse_innodb_status(innodb_status_text, metric_names={'Innodb_history_list_length'})
+    assert results == {'Innodb_history_list_length': '4187'}
+
+
+@pytest.mark.unit
+def test_parse_innodb_status_deadlock():
+    # The transactions of the latest deadlock are not counted with the current ones
+    results = parse_innodb_status(_read_innodb_status('mysql-5.6'), metric_names={'Innodb_tables_in_use'})
+    assert results['Innodb_tables_in_use'] == '3'
+    assert results['Innodb_locked_tables'] == '3'
+    assert results['Innodb_current_transactions'] == '4'
+    assert results['Innodb_active_transactions'] == '2'
+    assert results['Innodb_locked_transactions'] == '1'
@@ -76,9 +76,11 @@ class QueryMetrics(BaseModel):
     class Config:
         allow_mutation = False
 
+    cache_query_text: Optional[bool]
     collection_interval: Optional[float]
     enabled: Optional[bool]
     pg_stat_statements_max_warning_threshold: Optional[float]
+    query_text_cache_max_size: Optional[int]
 
 
 class QuerySamples(BaseModel):
@@ -270,6 +270,7 @@ class PostgresStatementSamples(DBMAsyncJob):
             cursor.execute(query, params)
             rows = cursor.fetchall()
 
+        self._record_rows(len(rows))
         self._report_check_hist_metrics(start_time, len(rows), "get_active_connections")
         self._log.debug("Loaded %s rows from %s", len(rows), self._config.pg_stat_activity_view)
         return [dict(row) for row in rows]
@@ -304,6 +305,7 @@ class PostgresStatementSamples(DBMAsyncJob):
             self._log.debug("Running query [%s] %s", query, params)
             cursor.execute(query, params)
             rows = cursor.fetchall()
+        self._record_rows(len(rows))
         self._report_check_hist_metrics(start_time, len(rows), "get_new_pg_stat_activity")
         self._log.debug("Loaded %s rows from %s", len(rows), self._config.pg_stat_activity_view)
         return rows
@@ -442,14 +444,17 @@ class PostgresStatementSamples(DBMAsyncJob):
         event_samples = self._collect_plans(rows)
         submitted_count = 0
         for e in event_samples:
-            self._check.database_monitoring_query_sample(json.dumps(e, default=default_json_event_encoding))
+            self._submit_dbm_event(
+                self._check.database_monitoring_query_sample, json.dumps(e, default=default_json_event_encoding)
+            )
             submitted_count += 1
 
         if self._report_activity_event():
             active_connections = self._get_active_connections()
             activity_event = self._create_activity_event(rows, active_connections)
-            self._check.database_monitoring_query_activity(
-                json.dumps(activity_event, default=default_json_event_encoding)
+            self._submit_dbm_event(
+                self._check.database_monitoring_query_activity,
+                json.dumps(activity_event, default=default_json_event_encoding),
             )
             self._check.histogram(
                 "dd.postgres.collect_activity_snapshot.time", (time.time() - start_time) * 1000, tags=self.tags
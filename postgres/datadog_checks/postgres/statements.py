@@ -8,13 +8,12 @@ import time
 
 import psycopg2
 import psycopg2.extras
-from cachetools import TTLCache
+from cachetools import LRUCache, TTLCache
 
 from datadog_checks.base import is_affirmative
 from datadog_checks.base.utils.common import to_native_string
-from datadog_checks.base.utils.db.sql import compute_sql_signature
 from datadog_checks.base.utils.db.statement_metrics import StatementMetrics
-from datadog_checks.base.utils.db.utils import DBMAsyncJob, default_json_event_encoding, obfuscate_sql_with_metadata
+from datadog_checks.base.utils.db.utils import DBMAsyncJob, default_json_event_encoding
 from datadog_checks.base.utils.serialization import json
 from datadog_checks.base.utils.tracking import tracked_method
 
@@ -39,6 +38,30 @@ SELECT {cols}
   {extra_clauses}
 """
 
+# Same as STATEMENTS_QUERY without the text of the queries, which is loaded separately with QUERY_TEXTS_QUERY
+# for the queries that are not cached yet. Rows without `queryid` are the ones with insufficient privileges.
+STATEMENTS_QUERY_WITHOUT_TEXT = """
+SELECT {cols}
+  FROM {pg_stat_statements_view}(false) as pg_stat_statements
+  LEFT JOIN pg_roles
+         ON pg_stat_statements.userid = pg_roles.oid
+  LEFT JOIN pg_database
+         ON pg_stat_statements.dbid = pg_database.oid
+  WHERE queryid IS NOT NULL
+  {filters}
+  {extra_clauses}
+"""
+
+QUERY_TEXTS_QUERY = """
+SELECT queryid, datname, rolname, query
+  FROM {pg_stat_statements_view} as pg_stat_statements
+  LEFT JOIN pg_roles
+         ON pg_stat_statements.userid = pg_roles.oid
+  LEFT JOIN pg_database
+         ON pg_stat_statements.dbid = pg_database.oid
+  WHERE queryid = ANY(%s)
+"""
+
 # Use pg_stat_statements(false) when available as an optimization to avoid pulling SQL text from disk
 PG_STAT_STATEMENTS_COUNT_QUERY = "SELECT COUNT(*) FROM pg_stat_statements(false)"
 PG_STAT_STATEMENTS_COUNT_QUERY_LT_9_4 = "SELECT COUNT(*) FROM pg_stat_statements"
@@ -104,8 +127,19 @@ def _row_key(row):
     return row['query_signature'], row['datname'], row['rolname']
 
 
+def _query_text_key(row):
+    """
+    :param row: a row from pg_stat_statements
+    :return: a tuple identifying the text of this row's query
+    """
+    return row['queryid'], row['datname'], row['rolname']
+
+
 DEFAULT_COLLECTION_INTERVAL = 10
 
+# Minimum size of the query text cache, unless `query_text_cache_max_size` is set
+DEFAULT_QUERY_TEXT_CACHE_MAX_SIZE = 10000
+
 
 class PostgresStatementMetrics(DBMAsyncJob):
     """Collects telemetry for SQL statements"""
@@ -139,6 +173,13 @@ class PostgresStatementMetrics(DBMAsyncJob):
         self._stat_column_cache = []
         self._track_io_timing_cache = None
         self._obfuscate_options = to_native_string(json.dumps(self._config.obfuscator_options))
+        # query_text_cache: the normalized text of the queries by queryid, when the text is not polled every run
+        self._query_text_cache = None
+        self._query_text_cache_max_size = config.statement_metrics_config.get('query_text_cache_max_size')
+        if is_affirmative(config.statement_metrics_config.get('cache_query_text', False)):
+            self._query_text_cache = LRUCache(
+                maxsize=int(self._query_text_cache_max_size or DEFAULT_QUERY_TEXT_CACHE_MAX_SIZE)
+            )
         # full_statement_text_cache: limit the ingestion rate of full statement text events per query_signature
         self._full_statement_text_cache = TTLCache(
             maxsize=config.full_statement_text_cache_max_size,
@@ -198,7 +239,9 @@ class PostgresStatementMetrics(DBMAsyncJob):
             if not rows:
                 return
             for event in self._rows_to_fqt_events(rows):
-                self._check.database_monitoring_query_sample(json.dumps(event, default=default_json_event_encoding))
+                self._submit_dbm_event(
+                    self._check.database_monitoring_query_sample, json.dumps(event, default=default_json_event_encoding)
+                )
             payload = {
                 'host': self._check.resolved_hostname,
                 'timestamp': time.time() * 1000,
@@ -210,7 +253,9 @@ class PostgresStatementMetrics(DBMAsyncJob):
                 'ddagentversion': datadog_agent.get_version(),
                 "ddagenthostname": self._check.agent_hostname,
             }
-            self._check.database_monitoring_query_metrics(json.dumps(payload, default=default_json_event_encoding))
+            self._submit_dbm_event(
+                self._check.database_monitoring_query_metrics, json.dumps(payload, default=default_json_event_encoding)
+            )
         except Exception:
             self._log.exception('Unable to collect statement metrics due to an error')
             return []
@@ -273,6 +318,12 @@ class PostgresStatementMetrics(DBMAsyncJob):
                 )
 
             query_columns = sorted(available_columns & desired_columns)
+            statements_query = STATEMENTS_QUERY
+            if self._can_cache_query_text(available_columns):
+                self._resize_query_text_cache(pg_stat_statements_max)
+                query_columns.remove('query')
+                statements_query = STATEMENTS_QUERY_WITHOUT_TEXT
+
             params = ()
             filters = ""
             if self._config.dbstrict:
@@ -285,7 +336,7 @@ class PostgresStatementMetrics(DBMAsyncJob):
                 params = params + tuple(self._config.ignore_databases)
             return self._execute_query(
                 self._check._get_db(self._config.dbname).cursor(cursor_factory=psycopg2.extras.DictCursor),
-                STATEMENTS_QUERY.format(
+                statements_query.format(
                     cols=', '.join(query_columns),
                     pg_stat_statements_view=self._config.pg_stat_statements_view,
                     filters=filters,
@@ -351,6 +402,57 @@ class PostgresStatementMetrics(DBMAsyncJob):
 
             return []
 
+    def _can_cache_query_text(self, available_columns):
+        # `pg_stat_statements(showtext)` is only available from Postgres 9.4 and can't be called on custom views
+        return (
+            self._query_text_cache is not None
+            and 'queryid' in available_columns
+            and self._check.version >= V9_4
+            and self._config.pg_stat_statements_view == 'pg_stat_statements'
+        )
+
+    def _resize_query_text_cache(self, pg_stat_statements_max):
+        # Unless its size is configured, the cache holds the text of every query tracked by pg_stat_statements
+        if self._query_text_cache_max_size or self._query_text_cache.maxsize >= pg_stat_statements_max:
+            return
+
+        query_text_cache = LRUCache(maxsize=pg_stat_statements_max)
+        query_text_cache.update(self._query_text_cache)
+        self._query_text_cache = query_text_cache
+
+    @tracked_method(agent_check_getter=agent_check_getter, track_result_length=True)
+    def _load_query_texts(self, query_text_keys):
+        """
+        Load and normalize the text of the given queries into the query text cache.
+
+        :return: the normalized queries that were loaded by query text key, which are still available
+            if the cache evicted them in the meantime
+        """
+        queryids = sorted({queryid for queryid, _, _ in query_text_keys})
+        rows = self._execute_query(
+            self._check._get_db(self._config.dbname).cursor(cursor_factory=psycopg2.extras.DictCursor),
+            QUERY_TEXTS_QUERY.format(pg_stat_statements_view=self._config.pg_stat_statements_view),
+            params=(queryids,),
+        )
+        normalized_queries = {}
+        for row in rows:
+            query_text_key = _query_text_key(row)
+            query = row['query']
+            if query_text_key not in query_text_keys or query is None:
+                continue
+
+            # Queries excluded from the metrics are cached as well, with an empty normalized query
+            normalized_query = {}
+            if query != '<insufficient privilege>' and not query.startswith('EXPLAIN '):
+                try:
+                    normalized_query = self._normalize_query(query)
+                except Exception as e:
+                    self._log_obfuscation_error(query, e)
+            self._query_text_cache[query_text_key] = normalized_query
+            normalized_queries[query_text_key] = normalized_query
+
+        return normalized_queries
+
     def _emit_pg_stat_statements_dealloc(self):
         if self._check.version < V14:
             return
@@ -401,8 +503,12 @@ class PostgresStatementMetrics(DBMAsyncJob):
         self._emit_pg_stat_statements_metrics()
         self._emit_pg_stat_statements_dealloc()
         rows = self._load_pg_stat_statements()
+        self._record_rows(len(rows))
 
-        rows = self._normalize_queries(rows)
+        if self._query_text_cache is not None and rows and 'query' not in rows[0].keys():
+            rows = self._normalize_queries_from_cache(rows)
+        else:
+            rows = self._normalize_queries(rows)
         if not rows:
             return []
 
@@ -415,27 +521,71 @@ class PostgresStatementMetrics(DBMAsyncJob):
             tags=self.tags + self._check._get_debug_tags(),
             hostname=self._check.resolved_hostname,
         )
+        self._submit_obfuscation_cache_stats(
+            self.tags + self._check._get_debug_tags(), hostname=self._check.resolved_hostname
+        )
         return rows
 
+    def _normalize_query(self, query):
+        statement = self._obfuscate(query, self._obfuscate_options)
+        metadata = statement['metadata']
+        return {
+            'query': statement['query'],
+            'query_signature': statement['query_signature'],
+            'dd_tables': metadata.get('tables', None),
+            'dd_commands': metadata.get('commands', None),
+        }
+
+    def _log_obfuscation_error(self, query, e):
+        if self._config.log_unobfuscated_queries:
+            self._log.warning("Failed to obfuscate query=[%s] | err=[%s]", query, e)
+        else:
+            self._log.debug("Failed to obfuscate query | err=[%s]", e)
+
     def _normalize_queries(self, rows):
         normalized_rows = []
         for row in rows:
             normalized_row = dict(copy.copy(row))
             try:
-                statement = obfuscate_sql_with_metadata(row['query'], self._obfuscate_options)
+                normalized_query = self._normalize_query(row['query'])
             except Exception as e:
-                if self._config.log_unobfuscated_queries:
-                    self._log.warning("Failed to obfuscate query=[%s] | err=[%s]", row['query'], e)
-                else:
-                    self._log.debug("Failed to obfuscate query | err=[%s]", e)
+                self._log_obfuscation_error(row['query'], e)
+                continue
+
+            normalized_row.update(normalized_query)
+            normalized_rows.append(normalized_row)
+
+        return normalized_rows
+
+    def _normalize_queries_from_cache(self, rows):
+        """
+        Add the normalized query text to rows loaded without it, only loading the text of the queries
+        missing from the query text cache.
+        """
+        query_text_keys = [_query_text_key(row) for row in rows]
+        # The queries of this run are looked up once, as loading the missing ones may evict others from the cache
+        normalized_queries = {}
+        missing_query_text_keys = set()
+        for key in query_text_keys:
+            if key in normalized_queries:
                 continue
+            normalized_query = self._query_text_cache.get(key)
+            if normalized_query is None:
+                missing_query_text_keys.add(key)
+            else:
+                normalized_queries[key] = normalized_query
+        if missing_query_text_keys:
+            normalized_queries.update(self._load_query_texts(missing_query_text_keys))
 
-            obfuscated_query = statement['query']
-            normalized_row['query'] = obfuscated_query
-            normalized_row['query_signature'] = compute_sql_signature(obfuscated_query)
-            metadata = statement['metadata']
-            normalized_row['dd_tables'] = metadata.get('tables', None)
-            normalized_row['dd_commands'] = metadata.get('commands', None)
+        normalized_rows = []
+        for row, query_text_key in zip(rows, query_text_keys):
+            normalized_query = normalized_queries.get(query_text_key)
+            # Skip the queries excluded from the metrics and the ones that were gone when loading their text
+            if not normalized_query:
+                continue
+
+            normalized_row = dict(copy.copy(row))
+            normalized_row.update(normalized_query)
             normalized_rows.append(normalized_row)
 
         return normalized_rows
@@ -10,6 +10,7 @@ import psycopg2
 import pytest
 from semver import VersionInfo
 
+from datadog_checks.base.utils.db.utils import obfuscation_cache
 from datadog_checks.dev import WaitFor, docker_run
 from datadog_checks.postgres import PostgreSql
 from datadog_checks.postgres.config import PostgresConfig
@@ -36,6 +37,12 @@ def connect_to_pg():
         psycopg2.connect(host=HOST, dbname=DB_NAME, user=USER, port=PORT_REPLICA2, password=PASSWORD)
 
 
+@pytest.fixture(autouse=True)
+def clear_obfuscation_cache():
+    # Obfuscated statements are shared across check instances, tests mocking the obfuscator must not reuse them
+    obfuscation_cache.clear()
+
+
 @pytest.fixture(scope='session')
 def dd_environment(e2e_instance):
     """
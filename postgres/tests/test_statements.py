@@ -107,6 +107,7 @@ def test_statement_metrics_version(integration_check, dbm_instance, version, exp
 @pytest.mark.parametrize("dbstrict,ignore_databases", [(True, []), (False, ['dogs']), (False, [])])
 @pytest.mark.parametrize("pg_stat_statements_view", ["pg_stat_statements", "datadog.pg_stat_statements()"])
 @pytest.mark.parametrize("track_io_timing_enabled", [True, False])
+@pytest.mark.parametrize("cache_query_text", [True, False])
 def test_statement_metrics(
     aggregator,
     integration_check,
@@ -116,6 +117,7 @@ def test_statement_metrics(
     pg_stat_statements_view,
     datadog_agent,
     track_io_timing_enabled,
+    cache_query_text,
 ):
     dbm_instance['dbstrict'] = dbstrict
     dbm_instance['ignore_databases'] = ignore_databases
@@ -123,7 +125,12 @@ def test_statement_metrics(
     # don't need samples for this test
     dbm_instance['query_samples'] = {'enabled': False}
     # very low collection interval for test purposes
-    dbm_instance['query_metrics'] = {'enabled': True, 'run_sync': True, 'collection_interval': 0.1}
+    dbm_instance['query_metrics'] = {
+        'enabled': True,
+        'run_sync': True,
+        'collection_interval': 0.1,
+        'cache_query_text': cache_query_text,
+    }
     connections = {}
 
     def _run_queries():
@@ -375,6 +382,97 @@ def test_statement_metrics_with_duplicates(aggregator, integration_check, dbm_in
     assert row['calls'] == 2
 
 
+def test_statement_metrics_query_text_cache(aggregator, integration_check, dbm_instance):
+    # don't need samples for this test
+    dbm_instance['query_samples'] = {'enabled': False}
+    # very low collection interval for test purposes
+    dbm_instance['query_metrics'] = {
+        'enabled': True,
+        'run_sync': True,
+        'collection_interval': 0.1,
+        'cache_query_text': True,
+    }
+    query = 'SELECT city FROM persons WHERE city = %s'
+    obfuscated_param = '?' if POSTGRES_VERSION.split('.')[0] == "9" else '$1'
+    expected_query = query % obfuscated_param
+
+    check = integration_check(dbm_instance)
+    check._connect()
+    statement_metrics = check.statement_metrics
+    conn = psycopg2.connect(host=HOST, dbname="datadog_test", user="bob", password="bob")
+
+    with mock.patch.object(
+        statement_metrics, '_load_query_texts', wraps=statement_metrics._load_query_texts
+    ) as load_query_texts:
+        for _ in range(3):
+            conn.cursor().execute(query, ('hello',))
+            check.check(dbm_instance)
+    conn.close()
+
+    query_text_keys = [
+        key for key, value in statement_metrics._query_text_cache.items() if value.get('query') == expected_query
+    ]
+    assert len(query_text_keys) == 1
+    # The text of the query is only loaded the first time it is seen
+    loaded_query_text_keys = [call[0][0] for call in load_query_texts.call_args_list]
+    assert query_text_keys[0] in loaded_query_text_keys[0]
+    assert not any(query_text_keys[0] in keys for keys in loaded_query_text_keys[1:])
+
+    event = aggregator.get_event_platform_events("dbm-metrics")[-1]
+    matching = [r for r in event['postgres_rows'] if r['query'] == expected_query]
+    assert len(matching) == 1
+    assert matching[0]['calls'] == 1
+    assert matching[0]['query_signature'] == compute_sql_signature(expected_query)
+
+
+def test_statement_metrics_query_text_cache_evictions(aggregator, integration_check, dbm_instance):
+    dbm_instance['query_samples'] = {'enabled': False}
+    # A single run has more distinct queries than the cache can hold
+    dbm_instance['query_metrics'] = {
+        'enabled': True,
+        'run_sync': True,
+        'collection_interval': 0.1,
+        'cache_query_text': True,
+        'query_text_cache_max_size': 1,
+    }
+    queries = ['SELECT city FROM persons WHERE city = %s', 'SELECT lastname FROM persons WHERE city = %s']
+    obfuscated_param = '?' if POSTGRES_VERSION.split('.')[0] == "9" else '$1'
+
+    check = integration_check(dbm_instance)
+    check._connect()
+    conn = psycopg2.connect(host=HOST, dbname="datadog_test", user="bob", password="bob")
+    for _ in range(2):
+        for query in queries:
+            conn.cursor().execute(query, ('hello',))
+        check.check(dbm_instance)
+    conn.close()
+
+    assert len(check.statement_metrics._query_text_cache) == 1
+    # Rows are not dropped when the text of their query was evicted during the same run
+    event = aggregator.get_event_platform_events("dbm-metrics")[-1]
+    for query in queries:
+        matching = [r for r in event['postgres_rows'] if r['query'] == query % obfuscated_param]
+        assert len(matching) == 1
+        assert matching[0]['calls'] == 1
+
+
+def test_statement_metrics_query_text_cache_default_size(integration_check, dbm_instance):
+    dbm_instance['query_samples'] = {'enabled': False}
+    dbm_instance['query_metrics'] = {
+        'enabled': True,
+        'run_sync': True,
+        'collection_interval': 0.1,
+        'cache_query_text': True,
+    }
+    check = integration_check(dbm_instance)
+    check._connect()
+    check.check(dbm_instance)
+
+    # The cache holds at least the text of every query tracked by pg_stat_statements
+    pg_stat_statements_max = int(check.pg_settings['pg_stat_statements.max'])
+    assert check.statement_metrics._query_text_cache.maxsize >= max(pg_stat_statements_max, 10000)
+
+
 @pytest.fixture
 def bob_conn():
     conn = psycopg2.connect(host=HOST, dbname=DB_NAME, user="bob", password="bob")
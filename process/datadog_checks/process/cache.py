@@ -1,6 +1,9 @@
 # (C) Datadog, Inc. 2020-present
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
+import os
+import re
+import threading
 import time
 
 import psutil
@@ -9,11 +12,145 @@ from .lock import ReadWriteLock
 
 DEFAULT_SHARED_PROCESS_LIST_CACHE_DURATION = 120
 
+# Backreferences and global flags change meaning, or become invalid, once patterns are combined into one
+UNCOMBINABLE_PATTERN = re.compile(r'\\[1-9]|\(\?P=|^\(\?[a-zA-Z]+\)')
+
+
+class ProcessIndex(object):
+    """
+    Names and command lines of the processes of a process list, each read at most once and matched
+    against the search strings of all the instances sharing the process list.
+
+    The pids matching each search string are kept until the process list is refreshed. The regular
+    expressions searched in the previous process list are combined into a single one, which leaves
+    out the command lines that none of them can match.
+    """
+
+    def __init__(self, processes, patterns=()):
+        self.processes = processes
+        self.lock = threading.Lock()
+
+        # Attribute -> (value by pid, process and error by pid of the processes we were denied access to)
+        self.attributes = {}
+        self.pids_by_name = None
+        self.sorted_names = None
+        self.matches = {}
+
+        self.patterns = set(patterns)
+        self.searched_patterns = set()
+        self.candidates = None
+
+    def search(self, search_string, exact_match, skip_pids=()):
+        """
+        Return the pids of the processes matching any of the search strings, the errors raised by the
+        processes we were denied access to, by pid, and the value read for the others, by pid.
+
+        Processes we were denied access to are tried again on every search, except those in `skip_pids`.
+        """
+        with self.lock:
+            values, errors = self.read('name' if exact_match else 'cmdline', skip_pids)
+            matching_pids = set()
+            for string in search_string:
+                matching_pids.update(self.match(string, exact_match))
+
+            # The values are updated by the searches of other threads once the lock is released
+            return matching_pids, errors, dict(values)
+
+    def names(self):
+        with self.lock:
+            if self.sorted_names is None:
+                self.sorted_names = sorted(self.read('name', retry=False)[0].values())
+
+            return self.sorted_names
+
+    def read(self, attribute, skip_pids=(), retry=True):
+        if attribute in self.attributes:
+            values, denied = self.attributes[attribute]
+            processes = [proc for pid, (proc, _) in denied.items() if pid not in skip_pids] if retry else []
+        else:
+            values, denied = self.attributes[attribute] = {}, {}
+            processes = self.processes
+
+        for proc in processes:
+            try:
+                if attribute == 'name':
+                    # The name was retrieved along with the process list, unless access was denied
+                    value = getattr(proc, 'info', {}).get('name') or proc.name()
+                else:
+                    value = ' '.join(proc.cmdline())
+            except psutil.NoSuchProcess:
+                # As the process list isn't necessarily scanned right after it's created, there can be
+                # cases where processes in the list are dead by the time they are scanned.
+                denied.pop(proc.pid, None)
+            except psutil.AccessDenied as e:
+                denied[proc.pid] = (proc, e)
+            else:
+                values[proc.pid] = value.lower() if os.name == 'nt' else value
+                if denied.pop(proc.pid, None) is not None:
+                    # Access is granted now, the pids matching each search string must be computed again
+                    self.matches.clear()
+                    self.pids_by_name = None
+                    self.sorted_names = None
+                    self.candidates = None
+
+        return values, {pid: error for pid, (_, error) in denied.items() if pid not in skip_pids}
+
+    def match(self, string, exact_match):
+        key = (string, exact_match)
+        if key in self.matches:
+            return self.matches[key]
+
+        # FIXME 8.x: All has been deprecated from the doc, should be removed
+        if string == 'All':
+            pids = set(self.read('name' if exact_match else 'cmdline', retry=False)[0])
+        elif exact_match:
+            pids = self.get_pids_by_name().get(string.lower() if os.name == 'nt' else string, set())
+        else:
+            pattern = string.lower() if os.name == 'nt' else string
+            regex = re.compile(pattern)
+            pids = {pid for pid, cmdline in self.get_candidates(pattern) if regex.search(cmdline)}
+
+        self.matches[key] = pids
+        return pids
+
+    def get_pids_by_name(self):
+        if self.pids_by_name is None:
+            self.pids_by_name = {}
+            for pid, name in self.read('name', retry=False)[0].items():
+                self.pids_by_name.setdefault(name, set()).add(pid)
+
+        return self.pids_by_name
+
+    def get_candidates(self, pattern):
+        """
+        Return the pids and command lines of the processes that the pattern can match.
+        """
+        self.searched_patterns.add(pattern)
+        cmdlines = self.read('cmdline', retry=False)[0]
+
+        if self.candidates is None:
+            self.candidates = {}
+            combinable_patterns = sorted(p for p in self.patterns if not UNCOMBINABLE_PATTERN.search(p))
+            try:
+                combined_regex = re.compile('|'.join('(?:{})'.format(p) for p in combinable_patterns))
+            except re.error:
+                combinable_patterns = []
+            else:
+                self.candidates = {pid: cmdline for pid, cmdline in cmdlines.items() if combined_regex.search(cmdline)}
+
+            self.patterns = set(combinable_patterns)
+
+        if pattern in self.patterns:
+            return self.candidates.items()
+
+        return cmdlines.items()
+
 
 class ProcessListCache(object):
     """Process list to be shared among all instances."""
 
     elements = []
+    index = ProcessIndex([])
     lock = ReadWriteLock()
     last_ts = 0
     cache_duration = DEFAULT_SHARED_PROCESS_LIST_CACHE_DURATION
@@ -38,6 +175,7 @@ class ProcessListCache(object):
         with self.write_lock():
             if self._should_refresh():
                 self.elements = list(psutil.process_iter(attrs=['pid', 'name']))
+                self.index = ProcessIndex(self.elements, self.index.searched_patterns)
                 self.last_ts = time.time()
                 return True
             else:
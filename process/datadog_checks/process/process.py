@@ -3,8 +3,6 @@
 # Licensed under a 3-clause BSD style license (see LICENSE)
 from __future__ import division
 
-import os
-import re
 import subprocess
 import time
 from collections import defaultdict
@@ -16,6 +14,7 @@ from datadog_checks.base import AgentCheck, is_affirmative
 from datadog_checks.base.utils.platform import Platform
 
 from .cache import DEFAULT_SHARED_PROCESS_LIST_CACHE_DURATION, ProcessListCache
+from .procfs import ProcfsCollector
 
 try:
     import datadog_agent
@@ -109,6 +108,9 @@ class ProcessCheck(AgentCheck):
         # Process cache, indexed by instance
         self.process_cache = defaultdict(dict)
 
+        # On Linux, read the state of processes straight from procfs rather than through psutil
+        self._procfs_collector = ProcfsCollector() if Platform.is_linux() else None
+
         self.process_list_cache.cache_duration = int(
             init_config.get('shared_process_list_cache_duration', DEFAULT_SHARED_PROCESS_LIST_CACHE_DURATION)
         )
@@ -135,8 +137,6 @@ class ProcessCheck(AgentCheck):
 
         refresh_ad_cache = self.should_refresh_ad_cache(name)
 
-        matching_pids = set()
-
         self.log.debug("Refreshing process list")
 
         # If refresh returns True, then the cache has been refreshed.
@@ -147,65 +147,34 @@ class ProcessCheck(AgentCheck):
             self.log.debug("Using process list cache")
 
         with self.process_list_cache.read_lock():
-            for proc in self.process_list_cache.elements:
-                # Skip access denied processes
-                if not refresh_ad_cache and proc.pid in self.ad_cache:
-                    continue
-
-                found = False
-                for string in search_string:
-                    try:
-                        # FIXME 8.x: All has been deprecated
-                        # from the doc, should be removed
-                        if string == 'All':
-                            found = True
-                        if exact_match:
-                            if os.name == 'nt':
-                                if proc.name().lower() == string.lower():
-                                    found = True
-                            else:
-                                if proc.name() == string:
-                                    found = True
-
-                        else:
-                            cmdline = proc.cmdline()
-                            if os.name == 'nt':
-                                lstring = string.lower()
-                                if re.search(lstring, ' '.join(cmdline).lower()):
-                                    found = True
-                            else:
-                                if re.search(string, ' '.join(cmdline)):
-                                    found = True
-                    except psutil.NoSuchProcess:
-                        # As the process list isn't necessarily scanned right after it's created
-                        # (since we're using a shared cache), there can be cases where processes
-                        # in the list are dead when an instance of the check tries to scan them.
-                        self.log.debug('Process disappeared while scanning')
-                    except psutil.AccessDenied as e:
-                        ad_error_logger('Access denied to process with PID {}'.format(proc.pid))
-                        ad_error_logger('Error: {}'.format(e))
-                        if refresh_ad_cache:
-                            self.ad_cache.add(proc.pid)
-                        if not ignore_ad:
-                            raise
-                    else:
-                        if refresh_ad_cache:
-                            self.ad_cache.discard(proc.pid)
-                        if found:
-                            matching_pids.add(proc.pid)
-                            break
+            # The names and command lines of the processes, and the pids matching each search string,
+            # are shared by all the instances until the process list is refreshed.
+            # Skip access denied processes
+            skip_pids = () if refresh_ad_cache else self.ad_cache
+            matching_pids, errors, readable_processes = self.process_list_cache.index.search(
+                search_string, exact_match, skip_pids
+            )
+
+            for pid, error in iteritems(errors):
+                ad_error_logger('Access denied to process with PID {}'.format(pid))
+                ad_error_logger('Error: {}'.format(error))
+                if refresh_ad_cache:
+                    self.ad_cache.add(pid)
+                if not ignore_ad:
+                    raise error
+
+            if refresh_ad_cache:
+                self.ad_cache.difference_update(readable_processes)
+            else:
+                matching_pids.difference_update(self.ad_cache)
 
             if not matching_pids:
                 # Allow debug logging while preserving warning check state.
-                # Uncaught psutil exceptions trigger an Error state
-                try:
-                    processes = sorted(proc.name() for proc in self.process_list_cache.elements)
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    pass
-                else:
-                    self.log.debug(
-                        "Unable to find process named %s among processes: %s", search_string, ', '.join(processes)
-                    )
+                self.log.debug(
+                    "Unable to find process named %s among processes: %s",
+                    search_string,
+                    ', '.join(self.process_list_cache.index.names()),
+                )
 
         self.pid_cache[name] = matching_pids
         self.last_pid_cache_ts[name] = time.time()
@@ -236,13 +205,7 @@ class ProcessCheck(AgentCheck):
 
         # Try running `num_fds` with sudo if possible
         if method == 'num_fds' and self.try_sudo:
-            self.log.debug("Running num_fds using sudo")
-            try:
-                ls_args = ['sudo', 'ls', '/proc/{}/fd/'.format(process.pid)]
-                process_ls = subprocess.check_output(ls_args)
-                result = len(process_ls.splitlines())
-            except Exception as e:
-                self.log.exception("Trying to retrieve %s with sudo failed with error: %s", method, e)
+            result = self.num_fds_with_sudo(process.pid)
 
         else:
             try:
@@ -264,6 +227,15 @@ class ProcessCheck(AgentCheck):
 
         return result
 
+    def num_fds_with_sudo(self, pid):
+        self.log.debug("Running num_fds using sudo")
+        try:
+            ls_args = ['sudo', 'ls', '/proc/{}/fd/'.format(pid)]
+            process_ls = subprocess.check_output(ls_args)
+            return len(process_ls.splitlines())
+        except Exception as e:
+            self.log.exception("Trying to retrieve %s with sudo failed with error: %s", 'num_fds', e)
+
     def get_process_state(self, name, pids):
         st = defaultdict(list)
 
@@ -273,85 +245,116 @@ class ProcessCheck(AgentCheck):
         for pid in pids_to_remove:
             del self.process_cache[name][pid]
 
+        if self._procfs_collector is not None:
+            self._procfs_collector.start(psutil.PROCFS_PATH, pids)
+
+        cpu_count = psutil.cpu_count()
         for pid in pids:
             st['pids'].append(pid)
 
-            new_process = False
-            # If the pid's process is not cached, retrieve it
-            if pid not in self.process_cache[name] or not self.process_cache[name][pid].is_running():
-                new_process = True
-                try:
-                    self.process_cache[name][pid] = psutil.Process(pid)
-                    self.log.debug('New process in cache: %s', pid)
-                # Skip processes dead in the meantime
-                except psutil.NoSuchProcess:
-                    self.log.debug('Process %s disappeared while scanning', pid)
-                    # reset the process caches now, something changed
-                    self.last_pid_cache_ts[name] = 0
-                    self.process_list_cache.reset()
-                    continue
-
-            p = self.process_cache[name][pid]
-
-            meminfo = self.psutil_wrapper(p, 'memory_info', ['rss', 'vms'])
-            st['rss'].append(meminfo.get('rss'))
-            st['vms'].append(meminfo.get('vms'))
-
-            mem_percent = self.psutil_wrapper(p, 'memory_percent')
-            st['mem_pct'].append(mem_percent)
-
-            # will fail on win32 and solaris
-            shared_mem = self.psutil_wrapper(p, 'memory_info', ['shared']).get('shared')
+            if self._procfs_collector is not None:
+                process_state = self.get_procfs_process_state(name, pid)
+            else:
+                process_state = self.get_psutil_process_state(name, pid)
+
+            if process_state is None:
+                # reset the process caches now, something changed
+                self.last_pid_cache_ts[name] = 0
+                self.process_list_cache.reset()
+                continue
+
+            cpu_percent = process_state.get('cpu')
+            if cpu_percent is not None:
+                if cpu_count > 0:
+                    process_state['cpu_norm'] = cpu_percent / cpu_count
+                else:
+                    self.log.debug('could not calculate the normalized cpu pct, cpu_count: %s', cpu_count)
+
+            for attr, value in iteritems(process_state):
+                st[attr].append(value)
+
+        return st
+
+    def get_procfs_process_state(self, name, pid):
+        """
+        Read the state of a process from procfs, falling back to psutil when procfs can't be parsed or read.
+        """
+        try:
+            process_state = self._procfs_collector.collect(pid)
+        except psutil.NoSuchProcess:
+            self.log.debug('Process %s disappeared while scanning', pid)
+            return None
+        except (psutil.Error, ValueError, IndexError) as e:
+            self.log.debug('Unable to read the state of process %s from procfs, using psutil instead: %s', pid, e)
+            return self.get_psutil_process_state(name, pid)
+
+        if process_state['open_fd'] is None and self.try_sudo:
+            process_state['open_fd'] = self.num_fds_with_sudo(pid)
+
+        return process_state
+
+    def get_psutil_process_state(self, name, pid):
+        new_process = False
+        # If the pid's process is not cached, retrieve it
+        if pid not in self.process_cache[name] or not self.process_cache[name][pid].is_running():
+            new_process = True
+            try:
+                self.process_cache[name][pid] = psutil.Process(pid)
+                self.log.debug('New process in cache: %s', pid)
+            # Skip processes dead in the meantime
+            except psutil.NoSuchProcess:
+                self.log.debug('Process %s disappeared while scanning', pid)
+                return None
+
+        p = self.process_cache[name][pid]
+        st = {}
+
+        # Retrieve the values read from the same files only once
+        with p.oneshot():
+            # shared will fail on win32 and solaris
+            meminfo = self.psutil_wrapper(p, 'memory_info', ['rss', 'vms', 'shared'])
+            st['rss'] = meminfo.get('rss')
+            st['vms'] = meminfo.get('vms')
+
+            st['mem_pct'] = self.psutil_wrapper(p, 'memory_percent')
+
+            shared_mem = meminfo.get('shared')
             if shared_mem is not None and meminfo.get('rss') is not None:
-                st['real'].append(meminfo['rss'] - shared_mem)
+                st['real'] = meminfo['rss'] - shared_mem
             else:
-                st['real'].append(None)
+                st['real'] = None
 
             ctxinfo = self.psutil_wrapper(p, 'num_ctx_switches', ['voluntary', 'involuntary'])
-            st['ctx_swtch_vol'].append(ctxinfo.get('voluntary'))
-            st['ctx_swtch_invol'].append(ctxinfo.get('involuntary'))
+            st['ctx_swtch_vol'] = ctxinfo.get('voluntary')
+            st['ctx_swtch_invol'] = ctxinfo.get('involuntary')
 
-            st['thr'].append(self.psutil_wrapper(p, 'num_threads'))
+            st['thr'] = self.psutil_wrapper(p, 'num_threads')
 
             cpu_percent = self.psutil_wrapper(p, 'cpu_percent')
-            cpu_count = psutil.cpu_count()
             if not new_process:
                 # psutil returns `0.` for `cpu_percent` the
                 # first time it's sampled on a process,
                 # so save the value only on non-new processes
-                st['cpu'].append(cpu_percent)
-                if cpu_count > 0 and cpu_percent is not None:
-                    st['cpu_norm'].append(cpu_percent / cpu_count)
-                else:
-                    self.log.debug('could not calculate the normalized cpu pct, cpu_count: %s', cpu_count)
-            st['open_fd'].append(self.psutil_wrapper(p, 'num_fds'))
-            st['open_handle'].append(self.psutil_wrapper(p, 'num_handles'))
+                st['cpu'] = cpu_percent
+            st['open_fd'] = self.psutil_wrapper(p, 'num_fds')
+            st['open_handle'] = self.psutil_wrapper(p, 'num_handles')
 
             ioinfo = self.psutil_wrapper(p, 'io_counters', ['read_count', 'write_count', 'read_bytes', 'write_bytes'])
-            st['r_count'].append(ioinfo.get('read_count'))
-            st['w_count'].append(ioinfo.get('write_count'))
-            st['r_bytes'].append(ioinfo.get('read_bytes'))
-            st['w_bytes'].append(ioinfo.get('write_bytes'))
+            st['r_count'] = ioinfo.get('read_count')
+            st['w_count'] = ioinfo.get('write_count')
+            st['r_bytes'] = ioinfo.get('read_bytes')
+            st['w_bytes'] = ioinfo.get('write_bytes')
 
             pagefault_stats = self.get_pagefault_stats(pid)
             if pagefault_stats is not None:
-                (minflt, cminflt, majflt, cmajflt) = pagefault_stats
-                st['minflt'].append(minflt)
-                st['cminflt'].append(cminflt)
-                st['majflt'].append(majflt)
-                st['cmajflt'].append(cmajflt)
+                (st['minflt'], st['cminflt'], st['majflt'], st['cmajflt']) = pagefault_stats
             else:
-                st['minflt'].append(None)
-                st['cminflt'].append(None)
-                st['majflt'].append(None)
-                st['cmajflt'].append(None)
+                st['minflt'] = st['cminflt'] = st['majflt'] = st['cmajflt'] = None
 
             # calculate process run time
             create_time = self.psutil_wrapper(p, 'create_time')
             if create_time is not None:
-                now = time.time()
-                run_time = now - create_time
-                st['run_time'].append(run_time)
+                st['run_time'] = time.time() - create_time
 
         return st
 
@@ -370,7 +373,8 @@ class ProcessCheck(AgentCheck):
         except Exception:
             self.log.debug('error getting proc stats: file_to_string failed for /%s/%s/stat', psutil.PROCFS_PATH, pid)
             return None
-        return (int(i) for i in data.split()[9:13])
+        # The process name is the only field that can contain spaces, skip it
+        return (int(i) for i in data[data.rindex(')') + 2 :].split()[7:11])
 
     def _get_child_processes(self, pids):
         children_pids = set()
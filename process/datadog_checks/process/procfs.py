@@ -0,0 +1,236 @@
+# (C) Datadog, Inc. 2023-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+"""
+Collect the state of processes directly from procfs on Linux.
+
+The state of a process is read from its `stat`, `statm`, `status` and `io` files, each of them being read once
+with a single system call into a buffer reused across processes, instead of going through the many `psutil`
+calls that each read and parse some of those files again.
+
+http://man7.org/linux/man-pages/man5/proc.5.html
+"""
+import errno
+import io
+import os
+import time
+
+import psutil
+
+# Size of the buffer the procfs files are read into, it's grown whenever a file doesn't fit
+DEFAULT_BUFFER_SIZE = 4096
+
+# Indexes of the fields of `/proc/<pid>/stat` following the process name, which is the only field
+# that can contain spaces and is wrapped in parentheses
+STAT_MINFLT = 7
+STAT_CMINFLT = 8
+STAT_MAJFLT = 9
+STAT_CMAJFLT = 10
+STAT_UTIME = 11
+STAT_STIME = 12
+STAT_NUM_THREADS = 17
+STAT_STARTTIME = 19
+
+STATUS_VOLUNTARY_CTX_SWITCHES = b'voluntary_ctxt_switches:'
+STATUS_INVOLUNTARY_CTX_SWITCHES = b'nonvoluntary_ctxt_switches:'
+
+IO_COUNTERS = {
+    b'syscr:': 'r_count',
+    b'syscw:': 'w_count',
+    b'read_bytes:': 'r_bytes',
+    b'write_bytes:': 'w_bytes',
+}
+
+NO_SUCH_PROCESS_ERRNOS = (errno.ENOENT, errno.ESRCH)
+ACCESS_DENIED_ERRNOS = (errno.EACCES, errno.EPERM)
+
+
+class ProcfsReadError(psutil.Error):
+    """
+    A procfs file couldn't be read for another reason than the process being gone or not accessible.
+    """
+
+    def __init__(self, pid, msg):
+        super(ProcfsReadError, self).__init__()
+        self.pid = pid
+        self.msg = msg
+
+    def __str__(self):
+        return self.msg
+
+
+class ProcfsCollector(object):
+    """
+    Read the state of processes from procfs, as a dictionary of the same attributes collected with `psutil`.
+
+    `start` must be called once per check run, before collecting the state of the matching processes. It reads
+    the system-wide values shared by all processes and forgets the CPU times of processes that are gone.
+    """
+
+    def __init__(self):
+        self.procfs_path = None
+        self.total_memory = None
+        self.buffer = bytearray(DEFAULT_BUFFER_SIZE)
+        self.page_size = os.sysconf('SC_PAGE_SIZE')
+        self.clock_ticks = float(os.sysconf('SC_CLK_TCK'))
+
+        # The boot time and whether the size of fd directories is their number of entries, by procfs path
+        self.boot_times = {}
+        self.fd_count_from_size = {}
+
+        # The start time, CPU time and timestamp of the last sample of each process, to compute CPU percentages
+        self.cpu_samples = {}
+
+    def start(self, procfs_path, pids):
+        self.procfs_path = procfs_path.rstrip('/')
+        self.total_memory = self.read_total_memory()
+
+        for pid in list(self.cpu_samples):
+            if pid not in pids:
+                del self.cpu_samples[pid]
+
+        if self.procfs_path not in self.boot_times:
+            self.boot_times[self.procfs_path] = self.read_boot_time()
+            self.fd_count_from_size[self.procfs_path] = self.probe_fd_count_from_size()
+
+    def read(self, path, pid=None):
+        """
+        Read a whole procfs file, raising `psutil.NoSuchProcess` and `psutil.AccessDenied` like `psutil` does,
+        or `ProcfsReadError` for any other error.
+        """
+        try:
+            with io.FileIO(path) as f:
+                size = f.readinto(self.buffer)
+                if size < len(self.buffer):
+                    return bytes(self.buffer[:size])
+
+                data = bytes(self.buffer) + f.read()
+        except (IOError, OSError) as e:
+            raise translate_error(e, path, pid)
+
+        self.buffer = bytearray(len(data) * 2)
+        return data
+
+    def read_total_memory(self):
+        try:
+            data = self.read('{}/meminfo'.format(self.procfs_path))
+        except Exception:
+            return None
+
+        for line in data.splitlines():
+            if line.startswith(b'MemTotal:'):
+                return int(line.split()[1]) * 1024
+
+    def read_boot_time(self):
+        try:
+            data = self.read('{}/stat'.format(self.procfs_path))
+        except Exception:
+            return None
+
+        for line in data.splitlines():
+            if line.startswith(b'btime'):
+                return float(line.split()[1])
+
+    def probe_fd_count_from_size(self):
+        # Since Linux 6.2 the size of `/proc/<pid>/fd` is the number of open file descriptors, which spares
+        # listing them. Make sure we are looking at the real procfs, and not a copy of it, before relying on it.
+        self_path = '{}/self'.format(self.procfs_path)
+        try:
+            return os.path.islink(self_path) and os.stat('{}/fd'.format(self_path)).st_size > 0
+        except OSError:
+            return False
+
+    def count_fds(self, pid):
+        path = '{}/{}/fd'.format(self.procfs_path, pid)
+        try:
+            if self.fd_count_from_size.get(self.procfs_path):
+                return os.stat(path).st_size
+            return len(os.listdir(path))
+        except (IOError, OSError) as e:
+            raise translate_error(e, path, pid)
+
+    def collect(self, pid):
+        """
+        Return the state of a process, raising `psutil.NoSuchProcess` if it's gone. Values that are not
+        readable by the Agent, such as the I/O counters and fds of processes owned by other users, are `None`.
+        """
+        base_path = '{}/{}/'.format(self.procfs_path, pid)
+        stat = self.read(base_path + 'stat', pid)
+        statm = self.read(base_path + 'statm', pid)
+        status = self.read(base_path + 'status', pid)
+        now = time.time()
+        state = {}
+
+        fields = stat[stat.rindex(b')') + 2 :].split()
+        state['thr'] = int(fields[STAT_NUM_THREADS])
+        state['minflt'] = int(fields[STAT_MINFLT])
+        state['cminflt'] = int(fields[STAT_CMINFLT])
+        state['majflt'] = int(fields[STAT_MAJFLT])
+        state['cmajflt'] = int(fields[STAT_CMAJFLT])
+
+        start_time = int(fields[STAT_STARTTIME])
+        cpu_time = (int(fields[STAT_UTIME]) + int(fields[STAT_STIME])) / self.clock_ticks
+        state['cpu'] = self.cpu_percent(pid, start_time, cpu_time, now)
+
+        boot_time = self.boot_times.get(self.procfs_path)
+        state['run_time'] = None if boot_time is None else now - (boot_time + start_time / self.clock_ticks)
+
+        vms, rss, shared = statm.split()[:3]
+        state['vms'] = int(vms) * self.page_size
+        state['rss'] = int(rss) * self.page_size
+        state['real'] = state['rss'] - int(shared) * self.page_size
+        state['mem_pct'] = None if not self.total_memory else state['rss'] * 100.0 / self.total_memory
+
+        state['ctx_swtch_vol'] = None
+        state['ctx_swtch_invol'] = None
+        for line in status.splitlines():
+            if line.startswith(STATUS_VOLUNTARY_CTX_SWITCHES):
+                state['ctx_swtch_vol'] = int(line.split()[1])
+            elif line.startswith(STATUS_INVOLUNTARY_CTX_SWITCHES):
+                state['ctx_swtch_invol'] = int(line.split()[1])
+
+        for attr in IO_COUNTERS.values():
+            state[attr] = None
+        try:
+            io_counters = self.read(base_path + 'io', pid)
+        except psutil.Error:
+            pass
+        else:
+            for line in io_counters.splitlines():
+                name, _, value = line.partition(b' ')
+                attr = IO_COUNTERS.get(name)
+                if attr is not None:
+                    state[attr] = int(value)
+
+        try:
+            state['open_fd'] = self.count_fds(pid)
+        except psutil.Error:
+            state['open_fd'] = None
+
+        return state
+
+    def cpu_percent(self, pid, start_time, cpu_time, now):
+        """
+        Compute the CPU usage of a process since its previous sample, like `psutil.Process.cpu_percent` does.
+
+        There is no value for the first sample of a process, or when its PID was reused by another process.
+        """
+        previous_sample = self.cpu_samples.get(pid)
+        self.cpu_samples[pid] = (start_time, cpu_time, now)
+        if previous_sample is None or previous_sample[0] != start_time:
+            return None
+
+        _, previous_cpu_time, previous_now = previous_sample
+        elapsed = now - previous_now
+        if elapsed <= 0:
+            return 0.0
+
+        return round((cpu_time - previous_cpu_time) / elapsed * 100, 1)
+
+
+def translate_error(error, path, pid=None):
+    if error.errno in NO_SUCH_PROCESS_ERRNOS:
+        return psutil.NoSuchProcess(pid, msg='{} does not exist'.format(path))
+    elif error.errno in ACCESS_DENIED_ERRNOS:
+        return psutil.AccessDenied(pid, msg='unable to read {}'.format(path))
+    return ProcfsReadError(pid, 'unable to read {}: {}'.format(path, error))
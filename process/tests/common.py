@@ -1,6 +1,8 @@
 # (C) Datadog, Inc. 2018-present
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
+import os
+
 from datadog_checks.dev import get_here
 
 HERE = get_here()
@@ -124,3 +126,78 @@ def get_config_stubs():
             'mocked_processes': {1},
         },
     ]
+
+
+PROCFS_BOOT_TIME = 1448632481
+PROCFS_PAGE_SIZE = os.sysconf('SC_PAGE_SIZE') if hasattr(os, 'sysconf') else 4096
+PROCFS_MEMINFO = (
+    'MemTotal:       16384000 kB\n'
+    'MemFree:         8192000 kB\n'
+    'MemAvailable:   12288000 kB\n'
+    'Buffers:          102400 kB\n'
+    'Cached:          2048000 kB\n'
+    'SwapCached:            0 kB\n'
+    'Active:          4096000 kB\n'
+    'Inactive:        2048000 kB\n'
+    'Shmem:            102400 kB\n'
+    'SReclaimable:     204800 kB\n'
+    'Slab:             409600 kB\n'
+    'SwapTotal:             0 kB\n'
+    'SwapFree:              0 kB\n'
+)
+
+
+def procfs_process(pid, name='worker', threads=4, utime=100, stime=50, start_time=1000, fds=3):
+    """
+    The files of a process in a synthetic procfs tree, with values derived from its pid.
+    """
+    stat_fields = ['S', '1', str(pid), str(pid), '0', '-1', '4194560']
+    stat_fields += [str(pid * 10), str(pid * 20), str(pid * 3), str(pid * 4), str(utime), str(stime), '0', '0']
+    stat_fields += ['20', '0', str(threads), '0', str(start_time), str(pid * 8192), str(pid * 2)]
+    stat_fields += ['0'] * (50 - len(stat_fields))
+
+    return {
+        'stat': '{} ({}) {}\n'.format(pid, name, ' '.join(stat_fields)),
+        'statm': '{} {} {} 77 0 2242 0\n'.format(pid * 2, pid, pid // 2),
+        'status': (
+            'Name:\t{}\n'
+            'State:\tS (sleeping)\n'
+            'Pid:\t{}\n'
+            'Uid:\t0\t0\t0\t0\n'
+            'Gid:\t0\t0\t0\t0\n'
+            'Threads:\t{}\n'
+            'voluntary_ctxt_switches:\t{}\n'
+            'nonvoluntary_ctxt_switches:\t{}\n'
+        ).format(name[:15], pid, threads, pid * 5, pid * 6),
+        'io': (
+            'rchar: {}\n'
+            'wchar: {}\n'
+            'syscr: {}\n'
+            'syscw: {}\n'
+            'read_bytes: {}\n'
+            'write_bytes: {}\n'
+            'cancelled_write_bytes: 0\n'
+        ).format(pid * 100, pid * 200, pid * 7, pid * 8, pid * 4096, pid * 8192),
+        'fd': {str(fd): '' for fd in range(fds)},
+    }
+
+
+def write_procfs(root, processes):
+    """
+    Write a synthetic procfs tree, `processes` mapping pids to the files returned by `procfs_process`.
+    """
+
+    def write(path, files):
+        for name, content in files.items():
+            file_path = os.path.join(path, name)
+            if isinstance(content, dict):
+                os.mkdir(file_path)
+                write(file_path, content)
+            else:
+                with open(file_path, 'w') as f:
+                    f.write(content)
+
+    files = {str(pid): process_files for pid, process_files in processes.items()}
+    files['stat'] = 'cpu  13034 0 18596 380856797 2013 2 2962 0 0 0\nbtime {}\n'.format(PROCFS_BOOT_TIME)
+    files['meminfo'] = PROCFS_MEMINFO
+    write(root, files)
@@ -0,0 +1,75 @@
+# (C) Datadog, Inc. 2023-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+import psutil
+import pytest
+from mock import patch
+
+from datadog_checks.base.utils.platform import Platform
+from datadog_checks.process import ProcessCheck
+
+from . import common
+
+requires_linux = pytest.mark.skipif(not Platform.is_linux(), reason='procfs is only available on Linux')
+
+PIDS = set(range(1000, 3000))
+
+
+class BenchProcess(object):
+    def __init__(self, pid):
+        self.pid = pid
+        self.info = {'pid': pid, 'name': 'worker' if pid % 10 == 0 else 'daemon'}
+
+    def name(self):
+        return self.info['name']
+
+    def cmdline(self):
+        # One process out of ten is a worker of one of the queues monitored by the instances
+        if self.pid % 10 == 0:
+            return ['/usr/bin/worker', '--queue', 'queue{}'.format(self.pid % 50), '--id', str(self.pid)]
+        return ['/usr/sbin/daemon', '--config', '/etc/daemon/{}.conf'.format(self.pid)]
+
+
+@pytest.fixture(scope='module')
+def procfs(tmp_path_factory):
+    root = str(tmp_path_factory.mktemp('procfs'))
+    common.write_procfs(root, {pid: common.procfs_process(pid) for pid in PIDS})
+    yield root
+
+
+@requires_linux
+@pytest.mark.parametrize('use_procfs', [True, False], ids=['procfs', 'psutil'])
+def test_get_process_state(benchmark, procfs, use_procfs):
+    check = ProcessCheck(common.CHECK_NAME, {}, [{'name': 'workers', 'pid': 1000}])
+    if not use_procfs:
+        check._procfs_collector = None
+
+    with patch.object(psutil, 'PROCFS_PATH', procfs):
+        # Warm up the process cache, like every check run following the first one
+        check.get_process_state('workers', PIDS)
+        state = benchmark(check.get_process_state, 'workers', PIDS)
+
+    assert len(state['rss']) == len(PIDS)
+
+
+@pytest.mark.parametrize('instances', [1, 10, 80])
+def test_find_pids(benchmark, instances):
+    processes = [BenchProcess(pid) for pid in PIDS]
+    checks = []
+    for i in range(instances):
+        instance = {'name': 'queue{}'.format(i), 'search_string': ['--queue queue{} '.format(i)], 'exact_match': False}
+        checks.append(ProcessCheck(common.CHECK_NAME, {}, [instance]))
+
+    def find_pids():
+        # Every instance looks for its processes in a new process list
+        ProcessCheck.process_list_cache.reset()
+        for check in checks:
+            check.last_pid_cache_ts = {}
+            check.find_pids(check.name, check.search_string, check.exact_match)
+
+    with patch('psutil.process_iter', return_value=processes):
+        find_pids()
+        benchmark(find_pids)
+
+    ProcessCheck.process_list_cache.reset()
+    assert len(checks[0].pid_cache[checks[0].name]) == len(PIDS) // 50
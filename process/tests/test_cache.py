@@ -0,0 +1,151 @@
+# (C) Datadog, Inc. 2023-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+import psutil
+import pytest
+from mock import patch
+
+from datadog_checks.process import ProcessCheck
+from datadog_checks.process.cache import ProcessIndex, ProcessListCache
+
+from . import common
+
+pytestmark = pytest.mark.unit
+
+
+@pytest.fixture(autouse=True)
+def reset_process_list_cache():
+    ProcessCheck.process_list_cache.reset()
+    yield
+    ProcessCheck.process_list_cache.reset()
+
+
+class IndexedMockProcess(object):
+    def __init__(self, pid, name, cmdline, denied=False):
+        self.pid = pid
+        self.info = {'pid': pid, 'name': None if denied else name}
+        self.denied = denied
+        self.calls = 0
+        self._name = name
+        self._cmdline = cmdline
+
+    def name(self):
+        self.calls += 1
+        if self.denied:
+            raise psutil.AccessDenied(self.pid)
+        return self._name
+
+    def cmdline(self):
+        self.calls += 1
+        if self.denied:
+            raise psutil.AccessDenied(self.pid)
+        return self._cmdline
+
+
+def mock_processes():
+    return [
+        IndexedMockProcess(1, 'systemd', ['/sbin/init']),
+        IndexedMockProcess(10, 'python', ['python', '/opt/app/web.py', '--port', '80']),
+        IndexedMockProcess(11, 'python', ['python', '/opt/app/worker.py']),
+        IndexedMockProcess(12, 'java', ['java', '-jar', 'kafka.jar']),
+        IndexedMockProcess(13, 'sshd', ['sshd'], denied=True),
+    ]
+
+
+def test_search():
+    index = ProcessIndex(mock_processes())
+
+    assert index.search(['python'], True)[0] == {10, 11}
+    assert index.search(['java', 'systemd'], True)[0] == {1, 12}
+    assert index.search(['worker', r'kafka\.jar'], False)[0] == {11, 12}
+    assert index.search(['All'], False)[0] == {1, 10, 11, 12}
+    assert index.search(['nginx'], True)[0] == set()
+
+
+def test_search_reads_processes_once():
+    processes = mock_processes()
+    index = ProcessIndex(processes)
+
+    for _ in range(10):
+        index.search(['web.py'], False)
+        index.search(['worker'], False)
+        index.search(['python'], True)
+
+    # The names were retrieved along with the process list
+    assert [proc.calls for proc in processes if not proc.denied] == [1, 1, 1, 1]
+
+
+def test_search_denied_access():
+    processes = mock_processes()
+    index = ProcessIndex(processes)
+
+    matching_pids, errors, readable_processes = index.search(['sshd'], False)
+    assert matching_pids == set()
+    assert list(errors) == [13]
+    assert isinstance(errors[13], psutil.AccessDenied)
+    assert set(readable_processes) == {1, 10, 11, 12}
+
+    # Skipped processes are not read again
+    assert index.search(['sshd'], False, skip_pids={13})[1] == {}
+    assert processes[-1].calls == 1
+
+    # Access can be granted later on
+    processes[-1].denied = False
+    first_readable_processes = readable_processes
+    matching_pids, errors, readable_processes = index.search(['sshd'], False)
+    assert matching_pids == {13}
+    assert errors == {}
+    assert readable_processes[13] == 'sshd'
+    # The values returned by a search are not updated by the following ones
+    assert 13 not in first_readable_processes
+
+
+@pytest.mark.parametrize(
+    'pattern, pids, candidates',
+    [
+        pytest.param(r'(python).*\1', set(), {10, 12}, id='backreference'),
+        pytest.param(r'(?i)KAFKA', {12}, {10, 12}, id='global flags'),
+        pytest.param(r'web|worker', {10, 11}, {10, 11, 12}, id='alternation'),
+    ],
+)
+def test_search_combined_patterns(pattern, pids, candidates):
+    patterns = [r'web\.py', r'(?P<jar>\w+)\.jar', pattern]
+    first_index = ProcessIndex(mock_processes())
+    for p in patterns:
+        first_index.search([p], False)
+
+    # The patterns of the previous process list are combined to leave out the command lines none of them match
+    index = ProcessIndex(mock_processes(), first_index.searched_patterns)
+    assert index.search([pattern], False)[0] == pids
+    assert index.search([r'web\.py'], False)[0] == {10}
+    assert index.search([r'(?P<jar>\w+)\.jar'], False)[0] == {12}
+    assert set(index.candidates) == candidates
+
+
+def test_refresh_keeps_searched_patterns():
+    cache = ProcessListCache()
+    cache.last_ts = 0
+    with patch('psutil.process_iter', side_effect=[mock_processes(), mock_processes()]):
+        assert cache.refresh()
+        cache.index.search(['worker'], False)
+        cache.reset()
+        assert cache.refresh()
+
+    assert cache.index.patterns == {'worker'}
+    assert cache.index.search(['worker'], False)[0] == {11}
+
+
+def test_instances_share_index():
+    processes = mock_processes()
+    instances = [
+        {'name': 'web', 'search_string': ['web.py'], 'exact_match': False},
+        {'name': 'worker', 'search_string': ['worker'], 'exact_match': False},
+        {'name': 'python', 'search_string': ['python']},
+    ]
+
+    with patch('psutil.process_iter', return_value=processes):
+        checks = [ProcessCheck(common.CHECK_NAME, {}, [instance]) for instance in instances]
+        pids = [check.find_pids(check.name, check.search_string, check.exact_match) for check in checks]
+
+    assert pids == [{10}, {11}, {10, 11}]
+    assert [proc.calls for proc in processes if not proc.denied] == [1, 1, 1, 1]
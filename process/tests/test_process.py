@@ -3,6 +3,7 @@
 # Licensed under a 3-clause BSD style license (see LICENSE)
 import logging
 import os
+from contextlib import contextmanager
 
 import psutil
 import pytest
@@ -45,6 +46,10 @@ class MockProcess(object):
     def children(self, recursive=False):
         return []
 
+    @contextmanager
+    def oneshot(self):
+        yield
+
 
 class NamedMockProcess(object):
     def __init__(self, name):
@@ -0,0 +1,161 @@
+# (C) Datadog, Inc. 2023-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+import os
+import shutil
+
+import psutil
+import pytest
+from mock import patch
+
+from datadog_checks.base.utils.platform import Platform
+from datadog_checks.process import ProcessCheck
+from datadog_checks.process.procfs import DEFAULT_BUFFER_SIZE, ProcfsCollector, ProcfsReadError
+
+from . import common
+
+pytestmark = pytest.mark.skipif(not Platform.is_linux(), reason='procfs is only available on Linux')
+
+
+@pytest.fixture
+def procfs(tmp_path):
+    root = str(tmp_path)
+    common.write_procfs(root, {42: common.procfs_process(42, name='kworker (u8:1)'), 43: common.procfs_process(43)})
+    yield root
+
+
+def start_collector(procfs, pids):
+    collector = ProcfsCollector()
+    collector.start(procfs, pids)
+    return collector
+
+
+def test_collect(procfs):
+    collector = start_collector(procfs, {42})
+
+    with patch('time.time', return_value=common.PROCFS_BOOT_TIME + 100):
+        state = collector.collect(42)
+
+    clock_ticks = os.sysconf('SC_CLK_TCK')
+    assert state == {
+        'thr': 4,
+        'minflt': 420,
+        'cminflt': 840,
+        'majflt': 126,
+        'cmajflt': 168,
+        'cpu': None,
+        'run_time': pytest.approx(100 - 1000.0 / clock_ticks),
+        'vms': 84 * common.PROCFS_PAGE_SIZE,
+        'rss': 42 * common.PROCFS_PAGE_SIZE,
+        'real': 21 * common.PROCFS_PAGE_SIZE,
+        'mem_pct': pytest.approx(42 * common.PROCFS_PAGE_SIZE * 100.0 / (16384000 * 1024)),
+        'ctx_swtch_vol': 210,
+        'ctx_swtch_invol': 252,
+        'r_count': 294,
+        'w_count': 336,
+        'r_bytes': 42 * 4096,
+        'w_bytes': 42 * 8192,
+        'open_fd': 3,
+    }
+
+
+def test_cpu_percent(procfs):
+    clock_ticks = os.sysconf('SC_CLK_TCK')
+    collector = start_collector(procfs, {42})
+    with patch('time.time', return_value=1000):
+        assert collector.collect(42)['cpu'] is None
+
+    os.mkdir(procfs + '/next')
+    common.write_procfs(procfs + '/next', {42: common.procfs_process(42, utime=100 + clock_ticks, stime=50)})
+    collector.start(procfs + '/next', {42})
+    with patch('time.time', return_value=1004):
+        assert collector.collect(42)['cpu'] == 25.0
+
+    # The PID was reused by another process
+    os.mkdir(procfs + '/reused')
+    common.write_procfs(procfs + '/reused', {42: common.procfs_process(42, start_time=5000)})
+    collector.start(procfs + '/reused', {42})
+    with patch('time.time', return_value=1008):
+        assert collector.collect(42)['cpu'] is None
+
+    collector.start(procfs + '/reused', {43})
+    assert collector.cpu_samples == {}
+
+
+def test_missing_process(procfs):
+    collector = start_collector(procfs, {44})
+
+    with pytest.raises(psutil.NoSuchProcess):
+        collector.collect(44)
+
+
+def test_read_error(procfs):
+    # Reading a directory fails with EISDIR
+    os.remove(os.path.join(procfs, '43', 'stat'))
+    os.mkdir(os.path.join(procfs, '43', 'stat'))
+    collector = start_collector(procfs, {43})
+
+    with pytest.raises(ProcfsReadError, match='unable to read .*stat'):
+        collector.collect(43)
+
+
+def test_unreadable_optional_files(procfs):
+    os.remove(os.path.join(procfs, '43', 'io'))
+    shutil.rmtree(os.path.join(procfs, '43', 'fd'))
+    collector = start_collector(procfs, {43})
+
+    state = collector.collect(43)
+
+    assert state['thr'] == 4
+    assert state['open_fd'] is None
+    assert all(state[attr] is None for attr in ('r_count', 'w_count', 'r_bytes', 'w_bytes'))
+
+
+def test_files_larger_than_buffer(procfs):
+    with open(os.path.join(procfs, '42', 'status'), 'a') as f:
+        f.write('Groups:\t{}\n'.format(' '.join(str(group) for group in range(DEFAULT_BUFFER_SIZE))))
+    collector = start_collector(procfs, {42})
+
+    assert collector.collect(42)['ctx_swtch_invol'] == 252
+    assert collector.collect(43)['ctx_swtch_invol'] == 258
+    assert len(collector.buffer) > DEFAULT_BUFFER_SIZE
+
+
+@pytest.mark.parametrize('error', [ValueError, ProcfsReadError(None, 'unable to read')])
+def test_fall_back_to_psutil(aggregator, dd_run_check, error):
+    check = ProcessCheck(common.CHECK_NAME, {}, [{'name': 'py', 'pid': os.getpid()}])
+
+    with patch.object(check._procfs_collector, 'collect', side_effect=error):
+        dd_run_check(check)
+
+    aggregator.assert_metric('system.processes.threads', count=1)
+    aggregator.assert_metric('system.processes.mem.rss', count=1)
+    assert os.getpid() in check.process_cache['py']
+
+
+def test_same_metrics_as_psutil(procfs, aggregator, dd_run_check):
+    def collect_metrics(use_procfs):
+        aggregator.reset()
+        check = ProcessCheck(common.CHECK_NAME, {}, [{'name': 'synthetic', 'pid': 42}])
+        if not use_procfs:
+            check._procfs_collector = None
+
+        # psutil caches the total memory the first time it computes a memory percentage
+        with patch.object(psutil, 'PROCFS_PATH', procfs), patch.object(psutil, '_TOTAL_PHYMEM', None):
+            # Collect twice so that CPU percentages are reported
+            dd_run_check(check)
+            dd_run_check(check)
+
+        return {
+            (name, metric.type, metric.value)
+            for name in aggregator.metric_names
+            if '.run_time.' not in name
+            for metric in aggregator.metrics(name)
+        }
+
+    procfs_metrics = collect_metrics(use_procfs=True)
+    psutil_metrics = collect_metrics(use_procfs=False)
+
+    assert procfs_metrics == psutil_metrics
+    assert ('system.processes.open_file_descriptors', aggregator.GAUGE, 3) in procfs_metrics
+    assert ('system.processes.cpu.pct', aggregator.GAUGE, 0) in procfs_metrics
@@ -22,6 +22,7 @@ from .pysnmp_types import (
     usmDESPrivProtocol,
     usmHMACMD5AuthProtocol,
 )
+from .reporting import ReportingPlan  # noqa: F401
 from .resolver import OIDResolver
 from .types import OIDMatch  # noqa: F401
 from .utils import register_device_target
@@ -40,6 +41,7 @@ class InstanceConfig:
     DEFAULT_BULK_THRESHOLD = 0
     DEFAULT_WORKERS = 5
     DEFAULT_REFRESH_OIDS_CACHE_INTERVAL = 0  # `0` means disabled
+    DEFAULT_FETCH_WINDOW = 1  # `1` means requests are sent one after another
 
     AUTH_PROTOCOL_MAPPING = {
         'md5': 'usmHMACMD5AuthProtocol',
@@ -109,6 +111,12 @@ class InstanceConfig:
 
         self.bulk_threshold = int(instance.get('bulk_threshold', self.DEFAULT_BULK_THRESHOLD))
 
+        self.fetch_window = int(instance.get('fetch_window', self.DEFAULT_FETCH_WINDOW))
+        if self.fetch_window < 1:
+            raise ConfigurationError('fetch_window must be a positive integer')
+        # Number of rows requested by GETBULK requests of each table, adjusted by the pipelined fetcher
+        self.bulk_max_repetitions = {}  # type: Dict[str, int]
+
         self._auth_data = self.get_auth_data(instance)
         self._context_data = ContextData(*self.get_context_data(instance))
 
@@ -158,6 +166,8 @@ class InstanceConfig:
             raise ConfigurationError('Instance should specify at least one metric or profiles should be defined')
 
         scalar_oids, next_oids, bulk_oids, self.parsed_metrics = self.parse_metrics(self.metrics)
+        # Compiled by the check from the parsed metrics, reset whenever they change
+        self.reporting_plan = None  # type: Optional[ReportingPlan]
         tag_oids, self.parsed_metric_tags = self.parse_metric_tags(metric_tags)
         if tag_oids:
             scalar_oids.extend(tag_oids)
@@ -198,6 +208,7 @@ class InstanceConfig:
         self.oid_config.add_parsed_oids(scalar_oids=scalar_oids + tag_oids, next_oids=next_oids, bulk_oids=bulk_oids)
         self.parsed_metrics.extend(parsed_metrics)
         self.parsed_metric_tags.extend(parsed_metric_tags)
+        self.reporting_plan = None
 
     def add_profile_tag(self, profile_name):
         # type: (str) -> None
@@ -319,6 +330,7 @@ class InstanceConfig:
 
         parsed_metric = ParsedSymbolMetric('sysUpTimeInstance', forced_type='gauge')
         self.parsed_metrics.append(parsed_metric)
+        self.reporting_plan = None
         self._uptime_metric_added = True
 
 
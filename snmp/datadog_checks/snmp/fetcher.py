@@ -0,0 +1,271 @@
+# (C) Datadog, Inc. 2023-present
+# All rights reserved
+# Licensed under Simplified BSD License (see LICENSE)
+import functools
+from collections import deque
+from typing import Any, Callable, Deque, List, Optional, Tuple  # noqa: F401
+
+from pyasn1.type.univ import Null
+from pysnmp.entity.rfc3413 import cmdgen
+from pysnmp.hlapi.asyncore.cmdgen import vbProcessor
+from pysnmp.proto import errind
+from pysnmp.proto.rfc1905 import endOfMibView
+
+from datadog_checks.base.errors import CheckException
+
+from .config import InstanceConfig  # noqa: F401
+from .exceptions import PySnmpError
+from .models import OID  # noqa: F401
+from .pysnmp_types import ObjectIdentity, ObjectType
+from .utils import batches, reply_invalid
+
+# The error status returned by agents when a response would not fit in a single message
+TOO_BIG_ERROR_STATUS = 1
+# Upper bound of the number of rows requested by a GETBULK request
+MAX_BULK_REPETITIONS = 250
+
+
+class BulkWalk(object):
+    """
+    The state of a table walk performed with GETBULK requests.
+    """
+
+    def __init__(self, key, initial_var, max_repetitions):
+        # type: (str, Any, int) -> None
+        self.key = key
+        self.initial_var = initial_var
+        self.var_binds = None  # type: Optional[List[Any]]
+        self.max_repetitions = max_repetitions
+        # Whether the agent returned fewer rows than requested, or none at all, during this walk
+        self.truncated = False
+
+
+class PipelinedFetcher(object):
+    """
+    Fetch the OIDs of a device while keeping up to `window` GET, GETNEXT and GETBULK requests in flight.
+
+    Requests are sent through the asynchronous transport dispatcher of the device's SNMP engine. Response
+    callbacks queue follow-up requests, such as the continuation of a walk or a GETNEXT fallback for OIDs
+    missing from a GET response, so a single run of the dispatcher fetches every OID.
+
+    The number of rows requested by GETBULK requests adapts to the responses: it grows while the agent
+    fills the responses, and shrinks to what the agent returned when it truncates them. The value reached
+    for each table is kept on the config and reused by the next check run.
+    """
+
+    def __init__(
+        self,
+        config,  # type: InstanceConfig
+        lookup_mib,  # type: bool
+        ignore_nonincreasing_oid,  # type: bool
+        window,  # type: int
+        oid_batch_size,  # type: int
+        max_repetitions,  # type: int
+        fetch_id,  # type: str
+    ):
+        # type: (...) -> None
+        if config.device is None:
+            raise RuntimeError('No device set')  # pragma: no cover
+
+        self.config = config
+        self.lookup_mib = lookup_mib
+        self.ignore_nonincreasing_oid = ignore_nonincreasing_oid
+        self.window = window
+        self.oid_batch_size = oid_batch_size
+        self.max_repetitions = max_repetitions
+        self.fetch_id = fetch_id
+
+        self.snmp_engine = config._snmp_engine
+        self.get_generator = cmdgen.GetCommandGenerator()
+        self.next_generator = cmdgen.NextCommandGenerator()
+        self.bulk_generator = cmdgen.BulkCommandGenerator()
+
+        # Requests waiting for a slot in the window
+        self.pending_requests = deque()  # type: Deque[Callable[[], None]]
+        self.requests_in_flight = 0
+
+        self.var_binds = []  # type: List[Any]
+        self.errors = []  # type: List[str]
+
+    def fetch(self, scalar_oids, next_oids, bulk_oids):
+        # type: (List[OID], List[OID], List[OID]) -> Tuple[List[Any], List[str]]
+        """
+        Fetch all the given OIDs, returning the var binds that were collected and the errors that occurred.
+        """
+        for oids_batch in batches([oid.as_object_type() for oid in scalar_oids], size=self.oid_batch_size):
+            self.queue_request(self.send_get, oids_batch)
+
+        for oids_batch in batches([oid.as_object_type() for oid in next_oids], size=self.oid_batch_size):
+            self.queue_request(self.send_next, oids_batch, None)
+
+        for oid in bulk_oids:
+            key = str(oid)
+            max_repetitions = self.config.bulk_max_repetitions.get(key, self.max_repetitions)
+            self.queue_request(self.send_bulk, oid.as_object_type(), BulkWalk(key, None, max_repetitions))
+
+        self.send_pending_requests()
+        self.snmp_engine.transportDispatcher.runDispatcher()
+
+        return self.var_binds, self.errors
+
+    def queue_request(self, send_request, *args):
+        # type: (Callable, *Any) -> None
+        self.pending_requests.append(functools.partial(send_request, *args))
+
+    def send_pending_requests(self):
+        # type: () -> None
+        while self.pending_requests and self.requests_in_flight < self.window:
+            send_request = self.pending_requests.popleft()
+            try:
+                send_request()
+            except (PySnmpError, CheckException) as e:
+                self.add_error(e)
+            else:
+                self.requests_in_flight += 1
+
+    def on_response(self, handle_response, error_indication, *args):
+        # type: (Callable, Any, *Any) -> None
+        self.requests_in_flight -= 1
+        try:
+            if error_indication:
+                raise CheckException('{} for device {}'.format(error_indication, self.config.device))
+
+            handle_response(*args)
+        except (PySnmpError, CheckException) as e:
+            self.add_error(e)
+
+        self.send_pending_requests()
+
+    def add_error(self, error):
+        # type: (Exception) -> None
+        self.errors.append('[{}] Failed to collect some metrics: {}'.format(self.fetch_id, error))
+
+    def send_get(self, oids):
+        # type: (List[Any]) -> None
+        self.get_generator.sendVarBinds(
+            self.snmp_engine,
+            self.config.device.target,
+            self.config._context_data.contextEngineId,
+            self.config._context_data.contextName,
+            vbProcessor.makeVarBinds(self.snmp_engine, oids),
+            self.get_callback,
+            None,
+        )
+
+    def get_callback(  # type: ignore
+        self, snmpEngine, sendRequestHandle, errorIndication, errorStatus, errorIndex, varBinds, cbCtx
+    ):
+        self.on_response(self.handle_get_response, errorIndication, varBinds)
+
+    def handle_get_response(self, var_binds):
+        # type: (List[Any]) -> None
+        missing_results = []
+        for var in vbProcessor.unmakeVarBinds(self.snmp_engine, var_binds, self.lookup_mib):
+            result_oid, value = var
+            if reply_invalid(value):
+                missing_results.append(ObjectType(ObjectIdentity(result_oid.asTuple())))
+            else:
+                self.var_binds.append(var)
+
+        # If we didn't catch the metric using snmpget, try snmpnext
+        for oids_batch in batches(missing_results, size=self.oid_batch_size):
+            self.queue_request(self.send_next, oids_batch, None)
+
+    def send_next(self, var_binds, initial_vars):
+        # type: (List[Any], Optional[List[Any]]) -> None
+        if initial_vars is None:
+            initial_vars = [x[0] for x in vbProcessor.makeVarBinds(self.snmp_engine, var_binds)]
+
+        self.next_generator.sendVarBinds(
+            self.snmp_engine,
+            self.config.device.target,
+            self.config._context_data.contextEngineId,
+            self.config._context_data.contextName,
+            var_binds,
+            self.next_callback,
+            initial_vars,
+        )
+
+    def next_callback(  # type: ignore
+        self, snmpEngine, sendRequestHandle, errorIndication, errorStatus, errorIndex, varBindTable, cbCtx
+    ):
+        if self.ignore_nonincreasing_oid and errorIndication and isinstance(errorIndication, errind.OidNotIncreasing):
+            errorIndication = None
+
+        self.on_response(self.handle_next_response, errorIndication, varBindTable, cbCtx)
+
+    def handle_next_response(self, var_bind_table, initial_vars):
+        # type: (List[Any], List[Any]) -> None
+        var_bind_table = [vbProcessor.unmakeVarBinds(self.snmp_engine, row, self.lookup_mib) for row in var_bind_table]
+
+        next_var_binds = []
+        next_initial_vars = []
+        for col, var_bind in enumerate(var_bind_table[0] if var_bind_table else []):
+            name, val = var_bind
+            if not isinstance(val, Null) and initial_vars[col].isPrefixOf(name):
+                next_var_binds.append(var_bind)
+                next_initial_vars.append(initial_vars[col])
+                self.var_binds.append(var_bind)
+
+        # Keep walking the columns that are still under their initial OID
+        if next_var_binds:
+            self.queue_request(self.send_next, next_var_binds, next_initial_vars)
+
+    def send_bulk(self, oid, walk):
+        # type: (Any, BulkWalk) -> None
+        if walk.var_binds is None:
+            walk.var_binds = [oid]
+            walk.initial_var = vbProcessor.makeVarBinds(self.snmp_engine, walk.var_binds)[0][0]
+
+        self.bulk_generator.sendVarBinds(
+            self.snmp_engine,
+            self.config.device.target,
+            self.config._context_data.contextEngineId,
+            self.config._context_data.contextName,
+            0,
+            walk.max_repetitions,
+            vbProcessor.makeVarBinds(self.snmp_engine, walk.var_binds),
+            self.bulk_callback,
+            walk,
+        )
+
+    def bulk_callback(  # type: ignore
+        self, snmpEngine, sendRequestHandle, errorIndication, errorStatus, errorIndex, varBindTable, cbCtx
+    ):
+        if self.ignore_nonincreasing_oid and errorIndication and isinstance(errorIndication, errind.OidNotIncreasing):
+            errorIndication = None
+
+        self.on_response(self.handle_bulk_response, errorIndication, errorStatus, varBindTable, cbCtx)
+
+    def handle_bulk_response(self, error_status, var_bind_table, walk):
+        # type: (Any, List[Any], BulkWalk) -> None
+        if error_status == TOO_BIG_ERROR_STATUS and walk.max_repetitions > 1:
+            # Ask for fewer rows so that the response fits in a single message
+            walk.max_repetitions //= 2
+            walk.truncated = True
+            self.config.bulk_max_repetitions[walk.key] = walk.max_repetitions
+            self.queue_request(self.send_bulk, None, walk)
+            return
+
+        var_bind_table = [vbProcessor.unmakeVarBinds(self.snmp_engine, row, self.lookup_mib) for row in var_bind_table]
+        for var_binds in var_bind_table:
+            name, value = var_binds[0]
+            if endOfMibView.isSameTypeWith(value) or not walk.initial_var.isPrefixOf(name):
+                return
+
+            self.var_binds.append(var_binds[0])
+
+        if not var_bind_table:
+            return
+
+        # The walk continues, use the number of rows the agent is able to return once it truncates
+        # a response and otherwise grow the number of requested rows while the agent fills the responses
+        if len(var_bind_table) < walk.max_repetitions:
+            walk.max_repetitions = len(var_bind_table)
+            walk.truncated = True
+        elif not walk.truncated:
+            walk.max_repetitions = min(walk.max_repetitions * 2, MAX_BULK_REPETITIONS)
+
+        self.config.bulk_max_repetitions[walk.key] = walk.max_repetitions
+        walk.var_binds = var_bind_table[-1]
+        self.queue_request(self.send_bulk, None, walk)
@@ -5,7 +5,7 @@
 Helpers for deriving metrics from SNMP values.
 """
 
-from typing import Any, Optional  # noqa: F401
+from typing import Any, Callable, Optional, Tuple  # noqa: F401
 
 from pyasn1.codec.ber.decoder import decode as pyasn1_decode
 
@@ -71,6 +71,48 @@ def as_metric_with_forced_type(value, forced_type, options):
     return None
 
 
+# Submission type of the forced types that convert values to floats
+FLOAT_FORCED_TYPES = {
+    'gauge': 'gauge',
+    'counter': 'rate',
+    'monotonic_count': 'monotonic_count',
+    'monotonic_count_and_rate': 'monotonic_count_and_rate',
+}
+
+
+def get_metric_converter(forced_type, options):
+    # type: (Optional[str], dict) -> Optional[Callable[[Any], Tuple[str, float]]]
+    """
+    Return a function converting values to the submission type and value of a metric, like
+    `as_metric_with_forced_type` and `as_metric_with_inferred_type` do, with the forced type resolved once.
+
+    The function raises an exception for values that can't be converted. There is no function for unknown forced types.
+    """
+    if forced_type is None:
+        return _convert_with_inferred_type
+
+    if forced_type == 'flag_stream':
+        index = int(options['placement']) - 1
+        return lambda value: ('gauge', int(str(value)[index]))
+
+    if forced_type == 'percent':
+        return lambda value: ('rate', total_time_to_temporal_percent(_varbind_value_to_float(value), scale=1))
+
+    submission_type = FLOAT_FORCED_TYPES.get(forced_type)
+    if submission_type is None:
+        return None
+
+    return lambda value: (submission_type, _varbind_value_to_float(value))
+
+
+def _convert_with_inferred_type(value):
+    # type: (Any) -> Tuple[str, float]
+    metric = as_metric_with_inferred_type(value)
+    if metric is None:
+        raise ValueError('Unsupported metric type {}'.format(type(value)))
+    return metric['type'], metric['value']
+
+
 def _varbind_value_to_float(value):
     # type: (Any) -> float
 
@@ -0,0 +1,172 @@
+# (C) Datadog, Inc. 2023-present
+# All rights reserved
+# Licensed under Simplified BSD License (see LICENSE)
+"""
+Compiled plans reporting the metrics of a device from the results of a fetch.
+"""
+from collections import defaultdict
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Pattern, Tuple  # noqa: F401
+
+from six import iteritems
+
+from .metrics import get_metric_converter
+from .parsing import ColumnTag, IndexTag, ParsedMetric, ParsedTableMetric  # noqa: F401
+from .parsing.parsed_metrics import ParsedMatchMetricTag, ParsedSimpleMetricTag
+from .utils import extract_value, reply_invalid
+
+if TYPE_CHECKING:
+    from .snmp import SnmpCheck  # noqa: F401
+
+
+class MetricEntry(object):
+    """
+    A parsed metric along with everything needed to submit its values that doesn't depend on the fetched results.
+    """
+
+    __slots__ = ('metric', 'metric_name', 'convert', 'tags', 'is_bandwidth_metric')
+
+    def __init__(self, check, metric):
+        # type: (SnmpCheck, ParsedMetric) -> None
+        self.metric = metric
+        if 'metric_suffix' in metric.options:
+            self.metric_name = check.normalize(
+                '{}.{}'.format(metric.name, metric.options['metric_suffix']), prefix='snmp'
+            )
+        else:
+            self.metric_name = check.normalize(metric.name, prefix='snmp')
+
+        try:
+            self.convert = get_metric_converter(metric.forced_type, metric.options)
+        except Exception:
+            # Invalid options, values are submitted one by one to report the error
+            self.convert = None
+
+        self.tags = () if isinstance(metric, ParsedTableMetric) else tuple(metric.tags)
+        self.is_bandwidth_metric = check.is_bandwidth_metric(metric.name)
+
+
+class ReportingPlan(object):
+    """
+    Plan to report the parsed metrics of a device, compiled once and reused for every fetch.
+
+    Metric names and value conversions are resolved when compiling the plan. Table metrics are grouped by their
+    index and column tags, so that the tags of a row are computed once per fetch for all the metrics of the group.
+    The values of each metric are then submitted in bulk with `AgentCheck.submit_metric_batch`.
+
+    Values that can't be converted, such as missing objects, are submitted one by one with `SnmpCheck.submit_metric`
+    so that errors are reported the same way.
+    """
+
+    def __init__(self, check, metrics):
+        # type: (SnmpCheck, List[ParsedMetric]) -> None
+        self.scalar_entries = []  # type: List[MetricEntry]
+        # Table metrics sharing the same row tags, keyed by the signature of their index and column tags
+        self.table_groups = {}  # type: Dict[tuple, Tuple[List[IndexTag], List[ColumnTag], List[MetricEntry]]]
+
+        for metric in metrics:
+            entry = MetricEntry(check, metric)
+            if isinstance(metric, ParsedTableMetric):
+                key = row_tags_signature(metric.index_tags, metric.column_tags)
+                if key not in self.table_groups:
+                    self.table_groups[key] = (metric.index_tags, metric.column_tags, [])
+                self.table_groups[key][2].append(entry)
+            else:
+                self.scalar_entries.append(entry)
+
+    def report(self, check, results, tags):
+        # type: (SnmpCheck, Dict[str, Dict[Tuple[str, ...], Any]], List[str]) -> None
+        base_tags = tuple(tags)
+        # The values and tags of the points to submit, by submission type and metric name
+        points = defaultdict(lambda: ([], []))  # type: Dict[Tuple[str, str], Tuple[List[float], List[tuple]]]
+
+        for entry in self.scalar_entries:
+            name = entry.metric.name
+            if name not in results:
+                check.log.debug('Ignoring metric %s', name)
+                continue
+            rows = results[name]
+            if len(rows) > 1:
+                check.log.warning('Several rows corresponding while the metric is supposed to be a scalar')
+                if entry.metric.enforce_scalar:
+                    # For backward compatibility reason, we publish the first value for OID.
+                    continue
+            value = next(iter(rows.values()))
+            add_point(check, points, entry, value, base_tags + entry.tags)
+
+        for index_tags, column_tags, entries in self.table_groups.values():
+            row_tags = {}  # type: Dict[Tuple[str, ...], tuple]
+            for entry in entries:
+                name = entry.metric.name
+                if name not in results:
+                    check.log.debug('Ignoring metric %s', name)
+                    continue
+                for index, value in iteritems(results[name]):
+                    point_tags = row_tags.get(index)
+                    if point_tags is None:
+                        point_tags = row_tags[index] = base_tags + tuple(
+                            check.get_index_tags(index, results, index_tags, column_tags)
+                        )
+                    add_point(check, points, entry, value, point_tags)
+                    if entry.is_bandwidth_metric:
+                        check.try_submit_bandwidth_usage_metric_if_bandwidth_metric(
+                            name, index, results, list(point_tags)
+                        )
+
+        for (submission_type, metric_name), (values, point_tags) in iteritems(points):
+            if submission_type == 'monotonic_count_and_rate':
+                check.submit_metric_batch('monotonic_count', metric_name, values, point_tags)
+                check.submit_metric_batch('rate', '{}.rate'.format(metric_name), values, point_tags)
+                check._submitted_metrics += 2 * len(values)
+            else:
+                check.submit_metric_batch(submission_type, metric_name, values, point_tags)
+                check._submitted_metrics += len(values)
+
+
+def add_point(check, points, entry, value, tags):
+    # type: (SnmpCheck, Dict[Tuple[str, str], Tuple[List[float], List[tuple]]], MetricEntry, Any, tuple) -> None
+    metric = entry.metric
+    try:
+        if entry.convert is None or reply_invalid(value):
+            raise ValueError
+        if metric.extract_value_pattern is not None:
+            submission_type, number = entry.convert(extract_value(metric.extract_value_pattern, value.prettyPrint()))
+        else:
+            submission_type, number = entry.convert(value)
+    except Exception:
+        check.submit_metric(
+            metric.name, value, metric.forced_type, list(tags), metric.options, metric.extract_value_pattern
+        )
+        return
+
+    values, point_tags = points[submission_type, entry.metric_name]
+    values.append(number)
+    point_tags.append(tags)
+
+
+def row_tags_signature(index_tags, column_tags):
+    # type: (List[IndexTag], List[ColumnTag]) -> tuple
+    """
+    Return a hashable value identifying the tags of the rows of table metrics, equal for metrics of the same table
+    defined in different places of a profile.
+    """
+    return (
+        tuple((index_tag.index, metric_tag_signature(index_tag.parsed_metric_tag)) for index_tag in index_tags),
+        tuple(
+            (
+                column_tag.column,
+                tuple((s.start, s.stop, s.step) for s in column_tag.index_slices or ()),
+                metric_tag_signature(column_tag.parsed_metric_tag),
+            )
+            for column_tag in column_tags
+        ),
+    )
+
+
+def metric_tag_signature(parsed_metric_tag):
+    # type: (Any) -> tuple
+    if isinstance(parsed_metric_tag, ParsedSimpleMetricTag):
+        return ('tag', parsed_metric_tag.name)
+    if isinstance(parsed_metric_tag, ParsedMatchMetricTag):
+        pattern = parsed_metric_tag.pattern
+        return ('match', pattern.pattern, pattern.flags, tuple(sorted(parsed_metric_tag.tags.items())))
+    return ('id', id(parsed_metric_tag))
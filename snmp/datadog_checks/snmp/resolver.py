@@ -85,12 +85,17 @@ class OIDResolver(object):
     ```
     """
 
+    # Maximum number of resolved OIDs kept in memory. Devices return mostly the same OIDs on every check run,
+    # so resolutions are looked up by OID parts instead of walking the trie or the MIBs again.
+    RESOLVED_OIDS_CACHE_SIZE = 100000
+
     def __init__(self, mib_view_controller, enforce_constraints):
         # type: (MibViewController, bool) -> None
         self._mib_view_controller = mib_view_controller
         self._resolver = OIDTrie()
         self._index_resolvers = defaultdict(dict)  # type: DefaultDict[str, Dict[int, Dict[int, str]]]
         self._enforce_constraints = enforce_constraints
+        self._resolved_oids = {}  # type: Dict[Tuple[int, ...], OIDMatch]
 
     def register(self, oid, name):
         # type: (OID, str) -> None
@@ -99,6 +104,7 @@ class OIDResolver(object):
         Corresponds to XXX(1) and XXX(2) in the summary listing.
         """
         self._resolver.set(oid.as_tuple(), name)
+        self._resolved_oids.clear()
 
     def register_index(self, tag, index, mapping):
         # type: (str, int, Dict[int, str]) -> None
@@ -107,6 +113,7 @@ class OIDResolver(object):
         Corresponds to XXX(3) in the summary listing.
         """
         self._index_resolvers[tag][index] = mapping
+        self._resolved_oids.clear()
 
     def _resolve_from_mibs(self, oid):
         # type: (OID) -> OIDMatch
@@ -156,13 +163,23 @@ class OIDResolver(object):
         tag_index: a sequence of tag values. k-th item in the sequence corresponds to the k-th entry in `metric_tags`.
         """
         parts = oid.as_tuple()
+        match = self._resolved_oids.get(parts)
+        if match is not None:
+            return match
+
         prefix, name = self._resolver.match(parts)
 
         if name is None:
-            return self._resolve_from_mibs(oid)
+            match = self._resolve_from_mibs(oid)
+        else:
+            # Example: parts: (1, 3, 6, 1, 2, 1, 1), prefix: (1, 3, 6, 1) -> tail: (2, 1, 1)
+            tail = parts[len(prefix) :]
+
+            tag_index = self._resolve_tag_index(tail, name=name)
+            match = OIDMatch(name=name, indexes=tag_index)
 
-        # Example: parts: (1, 3, 6, 1, 2, 1, 1), prefix: (1, 3, 6, 1) -> tail: (2, 1, 1)
-        tail = parts[len(prefix) :]
+        if len(self._resolved_oids) >= self.RESOLVED_OIDS_CACHE_SIZE:
+            self._resolved_oids.clear()
+        self._resolved_oids[parts] = match
 
-        tag_index = self._resolve_tag_index(tail, name=name)
-        return OIDMatch(name=name, indexes=tag_index)
+        return match
@@ -14,8 +14,6 @@ from collections import defaultdict
 from concurrent import futures
 from typing import Any, DefaultDict, Dict, List, Optional, Pattern, Tuple  # noqa: F401
 
-from six import iteritems
-
 from datadog_checks.base import AgentCheck, ConfigurationError, is_affirmative
 from datadog_checks.base.errors import CheckException
 from datadog_checks.snmp.utils import extract_value
@@ -25,11 +23,13 @@ from .compat import read_persistent_cache, write_persistent_cache
 from .config import InstanceConfig
 from .discovery import discover_instances
 from .exceptions import PySnmpError
+from .fetcher import PipelinedFetcher
 from .metrics import as_metric_with_forced_type, as_metric_with_inferred_type, try_varbind_value_to_float
 from .mibs import MIBLoader
 from .models import OID
 from .parsing import ColumnTag, IndexTag, ParsedMetric, ParsedTableMetric, SymbolTag  # noqa: F401
-from .pysnmp_types import ObjectIdentity, ObjectType, noSuchInstance, noSuchObject
+from .pysnmp_types import ObjectIdentity, ObjectType
+from .reporting import ReportingPlan
 from .utils import (
     OIDPrinter,
     batches,
@@ -37,6 +37,7 @@ from .utils import (
     get_profile_definition,
     oid_pattern_specificity,
     recursively_expand_base_profiles,
+    reply_invalid,
     transform_index,
 )
 
@@ -46,11 +47,6 @@ LOADER_TAG = 'loader:python'
 _MAX_FETCH_NUMBER = 10**6
 
 
-def reply_invalid(oid):
-    # type: (Any) -> bool
-    return noSuchInstance.isSameTypeWith(oid) or noSuchObject.isSameTypeWith(oid)
-
-
 class SnmpCheck(AgentCheck):
 
     SC_STATUS = 'snmp.can_check'
@@ -209,14 +205,20 @@ class SnmpCheck(AgentCheck):
         enforce_constraints = config.enforce_constraints
         fetch_id = self._get_next_fetch_id()
 
-        all_binds, error = self.fetch_oids(
-            config,
-            config.oid_config.scalar_oids,
-            config.oid_config.next_oids,
-            enforce_constraints=enforce_constraints,
-            fetch_id=fetch_id,
-        )
-        for oid in config.oid_config.bulk_oids:
+        if config.fetch_window > 1:
+            all_binds, error = self.fetch_oids_pipelined(config, enforce_constraints, fetch_id)
+            bulk_oids = []  # type: List[OID]
+        else:
+            all_binds, error = self.fetch_oids(
+                config,
+                config.oid_config.scalar_oids,
+                config.oid_config.next_oids,
+                enforce_constraints=enforce_constraints,
+                fetch_id=fetch_id,
+            )
+            bulk_oids = config.oid_config.bulk_oids
+
+        for oid in bulk_oids:
             try:
                 oid_object_type = oid.as_object_type()
                 self.log.debug(
@@ -250,6 +252,31 @@ class SnmpCheck(AgentCheck):
         results.default_factory = None  # type: ignore
         return results, scalar_oids, error
 
+    def fetch_oids_pipelined(self, config, enforce_constraints, fetch_id):
+        # type: (InstanceConfig, bool, str) -> Tuple[List[Any], Optional[str]]
+        """
+        Fetch all the OIDs of the device with up to `fetch_window` requests in flight at once.
+        """
+        self.log.debug('[%s] Running SNMP commands with up to %d requests in flight', fetch_id, config.fetch_window)
+        fetcher = PipelinedFetcher(
+            config,
+            lookup_mib=enforce_constraints,
+            ignore_nonincreasing_oid=self.ignore_nonincreasing_oid,
+            window=config.fetch_window,
+            oid_batch_size=self.oid_batch_size,
+            max_repetitions=self._MAX_REPETITIONS,
+            fetch_id=fetch_id,
+        )
+        all_binds, errors = fetcher.fetch(
+            config.oid_config.scalar_oids, config.oid_config.next_oids, config.oid_config.bulk_oids
+        )
+        self.log.debug('[%s] Returned vars: %s', fetch_id, OIDPrinter(all_binds, with_values=True))
+
+        for message in errors:
+            self.warning(message)
+
+        return all_binds, errors[0] if errors else None
+
     def fetch_oids(self, config, scalar_oids, next_oids, enforce_constraints, fetch_id):
         # type: (InstanceConfig, List[OID], List[OID], bool, str) -> Tuple[List[Any], Optional[str]]
         # UPDATE: We used to perform only a snmpgetnext command to fetch metric values.
@@ -451,7 +478,9 @@ class SnmpCheck(AgentCheck):
                 config.oid_config.update_scalar_oids(scalar_oids)
                 tags = self.extract_metric_tags(config.parsed_metric_tags, results)
                 tags.extend(config.tags)
-                self.report_metrics(config.parsed_metrics, results, tags)
+                if config.reporting_plan is None:
+                    config.reporting_plan = ReportingPlan(self, config.parsed_metrics)
+                self.report_metrics(config.parsed_metrics, results, tags, plan=config.reporting_plan)
         except CheckException as e:
             error = str(e)
             self.warning(error)
@@ -500,38 +529,19 @@ class SnmpCheck(AgentCheck):
         metrics,  # type: List[ParsedMetric]
         results,  # type: Dict[str, Dict[Tuple[str, ...], Any]]
         tags,  # type: List[str]
+        plan=None,  # type: Optional[ReportingPlan]
     ):
         # type: (...) -> None
         """
         For each of the metrics specified gather the tags requested in the
         instance conf for each row.
 
-        Submit the results to the aggregator.
+        Submit the results to the aggregator, following the given plan
+        compiled from the metrics, or a new one.
         """
-        for metric in metrics:
-            name = metric.name
-            if name not in results:
-                self.log.debug('Ignoring metric %s', name)
-                continue
-            if isinstance(metric, ParsedTableMetric):
-                for index, val in iteritems(results[name]):
-                    metric_tags = tags + self.get_index_tags(index, results, metric.index_tags, metric.column_tags)
-                    self.submit_metric(
-                        name, val, metric.forced_type, metric_tags, metric.options, metric.extract_value_pattern
-                    )
-                    self.try_submit_bandwidth_usage_metric_if_bandwidth_metric(name, index, results, metric_tags)
-            else:
-                result = list(results[name].items())
-                if len(result) > 1:
-                    self.log.warning('Several rows corresponding while the metric is supposed to be a scalar')
-                    if metric.enforce_scalar:
-                        # For backward compatibility reason, we publish the first value for OID.
-                        continue
-                val = result[0][1]
-                metric_tags = tags + metric.tags
-                self.submit_metric(
-                    name, val, metric.forced_type, metric_tags, metric.options, metric.extract_value_pattern
-                )
+        if plan is None:
+            plan = ReportingPlan(self, metrics)
+        plan.report(self, results, tags)
 
     BANDWIDTH_METRIC_NAME_TO_BANDWIDTH_USAGE_METRIC_NAME_MAPPING = {
         'ifHCInOctets': 'ifBandwidthInUsage',
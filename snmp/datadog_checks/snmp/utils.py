@@ -1,6 +1,7 @@
 # (C) Datadog, Inc. 2020-present
 # All rights reserved
 # Licensed under Simplified BSD License (see LICENSE)
+import copy
 import logging
 import os
 from typing import Any, Dict, Iterator, List, Mapping, Optional, Pattern, Sequence, Tuple, Union  # noqa: F401
@@ -19,11 +20,17 @@ from .pysnmp_types import (
     endOfMibView,
     lcd,
     noSuchInstance,
+    noSuchObject,
 )
 from .types import T  # noqa: F401
 
 logger = logging.getLogger(__name__)
 
+# Parsed profile definition files by path, along with the modification time and size of the file.
+# Base profiles are extended by most profiles and every check instance loads its profiles,
+# so each file is only parsed once per process as long as it does not change.
+_profile_definitions = {}  # type: Dict[str, Tuple[Tuple[float, int], Dict[str, Any]]]
+
 
 def get_profile_definition(profile):
     # type: (Dict[str, Any]) -> Dict[str, Any]
@@ -76,9 +83,17 @@ def _resolve_definition_file(definition_file):
 def _read_profile_definition(definition_file):
     # type: (str) -> Dict[str, Any]
     definition_file = _resolve_definition_file(definition_file)
+    stat = os.stat(definition_file)
+    version = (stat.st_mtime, stat.st_size)
+
+    cached = _profile_definitions.get(definition_file)
+    if cached is None or cached[0] != version:
+        with open(definition_file) as f:
+            cached = (version, yaml.safe_load(f))
+        _profile_definitions[definition_file] = cached
 
-    with open(definition_file) as f:
-        return yaml.safe_load(f)
+    # Definitions are updated in place when expanding base profiles, so never hand out the cached one.
+    return copy.deepcopy(cached[1])
 
 
 def recursively_expand_base_profiles(definition):
@@ -345,6 +360,11 @@ def register_device_target(ip, port, timeout, retries, engine, auth_data, contex
     return target
 
 
+def reply_invalid(oid):
+    # type: (Any) -> bool
+    return noSuchInstance.isSameTypeWith(oid) or noSuchObject.isSameTypeWith(oid)
+
+
 def batches(lst, size):
     # type: (List[T], int) -> Iterator[List[T]]
     """
@@ -0,0 +1,106 @@
+# (C) Datadog, Inc. 2023-present
+# All rights reserved
+# Licensed under Simplified BSD License (see LICENSE)
+"""
+A minimal SNMPv2c agent serving a static set of OIDs on the loopback interface.
+
+It answers GET, GETNEXT and GETBULK requests after a configurable latency, each response being sent from
+its own timer thread so that requests sent without waiting for the previous responses are answered
+concurrently, like a real agent behind a network link.
+"""
+import bisect
+import socket
+import threading
+
+from pyasn1.codec.ber import decoder, encoder
+from pysnmp.proto import api
+
+TOO_BIG_ERROR_STATUS = 1
+
+
+class SnmpResponder(object):
+    def __init__(self, objects, latency=0.0, max_bulk_rows=None, too_big_rows=None):
+        """
+        - objects: a dict mapping OID tuples to pysnmp values.
+        - latency: number of seconds to wait before answering each request.
+        - max_bulk_rows: maximum number of rows returned by a GETBULK response, like an agent truncating them.
+        - too_big_rows: number of rows above which a GETBULK request is answered with a `tooBig` error.
+        """
+        self.proto = api.protoModules[api.protoVersion2c]
+        self.objects = dict(objects)
+        self.oids = sorted(self.objects)
+        self.latency = latency
+        self.max_bulk_rows = max_bulk_rows
+        self.too_big_rows = too_big_rows
+
+        self.requests = []
+        self.lock = threading.Lock()
+
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(('127.0.0.1', 0))
+        self.port = self.socket.getsockname()[1]
+        self.thread = threading.Thread(target=self.serve)
+        self.thread.daemon = True
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *args):
+        self.socket.close()
+
+    def serve(self):
+        while True:
+            try:
+                message, address = self.socket.recvfrom(65535)
+            except (OSError, socket.error):
+                return
+
+            timer = threading.Timer(self.latency, self.respond, args=(message, address))
+            timer.daemon = True
+            timer.start()
+
+    def respond(self, message, address):
+        proto = self.proto
+        request, _ = decoder.decode(message, asn1Spec=proto.Message())
+        response = proto.apiMessage.getResponse(request)
+        request_pdu = proto.apiMessage.getPDU(request)
+        response_pdu = proto.apiMessage.getPDU(response)
+        oids = [tuple(oid) for oid, _ in proto.apiPDU.getVarBinds(request_pdu)]
+
+        if request_pdu.isSameTypeWith(proto.GetRequestPDU()):
+            kind = 'get'
+            var_binds = [(oid, self.objects.get(oid, proto.NoSuchInstance(''))) for oid in oids]
+        elif request_pdu.isSameTypeWith(proto.GetNextRequestPDU()):
+            kind = 'next'
+            var_binds = [self.next(oid) for oid in oids]
+        else:
+            kind = 'bulk'
+            repetitions = proto.apiBulkPDU.getMaxRepetitions(request_pdu)
+            var_binds = []
+            if self.too_big_rows is not None and repetitions > self.too_big_rows:
+                proto.apiPDU.setErrorStatus(response_pdu, TOO_BIG_ERROR_STATUS)
+                var_binds = [(oid, proto.Null('')) for oid in oids]
+            else:
+                if self.max_bulk_rows is not None:
+                    repetitions = min(repetitions, self.max_bulk_rows)
+                for _ in range(repetitions):
+                    oids = [self.next(oid)[0] for oid in oids]
+                    var_binds.extend((oid, self.objects.get(oid, proto.EndOfMibView(''))) for oid in oids)
+
+        with self.lock:
+            self.requests.append(kind)
+
+        proto.apiPDU.setVarBinds(response_pdu, var_binds)
+        try:
+            self.socket.sendto(encoder.encode(response), address)
+        except (OSError, socket.error):
+            pass
+
+    def next(self, oid):
+        index = bisect.bisect_right(self.oids, oid)
+        if index == len(self.oids):
+            return oid, self.proto.EndOfMibView('')
+
+        next_oid = self.oids[index]
+        return next_oid, self.objects[next_oid]
@@ -0,0 +1,36 @@
+# (C) Datadog, Inc. 2023-present
+# All rights reserved
+# Licensed under Simplified BSD License (see LICENSE)
+import os
+
+import pytest
+
+from datadog_checks.snmp.reporting import ReportingPlan
+
+from . import common
+from .utils import fetch_recording, report_metrics_one_by_one
+
+pytestmark = [pytest.mark.unit, common.snmp_integration_only]
+
+
+@pytest.fixture(scope='module')
+def recorded_fetch():
+    # The largest recording, a load balancer with hundreds of table rows
+    return fetch_recording(os.path.join(common.COMPOSE_DIR, 'data', 'f5-big-ip.snmprec'))
+
+
+@pytest.mark.parametrize('mode', ['plan', 'one_by_one'])
+def test_report_metrics(benchmark, aggregator, recorded_fetch, mode):
+    check, metrics, results, tags = recorded_fetch
+    plan = ReportingPlan(check, metrics)
+
+    def report():
+        aggregator.reset()
+        if mode == 'plan':
+            plan.report(check, results, tags)
+        else:
+            report_metrics_one_by_one(check, metrics, results, tags)
+
+    benchmark(report)
+
+    assert len(aggregator.metric_names) > 100
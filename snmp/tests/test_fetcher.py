@@ -0,0 +1,117 @@
+# (C) Datadog, Inc. 2023-present
+# All rights reserved
+# Licensed under Simplified BSD License (see LICENSE)
+import time
+
+import pytest
+from pysnmp.proto.rfc1902 import Counter32, Counter64, Integer, TimeTicks
+
+from datadog_checks.base import ConfigurationError
+from datadog_checks.snmp import SnmpCheck
+from datadog_checks.snmp.config import InstanceConfig
+
+from . import common
+from .responder import SnmpResponder
+
+pytestmark = [pytest.mark.unit, common.snmp_integration_only]
+
+ROWS = 40
+
+OBJECTS = {(1, 3, 6, 1, 2, 1, 1, 3, 0): TimeTicks(1234), (1, 3, 6, 1, 2, 1, 1, 7, 0): Integer(72)}
+for index in range(1, ROWS + 1):
+    OBJECTS[(1, 3, 6, 1, 2, 1, 2, 2, 1, 10, index)] = Counter32(index * 10)
+    OBJECTS[(1, 3, 6, 1, 2, 1, 2, 2, 1, 16, index)] = Counter32(index * 20)
+    OBJECTS[(1, 3, 6, 1, 2, 1, 31, 1, 1, 1, 6, index)] = Counter64(index * 30)
+
+METRICS = [
+    {'OID': '1.3.6.1.2.1.1.3.0', 'name': 'sysUpTimeInstance'},
+    # Not an instance, only fetched by the GETNEXT fallback
+    {'OID': '1.3.6.1.2.1.1.7', 'name': 'sysServices'},
+    {
+        'MIB': 'IF-MIB',
+        'table': {'OID': '1.3.6.1.2.1.2.2', 'name': 'ifTable'},
+        'symbols': [
+            {'OID': '1.3.6.1.2.1.2.2.1.10', 'name': 'ifInOctets'},
+            {'OID': '1.3.6.1.2.1.2.2.1.16', 'name': 'ifOutOctets'},
+        ],
+        'metric_tags': [{'tag': 'interface', 'index': 1}],
+    },
+    {
+        'MIB': 'IF-MIB',
+        'table': {'OID': '1.3.6.1.2.1.31.1.1', 'name': 'ifXTable'},
+        'symbols': [{'OID': '1.3.6.1.2.1.31.1.1.1.6', 'name': 'ifHCInOctets'}],
+        'metric_tags': [{'tag': 'interface', 'index': 1}],
+    },
+]
+
+
+def run_check(aggregator, responder, **options):
+    instance = {
+        'ip_address': '127.0.0.1',
+        'port': responder.port,
+        'community_string': 'public',
+        'bulk_threshold': 1,
+        'oid_batch_size': 2,
+        'timeout': 5,
+        'metrics': METRICS,
+    }
+    instance.update(options)
+    check = SnmpCheck('snmp', {}, [instance])
+    check.check(instance)
+
+    assert not check.warnings
+    return check, sorted(
+        (m.name, m.value, tuple(sorted(m.tags)))
+        for name in aggregator.metric_names
+        if name.startswith('snmp.')
+        for m in aggregator.metrics(name)
+    )
+
+
+@pytest.mark.parametrize('fetch_window', [0, -1])
+def test_fetch_window_must_be_positive(fetch_window):
+    with pytest.raises(ConfigurationError, match='fetch_window must be a positive integer'):
+        InstanceConfig({'ip_address': '127.0.0.1', 'community_string': 'public', 'fetch_window': fetch_window})
+
+
+def test_same_results_as_sequential_fetch(aggregator):
+    with SnmpResponder(OBJECTS) as responder:
+        _, sequential = run_check(aggregator, responder)
+        aggregator.reset()
+        _, pipelined = run_check(aggregator, responder, fetch_window=4)
+
+    assert pipelined == sequential
+    metric_names = {name for name, _, _ in pipelined}
+    assert {'snmp.sysUpTimeInstance', 'snmp.sysServices', 'snmp.ifInOctets', 'snmp.ifHCInOctets'} <= metric_names
+    assert sum(1 for name, _, _ in pipelined if name == 'snmp.ifOutOctets') == ROWS
+
+
+def test_requests_in_flight(aggregator):
+    with SnmpResponder(OBJECTS, latency=0.05) as responder:
+        start = time.time()
+        _, sequential = run_check(aggregator, responder)
+        sequential_duration = time.time() - start
+        aggregator.reset()
+
+        start = time.time()
+        _, pipelined = run_check(aggregator, responder, fetch_window=8)
+        pipelined_duration = time.time() - start
+
+    assert pipelined == sequential
+    assert pipelined_duration < sequential_duration
+
+
+def test_bulk_repetitions_shrink_to_truncated_responses(aggregator):
+    with SnmpResponder(OBJECTS, max_bulk_rows=3) as responder:
+        check, _ = run_check(aggregator, responder, fetch_window=4)
+
+    assert check._config.bulk_max_repetitions == {'1.3.6.1.2.1.2.2': 3}
+    assert len(aggregator.metrics('snmp.ifInOctets')) == ROWS
+
+
+def test_bulk_repetitions_halved_on_too_big(aggregator):
+    with SnmpResponder(OBJECTS, too_big_rows=4) as responder:
+        check, _ = run_check(aggregator, responder, fetch_window=4)
+
+    assert check._config.bulk_max_repetitions == {'1.3.6.1.2.1.2.2': 3}
+    assert len(aggregator.metrics('snmp.ifOutOctets')) == ROWS
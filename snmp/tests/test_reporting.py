@@ -0,0 +1,89 @@
+# (C) Datadog, Inc. 2023-present
+# All rights reserved
+# Licensed under Simplified BSD License (see LICENSE)
+import os
+
+import mock
+import pytest
+from pysnmp.proto.rfc1905 import noSuchInstance
+
+from datadog_checks.snmp import SnmpCheck
+from datadog_checks.snmp.reporting import ReportingPlan
+
+from . import common
+from .utils import fetch_recording, report_metrics_one_by_one
+
+pytestmark = [pytest.mark.unit, common.snmp_integration_only]
+
+
+def submitted_metrics(aggregator):
+    return sorted(
+        (m.name, m.type, m.value, tuple(sorted(m.tags)))
+        for name in aggregator.metric_names
+        if not name.startswith('datadog.')
+        for m in aggregator.metrics(name)
+    )
+
+
+@pytest.mark.parametrize('recording', ['cisco-nexus', 'f5-big-ip', 'hpe-proliant', 'public'])
+def test_same_metrics_as_one_by_one_submission(aggregator, recording):
+    check, metrics, results, tags = fetch_recording(os.path.join(common.COMPOSE_DIR, 'data', recording + '.snmprec'))
+
+    aggregator.reset()
+    report_metrics_one_by_one(check, metrics, results, tags)
+    expected = submitted_metrics(aggregator)
+    expected_count = check._submitted_metrics
+
+    aggregator.reset()
+    check._submitted_metrics = 0
+    check.report_metrics(metrics, results, tags)
+
+    assert submitted_metrics(aggregator) == expected
+    assert check._submitted_metrics == expected_count
+    assert len(expected) > 100
+
+
+def test_row_tags_computed_once_per_table(aggregator):
+    check, metrics, results, tags = fetch_recording(os.path.join(common.COMPOSE_DIR, 'data', 'cisco-nexus.snmprec'))
+    plan = ReportingPlan(check, metrics)
+
+    with mock.patch.object(SnmpCheck, 'get_index_tags', autospec=True, return_value=[]) as get_index_tags:
+        plan.report(check, results, tags)
+
+    # Every row of every group of tables sharing the same tags
+    rows = set()
+    for key, (_, _, entries) in plan.table_groups.items():
+        for entry in entries:
+            rows.update((key, index) for index in results.get(entry.metric.name, ()))
+    assert get_index_tags.call_count == len(rows)
+    assert sum(len(entries) for _, _, entries in plan.table_groups.values()) > len(plan.table_groups)
+
+
+def test_plan_is_compiled_once_per_profile(aggregator):
+    check, metrics, results, tags = fetch_recording(os.path.join(common.COMPOSE_DIR, 'data', 'cisco-nexus.snmprec'))
+    config = check._config
+    plan = config.reporting_plan
+    assert plan is not None
+
+    with mock.patch.object(check, 'fetch_results', return_value=(results, [], None)):
+        check.check(config.instance)
+    assert config.reporting_plan is plan
+
+    config.refresh_with_profile(check.profiles['generic-router'])
+    assert config.reporting_plan is None
+
+
+def test_invalid_values_are_submitted_one_by_one(aggregator):
+    check, metrics, results, tags = fetch_recording(os.path.join(common.COMPOSE_DIR, 'data', 'cisco-nexus.snmprec'))
+    name = next(m.name for m in metrics if m.name in results and len(results[m.name]) > 1)
+    index = next(iter(results[name]))
+    results[name][index] = noSuchInstance
+
+    with mock.patch.object(check, 'submit_metric', wraps=check.submit_metric) as submit_metric, mock.patch.object(
+        check.log, 'warning'
+    ) as warning:
+        check.report_metrics(metrics, results, tags)
+
+    assert submit_metric.call_count == 1
+    assert submit_metric.call_args[0][:2] == (name, noSuchInstance)
+    warning.assert_any_call('No such Mib available: %s', name)
@@ -20,10 +20,13 @@ from datadog_checks.snmp import SnmpCheck
 from datadog_checks.snmp.config import InstanceConfig
 from datadog_checks.snmp.discovery import discover_instances
 from datadog_checks.snmp.parsing import ParsedSymbolMetric, ParsedTableMetric
-from datadog_checks.snmp.resolver import OIDTrie
+from datadog_checks.snmp.models import OID
+from datadog_checks.snmp.resolver import OIDResolver, OIDTrie
+from datadog_checks.snmp.types import OIDMatch
 from datadog_checks.snmp.utils import (
     _load_default_profiles,
     batches,
+    get_profile_definition,
     oid_pattern_specificity,
     recursively_expand_base_profiles,
 )
@@ -413,6 +416,25 @@ def test_trie():
     assert trie.match((2, 3, 4)) == ((), None)
 
 
+def test_resolver_caches_resolved_oids():
+    resolver = OIDResolver(mib_view_controller=None, enforce_constraints=True)
+    resolver.register(OID('1.2.3'), 'foo')
+    resolver.register_index('foo', 1, {4: 'four'})
+
+    match = resolver.resolve_oid(OID('1.2.3.4.5'))
+    assert match == OIDMatch(name='foo', indexes=('four', '5'))
+
+    with mock.patch.object(resolver._resolver, 'match') as match_mock:
+        assert resolver.resolve_oid(OID('1.2.3.4.5')) is match
+    match_mock.assert_not_called()
+
+    # New registrations invalidate the resolved OIDs
+    resolver.register_index('foo', 2, {5: 'five'})
+    assert resolver.resolve_oid(OID('1.2.3.4.5')) == OIDMatch(name='foo', indexes=('four', 'five'))
+    resolver.register(OID('1.2.3.4'), 'bar')
+    assert resolver.resolve_oid(OID('1.2.3.4.5')) == OIDMatch(name='bar', indexes=('5',))
+
+
 @pytest.mark.parametrize(
     'oids, expected',
     [
@@ -469,6 +491,31 @@ def test_profile_extends():
             }
 
 
+def test_profile_definitions_parsed_once():
+    # type: () -> None
+    profile = {'metrics': [{'MIB': 'TCP-MIB', 'symbol': 'tcpPassiveOpens', 'forced_type': 'monotonic_count'}]}
+
+    with temp_dir() as tmp:
+        with mock_profiles_confd_root(tmp):
+            profile_file = os.path.join(tmp, 'profile.yaml')
+            with open(profile_file, 'wb') as f:
+                f.write(yaml.safe_dump(profile))
+
+            with mock.patch('yaml.safe_load', wraps=yaml.safe_load) as safe_load:
+                definition = get_profile_definition({'definition_file': 'profile.yaml'})
+                definition['metrics'].append({'OID': '1.2.3', 'name': 'foo'})
+                assert get_profile_definition({'definition_file': 'profile.yaml'}) == profile
+                assert safe_load.call_count == 1
+
+                # Changed files are parsed again
+                profile['metric_tags'] = [{'MIB': 'SNMPv2-MIB', 'symbol': 'sysName', 'tag': 'snmp_host'}]
+                with open(profile_file, 'wb') as f:
+                    f.write(yaml.safe_dump(profile))
+
+                assert get_profile_definition({'definition_file': 'profile.yaml'}) == profile
+                assert safe_load.call_count == 2
+
+
 def test_default_profiles():
     profile = {
         'metrics': [{'MIB': 'TCP-MIB', 'symbol': 'tcpPassiveOpens', 'forced_type': 'monotonic_count'}],
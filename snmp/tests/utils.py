@@ -2,12 +2,30 @@
 # All rights reserved
 # Licensed under Simplified BSD License (see LICENSE)
 
+import binascii
 import contextlib
-from typing import Iterator  # noqa: F401
+from typing import Any, Dict, Iterator, Tuple  # noqa: F401
 
 import mock
+from pysnmp.proto import rfc1902
 
-from datadog_checks.snmp import utils
+from datadog_checks.snmp import SnmpCheck, utils
+from datadog_checks.snmp.parsing import ParsedTableMetric
+
+from .responder import SnmpResponder
+
+# Types of the values of `.snmprec` recordings, the `x` suffix meaning that values are hex-encoded
+SNMPREC_TYPES = {
+    '2': rfc1902.Integer,
+    '4': rfc1902.OctetString,
+    '6': rfc1902.ObjectName,
+    '64': rfc1902.IpAddress,
+    '65': rfc1902.Counter32,
+    '66': rfc1902.Gauge32,
+    '67': rfc1902.TimeTicks,
+    '68': rfc1902.Opaque,
+    '70': rfc1902.Counter64,
+}
 
 
 @contextlib.contextmanager
@@ -15,3 +33,67 @@ def mock_profiles_confd_root(root):
     # type: (str) -> Iterator[None]
     with mock.patch.object(utils, '_get_profiles_confd_root', return_value=root):
         yield
+
+
+def load_snmprec(path):
+    # type: (str) -> Dict[Tuple[int, ...], Any]
+    """
+    Load the objects of a `.snmprec` recording as a mapping of OID tuples to pysnmp values,
+    skipping the values of unsupported types.
+    """
+    objects = {}
+    with open(path) as f:
+        for line in f:
+            if line.startswith('#') or line.count('|') != 2:
+                continue
+            oid, tag, value = line.rstrip('\n').split('|')
+            value_type = SNMPREC_TYPES.get(tag.rstrip('x'))
+            if value_type is None:
+                continue
+            if tag.endswith('x'):
+                value = binascii.unhexlify(value)
+            try:
+                objects[tuple(int(part) for part in oid.split('.'))] = value_type(value)
+            except Exception:
+                continue
+    return objects
+
+
+def fetch_recording(path, **options):
+    """
+    Run the check once against the objects of a `.snmprec` recording, and return the check along with
+    the arguments of its `report_metrics` call: the parsed metrics of the matching profile, the results and the tags.
+    """
+    with SnmpResponder(load_snmprec(path)) as responder:
+        instance = {'ip_address': '127.0.0.1', 'port': responder.port, 'community_string': 'public', 'timeout': 5}
+        instance.update(options)
+        check = SnmpCheck('snmp', {}, [instance])
+        with mock.patch.object(SnmpCheck, 'report_metrics', autospec=True) as report_metrics:
+            check.check(instance)
+
+    _, metrics, results, tags = report_metrics.call_args[0]
+    return check, metrics, results, tags
+
+
+def report_metrics_one_by_one(check, metrics, results, tags):
+    """
+    Submit every value with `SnmpCheck.submit_metric`, computing the tags of each row for each metric.
+    """
+    for metric in metrics:
+        name = metric.name
+        if name not in results:
+            continue
+        if isinstance(metric, ParsedTableMetric):
+            for index, val in results[name].items():
+                metric_tags = tags + check.get_index_tags(index, results, metric.index_tags, metric.column_tags)
+                check.submit_metric(
+                    name, val, metric.forced_type, metric_tags, metric.options, metric.extract_value_pattern
+                )
+                check.try_submit_bandwidth_usage_metric_if_bandwidth_metric(name, index, results, metric_tags)
+        else:
+            result = list(results[name].items())
+            if len(result) > 1 and metric.enforce_scalar:
+                continue
+            check.submit_metric(
+                name, result[0][1], metric.forced_type, tags + metric.tags, metric.options, metric.extract_value_pattern
+            )
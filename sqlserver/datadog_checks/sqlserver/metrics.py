@@ -87,6 +87,47 @@ class BaseSqlServerMetric(object):
         raise NotImplementedError
 
 
+class PerformanceCounters(object):
+    """The rows of `sys.dm_os_performance_counters` fetched during a check run, stripped once and indexed by
+    counter name, instance name and object name so that each metric only reads the rows it matches.
+    """
+
+    def __init__(self):
+        # counter_name -> instance_name -> [(position, object_name, values), ...]
+        self._counters = {}
+        self._count = 0
+
+    def add(self, counter_name, instance_name, object_name, values):
+        instances = self._counters.setdefault(counter_name.strip(), {})
+        instances.setdefault(instance_name.strip(), []).append((self._count, object_name.strip(), values))
+        self._count += 1
+
+    def __contains__(self, counter_name):
+        return counter_name in self._counters
+
+    def get_instance_names(self, counter_name):
+        return list(self._counters.get(counter_name, ()))
+
+    def get_rows(self, counter_name, instance_name, object_name=None):
+        """Return the values of the rows of the counter for the instance, and for the object if specified."""
+        rows = self._counters.get(counter_name, {}).get(instance_name, ())
+        return [row[2] for row in rows if not object_name or row[1] == object_name]
+
+    def get_first_row(self, counter_name, instance_names, object_name=None):
+        """Return the object name and the values of the first row of the counter for any of the instances, and for
+        the object if specified, or None if there is no such row."""
+        instances = self._counters.get(counter_name, {})
+        first_row = None
+        for instance_name in instance_names:
+            for row in instances.get(instance_name, ()):
+                if object_name and row[1] != object_name:
+                    continue
+                if first_row is None or row[0] < first_row[0]:
+                    first_row = row
+                break
+        return None if first_row is None else first_row[1:]
+
+
 # https://docs.microsoft.com/en-us/sql/relational-databases/system-dynamic-management-views/sys-dm-os-performance-counters-transact-sql
 class SqlSimpleMetric(BaseSqlServerMetric):
     TABLE = 'sys.dm_os_performance_counters'
@@ -98,29 +139,26 @@ class SqlSimpleMetric(BaseSqlServerMetric):
 
     @classmethod
     def fetch_all_values(cls, cursor, counters_list, logger, databases=None):
-        return cls._fetch_generic_values(cursor, counters_list, logger)
+        rows, columns = cls._fetch_generic_values(cursor, counters_list, logger)
+        counters = PerformanceCounters()
+        for counter_name, instance_name, object_name, cntr_value in rows:
+            counters.add(counter_name, instance_name, object_name, cntr_value)
+        return counters, columns
+
+    def fetch_metric(self, counters, _):
+        if self.instance == ALL_INSTANCES:
+            for instance_name in counters.get_instance_names(self.sql_name):
+                if instance_name == "_Total":
+                    continue
+                metric_tags = self.tags + ['{}:{}'.format(self.tag_by, instance_name)]
+                for cntr_value in counters.get_rows(self.sql_name, instance_name):
+                    self.report_function(self.datadog_name, cntr_value, tags=list(metric_tags))
+            return
 
-    def fetch_metric(self, rows, _):
-        for counter_name_long, instance_name_long, object_name, cntr_value in rows:
-            counter_name = counter_name_long.strip()
-            instance_name = instance_name_long.strip()
-            object_name = object_name.strip()
-            if counter_name.strip() == self.sql_name:
-                matched = False
-                metric_tags = list(self.tags)
-
-                if (self.instance == ALL_INSTANCES and instance_name != "_Total") or (
-                    (instance_name == self.instance or instance_name == self.physical_db_name)
-                    and (not self.object_name or object_name == self.object_name)
-                ):
-                    matched = True
-
-                if matched:
-                    if self.instance == ALL_INSTANCES:
-                        metric_tags.append('{}:{}'.format(self.tag_by, instance_name.strip()))
-                    self.report_function(self.datadog_name, cntr_value, tags=metric_tags)
-                    if self.instance != ALL_INSTANCES:
-                        break
+        row = counters.get_first_row(self.sql_name, (self.instance, self.physical_db_name), self.object_name)
+        if row is not None:
+            _, cntr_value = row
+            self.report_function(self.datadog_name, cntr_value, tags=list(self.tags))
 
 
 class SqlFractionMetric(BaseSqlServerMetric):
@@ -147,12 +185,11 @@ class SqlFractionMetric(BaseSqlServerMetric):
         logger.debug("%s: fetch_all executing query: %s, %s", cls.__name__, query, str(counters_list))
         cursor.execute(query, counters_list)
         rows = cursor.fetchall()
-        results = defaultdict(list)
+        counters = PerformanceCounters()
         for counter_name, cntr_type, cntr_value, instance_name, object_name in rows:
-            rowlist = [cntr_type, cntr_value, instance_name.strip(), object_name.strip()]
-            logger.debug("Adding new rowlist %s", str(rowlist))
-            results[counter_name.strip()].append(rowlist)
-        return results, None
+            counters.add(counter_name, instance_name, object_name, (cntr_type, cntr_value))
+        logger.debug("%s: received %d rows", cls.__name__, len(rows))
+        return counters, None
 
     def set_instances(self, cursor):
         if self.instance == ALL_INSTANCES:
@@ -161,46 +198,33 @@ class SqlFractionMetric(BaseSqlServerMetric):
         else:
             self.instances = [self.instance]
 
-    def fetch_metric(self, results, _):
+    def fetch_metric(self, counters, _):
         """
         Because we need to query the metrics by matching pairs, we can't query
         all of them together without having to perform some matching based on
         the name afterwards so instead we query instance by instance.
-        We cache the list of instance so that we don't have to look it up every time
+        Each row of the counter is matched with the row of the base counter for the same instance and object.
         """
-        if self.sql_name not in results:
+        if self.sql_name not in counters:
             self.log.warning("Couldn't find %s in results", self.sql_name)
             return
 
-        results_list = results[self.sql_name]
-        done_instances = []
-        for ndx, row in enumerate(results_list):
-            ctype = row[0]
-            cval = row[1]
-            inst = row[2]
-            object_name = row[3]
-
-            if inst in done_instances:
-                continue
+        if self.instance == ALL_INSTANCES:
+            instance_names = counters.get_instance_names(self.sql_name)
+        else:
+            instance_names = {self.instance, self.physical_db_name}
 
-            if (self.instance != ALL_INSTANCES and inst != self.instance and inst != self.physical_db_name) or (
-                self.object_name and object_name != self.object_name
-            ):
-                done_instances.append(inst)
+        for inst in instance_names:
+            row = counters.get_first_row(self.sql_name, (inst,), self.object_name)
+            if row is None:
                 continue
+            object_name, (ctype, cval) = row
 
-            # find the next row which has the same instance
-            cval2 = None
-            ctype2 = None
-            for second_row in results_list[: ndx + 1]:
-                if inst == second_row[2]:
-                    cval2 = second_row[1]
-                    ctype2 = second_row[0]
-
-            if cval2 is None:
+            base_row = counters.get_first_row(self.base_name, (inst,), object_name)
+            if base_row is None:
                 self.log.warning("Couldn't find second value for %s", self.sql_name)
                 continue
-            done_instances.append(inst)
+            _, (ctype2, cval2) = base_row
             if ctype < ctype2:
                 value = cval
                 base = cval2
@@ -210,7 +234,7 @@ class SqlFractionMetric(BaseSqlServerMetric):
 
             metric_tags = list(self.tags)
             if self.instance == ALL_INSTANCES:
-                metric_tags.append('{}:{}'.format(self.tag_by, inst.strip()))
+                metric_tags.append('{}:{}'.format(self.tag_by, inst))
             self.report_fraction(value, base, metric_tags)
 
     def report_fraction(self, value, base, metric_tags):
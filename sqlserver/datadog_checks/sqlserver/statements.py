@@ -11,7 +11,6 @@ from lxml import etree as ET
 
 from datadog_checks.base import is_affirmative
 from datadog_checks.base.utils.common import ensure_unicode, to_native_string
-from datadog_checks.base.utils.db.sql import compute_sql_signature
 from datadog_checks.base.utils.db.statement_metrics import StatementMetrics
 from datadog_checks.base.utils.db.utils import (
     DBMAsyncJob,
@@ -282,6 +281,7 @@ class SqlserverStatementMetrics(DBMAsyncJob):
         columns = [i[0] for i in cursor.description]
         # construct row dicts manually as there's no DictCursor for pyodbc
         rows = [dict(zip(columns, row)) for row in cursor.fetchall()]
+        self._record_rows(len(rows))
         self.log.debug("loaded sql server statement metrics len(rows)=%s", len(rows))
         return rows
 
@@ -289,11 +289,11 @@ class SqlserverStatementMetrics(DBMAsyncJob):
         normalized_rows = []
         for row in rows:
             try:
-                statement = obfuscate_sql_with_metadata(row['statement_text'], self.check.obfuscator_options)
+                statement = self._obfuscate(row['statement_text'], self.check.obfuscator_options)
                 procedure_statement = None
                 row['is_proc'], procedure_name = is_statement_proc(row['text'])
                 if row['is_proc']:
-                    procedure_statement = obfuscate_sql_with_metadata(row['text'], self.check.obfuscator_options)
+                    procedure_statement = self._obfuscate(row['text'], self.check.obfuscator_options)
             except Exception as e:
                 if self.check.log_unobfuscated_queries:
                     raw_query_text = row['text'] if row.get('is_proc', False) else row['statement_text']
@@ -313,10 +313,10 @@ class SqlserverStatementMetrics(DBMAsyncJob):
             row['text'] = obfuscated_statement
             if procedure_statement:
                 row['procedure_text'] = procedure_statement['query']
-                row['procedure_signature'] = compute_sql_signature(procedure_statement['query'])
+                row['procedure_signature'] = procedure_statement['query_signature']
             if procedure_name:
                 row['procedure_name'] = procedure_name
-            row['query_signature'] = compute_sql_signature(obfuscated_statement)
+            row['query_signature'] = statement['query_signature']
             row['query_hash'] = _hash_to_hex(row['query_hash'])
             row['query_plan_hash'] = _hash_to_hex(row['query_plan_hash'])
             row['plan_handle'] = _hash_to_hex(row['plan_handle'])
@@ -377,11 +377,20 @@ class SqlserverStatementMetrics(DBMAsyncJob):
                 if not rows:
                     return
                 for event in self._rows_to_fqt_events(rows):
-                    self.check.database_monitoring_query_sample(json.dumps(event, default=default_json_event_encoding))
+                    self._submit_dbm_event(
+                        self.check.database_monitoring_query_sample,
+                        json.dumps(event, default=default_json_event_encoding),
+                    )
                 payload = self._to_metrics_payload(rows)
-                self.check.database_monitoring_query_metrics(json.dumps(payload, default=default_json_event_encoding))
+                self._submit_dbm_event(
+                    self.check.database_monitoring_query_metrics,
+                    json.dumps(payload, default=default_json_event_encoding),
+                )
                 for event in self._collect_plans(rows, cursor, deadline):
-                    self.check.database_monitoring_query_sample(json.dumps(event, default=default_json_event_encoding))
+                    self._submit_dbm_event(
+                        self.check.database_monitoring_query_sample,
+                        json.dumps(event, default=default_json_event_encoding),
+                    )
                     plans_submitted += 1
 
         self.check.count(
@@ -397,6 +406,7 @@ class SqlserverStatementMetrics(DBMAsyncJob):
             len(self._full_statement_text_cache),
             **self.check.debug_stats_kwargs()
         )
+        self._submit_obfuscation_cache_stats(self.check.debug_tags(), hostname=self.check.resolved_hostname)
 
     def _rows_to_fqt_events(self, rows):
         for row in rows:
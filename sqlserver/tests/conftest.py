@@ -10,6 +10,7 @@ from copy import deepcopy
 
 import pytest
 
+from datadog_checks.base.utils.db.utils import obfuscation_cache
 from datadog_checks.dev import WaitFor, docker_run
 from datadog_checks.dev.conditions import CheckDockerLogs
 from datadog_checks.dev.docker import using_windows_containers
@@ -31,6 +32,12 @@ except ImportError:
     pyodbc = None
 
 
+@pytest.fixture(autouse=True)
+def clear_obfuscation_cache():
+    # Obfuscated statements are shared across check instances, tests mocking the obfuscator must not reuse them
+    obfuscation_cache.clear()
+
+
 @pytest.fixture
 def init_config():
     return deepcopy(INIT_CONFIG)
@@ -0,0 +1,49 @@
+# (C) Datadog, Inc. 2023-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+import logging
+
+import mock
+import pytest
+
+from datadog_checks.sqlserver.const import INSTANCE_METRICS_DATABASE
+from datadog_checks.sqlserver.metrics import SqlSimpleMetric
+
+from .utils import performance_counter_rows
+
+pytestmark = pytest.mark.unit
+
+DATABASES = ['db{}'.format(i) for i in range(200)]
+
+
+def test_performance_counters(benchmark):
+    """Per database performance counters of 200 databases, as collected with autodiscovery."""
+    logger = logging.getLogger(__name__)
+    cursor = mock.MagicMock()
+    cursor.fetchall.return_value = performance_counter_rows(DATABASES)
+    cursor.description = [('counter_name',), ('instance_name',), ('object_name',), ('cntr_value',)]
+
+    report_function = mock.MagicMock()
+    counter_names = {counter_name for _, counter_name, _ in INSTANCE_METRICS_DATABASE}
+    metrics = [
+        SqlSimpleMetric(
+            {'name': name, 'counter_name': counter_name, 'instance_name': db, 'tags': ['database:{}'.format(db)]},
+            None,
+            report_function,
+            None,
+            logger,
+        )
+        for db in DATABASES
+        for name, counter_name, _ in INSTANCE_METRICS_DATABASE
+    ]
+
+    def collect():
+        report_function.reset_mock()
+        counters, columns = SqlSimpleMetric.fetch_all_values(cursor, list(counter_names), logger)
+        for metric in metrics:
+            metric.fetch_metric(counters, columns)
+
+    benchmark(collect)
+
+    # Only the counters present in the table are reported
+    assert report_function.call_count == len(DATABASES) * 4
@@ -0,0 +1,82 @@
+# (C) Datadog, Inc. 2023-present
+# All rights reserved
+# Licensed under a 3-clause BSD style license (see LICENSE)
+import logging
+
+import mock
+import pytest
+
+from datadog_checks.sqlserver.metrics import ALL_INSTANCES, SqlFractionMetric, SqlSimpleMetric
+
+from .utils import performance_counter_rows
+
+pytestmark = pytest.mark.unit
+
+logger = logging.getLogger(__name__)
+
+DATABASES = ['master', 'tempdb', 'datadog_test']
+
+
+def make_cursor(rows):
+    cursor = mock.MagicMock()
+    cursor.fetchall.return_value = rows
+    cursor.description = [('counter_name',), ('instance_name',), ('object_name',), ('cntr_value',)]
+    return cursor
+
+
+def make_metric(cls, counter_name, base_name=None, **cfg):
+    report_function = mock.MagicMock()
+    cfg_instance = dict(cfg, name='sqlserver.test', counter_name=counter_name, tags=['foo:bar'])
+    return cls(cfg_instance, base_name, report_function, None, logger), report_function
+
+
+def test_simple_metric():
+    counters, columns = SqlSimpleMetric.fetch_all_values(
+        make_cursor(performance_counter_rows(DATABASES)), ['Transactions/sec', 'Active Transactions'], logger
+    )
+
+    metric, report = make_metric(SqlSimpleMetric, 'Transactions/sec', instance_name='tempdb')
+    metric.fetch_metric(counters, columns)
+    report.assert_called_once_with('sqlserver.test', 2, raw=True, tags=['foo:bar'])
+
+    metric, report = make_metric(
+        SqlSimpleMetric, 'Active Transactions', instance_name='datadog', physical_db_name='datadog_test'
+    )
+    metric.fetch_metric(counters, columns)
+    report.assert_called_once_with('sqlserver.test', 3, raw=True, tags=['foo:bar'])
+
+    metric, report = make_metric(
+        SqlSimpleMetric, 'Transactions/sec', instance_name='_Total', object_name='SQLServer:Other'
+    )
+    metric.fetch_metric(counters, columns)
+    report.assert_not_called()
+
+    metric, report = make_metric(SqlSimpleMetric, 'Transactions/sec', instance_name=ALL_INSTANCES, tag_by='db')
+    metric.fetch_metric(counters, columns)
+    assert report.call_args_list == [
+        mock.call('sqlserver.test', value, raw=True, tags=['foo:bar', 'db:{}'.format(db)])
+        for value, db in enumerate(DATABASES, 1)
+    ]
+
+
+def test_fraction_metric():
+    columns = ('counter_name', 'cntr_type', 'cntr_value', 'instance_name', 'object_name')
+    counters, _ = SqlFractionMetric.fetch_all_values(
+        make_cursor(performance_counter_rows(DATABASES, columns)), ['Cache Hit Ratio', 'Cache Hit Ratio Base'], logger
+    )
+
+    metric, report = make_metric(SqlFractionMetric, 'Cache Hit Ratio', 'Cache Hit Ratio Base', instance_name='master')
+    metric.fetch_metric(counters, None)
+    report.assert_called_once_with('sqlserver.test', 0.5, raw=True, tags=['foo:bar'])
+
+    metric, report = make_metric(
+        SqlFractionMetric, 'Cache Hit Ratio', 'Cache Hit Ratio Base', instance_name=ALL_INSTANCES, tag_by='db'
+    )
+    metric.fetch_metric(counters, None)
+    assert sorted(c.kwargs['tags'][1] for c in report.call_args_list) == sorted(
+        'db:{}'.format(db) for db in DATABASES + ['_Total']
+    )
+
+    metric, report = make_metric(SqlFractionMetric, 'Cache Hit Ratio', 'Missing Base', instance_name='master')
+    metric.fetch_metric(counters, None)
+    report.assert_not_called()
@@ -215,3 +215,29 @@ class HighCardinalityQueries:
     @staticmethod
     def _create_rand_string(length=5):
         return ''.join(choice(string.ascii_lowercase + string.digits) for _ in range(length))
+
+
+def performance_counter_rows(databases, columns=('counter_name', 'instance_name', 'object_name', 'cntr_value')):
+    """Rows of `sys.dm_os_performance_counters` with the per database counters of the given databases, padded like
+    the `nchar` columns of SQL Server."""
+    counters = [
+        ('Transactions/sec', 'SQLServer:Databases', 272696576),
+        ('Log Flushes/sec', 'SQLServer:Databases', 272696576),
+        ('Log Flush Wait Time', 'SQLServer:Databases', 65792),
+        ('Active Transactions', 'SQLServer:Databases', 65792),
+        ('Cache Hit Ratio', 'SQLServer:Catalog Metadata', 537003264),
+        ('Cache Hit Ratio Base', 'SQLServer:Catalog Metadata', 1073939712),
+    ]
+    rows = []
+    for position, instance_name in enumerate(list(databases) + ['_Total']):
+        for counter_name, object_name, cntr_type in counters:
+            row = {
+                'counter_name': counter_name.ljust(128),
+                'instance_name': instance_name.ljust(128),
+                'object_name': object_name.ljust(128),
+                'cntr_type': cntr_type,
+                # The base of the cache hit ratio is twice its value
+                'cntr_value': (position + 1) * (2 if counter_name.endswith('Base') else 1),
+            }
+            rows.append(tuple(row[column] for column in columns))
+    return rows
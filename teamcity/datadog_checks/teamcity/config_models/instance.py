@@ -106,6 +106,9 @@ class InstanceConfig(BaseModel):
     collect_counters_with_distributions: Optional[bool]
     collect_events: Optional[bool]
     collect_histogram_buckets: Optional[bool]
+    compile_sample_pipelines: Optional[bool]
+    concurrent_scrapers: Optional[int]
+    conditional_requests: Optional[bool]
     connect_timeout: Optional[float]
     default_build_configs_limit: Optional[int]
     default_projects_limit: Optional[int]
@@ -160,6 +163,7 @@ class InstanceConfig(BaseModel):
     tags: Optional[Sequence[str]]
     telemetry: Optional[bool]
     tests_health_check: Optional[bool]
+    text_parser: Optional[str]
     timeout: Optional[float]
     tls_ca_cert: Optional[str]
     tls_cert: Optional[str]
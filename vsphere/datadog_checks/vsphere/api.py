@@ -4,7 +4,7 @@
 import datetime as dt  # noqa: F401
 import functools
 import ssl
-from typing import Any, Callable, List, TypeVar, cast  # noqa: F401
+from typing import Any, Callable, List, Optional, Set, Tuple, TypeVar, cast  # noqa: F401
 
 from pyVim import connect
 from pyVmomi import SoapAdapter, vim, vmodl
@@ -93,6 +93,8 @@ class VSphereAPI(object):
         self.log = log
 
         self._conn = cast(vim.ServiceInstance, None)
+        # Property collector dedicated to the updates of the infrastructure, see `get_infrastructure_updates`
+        self._infrastructure_collector = None  # type: Optional[vmodl.query.PropertyCollector]
         self.smart_connect()
 
     def smart_connect(self):
@@ -143,6 +145,8 @@ class VSphereAPI(object):
             connect.Disconnect(self._conn)
 
         self._conn = conn
+        # The property collectors and their filters are bound to the session
+        self._infrastructure_collector = None
         self.log.debug("Connected to %s", version_info.fullName)
 
     @smart_retry
@@ -165,13 +169,10 @@ class VSphereAPI(object):
         """
         return self._conn.content.perfManager.QueryPerfCounterByLevel(collection_level)
 
-    @smart_retry
-    def _get_raw_infrastructure(self):
-        # type: () -> List[vmodl.query.PropertyCollector.ObjectContent]
-        """Traverse the whole vSphere infrastructure and returns the list of raw pyvmomi MOR objects with
-        the required pre-fetched attributes."""
-        content = self._conn.content  # vim.ServiceInstanceContent reference from the connection
-
+    def _get_infrastructure_filter_spec(self, view_ref):
+        # type: (vim.view.ContainerView) -> vmodl.query.PropertyCollector.FilterSpec
+        """Build the spec of a property collector filter selecting the required attributes of every object
+        of the given container view."""
         property_specs = []
         # Specify which attributes we want to retrieve per object
         for resource in ALL_RESOURCES:
@@ -192,24 +193,33 @@ class VSphereAPI(object):
         traversal_spec.skip = False
         traversal_spec.type = vim.view.ContainerView
 
-        retr_opts = vmodl.query.PropertyCollector.RetrieveOptions()
-        # To limit the number of objects retrieved per call.
-        # If batch_collector_size is 0, collect maximum number of objects.
-        retr_opts.maxObjects = self.config.batch_collector_size
-
         # Specify the root object from where we collect the rest of the objects
         obj_spec = vmodl.query.PropertyCollector.ObjectSpec()
+        obj_spec.obj = view_ref
         obj_spec.skip = True
         obj_spec.selectSet = [traversal_spec]
 
         # Create our filter spec from the above specs
         filter_spec = vmodl.query.PropertyCollector.FilterSpec()
         filter_spec.propSet = property_specs
+        filter_spec.objectSet = [obj_spec]
+        return filter_spec
+
+    @smart_retry
+    def _get_raw_infrastructure(self):
+        # type: () -> List[vmodl.query.PropertyCollector.ObjectContent]
+        """Traverse the whole vSphere infrastructure and returns the list of raw pyvmomi MOR objects with
+        the required pre-fetched attributes."""
+        content = self._conn.content  # vim.ServiceInstanceContent reference from the connection
+
+        retr_opts = vmodl.query.PropertyCollector.RetrieveOptions()
+        # To limit the number of objects retrieved per call.
+        # If batch_collector_size is 0, collect maximum number of objects.
+        retr_opts.maxObjects = self.config.batch_collector_size
 
         view_ref = content.viewManager.CreateContainerView(content.rootFolder, ALL_RESOURCES, True)
         try:
-            obj_spec.obj = view_ref
-            filter_spec.objectSet = [obj_spec]
+            filter_spec = self._get_infrastructure_filter_spec(view_ref)
 
             # Collect the objects and their properties
             res = content.propertyCollector.RetrievePropertiesEx([filter_spec], retr_opts)
@@ -223,6 +233,44 @@ class VSphereAPI(object):
 
         return obj_content_list
 
+    @smart_retry
+    def _wait_for_infrastructure_updates(self, version):
+        # type: (str) -> Tuple[str, bool, List[vmodl.query.PropertyCollector.ObjectUpdate]]
+        """Return the changes of the infrastructure since the given version of the infrastructure filter, along with
+        the new version and whether the changes are the whole infrastructure.
+
+        The filter is created on a property collector of its own the first time, and again whenever the connection
+        is renewed. Its first update set then contains every object of the infrastructure, whatever the version."""
+        if self._infrastructure_collector is None:
+            content = self._conn.content
+            collector = content.propertyCollector.CreatePropertyCollector()
+            view_ref = content.viewManager.CreateContainerView(content.rootFolder, ALL_RESOURCES, True)
+            collector.CreateFilter(self._get_infrastructure_filter_spec(view_ref), partialUpdates=False)
+            self._infrastructure_collector = collector
+            version = ''
+
+        wait_opts = vmodl.query.PropertyCollector.WaitOptions()
+        # Return the pending updates without waiting for new ones
+        wait_opts.maxWaitSeconds = 0
+        if self.config.batch_collector_size > 0:
+            # To limit the number of objects retrieved per call.
+            wait_opts.maxObjectUpdates = self.config.batch_collector_size
+
+        is_full = version == ''
+        object_updates = []  # type: List[vmodl.query.PropertyCollector.ObjectUpdate]
+        while True:
+            update_set = self._infrastructure_collector.WaitForUpdatesEx(version, wait_opts)
+            if update_set is None:
+                # No more updates
+                break
+            version = update_set.version
+            for filter_update in update_set.filterSet or []:
+                object_updates.extend(filter_update.objectSet or [])
+            if not update_set.truncated:
+                break
+
+        return version, is_full, object_updates
+
     @smart_retry
     def _fetch_all_attributes(self):
         # type: () -> List[vim.CustomFieldsManager.FieldDef]
@@ -259,26 +307,80 @@ class VSphereAPI(object):
         root_folder = self._conn.content.rootFolder
         infrastructure_data[root_folder] = {"name": root_folder.name, "parent": None}
 
-        if self.config.should_collect_attributes:
-            # Clean up attributes in infrastructure_data,
-            # at this point they are custom pyvmomi objects and the attribute keys are not resolved.
+        self._resolve_attributes(infrastructure_data)
+        return cast(InfrastructureData, infrastructure_data)
 
-            attribute_keys = {x.key: x.name for x in self._fetch_all_attributes()}
-            for props in itervalues(infrastructure_data):
-                mor_attributes = []
-                if 'customValue' not in props:
+    def get_infrastructure_updates(self, version):
+        # type: (str) -> Tuple[str, bool, InfrastructureData, Set[vim.ManagedEntity]]
+        """Return the changes of the infrastructure since the given version, as reported by a property collector
+        filter kept across calls. The changes are the whole infrastructure for an empty version, or if the filter
+        had to be created again.
+
+        :return: (
+            <NEW_VERSION>,
+            <WHETHER_THE_CHANGES_ARE_THE_WHOLE_INFRASTRUCTURE>,
+            {
+                'vim.VirtualMachine-VM0': {
+                    'name': 'VM-0',
+                    ...
+                }
+                ...
+            },
+            {<DELETED_MOR>, ...}
+        )
+        Only the modified properties of the mors are given, a property set to None was removed.
+        """
+        version, is_full, object_updates = self._wait_for_infrastructure_updates(version)
+
+        updated_data = {}  # type: InfrastructureData
+        deleted_mors = set()  # type: Set[vim.ManagedEntity]
+        for object_update in object_updates:
+            mor = object_update.obj
+            if object_update.kind == 'leave':
+                updated_data.pop(mor, None)
+                deleted_mors.add(mor)
+                continue
+
+            deleted_mors.discard(mor)
+            props = updated_data.setdefault(mor, {})
+            for change in object_update.changeSet or []:
+                if change.op in ('remove', 'indirectRemove'):
+                    props[change.name] = None
+                else:
+                    props[change.name] = change.val
+
+        if is_full:
+            # Add the root folder entity as it is not part of the container view.
+            root_folder = self._conn.content.rootFolder
+            updated_data[root_folder] = {"name": root_folder.name, "parent": None}
+
+        self._resolve_attributes(updated_data)
+        return version, is_full, cast(InfrastructureData, updated_data), deleted_mors
+
+    def _resolve_attributes(self, infrastructure_data):
+        # type: (InfrastructureData) -> None
+        if not self.config.should_collect_attributes:
+            return
+
+        # Clean up attributes in infrastructure_data,
+        # at this point they are custom pyvmomi objects and the attribute keys are not resolved.
+        attribute_keys = None
+        for props in itervalues(infrastructure_data):
+            mor_attributes = []
+            if 'customValue' not in props:
+                continue
+            if attribute_keys is None:
+                attribute_keys = {x.key: x.name for x in self._fetch_all_attributes()}
+            for attribute in props.pop('customValue') or []:
+                # The attribute key is always unique
+                attr_key_name = attribute_keys.get(attribute.key)
+                if attr_key_name is None:
+                    self.log.debug("Unable to resolve attribute key with ID: %s", attribute.key)
                     continue
-                for attribute in props.pop('customValue'):
-                    # The attribute key is always unique
-                    attr_key_name = attribute_keys.get(attribute.key)
-                    if attr_key_name is None:
-                        self.log.debug("Unable to resolve attribute key with ID: %s", attribute.key)
-                        continue
-                    attr_value = attribute.value
-                    mor_attributes.append("{}{}:{}".format(self.config.attr_prefix, attr_key_name, attr_value))
-
-                props['attributes'] = mor_attributes
-        return cast(InfrastructureData, infrastructure_data)
+                attr_value = attribute.value
+                mor_attributes.append("{}{}:{}".format(self.config.attr_prefix, attr_key_name, attr_value))
+
+            props['attributes'] = mor_attributes
 
     @smart_retry
     def query_metrics(self, query_specs):
@@ -2,13 +2,20 @@
 # All rights reserved
 # Licensed under Simplified BSD License (see LICENSE)
 import time
+from collections import defaultdict
 from contextlib import contextmanager
-from typing import Any, Dict, Generator, Iterator, List, Type  # noqa: F401
+from typing import Any, DefaultDict, Dict, Generator, Iterator, List, Set, Type  # noqa: F401
 
 from pyVmomi import vim  # noqa: F401
-from six import iterkeys
+from six import iteritems, iterkeys
 
-from datadog_checks.vsphere.types import CounterId, MetricName, ResourceTags  # noqa: F401
+from datadog_checks.vsphere.types import (  # noqa: F401
+    CounterId,
+    InfrastructureData,
+    InfrastructureDataItem,
+    MetricName,
+    ResourceTags,
+)
 
 
 class VSphereCache(object):
@@ -148,3 +155,94 @@ class InfrastructureCache(VSphereCache):
         if mor_type not in self._mors:
             self._mors[mor_type] = {}
         self._mors[mor_type][mor] = mor_data
+
+    def delete_mor_props(self, mor):
+        # type: (vim.ManagedEntity) -> None
+        self._mors.get(type(mor), {}).pop(mor, None)
+
+
+class InfrastructureInventory(object):
+    """The raw properties of all the resources of the infrastructure, kept up to date with the changes reported
+    by `VSphereAPI.get_infrastructure_updates`.
+
+    The resources are indexed by the resources they reference as `parent` or `runtime.host`, which their tags
+    and filters are based on. When a resource changes, only the resources depending on it are processed again.
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self.version = ''
+        self.data = {}  # type: InfrastructureData
+        self._dependents = defaultdict(set)  # type: DefaultDict[vim.ManagedEntity, Set[vim.ManagedEntity]]
+
+    def reset(self):
+        # type: () -> None
+        """Forget all the resources, the next changes will be requested for the whole infrastructure."""
+        self.version = ''
+        self.data = {}
+        self._dependents.clear()
+
+    def apply_updates(self, version, is_full, updated_data, deleted_mors):
+        # type: (str, bool, InfrastructureData, Set[vim.ManagedEntity]) -> Set[vim.ManagedEntity]
+        """Apply the changes returned by `VSphereAPI.get_infrastructure_updates`.
+
+        :return: The resources that were created, modified or deleted, along with all the resources depending on them.
+        """
+        if is_full:
+            self.reset()
+        self.version = version
+
+        changed_mors = set()  # type: Set[vim.ManagedEntity]
+        for mor in deleted_mors:
+            props = self.data.pop(mor, None)
+            if props is not None:
+                self._unlink(mor, props)
+                changed_mors.add(mor)
+
+        for mor, changes in iteritems(updated_data):
+            old_props = self.data.get(mor)
+            new_props = {} if old_props is None else old_props.copy()  # type: InfrastructureDataItem
+            for name, value in iteritems(changes):
+                if value is None:
+                    new_props.pop(name, None)
+                else:
+                    new_props[name] = value
+            if new_props == old_props:
+                continue
+
+            if old_props is not None:
+                self._unlink(mor, old_props)
+            self._link(mor, new_props)
+            self.data[mor] = new_props
+            changed_mors.add(mor)
+
+        # Go down the resources depending on the changed ones
+        affected_mors = set()  # type: Set[vim.ManagedEntity]
+        pending_mors = list(changed_mors)
+        while pending_mors:
+            mor = pending_mors.pop()
+            if mor in affected_mors:
+                continue
+            affected_mors.add(mor)
+            pending_mors.extend(self._dependents.get(mor, ()))
+
+        return affected_mors
+
+    def _link(self, mor, props):
+        # type: (vim.ManagedEntity, InfrastructureDataItem) -> None
+        for name in ('parent', 'runtime.host'):
+            referenced = props.get(name)
+            if referenced is not None:
+                self._dependents[referenced].add(mor)
+
+    def _unlink(self, mor, props):
+        # type: (vim.ManagedEntity, InfrastructureDataItem) -> None
+        for name in ('parent', 'runtime.host'):
+            referenced = props.get(name)
+            if referenced is None:
+                continue
+            dependents = self._dependents.get(referenced)
+            if dependents is not None:
+                dependents.discard(mor)
+                if not dependents:
+                    del self._dependents[referenced]
@@ -49,6 +49,10 @@ UNLIMITED_HIST_METRICS_PER_QUERY = float('inf')
 DEFAULT_MAX_QUERY_METRICS = 256  # type: float
 MAX_QUERY_METRICS_OPTION = "config.vpxd.stats.maxQueryMetrics"
 DEFAULT_THREAD_COUNT = 4
+# Duration and number of values per query aimed at with `adaptive_metrics_per_query`. Queries well below the
+# realtime sampling interval let all the batches of a check run complete within it.
+ADAPTIVE_QUERY_TARGET_TIME = 4  # seconds
+ADAPTIVE_QUERY_TARGET_SERIES = 10000
 
 DEFAULT_REFRESH_METRICS_METADATA_CACHE_INTERVAL = 1800
 DEFAULT_REFRESH_INFRASTRUCTURE_CACHE_INTERVAL = 300
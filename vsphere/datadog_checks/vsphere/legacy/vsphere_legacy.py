@@ -185,13 +185,16 @@ class VSphereLegacyCheck(AgentCheck):
         self.pool.join()
         assert self.pool.get_nworkers() == 0
 
-    def stop_pool(self):
+    def stop_pool(self, tags=None):
         self.log.info("Stopping Thread Pool, waiting for queued jobs to finish")
+        # Sample the state of the pool once all the jobs are queued, before its workers exit
+        self.pool.submit_gauges(self, 'datadog.agent.vsphere.thread_pool', tags=tags)
         for _ in self.pool._workers:
             self.pool._workq.put(SENTINEL)
         self.pool.close()
         self.pool.join()
         assert self.pool.get_nworkers() == 0
+        self.pool.submit_metrics(self, 'datadog.agent.vsphere.thread_pool', tags=tags, gauges=False)
 
     def _query_event(self, instance):
         i_key = self._instance_key(instance)
@@ -984,6 +987,7 @@ class VSphereLegacyCheck(AgentCheck):
         )
         try:
             self.exception_printed = 0
+            custom_tags = instance.get('tags', []) + ['instance:{}'.format(self._instance_key(instance))]
 
             # First part: make sure our object repository is neat & clean
             if self._should_cache(instance, CacheConfig.Metadata):
@@ -998,7 +1002,7 @@ class VSphereLegacyCheck(AgentCheck):
             self._process_mor_objects_queue(instance)
             # Remove old objects that might be gone from the Mor cache
             self.mor_cache.purge(self._instance_key(instance), self.clean_morlist_interval)
-            self.stop_pool()
+            self.stop_pool(tags=custom_tags + ['thread_pool:mor_objects_queue'])
 
             # Second part: do the job
             self.start_pool()
@@ -1007,7 +1011,7 @@ class VSphereLegacyCheck(AgentCheck):
                 self._query_event(instance)
                 self.set_external_tags(self.get_external_host_tags())
 
-            self.stop_pool()
+            self.stop_pool(tags=custom_tags + ['thread_pool:collect_metrics'])
 
             if self.exception_printed > 0:
                 self.log.error("One thread in the pool crashed, check the logs")
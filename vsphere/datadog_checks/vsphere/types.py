@@ -2,7 +2,7 @@
 # All rights reserved
 # Licensed under a 3-clause BSD style license (see LICENSE)
 
-from typing import Any, Dict, List, Optional, Pattern, Type, TypedDict
+from typing import Any, Dict, List, Optional, Pattern, Tuple, Type, TypedDict
 
 # CONFIG ALIASES
 from pyVmomi import vim
@@ -27,6 +27,7 @@ InstanceConfig = TypedDict(
         'max_historical_metrics': int,
         'threads_count': int,
         'metrics_per_query': int,
+        'adaptive_metrics_per_query': bool,
         'batch_property_collector_size': int,
         'batch_tags_collector_size': int,
         'collect_events': bool,
@@ -39,6 +40,7 @@ InstanceConfig = TypedDict(
         'excluded_host_tags': List[str],
         'tags': List[str],
         'refresh_infrastructure_cache_interval': int,
+        'incremental_infrastructure_cache': bool,
         'refresh_metrics_metadata_cache_interval': int,
         'resource_filters': List[ResourceFilterConfig],
         'metric_filters': MetricFilterConfig,
@@ -51,6 +53,8 @@ InstanceConfig = TypedDict(
 # CHECK ALIASES
 MetricName = str
 CounterId = int
+# The metric name, the instance tag key if values are collected per instance, and whether the metric is a percentage
+MetricSubmission = Tuple[str, Optional[str], bool]
 
 InfrastructureDataItem = TypedDict(
     'InfrastructureDataItem',
@@ -1,7 +1,8 @@
 # (C) Datadog, Inc. 2019-present
 # All rights reserved
 # Licensed under Simplified BSD License (see LICENSE)
-from typing import List, Optional, Type  # noqa: F401
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple, Type  # noqa: F401
 
 from pyVmomi import vim
 from six import iteritems
@@ -10,7 +11,12 @@ from datadog_checks.base import to_string
 from datadog_checks.vsphere.config import VSphereConfig  # noqa: F401
 from datadog_checks.vsphere.constants import MOR_TYPE_AS_STRING, REFERENCE_METRIC, SHORT_ROLLUP
 from datadog_checks.vsphere.resource_filters import ResourceFilter, match_any_regex  # noqa: F401
-from datadog_checks.vsphere.types import InfrastructureData, MetricFilters, MetricName  # noqa: F401
+from datadog_checks.vsphere.types import (  # noqa: F401
+    InfrastructureData,
+    InfrastructureDataItem,
+    MetricFilters,
+    MetricName,
+)
 
 METRIC_TO_INSTANCE_TAG_MAPPING = {
     # Structure:
@@ -85,22 +91,10 @@ def is_metric_excluded_by_filters(metric_name, mor_type, metric_filters):
     return True
 
 
-def get_tags_recursively(mor, infrastructure_data, config, include_only=None):
-    # type: (vim.ManagedEntity, InfrastructureData, VSphereConfig, Optional[List[str]]) -> List[str]
-    """Go up the resources hierarchy from the given mor. Note that a host running a VM is not considered to be a
-    parent of that VM.
-
-    rootFolder(vim.Folder):
-      - vm(vim.Folder):
-          VM1-1
-          VM1-2
-      - host(vim.Folder):
-          HOST1
-          HOST2
-
-    """
+def get_entity_tags(mor, properties, config):
+    # type: (vim.ManagedEntity, InfrastructureDataItem, VSphereConfig) -> List[str]
+    """The tags a resource passes down to the resources below it in the hierarchy."""
     tags = []
-    properties = infrastructure_data.get(mor, {})
     entity_name = to_string(properties.get('name', 'unknown'))
     if isinstance(mor, vim.HostSystem):
         tags.append('vsphere_host:{}'.format(entity_name))
@@ -120,20 +114,86 @@ def get_tags_recursively(mor, infrastructure_data, config, include_only=None):
         tags.append('vsphere_datacenter:{}'.format(entity_name))
     elif isinstance(mor, vim.Datastore):
         tags.append('vsphere_datastore:{}'.format(entity_name))
+    return tags
 
-    parent = infrastructure_data.get(mor, {}).get('parent')
-    if parent is None:
-        return tags
-    tags.extend(get_tags_recursively(parent, infrastructure_data, config))
-    if not include_only:
+
+class HierarchyTags(object):
+    """Compute the tags of the resources hierarchy, as `get_tags_recursively` does, once per resource.
+    The tags of a resource are built on top of the tags of its parent, which are computed first and shared by all
+    its children. The tags are stored as tuples, they must not be modified.
+
+    The tags of the resources which changed in `infrastructure_data`, and of all the resources below them,
+    must be discarded with `invalidate`.
+    """
+
+    def __init__(self, infrastructure_data, config):
+        # type: (InfrastructureData, VSphereConfig) -> None
+        self._infrastructure_data = infrastructure_data
+        self._config = config
+        self._tags = {}  # type: Dict[vim.ManagedEntity, Tuple[str, ...]]
+        self._filtered_tags = {}  # type: Dict[Tuple[vim.ManagedEntity, Tuple[str, ...]], Tuple[str, ...]]
+
+    def get(self, mor, include_only=None):
+        # type: (vim.ManagedEntity, Optional[List[str]]) -> Tuple[str, ...]
+        tags = self._tags.get(mor)
+        if tags is None:
+            tags = self._compute(mor)
+        if not include_only or self._infrastructure_data.get(mor, {}).get('parent') is None:
+            # The tags of a resource without parent are never filtered
+            return tags
+
+        key = (mor, tuple(include_only))
+        filtered_tags = self._filtered_tags.get(key)
+        if filtered_tags is None:
+            prefixes = tuple(prefix + ':' for prefix in include_only)
+            filtered_tags = self._filtered_tags[key] = tuple(tag for tag in tags if tag.startswith(prefixes))
+        return filtered_tags
+
+    def invalidate(self, mors):
+        # type: (Iterable[vim.ManagedEntity]) -> None
+        for mor in mors:
+            self._tags.pop(mor, None)
+        if self._filtered_tags:
+            self._filtered_tags = {k: v for k, v in iteritems(self._filtered_tags) if k[0] in self._tags}
+
+    def _compute(self, mor):
+        # type: (vim.ManagedEntity) -> Tuple[str, ...]
+        # Go up the hierarchy until a resource with known tags, then compute the tags of each resource on the way
+        # down, from the topmost one.
+        path = []
+        parent_tags = ()  # type: Tuple[str, ...]
+        current = mor  # type: Optional[vim.ManagedEntity]
+        while current is not None:
+            known_tags = self._tags.get(current)
+            if known_tags is not None:
+                parent_tags = known_tags
+                break
+            path.append(current)
+            current = self._infrastructure_data.get(current, {}).get('parent')
+
+        tags = parent_tags
+        for current in reversed(path):
+            properties = self._infrastructure_data.get(current, {})
+            tags = self._tags[current] = tuple(get_entity_tags(current, properties, self._config)) + tags
         return tags
-    filtered_tags = []
-    for tag in tags:
-        for prefix in include_only:
-            if not tag.startswith(prefix + ":"):
-                continue
-            filtered_tags.append(tag)
-    return filtered_tags
+
+
+def get_tags_recursively(mor, infrastructure_data, config, include_only=None):
+    # type: (vim.ManagedEntity, InfrastructureData, VSphereConfig, Optional[List[str]]) -> List[str]
+    """Go up the resources hierarchy from the given mor. Note that a host running a VM is not considered to be a
+    parent of that VM.
+
+    rootFolder(vim.Folder):
+      - vm(vim.Folder):
+          VM1-1
+          VM1-2
+      - host(vim.Folder):
+          HOST1
+          HOST2
+
+    Use `HierarchyTags` to get the tags of many resources.
+    """
+    return list(HierarchyTags(infrastructure_data, config).get(mor, include_only))
 
 
 def should_collect_per_instance_values(config, metric_name, resource_type):
@@ -154,3 +214,45 @@ def get_mapped_instance_tag(metric_name):
         if metric_name.startswith(prefix):
             return tag_key
     return 'instance'
+
+
+class AdaptiveBatchSize(object):
+    """Tune the number of metrics queried at once for each resource type, from the duration and the number of values
+    of the previous queries. Each query suggests the batch size that would have met the targets, and the batch size
+    moves halfway towards it. A single query can at most double or halve the batch size it was made with.
+
+    Queries can be recorded from multiple threads.
+    """
+
+    def __init__(self, target_time, target_series):
+        # type: (float, int) -> None
+        self._target_time = target_time
+        self._target_series = target_series
+        self._sizes = {}  # type: Dict[Type[vim.ManagedEntity], float]
+        self._lock = threading.Lock()
+
+    def get(self, resource_type, default):
+        # type: (Type[vim.ManagedEntity], float) -> float
+        """:return The tuned batch size of the resource type, or `default` when no query was recorded yet."""
+        size = self._sizes.get(resource_type)
+        if size is None:
+            return default
+        return int(size)
+
+    def record(self, resource_type, batch_size, elapsed, series_count):
+        # type: (Type[vim.ManagedEntity], int, float, int) -> None
+        """Record a query of `batch_size` metrics that returned `series_count` series in `elapsed` seconds."""
+        load = max(elapsed / self._target_time, series_count / float(self._target_series))
+        ratio = 2.0 if load <= 0.5 else max(1 / load, 0.5)
+        self._update(resource_type, batch_size * ratio)
+
+    def record_failure(self, resource_type, batch_size):
+        # type: (Type[vim.ManagedEntity], int) -> None
+        """Record a query of `batch_size` metrics that failed, possibly because it was too large."""
+        self._update(resource_type, batch_size * 0.5)
+
+    def _update(self, resource_type, suggested_size):
+        # type: (Type[vim.ManagedEntity], float) -> None
+        with self._lock:
+            size = self._sizes.get(resource_type, suggested_size)
+            self._sizes[resource_type] = max((size + suggested_size) / 2, 1.0)
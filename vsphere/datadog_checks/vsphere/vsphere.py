@@ -8,7 +8,7 @@ import logging
 from collections import defaultdict
 from concurrent.futures import as_completed
 from concurrent.futures.thread import ThreadPoolExecutor
-from typing import Any, Dict, Generator, Iterable, List, Set, Type, cast  # noqa: F401
+from typing import Any, Dict, Generator, Iterable, List, Optional, Set, Tuple, Type, cast  # noqa: F401
 
 from pyVmomi import vim, vmodl
 from six import iteritems
@@ -18,9 +18,11 @@ from datadog_checks.base.checks.libs.timer import Timer
 from datadog_checks.base.utils.time import get_current_datetime, get_timestamp
 from datadog_checks.vsphere.api import APIConnectionError, VSphereAPI
 from datadog_checks.vsphere.api_rest import VSphereRestAPI
-from datadog_checks.vsphere.cache import InfrastructureCache, MetricsMetadataCache
+from datadog_checks.vsphere.cache import InfrastructureCache, InfrastructureInventory, MetricsMetadataCache
 from datadog_checks.vsphere.config import VSphereConfig
 from datadog_checks.vsphere.constants import (
+    ADAPTIVE_QUERY_TARGET_SERIES,
+    ADAPTIVE_QUERY_TARGET_TIME,
     DEFAULT_MAX_QUERY_METRICS,
     HISTORICAL_RESOURCES,
     MAX_QUERY_METRICS_OPTION,
@@ -36,14 +38,16 @@ from datadog_checks.vsphere.types import (
     InfrastructureDataItem,  # noqa: F401
     InstanceConfig,
     MetricName,  # noqa: F401
+    MetricSubmission,  # noqa: F401
     MorBatch,  # noqa: F401
     ResourceTags,  # noqa: F401
 )
 from datadog_checks.vsphere.utils import (
     MOR_TYPE_AS_STRING,
+    AdaptiveBatchSize,
+    HierarchyTags,
     format_metric_name,
     get_mapped_instance_tag,
-    get_tags_recursively,
     is_metric_excluded_by_filters,
     is_resource_collected_by_filters,
     should_collect_per_instance_values,
@@ -80,9 +84,17 @@ class VSphereCheck(AgentCheck):
 
         self.latest_event_query = get_current_datetime()
         self.infrastructure_cache = InfrastructureCache(interval_sec=self._config.refresh_infrastructure_cache_interval)
+        # Only used with `incremental_infrastructure_cache`
+        self.infrastructure_inventory = InfrastructureInventory()
+        # The hierarchy tags of the infrastructure the infrastructure_cache was built from
+        self.hierarchy_tags = HierarchyTags({}, self._config)
         self.metrics_metadata_cache = MetricsMetadataCache(
             interval_sec=self._config.refresh_metrics_metadata_cache_interval
         )
+        # See `get_metrics_submission_table`
+        self.metrics_submission_tables = {}  # type: Dict[Type[vim.ManagedEntity], Dict[CounterId, MetricSubmission]]
+        # Only used with `adaptive_metrics_per_query`
+        self.batch_size = AdaptiveBatchSize(ADAPTIVE_QUERY_TARGET_TIME, ADAPTIVE_QUERY_TARGET_SERIES)
         self.api = cast(VSphereAPI, None)
         self.api_rest = cast(VSphereRestAPI, None)
         # Do not override `AgentCheck.hostname`
@@ -143,6 +155,8 @@ class VSphereCheck(AgentCheck):
         )
         self.log.debug("Collected %d counters metadata in %.3f seconds.", len(counters), t0.total())
 
+        self.metrics_submission_tables = {}
+
         for mor_type in self._config.collected_resource_types:
             allowed_counters = []
             for c in counters:
@@ -217,84 +231,150 @@ class VSphereCheck(AgentCheck):
         self.log.debug("Infrastructure cache refreshed in %.3f seconds.", t0.total())
         self.log.debug("Infrastructure cache: %s", infrastructure_data)
 
+        self.set_infrastructure_cache(infrastructure_data)
+
+    def update_infrastructure_cache(self):
+        # type: () -> bool
+        """Fetch the changes of the infrastructure since the previous check run and apply them to the
+        infrastructure_cache. Only the resources depending on the created, modified or deleted ones are processed
+        again. When the infrastructure_cache expires, it is built again from the known infrastructure to collect
+        the vSphere tags, without fetching the complete infrastructure.
+        :return True if the infrastructure_cache changed."""
+        inventory = self.infrastructure_inventory
+        self.log.debug("Updating the infrastructure cache from version '%s'...", inventory.version)
+        t0 = Timer()
+        try:
+            version, is_full, updated_data, deleted_mors = self.api.get_infrastructure_updates(inventory.version)
+            affected_mors = inventory.apply_updates(version, is_full, updated_data, deleted_mors)
+            self.gauge(
+                "datadog.vsphere.refresh_infrastructure_cache.time",
+                t0.total(),
+                tags=self._config.base_tags,
+                raw=True,
+                hostname=self._hostname,
+            )
+            self.log.debug(
+                "Infrastructure cache updated in %.3f seconds, %d resources affected.", t0.total(), len(affected_mors)
+            )
+
+            if is_full or self.infrastructure_cache.is_expired():
+                with self.infrastructure_cache.update():
+                    self.set_infrastructure_cache(inventory.data)
+                return True
+
+            # The affected mors include all the resources below the changed ones in the hierarchy
+            self.hierarchy_tags.invalidate(affected_mors)
+            for mor in affected_mors:
+                self.cache_mor(mor, inventory.data)
+        except Exception:
+            # Start over from the complete infrastructure at the next check run
+            inventory.reset()
+            raise
+
+        return bool(affected_mors)
+
+    def set_infrastructure_cache(self, infrastructure_data):
+        # type: (InfrastructureData) -> None
+        """Generate tags for each monitored resources of the given infrastructure and store all of that
+        into the infrastructure_cache."""
         all_tags = {}
         if self._config.should_collect_tags:
             all_tags = self.collect_tags(infrastructure_data)
         self.infrastructure_cache.set_all_tags(all_tags)
 
-        for mor, properties in iteritems(infrastructure_data):
-            if not isinstance(mor, tuple(self._config.collected_resource_types)):
-                # Do nothing for the resource types we do not collect
-                continue
-
-            mor_name = to_string(properties.get("name", "unknown"))
-            mor_type_str = MOR_TYPE_AS_STRING[type(mor)]
-            hostname = None
-            tags = []
-
-            if isinstance(mor, vim.VirtualMachine):
-                power_state = properties.get("runtime.powerState")
-                if power_state != vim.VirtualMachinePowerState.poweredOn:
-                    # Skipping because the VM is not powered on
-                    # TODO: Sometimes VM are "poweredOn" but "disconnected" and thus have no metrics
-                    self.log.debug("Skipping VM %s in state %s", mor_name, to_string(power_state))
-                    continue
-
-                # Hosts are not considered as parents of the VMs they run, we use the `runtime.host` property
-                # to get the name of the ESXi host
-                runtime_host = properties.get("runtime.host")
-                runtime_host_props = {}  # type: InfrastructureDataItem
-                if runtime_host:
-                    if runtime_host in infrastructure_data:
-                        runtime_host_props = infrastructure_data.get(runtime_host, {})
-                    else:
-                        self.log.debug("Missing runtime.host details for VM %s", mor_name)
-                runtime_hostname = to_string(runtime_host_props.get("name", "unknown"))
-                tags.append('vsphere_host:{}'.format(runtime_hostname))
+        self.hierarchy_tags = HierarchyTags(infrastructure_data, self._config)
+        for mor in infrastructure_data:
+            self.cache_mor(mor, infrastructure_data)
+
+    def cache_mor(self, mor, infrastructure_data):
+        # type: (vim.ManagedEntity, InfrastructureData) -> None
+        """Generate the tags and the `hostname` property of a resource and store them into the infrastructure_cache,
+        or remove the resource from the infrastructure_cache if it is not monitored."""
+        properties = infrastructure_data.get(mor)
+        if properties is None or not isinstance(mor, tuple(self._config.collected_resource_types)):
+            # Do nothing for the resource types we do not collect
+            self.infrastructure_cache.delete_mor_props(mor)
+            return
 
-                if self._config.use_guest_hostname:
-                    hostname = properties.get("guest.hostName", mor_name)
+        mor_name = to_string(properties.get("name", "unknown"))
+        mor_type_str = MOR_TYPE_AS_STRING[type(mor)]
+        hostname = None
+        tags = []
+
+        if isinstance(mor, vim.VirtualMachine):
+            power_state = properties.get("runtime.powerState")
+            if power_state != vim.VirtualMachinePowerState.poweredOn:
+                # Skipping because the VM is not powered on
+                # TODO: Sometimes VM are "poweredOn" but "disconnected" and thus have no metrics
+                self.log.debug("Skipping VM %s in state %s", mor_name, to_string(power_state))
+                self.infrastructure_cache.delete_mor_props(mor)
+                return
+
+            # Hosts are not considered as parents of the VMs they run, we use the `runtime.host` property
+            # to get the name of the ESXi host
+            runtime_host = properties.get("runtime.host")
+            runtime_host_props = {}  # type: InfrastructureDataItem
+            if runtime_host:
+                if runtime_host in infrastructure_data:
+                    runtime_host_props = infrastructure_data.get(runtime_host, {})
                 else:
-                    hostname = mor_name
-            elif isinstance(mor, vim.HostSystem):
-                hostname = mor_name
+                    self.log.debug("Missing runtime.host details for VM %s", mor_name)
+            runtime_hostname = to_string(runtime_host_props.get("name", "unknown"))
+            tags.append('vsphere_host:{}'.format(runtime_hostname))
+
+            if self._config.use_guest_hostname:
+                hostname = properties.get("guest.hostName", mor_name)
             else:
-                tags.append('vsphere_{}:{}'.format(mor_type_str, mor_name))
-
-            parent = properties.get('parent')
-            runtime_host = properties.get('runtime.host')
-            if parent is not None:
-                tags.extend(get_tags_recursively(parent, infrastructure_data, self._config))
-            if runtime_host is not None:
-                tags.extend(
-                    get_tags_recursively(
-                        runtime_host, infrastructure_data, self._config, include_only=['vsphere_cluster']
-                    )
-                )
-            tags.append('vsphere_type:{}'.format(mor_type_str))
-
-            # Attach tags from fetched attributes.
-            tags.extend(properties.get('attributes', []))
-
-            resource_tags = self.infrastructure_cache.get_mor_tags(mor) + tags
-            if not is_resource_collected_by_filters(
-                mor,
-                infrastructure_data,
-                self._config.resource_filters,
-                resource_tags,
-            ):
-                # The resource does not match the specified whitelist/blacklist patterns.
-                self.log.debug(
-                    "Skipping resource not matched by filters. resource=`%s` tags=`%s`", mor_name, resource_tags
-                )
-                continue
+                hostname = mor_name
+        elif isinstance(mor, vim.HostSystem):
+            hostname = mor_name
+        else:
+            tags.append('vsphere_{}:{}'.format(mor_type_str, mor_name))
+
+        parent = properties.get('parent')
+        runtime_host = properties.get('runtime.host')
+        if parent is not None:
+            tags.extend(self.hierarchy_tags.get(parent))
+        if runtime_host is not None:
+            tags.extend(self.hierarchy_tags.get(runtime_host, include_only=['vsphere_cluster']))
+        tags.append('vsphere_type:{}'.format(mor_type_str))
+
+        # Attach tags from fetched attributes.
+        tags.extend(properties.get('attributes', []))
+
+        resource_tags = self.infrastructure_cache.get_mor_tags(mor) + tags
+        if not is_resource_collected_by_filters(
+            mor,
+            infrastructure_data,
+            self._config.resource_filters,
+            resource_tags,
+        ):
+            # The resource does not match the specified whitelist/blacklist patterns.
+            self.log.debug("Skipping resource not matched by filters. resource=`%s` tags=`%s`", mor_name, resource_tags)
+            self.infrastructure_cache.delete_mor_props(mor)
+            return
 
-            mor_payload = {"tags": tags}  # type: Dict[str, Any]
+        mor_payload = {"tags": tags}  # type: Dict[str, Any]
 
-            if hostname:
-                mor_payload['hostname'] = hostname
+        if hostname:
+            mor_payload['hostname'] = hostname
 
-            self.infrastructure_cache.set_mor_props(mor, mor_payload)
+        self.infrastructure_cache.set_mor_props(mor, mor_payload)
+
+    def get_metrics_submission_table(self, resource_type):
+        # type: (Type[vim.ManagedEntity]) -> Dict[CounterId, MetricSubmission]
+        """Return how the values of each counter of the resource type are submitted, computed once per refresh of
+        the metrics metadata cache."""
+        table = self.metrics_submission_tables.get(resource_type)
+        if table is None:
+            table = {}
+            for counter_id, metric_name in iteritems(self.metrics_metadata_cache.get_metadata(resource_type)):
+                instance_tag_key = None
+                if should_collect_per_instance_values(self._config, metric_name, resource_type):
+                    instance_tag_key = get_mapped_instance_tag(metric_name)
+                table[counter_id] = (to_string(metric_name), instance_tag_key, metric_name in PERCENT_METRICS)
+            self.metrics_submission_tables[resource_type] = table
+        return table
 
     def submit_metrics_callback(self, query_results):
         # type: (List[vim.PerformanceManager.EntityMetricBase]) -> None
@@ -303,19 +383,18 @@ class VSphereCheck(AgentCheck):
 
         `query_results` currently contain results of one resource type in practice, but this function is generic
         and can handle results with mixed resource types.
+
+        Values are submitted as the results are read, except the aggregated values of the metrics collected per
+        instance. They are submitted at the end, only for the metrics without instance values.
         """
 
-        # `have_instance_value` is used later to avoid collecting aggregated metrics
+        # `have_instance_value` is used to avoid collecting aggregated metrics
         # when instance metrics are collected.
         have_instance_value = defaultdict(set)  # type: Dict[Type[vim.ManagedEntity], Set[MetricName]]
+        aggregated_values = []  # type: List[Tuple[Type[vim.ManagedEntity], str, float, Optional[str], List[str]]]
         for results_per_mor in query_results:
             resource_type = type(results_per_mor.entity)
-            metadata = self.metrics_metadata_cache.get_metadata(resource_type)
-            for result in results_per_mor.value:
-                if result.id.instance:
-                    have_instance_value[resource_type].add(metadata[result.id.counterId])
-
-        for results_per_mor in query_results:
+            table = self.get_metrics_submission_table(resource_type)
             mor_props = self.infrastructure_cache.get_mor_props(results_per_mor.entity)
             if mor_props is None:
                 self.log.debug(
@@ -323,25 +402,41 @@ class VSphereCheck(AgentCheck):
                     " you can increase the value of 'refresh_infrastructure_cache_interval'.",
                     results_per_mor.entity,
                 )
+                for result in results_per_mor.value:
+                    if result.id.instance and result.id.counterId in table:
+                        have_instance_value[resource_type].add(table[result.id.counterId][0])
                 continue
             self.log.debug(
                 "Retrieved mor props for entity %s: %s",
                 results_per_mor.entity,
                 mor_props,
             )
-            resource_type = type(results_per_mor.entity)
-            metadata = self.metrics_metadata_cache.get_metadata(resource_type)
+
+            vsphere_tags = self.infrastructure_cache.get_mor_tags(results_per_mor.entity)
+            mor_tags = mor_props['tags'] + vsphere_tags
+            if resource_type in HISTORICAL_RESOURCES:
+                # Tags are attached to the metrics
+                tags = mor_tags + self._config.base_tags
+                hostname = None
+            else:
+                # Tags are (mostly) submitted as external host tags.
+                hostname = to_string(mor_props.get('hostname'))
+                tags = []
+                if self._config.excluded_host_tags:
+                    tags.extend([t for t in mor_tags if t.split(":", 1)[0] in self._config.excluded_host_tags])
+                tags.extend(self._config.base_tags)
+
             for result in results_per_mor.value:
-                metric_name = metadata.get(result.id.counterId)
+                metric = table.get(result.id.counterId)
                 if self.log.isEnabledFor(logging.DEBUG):
                     # Use isEnabledFor to avoid unnecessary processing
                     self.log.debug(
                         "Processing metric `%s`: resource_type=`%s`, result=`%s`",
-                        metric_name,
+                        metric[0] if metric else None,
                         resource_type,
                         str(result).replace("\n", "\\n"),
                     )
-                if not metric_name:
+                if metric is None:
                     # Fail-safe
                     self.log.debug(
                         "Skipping value for counter %s, because the integration doesn't have metadata about it. If this"
@@ -350,8 +445,13 @@ class VSphereCheck(AgentCheck):
                     )
                     continue
 
+                metric_name, instance_tag_key, is_percent = metric
+                instance_value = result.id.instance
+                if instance_value:
+                    have_instance_value[resource_type].add(metric_name)
+
                 if not result.value:
-                    self.log.debug("Skipping metric %s because the value is empty", to_string(metric_name))
+                    self.log.debug("Skipping metric %s because the value is empty", metric_name)
                     continue
 
                 # Get the most recent value that isn't negative
@@ -360,52 +460,46 @@ class VSphereCheck(AgentCheck):
                     self.log.debug(
                         "Skipping metric %s because the value returned by vCenter"
                         " is negative (i.e. the metric is not yet available). values: %s",
-                        to_string(metric_name),
+                        metric_name,
                         list(result.value),
                     )
                     continue
 
-                tags = []
-                if should_collect_per_instance_values(self._config, metric_name, resource_type) and (
-                    metric_name in have_instance_value[resource_type]
-                ):
-                    instance_value = result.id.instance
+                value = valid_values[-1]
+                if is_percent:
+                    # Convert the percentage to a float.
+                    value /= 100.0
+
+                metric_tags = tags
+                if instance_tag_key is not None:
                     # When collecting per instance values, it's possible that both aggregated metric and per instance
                     # metrics are received. In that case, the metric with no instance value is skipped.
                     if not instance_value:
+                        aggregated_values.append((resource_type, metric_name, value, hostname, tags))
                         continue
-                    instance_tag_key = get_mapped_instance_tag(metric_name)
-                    tags.append('{}:{}'.format(instance_tag_key, instance_value))
-
-                vsphere_tags = self.infrastructure_cache.get_mor_tags(results_per_mor.entity)
-                mor_tags = mor_props['tags'] + vsphere_tags
-
-                if resource_type in HISTORICAL_RESOURCES:
-                    # Tags are attached to the metrics
-                    tags.extend(mor_tags)
-                    hostname = None
-                else:
-                    # Tags are (mostly) submitted as external host tags.
-                    hostname = to_string(mor_props.get('hostname'))
-                    if self._config.excluded_host_tags:
-                        tags.extend([t for t in mor_tags if t.split(":", 1)[0] in self._config.excluded_host_tags])
-
-                tags.extend(self._config.base_tags)
-
-                value = valid_values[-1]
-                if metric_name in PERCENT_METRICS:
-                    # Convert the percentage to a float.
-                    value /= 100.0
+                    metric_tags = ['{}:{}'.format(instance_tag_key, instance_value)] + tags
 
                 self.log.debug(
                     "Submit metric: name=`%s`, value=`%s`, hostname=`%s`, tags=`%s`",
                     metric_name,
                     value,
                     hostname,
-                    tags,
+                    metric_tags,
                 )
                 # vSphere "rates" should be submitted as gauges (rate is precomputed).
-                self.gauge(to_string(metric_name), value, hostname=hostname, tags=tags)
+                self.gauge(metric_name, value, hostname=hostname, tags=metric_tags)
+
+        for resource_type, metric_name, value, hostname, tags in aggregated_values:
+            if metric_name in have_instance_value[resource_type]:
+                continue
+            self.log.debug(
+                "Submit metric: name=`%s`, value=`%s`, hostname=`%s`, tags=`%s`",
+                metric_name,
+                value,
+                hostname,
+                tags,
+            )
+            self.gauge(metric_name, value, hostname=hostname, tags=tags)
 
     def query_metrics_wrapper(self, query_specs):
         # type: (List[vim.PerformanceManager.QuerySpec]) -> List[vim.PerformanceManager.EntityMetricBase]
@@ -413,16 +507,36 @@ class VSphereCheck(AgentCheck):
         Warning: called in threads
         """
         t0 = Timer()
-        metrics_values = self.api.query_metrics(query_specs)
+        try:
+            metrics_values = self.api.query_metrics(query_specs)
+        except vmodl.fault.InvalidArgument:
+            raise
+        except Exception:
+            if self._config.adaptive_metrics_per_query:
+                self.batch_size.record_failure(type(query_specs[0].entity), self.count_metric_ids(query_specs))
+            raise
+        elapsed = t0.total()
         self.histogram(
             'datadog.vsphere.query_metrics.time',
-            t0.total(),
+            elapsed,
             tags=self._config.base_tags,
             raw=True,
             hostname=self._hostname,
         )
+        if self._config.adaptive_metrics_per_query:
+            self.batch_size.record(
+                type(query_specs[0].entity),
+                self.count_metric_ids(query_specs),
+                elapsed,
+                sum(len(results_per_mor.value) for results_per_mor in metrics_values or []),
+            )
         return metrics_values
 
+    @staticmethod
+    def count_metric_ids(query_specs):
+        # type: (List[vim.PerformanceManager.QuerySpec]) -> int
+        return sum(len(query_spec.metricId) for query_spec in query_specs)
+
     def make_query_specs(self):
         # type: () -> Iterable[List[vim.PerformanceManager.QuerySpec]]
         """
@@ -489,8 +603,16 @@ class VSphereCheck(AgentCheck):
                     continue
 
                 try:
+                    t0 = Timer()
                     # Callback is called in the main thread
                     self.submit_metrics_callback(results)
+                    self.histogram(
+                        'datadog.vsphere.submit_metrics.time',
+                        t0.total(),
+                        tags=self._config.base_tags,
+                        raw=True,
+                        hostname=self._hostname,
+                    )
                 except Exception as e:
                     self.log.exception(
                         "Exception '%s' raised during the submit_metrics_callback. "
@@ -504,7 +626,8 @@ class VSphereCheck(AgentCheck):
         metric_ids,  # type: List[vim.PerformanceManager.MetricId]
         resource_type,  # type: Type[vim.ManagedEntity]
     ):  # type: (...) -> Generator[MorBatch, None, None]
-        """Iterates over mor and generate batches with a fixed number of metrics to query.
+        """Iterates over mor and generate batches with a fixed number of metrics to query. With
+        `adaptive_metrics_per_query`, the number of metrics is tuned from the previous queries of the resource type.
         Querying multiple resource types in the same call is error prone if we query a cluster metric. Indeed,
         cluster metrics result in an unpredictable number of internal metric queries which all count towards
         max_query_metrics. Therefore often collecting a single cluster metric can make the whole call to fail. That's
@@ -526,6 +649,12 @@ class VSphereCheck(AgentCheck):
             else:
                 max_batch_size = min(self._config.metrics_per_query, self._config.max_historical_metrics)
 
+        if self._config.adaptive_metrics_per_query and resource_type != vim.ClusterComputeResource:
+            max_batch_size = self.batch_size.get(resource_type, max_batch_size)
+            if resource_type not in REALTIME_RESOURCES and self._config.max_historical_metrics >= 0:
+                # vCenter denies queries with more historical metrics than `max_query_metrics`
+                max_batch_size = min(max_batch_size, self._config.max_historical_metrics)
+
         batch = defaultdict(list)  # type: MorBatch
         batch_size = 0
         for m in mors_filtered:
@@ -665,7 +794,11 @@ class VSphereCheck(AgentCheck):
                 self.refresh_metrics_metadata_cache()
 
         # Refresh the infrastructure cache
-        if self.infrastructure_cache.is_expired():
+        if self._config.incremental_infrastructure_cache:
+            if self.update_infrastructure_cache():
+                # Submit host tags as soon as we have fresh data
+                self.submit_external_host_tags()
+        elif self.infrastructure_cache.is_expired():
             with self.infrastructure_cache.update():
                 self.refresh_infrastructure_cache()
             # Submit host tags as soon as we have fresh data
@@ -27,6 +27,8 @@ class MockedAPI(object):
     def __init__(self, config, _=None):
         self.config = config
         self.infrastructure_data = {}
+        # Changes returned by `get_infrastructure_updates` after the whole infrastructure, as (updated, deleted) tuples
+        self.infrastructure_updates = []
         self.metrics_data = []
         self.mock_events = []
         self.server_time = dt.datetime.now()
@@ -90,6 +92,17 @@ class MockedAPI(object):
 
         return self.infrastructure_data
 
+    def get_infrastructure_updates(self, version):
+        if not version:
+            return '1', True, self.get_infrastructure(), set()
+
+        updated_data, deleted_mors = self.infrastructure_updates.pop(0) if self.infrastructure_updates else ({}, set())
+        for mor, props in iteritems(updated_data):
+            self.infrastructure_data.setdefault(mor, {}).update(props)
+        for mor in deleted_mors:
+            self.infrastructure_data.pop(mor, None)
+        return str(int(version) + 1), False, updated_data, deleted_mors
+
     def query_metrics(self, query_specs):
         if not self.metrics_data:
             metrics_filename = 'metrics_{}.json'.format(self.config.collection_type)
@@ -111,6 +111,68 @@ def test_get_infrastructure(realtime_instance):
         container_view.Destroy.assert_called_once()
 
 
+def test_get_infrastructure_updates(realtime_instance):
+    with patch('datadog_checks.vsphere.api.connect'):
+        config = VSphereConfig(realtime_instance, {}, MagicMock())
+        api = VSphereAPI(config, MagicMock())
+
+        container_view = api._conn.content.viewManager.CreateContainerView.return_value
+        container_view.__class__ = vim.ManagedObject
+        collector = api._conn.content.propertyCollector.CreatePropertyCollector.return_value
+        root_folder = api._conn.content.rootFolder
+        root_folder.name = 'root-folder'
+
+        def update_set(version, object_updates, truncated=False):
+            return MagicMock(version=version, truncated=truncated, filterSet=[MagicMock(objectSet=object_updates)])
+
+        def change(name, val, op='assign'):
+            change = MagicMock(val=val, op=op)
+            change.name = name
+            return change
+
+        collector.WaitForUpdatesEx.side_effect = [
+            update_set('1', [MagicMock(obj='foo', kind='enter', changeSet=[change('name', 'foo')])], truncated=True),
+            update_set('2', [MagicMock(obj='bar', kind='enter', changeSet=[change('name', 'bar')])]),
+        ]
+        assert api.get_infrastructure_updates('') == (
+            '2',
+            True,
+            {'foo': {'name': 'foo'}, 'bar': {'name': 'bar'}, root_folder: {'name': 'root-folder', 'parent': None}},
+            set(),
+        )
+        assert [c.args[0] for c in collector.WaitForUpdatesEx.call_args_list] == ['', '1']
+
+        collector.WaitForUpdatesEx.side_effect = [
+            update_set(
+                '3',
+                [
+                    MagicMock(
+                        obj='foo', kind='modify', changeSet=[change('name', 'baz'), change('parent', None, 'remove')]
+                    ),
+                    MagicMock(obj='bar', kind='leave', changeSet=[]),
+                ],
+            )
+        ]
+        assert api.get_infrastructure_updates('2') == ('3', False, {'foo': {'name': 'baz', 'parent': None}}, {'bar'})
+
+        # No update since the previous call
+        collector.WaitForUpdatesEx.side_effect = [None]
+        assert api.get_infrastructure_updates('3') == ('3', False, {}, set())
+        collector.CreateFilter.assert_called_once()
+
+        # The filter is created again with a new connection, and returns the whole infrastructure
+        api.smart_connect()
+        collector.WaitForUpdatesEx.side_effect = [update_set('1', [])]
+        assert api.get_infrastructure_updates('3') == (
+            '1',
+            True,
+            {root_folder: {'name': 'root-folder', 'parent': None}},
+            set(),
+        )
+        assert collector.WaitForUpdatesEx.call_args.args[0] == ''
+        assert collector.CreateFilter.call_count == 2
+
+
 @pytest.mark.parametrize(
     'exception, expected_calls',
     [
@@ -8,7 +8,12 @@ from mock import MagicMock, patch
 from pyVmomi import vim
 from six import iteritems
 
-from datadog_checks.vsphere.cache import InfrastructureCache, MetricsMetadataCache, VSphereCache
+from datadog_checks.vsphere.cache import (
+    InfrastructureCache,
+    InfrastructureInventory,
+    MetricsMetadataCache,
+    VSphereCache,
+)
 from datadog_checks.vsphere.config import VSphereConfig
 from datadog_checks.vsphere.constants import ALL_RESOURCES_WITH_METRICS
 
@@ -100,3 +105,37 @@ def test_infrastructure_cache(realtime_instance):
     assert cache.get_mor_tags(vm_mor) == ['my_cat_name_1:my_tag_name_1', 'my_cat_name_2:my_tag_name_2']
     assert cache.get_mor_tags(datastore) == ['my_cat_name_2:my_tag_name_2']
     assert cache.get_mor_tags(vm2_mor) == []
+
+
+def test_infrastructure_inventory():
+    inventory = InfrastructureInventory()
+    folder, cluster, host, vm = (MagicMock(name=name) for name in ('folder', 'cluster', 'host', 'vm'))
+    data = {
+        folder: {'name': 'folder', 'parent': None},
+        cluster: {'name': 'cluster', 'parent': folder},
+        host: {'name': 'host', 'parent': cluster},
+        vm: {'name': 'vm', 'parent': folder, 'runtime.host': host},
+    }
+    assert inventory.apply_updates('1', True, data, set()) == {folder, cluster, host, vm}
+    assert inventory.version == '1'
+
+    # Resources depending on the changed one through `parent` or `runtime.host` are affected
+    assert inventory.apply_updates('2', False, {cluster: {'name': 'new-cluster'}}, set()) == {cluster, host, vm}
+    assert inventory.data[cluster] == {'name': 'new-cluster', 'parent': folder}
+
+    # Unchanged properties are ignored
+    assert inventory.apply_updates('3', False, {host: {'name': 'host'}}, set()) == set()
+
+    # The VM does not depend on the host anymore
+    assert inventory.apply_updates('4', False, {vm: {'runtime.host': None}}, set()) == {vm}
+    assert inventory.data[vm] == {'name': 'vm', 'parent': folder}
+    assert inventory.apply_updates('5', False, {host: {'name': 'new-host'}}, set()) == {host}
+
+    assert inventory.apply_updates('6', False, {}, {vm}) == {vm}
+    assert vm not in inventory.data
+    assert inventory.apply_updates('7', False, {}, {vm}) == set()
+
+    # The whole infrastructure replaces the known one
+    assert inventory.apply_updates('1', True, {folder: {'name': 'folder', 'parent': None}}, set()) == {folder}
+    # Properties set to None are removed
+    assert inventory.data == {folder: {'name': 'folder'}}
@@ -9,6 +9,7 @@ import time
 import mock
 import pytest
 from mock import MagicMock
+from pyVmomi import vim
 
 from datadog_checks.base import to_string
 from datadog_checks.vsphere import VSphereCheck
@@ -38,6 +39,61 @@ def test_realtime_metrics(aggregator, dd_run_check, realtime_instance):
     aggregator.assert_all_metrics_covered()
 
 
+@pytest.mark.usefixtures("mock_type", "mock_threadpool", "mock_api")
+def test_realtime_metrics_incremental_infrastructure_cache(aggregator, dd_run_check, realtime_instance):
+    """The infrastructure cache built from the infrastructure updates produces the same metrics."""
+    realtime_instance['incremental_infrastructure_cache'] = True
+    check = VSphereCheck('vsphere', {}, [realtime_instance])
+    dd_run_check(check)
+
+    fixture_file = os.path.join(HERE, 'fixtures', 'metrics_realtime_values.json')
+    with open(fixture_file, 'r') as f:
+        data = json.load(f)
+        for metric in data:
+            aggregator.assert_metric(
+                metric['name'], metric.get('value'), hostname=metric.get('hostname'), tags=metric.get('tags')
+            )
+
+    aggregator.assert_metric('datadog.vsphere.collect_events.time', metric_type=aggregator.GAUGE, count=1)
+    aggregator.assert_metric('datadog.vsphere.refresh_infrastructure_cache.time', count=1)
+    aggregator.assert_all_metrics_covered()
+
+
+@pytest.mark.usefixtures("mock_type", "mock_threadpool", "mock_api")
+def test_incremental_infrastructure_cache_updates(dd_run_check, realtime_instance):
+    realtime_instance['incremental_infrastructure_cache'] = True
+    check = VSphereCheck('vsphere', {}, [realtime_instance])
+    dd_run_check(check)
+
+    mors = {props['name']: mor for mor, props in check.api.infrastructure_data.items()}
+    host, vm_on_host, other_vm = mors['10.0.0.104'], mors['VM4-1'], mors['VM3-1']
+    assert 'vsphere_host:10.0.0.104' in check.infrastructure_cache.get_mor_props(vm_on_host)['tags']
+
+    check.api.infrastructure_updates.append(
+        ({host: {'name': 'esxi-104'}, other_vm: {'runtime.powerState': None}}, {mors['VM4-2']})
+    )
+    check.cache_mor = MagicMock(wraps=check.cache_mor)
+    check.submit_external_host_tags = MagicMock()
+    dd_run_check(check)
+
+    # Only the changed resources and the VMs running on the renamed host are processed again
+    processed = {c.args[0] for c in check.cache_mor.call_args_list}
+    assert processed == {mor for name, mor in mors.items() if name.startswith('VM4-')} | {host, other_vm}
+    check.submit_external_host_tags.assert_called_once()
+
+    assert check.infrastructure_cache.get_mor_props(host)['hostname'] == 'esxi-104'
+    assert 'vsphere_host:esxi-104' in check.infrastructure_cache.get_mor_props(vm_on_host)['tags']
+    assert check.infrastructure_cache.get_mor_props(other_vm) is None
+    assert check.infrastructure_cache.get_mor_props(mors['VM4-2']) is None
+
+    # Nothing changed since the previous run
+    check.cache_mor.reset_mock()
+    check.submit_external_host_tags.reset_mock()
+    dd_run_check(check)
+    check.cache_mor.assert_not_called()
+    check.submit_external_host_tags.assert_not_called()
+
+
 @pytest.mark.usefixtures("mock_type", "mock_threadpool", "mock_api")
 def test_historical_metrics(aggregator, dd_run_check, historical_instance):
     """This test asserts that the same api content always produces the same metrics."""
@@ -53,6 +109,39 @@ def test_historical_metrics(aggregator, dd_run_check, historical_instance):
     aggregator.assert_all_metrics_covered()
 
 
+@pytest.mark.usefixtures("mock_type", "mock_threadpool", "mock_api")
+def test_adaptive_metrics_per_query(aggregator, dd_run_check, historical_instance):
+    historical_instance.update(metrics_per_query=1, max_historical_metrics=4, adaptive_metrics_per_query=True)
+    check = VSphereCheck('vsphere', {}, [historical_instance])
+    dd_run_check(check)
+
+    fixture_file = os.path.join(HERE, 'fixtures', 'metrics_historical_values.json')
+    with open(fixture_file, 'r') as f:
+        data = json.load(f)
+        for metric in data:
+            aggregator.assert_metric(metric['name'], metric.get('value'), tags=metric.get('tags'))
+    aggregator.assert_all_metrics_covered()
+
+    # Fast queries lead to larger batches, up to the historical metrics limit
+    queries_count = len(aggregator.metrics('datadog.vsphere.query_metrics.time'))
+    aggregator.reset()
+    dd_run_check(check)
+    assert len(aggregator.metrics('datadog.vsphere.query_metrics.time')) < queries_count
+    assert check.batch_size.get(vim.Datastore, 1) > 1
+
+    for _ in range(5):
+        dd_run_check(check)
+    mors = list(check.infrastructure_cache.get_mors(vim.Datastore))
+    metric_ids = [vim.PerformanceManager.MetricId(counterId=i, instance='') for i in range(10)]
+    batches = list(check.make_batch(mors, metric_ids, vim.Datastore))
+    assert max(sum(len(m) for m in batch.values()) for batch in batches) == 4
+
+    # Clusters are always queried one metric at a time
+    mors = list(check.infrastructure_cache.get_mors(vim.ClusterComputeResource))
+    batches = list(check.make_batch(mors, metric_ids, vim.ClusterComputeResource))
+    assert all(sum(len(m) for m in batch.values()) == 1 for batch in batches)
+
+
 @pytest.mark.usefixtures("mock_type", "mock_threadpool", "mock_api")
 def test_historical_metrics_no_dsc_folder(aggregator, dd_run_check, historical_instance):
     """This test does the same check than test_historical_events, but deactivate the option to get datastore cluster
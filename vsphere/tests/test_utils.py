@@ -3,11 +3,21 @@
 # Licensed under Simplified BSD License (see LICENSE)
 
 import pytest
+from mock import MagicMock, patch
 from pytest import param
 from pyVmomi import vim
 
+from datadog_checks.vsphere import utils
 from datadog_checks.vsphere.config import VSphereConfig
-from datadog_checks.vsphere.utils import get_mapped_instance_tag, should_collect_per_instance_values
+from datadog_checks.vsphere.utils import (
+    AdaptiveBatchSize,
+    HierarchyTags,
+    get_mapped_instance_tag,
+    get_tags_recursively,
+    should_collect_per_instance_values,
+)
+
+from .mocked_api import MockedAPI
 
 
 @pytest.mark.parametrize(
@@ -50,3 +60,68 @@ def test_should_collect_per_instance_values(metric_name, resource_type, expect_m
     )
 
     assert expect_match == should_collect_per_instance_values(config, metric_name, resource_type)
+
+
+def test_hierarchy_tags(realtime_instance):
+    config = VSphereConfig(realtime_instance, {}, MagicMock())
+    infrastructure_data = MockedAPI(config).get_infrastructure()
+    mors = {props['name']: mor for mor, props in infrastructure_data.items()}
+
+    hierarchy_tags = HierarchyTags(infrastructure_data, config)
+    with patch('datadog_checks.vsphere.utils.get_entity_tags', wraps=utils.get_entity_tags) as get_entity_tags:
+        all_tags = {mor: hierarchy_tags.get(mor) for mor in infrastructure_data}
+    # The tags of each resource are computed once
+    assert get_entity_tags.call_count == len(infrastructure_data)
+
+    for mor, props in infrastructure_data.items():
+        expected_tags = tuple(utils.get_entity_tags(mor, props, config))
+        if props['parent'] is not None:
+            expected_tags += all_tags[props['parent']]
+        assert all_tags[mor] == expected_tags
+
+    host = mors['10.0.0.104']
+    assert hierarchy_tags.get(host) == (
+        'vsphere_host:10.0.0.104',
+        'vsphere_cluster:Cluster2',
+        'vsphere_compute:Cluster2',
+        'vsphere_folder:host',
+        'vsphere_datacenter:Datacenter2',
+        'vsphere_folder:Datacenters',
+    )
+    assert hierarchy_tags.get(host, include_only=['vsphere_cluster']) == ('vsphere_cluster:Cluster2',)
+    assert list(hierarchy_tags.get(host)) == get_tags_recursively(host, infrastructure_data, config)
+
+    # The children of a resource share the tags of their parent
+    cluster = mors['Cluster2']
+    infrastructure_data[cluster]['name'] = 'Cluster3'
+    assert hierarchy_tags.get(host, include_only=['vsphere_cluster']) == ('vsphere_cluster:Cluster2',)
+    hierarchy_tags.invalidate([cluster, host])
+    assert hierarchy_tags.get(host, include_only=['vsphere_cluster']) == ('vsphere_cluster:Cluster3',)
+    assert hierarchy_tags.get(host)[1:] == hierarchy_tags.get(cluster)
+
+
+def test_adaptive_batch_size():
+    batch_size = AdaptiveBatchSize(target_time=4, target_series=1000)
+    assert batch_size.get(vim.VirtualMachine, 500) == 500
+
+    # Fast and small queries double the batch size at most
+    batch_size.record(vim.VirtualMachine, 500, 0.1, 10)
+    assert batch_size.get(vim.VirtualMachine, 500) == 1000
+    batch_size.record(vim.VirtualMachine, 1000, 0.1, 10)
+    assert batch_size.get(vim.VirtualMachine, 500) == 1500
+
+    # The batch size moves halfway towards the one that would have taken the target time
+    batch_size.record(vim.VirtualMachine, 1500, 8, 10)
+    assert batch_size.get(vim.VirtualMachine, 500) == 1125
+
+    # Too many series returned
+    batch_size.record(vim.VirtualMachine, 1000, 1, 4000)
+    assert batch_size.get(vim.VirtualMachine, 500) == 812
+
+    batch_size.record_failure(vim.VirtualMachine, 800)
+    assert batch_size.get(vim.VirtualMachine, 500) == 606
+
+    # Each resource type has its own batch size, which is never below 1
+    assert batch_size.get(vim.HostSystem, 500) == 500
+    batch_size.record_failure(vim.HostSystem, 1)
+    assert batch_size.get(vim.HostSystem, 500) == 1